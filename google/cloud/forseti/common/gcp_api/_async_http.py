@@ -0,0 +1,147 @@
+# Copyright 2020 The Forseti Security Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Pooled asyncio HTTP transport for the discovery API requests.
+
+The requests are built by the discovery client as usual and sent over a
+shared httpx client per event loop, which keeps connections alive and
+multiplexes the requests to an API host over HTTP/2 when h2 is installed.
+"""
+
+import asyncio
+import random
+
+import google_auth_httplib2
+import httplib2
+
+from google.cloud.forseti.common.util import http_helpers
+from google.cloud.forseti.common.util import logger
+
+LOGGER = logger.get_logger(__name__)
+
+try:
+    import httpx
+    HTTPX_IMPORTED = True
+except ImportError:
+    LOGGER.info('Async HTTP transport is not available because the `httpx` '
+                'library was not found, async queries run the requests on '
+                'threads instead. Run `sudo pip3 install .[async_http]` to '
+                'install it.')
+    HTTPX_IMPORTED = False
+
+# Connection pool limits of the shared client.
+MAX_CONNECTIONS = 100
+MAX_KEEPALIVE_CONNECTIONS = 20
+
+# Responses retried by the transport, like HttpRequest.execute.
+_RETRIED_STATUS_MIN = 500
+_THROTTLED_STATUS = 429
+
+# event loop -> shared httpx.AsyncClient.
+_CLIENTS = {}
+
+
+def _new_client():
+    """Create a pooled client, using HTTP/2 if h2 is installed.
+
+    Returns:
+        httpx.AsyncClient: The client.
+    """
+    limits = httpx.Limits(max_connections=MAX_CONNECTIONS,
+                          max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS)
+    timeout = httpx.Timeout(http_helpers.HTTP_REQUEST_TIMEOUT)
+    try:
+        return httpx.AsyncClient(http2=True, limits=limits, timeout=timeout)
+    except ImportError:
+        LOGGER.info('HTTP/2 is not available because the `h2` library was '
+                    'not found, using HTTP/1.1 keep-alive connections.')
+        return httpx.AsyncClient(limits=limits, timeout=timeout)
+
+
+def get_client():
+    """Get the shared client of the running event loop.
+
+    Returns:
+        httpx.AsyncClient: The client, created on first use.
+    """
+    loop = asyncio.get_event_loop()
+    client = _CLIENTS.get(loop)
+    if client is None:
+        client = _new_client()
+        _CLIENTS[loop] = client
+    return client
+
+
+async def close_client():
+    """Close the shared client of the running event loop, if any."""
+    client = _CLIENTS.pop(asyncio.get_event_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+async def _authorize(credentials, headers):
+    """Add the authorization headers, refreshing the credentials if needed.
+
+    Args:
+        credentials (google.auth.credentials.Credentials): The credentials.
+        headers (dict): The request headers to update.
+    """
+    if not credentials.valid:
+        # The refresh is a blocking call to the token endpoint.
+        auth_request = google_auth_httplib2.Request(
+            http_helpers.build_http())
+        await asyncio.get_event_loop().run_in_executor(
+            None, credentials.refresh, auth_request)
+    credentials.apply(headers)
+
+
+async def send(request, credentials, num_retries=0):
+    """Send a discovery request and parse the response.
+
+    Server errors and throttled responses are retried with randomized
+    exponential backoff, like HttpRequest.execute.
+
+    Args:
+        request (HttpRequest): The request built by the discovery client.
+        credentials (google.auth.credentials.Credentials): The credentials
+            to authorize the request with.
+        num_retries (int): The number of retries of retriable responses.
+
+    Returns:
+        object: The deserialized response.
+
+    Raises:
+        HttpError: Raised by the request postproc for error responses.
+    """
+    client = get_client()
+    headers = dict(request.headers)
+    for retry_num in range(num_retries + 1):
+        if retry_num:
+            sleep_time = random.random() * 2 ** retry_num
+            LOGGER.warning('Sleeping %.2f seconds before retry %d of %d for '
+                           '%s: %s', sleep_time, retry_num, num_retries,
+                           request.method, request.uri)
+            await asyncio.sleep(sleep_time)
+
+        await _authorize(credentials, headers)
+        response = await client.request(request.method, request.uri,
+                                        content=request.body,
+                                        headers=headers)
+        status = response.status_code
+        if status < _RETRIED_STATUS_MIN and status != _THROTTLED_STATUS:
+            break
+
+    info = dict(response.headers)
+    info['status'] = str(status)
+    return request.postproc(httplib2.Response(info), response.content)
@@ -15,10 +15,11 @@
 """Base GCP client which uses the discovery API."""
 from builtins import str
 from builtins import object
-import json
+import asyncio
 import logging
 import os
 import threading
+import time
 
 from urllib.parse import urljoin
 from future import standard_library
@@ -27,18 +28,22 @@ import google_auth_httplib2
 import pkg_resources
 import uritemplate
 from googleapiclient import discovery
-from ratelimiter import RateLimiter
+from googleapiclient import errors
 from retrying import retry
 
 import google.auth
 from google.auth.credentials import with_scopes_if_required
 
+from google.cloud.forseti.common.gcp_api import _async_http
+from google.cloud.forseti.common.gcp_api import _discovery_cache
 from google.cloud.forseti.common.gcp_api import _supported_apis
 from google.cloud.forseti.common.gcp_api import errors as api_errors
 from google.cloud.forseti.common.util import http_helpers
 from google.cloud.forseti.common.util import logger
+from google.cloud.forseti.common.util import page_prefetcher
 from google.cloud.forseti.common.util import replay
 from google.cloud.forseti.common.util import retryable_exceptions
+from google.cloud.forseti.common.util import token_bucket
 import google.oauth2.credentials
 
 standard_library.install_aliases()
@@ -53,6 +58,18 @@ LOGGER = logger.get_logger(__name__)
 # Default value num_retries within HttpRequest execute method
 NUM_HTTP_RETRIES = 5
 
+# Attempts and maximum backoff of the async execution, like the retry
+# decorator of _execute.
+ASYNC_MAX_ATTEMPTS = 5
+ASYNC_MAX_BACKOFF_SECONDS = 10
+
+# Calls per batch request, the maximum recommended by the Google APIs.
+MAX_BATCH_SIZE = 100
+# Attempts and maximum backoff of the calls of a batch that failed with a
+# retriable error.
+BATCH_MAX_ATTEMPTS = 5
+BATCH_MAX_BACKOFF_SECONDS = 10
+
 # Support older versions of apiclient without cache support
 SUPPORT_DISCOVERY_CACHE = (
     pkg_resources.get_distribution(
@@ -66,6 +83,65 @@ REQUEST_REPLAYER = dict()
 DISCOVERY_DOCS_BASE_DIR = os.path.join(os.path.abspath(
     os.path.dirname(__file__)), 'discovery_documents')
 
+# (service name, version, developer key, is private API, versioned discovery
+# doc) -> (service object, build time), shared by all the clients of the
+# process. The cached service objects are not bound to any credentials, every
+# request is executed with the authorized http object of the calling
+# repository, also the calls of batch requests. The service objects are built
+# again once their discovery document expires.
+_SERVICE_APIS = {}
+_SERVICE_APIS_LOCK = threading.Lock()
+
+
+def _get_service_api(credentials, service_name, version, is_private_api,
+                     developer_key=None, cache_discovery=True,
+                     use_versioned_discovery_doc=False):
+    """Returns a cloud API service object, building it on first use.
+
+    When cache_discovery is set, the service objects are built once per
+    process without credentials and shared by all the clients of the API,
+    which pass their own authorized http when executing a request.
+
+    Args:
+        credentials (OAuth2Credentials): Credentials that will be used to
+            authenticate the API calls, bound to the service object only when
+            it is not cached.
+        service_name (str): The name of the API.
+        version (str): The version of the API to use.
+        is_private_api (bool): Whether the API is a private API.
+        developer_key (str): The api key to use to determine the project
+            associated with the API call, most API services do not require
+            this to be set.
+        cache_discovery (bool): Whether or not to cache the discovery doc and
+            the service object.
+        use_versioned_discovery_doc (bool): When set to true, will use the
+            discovery doc with the version suffix in the filename.
+
+    Returns:
+        object: A Resource object with methods for interacting with the service.
+    """
+    if not cache_discovery:
+        return _create_service_api(credentials, service_name, version,
+                                   is_private_api, developer_key,
+                                   cache_discovery,
+                                   use_versioned_discovery_doc)
+
+    key = (service_name, version, developer_key, is_private_api,
+           use_versioned_discovery_doc)
+    with _SERVICE_APIS_LOCK:
+        service_api, built = _SERVICE_APIS.get(key, (None, 0))
+    if (service_api is not None and
+            time.time() - built <= _discovery_cache.MAX_AGE_SECONDS):
+        return service_api
+
+    service_api = _create_service_api(None, service_name, version,
+                                      is_private_api, developer_key,
+                                      cache_discovery,
+                                      use_versioned_discovery_doc)
+    with _SERVICE_APIS_LOCK:
+        _SERVICE_APIS[key] = (service_api, time.time())
+    return service_api
+
 
 @retry(retry_on_exception=retryable_exceptions.is_retryable_exception,
        wait_exponential_multiplier=1000, wait_exponential_max=10000,
@@ -77,14 +153,16 @@ def _create_service_api(credentials, service_name, version, is_private_api,
 
     Args:
         credentials (OAuth2Credentials): Credentials that will be used to
-            authenticate the API calls.
+            authenticate the API calls, or None to build a service object
+            that is not bound to any credentials.
         service_name (str): The name of the API.
         version (str): The version of the API to use.
         is_private_api (bool): Whether the API is a private API.
         developer_key (str): The api key to use to determine the project
             associated with the API call, most API services do not require
             this to be set.
-        cache_discovery (bool): Whether or not to cache the discovery doc.
+        cache_discovery (bool): Whether or not to cache the discovery doc,
+            in memory and on disk.
         use_versioned_discovery_doc (bool): When set to true, will use the
             discovery doc with the version suffix in the filename.
 
@@ -114,10 +192,16 @@ def _create_service_api(credentials, service_name, version, is_private_api,
     discovery_kwargs = {
         'serviceName': service_name,
         'version': version,
-        'developerKey': developer_key,
-        'credentials': credentials}
+        'developerKey': developer_key}
+    if credentials:
+        discovery_kwargs['credentials'] = credentials
+    else:
+        discovery_kwargs['http'] = http_helpers.build_http()
     if SUPPORT_DISCOVERY_CACHE:
         discovery_kwargs['cache_discovery'] = cache_discovery
+        if cache_discovery:
+            discovery_kwargs['cache'] = _discovery_cache.get_cache(
+                service_name, version)
 
     return discovery.build(**discovery_kwargs)
 
@@ -127,21 +211,40 @@ def _build_service_from_document(credentials, document_path):
 
     Args:
         credentials (OAuth2Credentials): Credentials that will be used to
-            authenticate the API calls.
+            authenticate the API calls, or None to build a service object
+            that is not bound to any credentials.
         document_path (str): The local path of the discovery document
 
     Returns:
         object: A Resource object with methods for interacting with the service.
     """
-    with open(document_path, 'r') as f:
-        discovery_data = json.load(f)
+    discovery_data = _discovery_cache.load_document(document_path)
 
+    if not credentials:
+        return discovery.build_from_document(
+            service=discovery_data,
+            http=http_helpers.build_http()
+        )
     return discovery.build_from_document(
         service=discovery_data,
         credentials=credentials
     )
 
 
+def _is_retryable_batch_error(e):
+    """Whether a failed call of a batch request should be sent again.
+
+    Args:
+        e (Exception): The error of the call.
+
+    Returns:
+        bool: True for retriable errors and server errors.
+    """
+    if isinstance(e, errors.HttpError) and e.resp.status >= 500:
+        return True
+    return retryable_exceptions.is_retryable_exception(e)
+
+
 # pylint: disable=too-many-instance-attributes
 class BaseRepositoryClient(object):
     """Base class for API repository for a specified Cloud API."""
@@ -155,6 +258,7 @@ class BaseRepositoryClient(object):
                  use_rate_limiter=False,
                  read_only=False,
                  use_versioned_discovery_doc=False,
+                 prefetch_pages=0,
                  **kwargs):
         """Constructor.
 
@@ -172,6 +276,8 @@ class BaseRepositoryClient(object):
                 would modify a resource within the repository.
             use_versioned_discovery_doc (bool): When set to true, will use the
                 discovery doc with the version suffix in the filename.
+            prefetch_pages (int): The number of pages of paged queries fetched
+                ahead of the caller, 0 disables prefetching.
             **kwargs (dict): Additional args such as version.
         """
         self._use_cached_http = False
@@ -186,12 +292,14 @@ class BaseRepositoryClient(object):
         self._repository_lock = threading.RLock()
 
         if use_rate_limiter:
-            self._rate_limiter = RateLimiter(max_calls=quota_max_calls,
-                                             period=quota_period)
+            # The bucket is shared by all the clients of the API.
+            self._rate_limiter = token_bucket.get_token_bucket(
+                api_name, quota_max_calls, quota_period)
         else:
             self._rate_limiter = None
 
         self._read_only = read_only
+        self._prefetch_pages = prefetch_pages
 
         self.name = api_name
 
@@ -223,13 +331,13 @@ class BaseRepositoryClient(object):
 
         self.gcp_services = {}
         for version in versions:
-            self.gcp_services[version] = _create_service_api(
+            self.gcp_services[version] = _get_service_api(
                 self._credentials,
                 self.name,
                 version,
                 self.is_private_api,
                 kwargs.get('developer_key'),
-                kwargs.get('cache_discovery', False),
+                kwargs.get('cache_discovery', True),
                 use_versioned_discovery_doc)
 
     def __repr__(self):
@@ -264,7 +372,8 @@ class BaseRepositoryClient(object):
                                     credentials=self._credentials,
                                     rate_limiter=self._rate_limiter,
                                     use_cached_http=self._use_cached_http,
-                                    read_only=self._read_only)
+                                    read_only=self._read_only,
+                                    prefetch_pages=self._prefetch_pages)
 
 
 # pylint: enable=too-many-instance-attributes
@@ -278,7 +387,7 @@ class GCPRepository(object):
                  entity_field=None, list_key_field=None, get_key_field=None,
                  max_results_field='maxResults', search_query_field='query',
                  resource_path_template=None, rate_limiter=None,
-                 use_cached_http=True, read_only=False):
+                 use_cached_http=True, read_only=False, prefetch_pages=0):
         """Constructor.
 
         Args:
@@ -307,12 +416,15 @@ class GCPRepository(object):
                 and usually in the documentation for the API under the get
                 request. This is used when creating fake responses when running
                 in read only mode.
-            rate_limiter (object): A RateLimiter object to manage API quota.
+            rate_limiter (TokenBucket): A TokenBucket object to manage API
+                quota.
             use_cached_http (bool): If set to true, calls to the API will use
                 a thread local shared http object. When false a new http object
                 is used for each request.
             read_only (bool): When set to true, disables any API calls that
                 would modify a resource within the repository.
+            prefetch_pages (int): The number of pages of paged queries fetched
+                ahead of the caller, 0 disables prefetching.
         """
         self.gcp_service = gcp_service
         self.read_only = read_only
@@ -341,6 +453,8 @@ class GCPRepository(object):
 
         self._use_cached_http = use_cached_http
         self._local = LOCAL_THREAD
+        self._prefetch_pages = max(int(prefetch_pages or 0), 0)
+        self._pager_metrics = page_prefetcher.PagerMetrics()
 
     @property
     def http(self):
@@ -444,6 +558,28 @@ class GCPRepository(object):
         request_submission_status = self._execute(request)
         return request_submission_status
 
+    def get_pager_metrics(self):
+        """Get the page throughput of the paged queries of the repository.
+
+        Returns:
+            dict: The number of pages, the pages per second and the time in
+                seconds the callers were blocked waiting for pages.
+        """
+        return self._pager_metrics.get_metrics()
+
+    def _prefetch(self, pages):
+        """Iterate the pages of a query, prefetching the next pages.
+
+        Args:
+            pages (iterator): The pages of the query.
+
+        Returns:
+            iterator: The pages, fetched ahead of the caller when page
+                prefetching is enabled.
+        """
+        return page_prefetcher.prefetch(
+            pages, self._prefetch_pages, self._pager_metrics)
+
     def execute_paged_query(self, verb, verb_arguments):
         """Executes query (ex. list) via a dedicated http object.
 
@@ -462,6 +598,19 @@ class GCPRepository(object):
             raise api_errors.PaginationNotSupportedError(
                 '{} does not support pagination')
 
+        yield from self._prefetch(self._paged_responses(verb, verb_arguments))
+
+    def _paged_responses(self, verb, verb_arguments):
+        """Requests the pages of a paged query.
+
+        Args:
+            verb (str): Method to execute on the component (ex. get, list).
+            verb_arguments (dict): key-value pairs to be passed to
+                _BuildRequest.
+
+        Yields:
+            dict: Service Response.
+        """
         request = self._build_request(verb, verb_arguments)
 
         number_of_pages_processed = 0
@@ -476,6 +625,20 @@ class GCPRepository(object):
     def execute_search_query(self, verb, verb_arguments):
         """Executes query (ex. search) via a dedicated http object.
 
+        Args:
+            verb (str): Method to execute on the component (ex. search).
+            verb_arguments (dict): key-value pairs to be passed to
+                _BuildRequest.
+
+        Yields:
+            dict: Service Response.
+        """
+        yield from self._prefetch(
+            self._search_responses(verb, verb_arguments))
+
+    def _search_responses(self, verb, verb_arguments):
+        """Requests the pages of a search query.
+
         Args:
             verb (str): Method to execute on the component (ex. search).
             verb_arguments (dict): key-value pairs to be passed to
@@ -503,6 +666,128 @@ class GCPRepository(object):
             if not next_page_token:
                 break
 
+    def execute_batch_query(self, verb, verb_arguments_list):
+        """Executes queries (ex. getIamPolicy) in batch requests.
+
+        The queries are sent in batch requests of up to MAX_BATCH_SIZE calls.
+        The calls that fail with a retriable error are retried in the next
+        batches, the other calls are not sent again.
+
+        When recording or replaying API responses, the queries are executed
+        one at a time instead, so the recordings hold one response per
+        query.
+
+        Args:
+            verb (str): Method to execute on the component (ex. get, list).
+            verb_arguments_list (list): The key-value pairs to be passed to
+                _BuildRequest, one dict per query.
+
+        Returns:
+            list: A (response, error) tuple per query, in the order of the
+                arguments. error is the exception raised by a failed query
+                and None on success.
+        """
+        requests = [self._build_request(verb, verb_arguments)
+                    for verb_arguments in verb_arguments_list]
+        if (os.environ.get(replay.RECORD_ENVIRONMENT_VAR) or
+                os.environ.get(replay.REPLAY_ENVIRONMENT_VAR)):
+            results = []
+            for request in requests:
+                try:
+                    results.append((self._execute(request), None))
+                except Exception as e:  # pylint: disable=broad-except
+                    results.append((None, e))
+            return results
+        return self._execute_batches(requests)
+
+    def _execute_batches(self, requests):
+        """Run requests in batches, retrying the failed calls.
+
+        Args:
+            requests (list): The HttpRequest objects to execute.
+
+        Returns:
+            list: A (response, error) tuple per request.
+        """
+        results = [(None, None)] * len(requests)
+        pending = list(range(len(requests)))
+        for attempt in range(1, BATCH_MAX_ATTEMPTS + 1):
+            if attempt > 1:
+                LOGGER.info('Retrying %d failed calls of batch requests, '
+                            'attempt %d.', len(pending), attempt)
+                time.sleep(min(2 ** (attempt - 1),
+                               BATCH_MAX_BACKOFF_SECONDS))
+            retry_indexes = []
+            for start in range(0, len(pending), MAX_BATCH_SIZE):
+                batch_indexes = pending[start:start + MAX_BATCH_SIZE]
+                for index, response, error in self._execute_batch(
+                        [(i, requests[i]) for i in batch_indexes]):
+                    results[index] = (response, error)
+                    if (error is not None and
+                            attempt < BATCH_MAX_ATTEMPTS and
+                            _is_retryable_batch_error(error)):
+                        retry_indexes.append(index)
+            pending = retry_indexes
+            if not pending:
+                break
+        return results
+
+    def _execute_batch(self, indexed_requests):
+        """Run one batch request with rate limiting.
+
+        Each call of the batch takes a token from the rate limiter, as each
+        call counts against the API quota.
+
+        Args:
+            indexed_requests (list): The (index, HttpRequest) pairs of the
+                calls of the batch.
+
+        Returns:
+            list: The (index, response, error) tuples of the calls.
+        """
+        results = {}
+
+        def callback(request_id, response, exception):
+            """Store the result of a call of the batch.
+
+            Args:
+                request_id (str): The index of the call.
+                response (object): The deserialized response.
+                exception (Exception): The error of the call, if any.
+            """
+            results[int(request_id)] = (response, exception)
+
+        # The calls of a batch are authorized with the credentials of the http
+        # object of each request, not of the http object executing the batch,
+        # and the shared service objects are not bound to any credentials.
+        authorized_http = self.http
+        batch = self.gcp_service.new_batch_http_request(callback=callback)
+        for index, request in indexed_requests:
+            if self._rate_limiter:
+                self._rate_limiter.acquire()
+            request.http = authorized_http
+            batch.add(request, request_id=str(index))
+
+        started = time.time()
+        try:
+            batch.execute(http=authorized_http)
+        except Exception as e:  # pylint: disable=broad-except
+            LOGGER.warning('Batch request of %d calls failed: %s',
+                           len(indexed_requests), e)
+            for index, _ in indexed_requests:
+                results.setdefault(index, (None, e))
+        finally:
+            if self._rate_limiter:
+                latency = time.time() - started
+                for index, _ in indexed_requests:
+                    error = results.get(index, (None, None))[1]
+                    self._rate_limiter.record(
+                        latency,
+                        error.resp.status if isinstance(
+                            error, errors.HttpError) else None)
+
+        return [(index,) + results[index] for index, _ in indexed_requests]
+
     def execute_query(self, verb, verb_arguments):
         """Executes query (ex. get) via a dedicated http object.
 
@@ -517,6 +802,116 @@ class GCPRepository(object):
         request = self._build_request(verb, verb_arguments)
         return self._execute(request)
 
+    async def execute_query_async(self, verb, verb_arguments):
+        """Executes query (ex. get) over the async HTTP transport.
+
+        Args:
+            verb (str): Method to execute on the component (ex. get, list).
+            verb_arguments (dict): key-value pairs to be passed to
+                _BuildRequest.
+
+        Returns:
+            dict: Service Response.
+        """
+        request = self._build_request(verb, verb_arguments)
+        return await self._execute_async(request)
+
+    async def execute_paged_query_async(self, verb, verb_arguments):
+        """Executes query (ex. list) over the async HTTP transport.
+
+        Args:
+            verb (str): Method to execute on the component (ex. get, list).
+            verb_arguments (dict): key-value pairs to be passed to
+                _BuildRequest.
+
+        Yields:
+            dict: Service Response.
+
+        Raises:
+            PaginationNotSupportedError: When an API does not support paging.
+        """
+        if not self._request_supports_pagination(verb=verb):
+            raise api_errors.PaginationNotSupportedError(
+                '{} does not support pagination')
+
+        request = self._build_request(verb, verb_arguments)
+
+        number_of_pages_processed = 0
+        while request is not None:
+            response = await self._execute_async(request)
+            number_of_pages_processed += 1
+            LOGGER.debug('Executing async paged request # %s',
+                         number_of_pages_processed)
+            request = self._build_next_request(verb, request, response)
+            yield response
+
+    async def _execute_async(self, request):
+        """Run execute over the async HTTP transport.
+
+        Without httpx, the request is executed by _execute on a thread of the
+        event loop executor instead.
+
+        Args:
+            request (object): The HttpRequest object to execute.
+
+        Returns:
+            dict: The response from the API.
+        """
+        if not _async_http.HTTPX_IMPORTED:
+            return await asyncio.get_event_loop().run_in_executor(
+                None, self._execute, request)
+        return await self._execute_async_http(request)
+
+    @replay.replay_async(REQUEST_REPLAYER)
+    @replay.record_async(REQUEST_RECORDER)
+    async def _execute_async_http(self, request):
+        """Send a request with retries and rate limiting.
+
+        Args:
+            request (object): The HttpRequest object to execute.
+
+        Returns:
+            dict: The response from the API.
+
+        Raises:
+            Exception: The error of the last attempt, or a non retryable
+                error.
+        """
+        for attempt in range(1, ASYNC_MAX_ATTEMPTS + 1):
+            try:
+                return await self._send_async(request)
+            except Exception as e:  # pylint: disable=broad-except
+                if (attempt == ASYNC_MAX_ATTEMPTS or
+                        not retryable_exceptions.is_retryable_exception(e)):
+                    raise
+                await asyncio.sleep(min(2 ** attempt,
+                                        ASYNC_MAX_BACKOFF_SECONDS))
+
+    async def _send_async(self, request):
+        """Send a request, taking a token from the rate limiter first.
+
+        Args:
+            request (object): The HttpRequest object to execute.
+
+        Returns:
+            dict: The response from the API.
+        """
+        if not self._rate_limiter:
+            return await _async_http.send(request, self._credentials,
+                                          self._num_retries)
+
+        await self._rate_limiter.acquire_async()
+        started = time.time()
+        status = None
+        try:
+            return await _async_http.send(request, self._credentials,
+                                          self._num_retries)
+        except errors.HttpError as e:
+            status = e.resp.status
+            raise
+        finally:
+            self._rate_limiter.record(time.time() - started, status)
+
     @replay.replay(REQUEST_REPLAYER)
     @replay.record(REQUEST_RECORDER)
     @retry(retry_on_exception=retryable_exceptions.is_retryable_exception,
@@ -534,14 +929,20 @@ class GCPRepository(object):
         if hasattr(self.http, 'data'):
             if isinstance(self.http.data, str):
                 self.http.data = self.http.data.encode()
-        if self._rate_limiter:
-            # Since the ratelimiter library only exposes a context manager
-            # interface the code has to be duplicated to handle the case where
-            # no rate limiter is defined.
-            with self._rate_limiter:
-                return request.execute(http=self.http,
-                                       num_retries=self._num_retries)
-        return request.execute(http=self.http,
-                               num_retries=self._num_retries)
+        if not self._rate_limiter:
+            return request.execute(http=self.http,
+                                   num_retries=self._num_retries)
+
+        self._rate_limiter.acquire()
+        started = time.time()
+        status = None
+        try:
+            return request.execute(http=self.http,
+                                   num_retries=self._num_retries)
+        except errors.HttpError as e:
+            status = e.resp.status
+            raise
+        finally:
+            self._rate_limiter.record(time.time() - started, status)
 # pylint: enable=too-many-instance-attributes, too-many-arguments
 # pylint: enable=too-many-locals
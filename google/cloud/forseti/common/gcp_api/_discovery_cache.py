@@ -0,0 +1,260 @@
+# Copyright 2020 The Forseti Security Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Process wide and on disk cache of API discovery documents.
+
+The documents fetched by discovery.build are kept in memory and written to a
+cache directory, one file per service, version and discovery URL, so later
+processes (server restarts, CLI and scanner runs) build their API clients
+without fetching the documents again. The documents are fetched again once
+they are MAX_AGE_SECONDS old, in memory as on disk.
+"""
+
+import hashlib
+import json
+import os
+import stat
+import tempfile
+import threading
+import time
+
+from googleapiclient.discovery_cache import base
+
+from google.cloud.forseti.common.util import logger
+
+LOGGER = logger.get_logger(__name__)
+
+# Overrides the directory of the on disk cache.
+CACHE_DIR_ENVIRONMENT_VAR = 'FORSETI_DISCOVERY_CACHE_DIR'
+# The default directory is private to the user running the process, the
+# documents are never read from or written to a directory other users can
+# write to.
+DEFAULT_CACHE_DIR = os.path.join(
+    tempfile.gettempdir(), 'forseti_discovery_cache_{}'.format(os.getuid()))
+CACHE_DIR_MODE = 0o700
+
+# Documents older than this are fetched again, like the googleapiclient
+# file cache.
+MAX_AGE_SECONDS = 24 * 60 * 60
+
+# path -> parsed local discovery document.
+_LOCAL_DOCUMENTS = {}
+# (service name, version) -> DiscoveryCache.
+_CACHES = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def get_cache_dir():
+    """Get the directory of the on disk cache.
+
+    Returns:
+        str: The directory.
+    """
+    return os.environ.get(CACHE_DIR_ENVIRONMENT_VAR) or DEFAULT_CACHE_DIR
+
+
+def is_private_dir(cache_dir):
+    """Create the cache directory if needed, and check it is private.
+
+    Args:
+        cache_dir (str): The directory of the on disk cache.
+
+    Returns:
+        bool: True if the directory is owned by the current user and no other
+            user can write to it.
+    """
+    try:
+        os.makedirs(cache_dir, mode=CACHE_DIR_MODE, exist_ok=True)
+        dir_stat = os.lstat(cache_dir)
+    except (IOError, OSError) as e:
+        LOGGER.warning('Unable to create the discovery cache directory %s: '
+                       '%s', cache_dir, e)
+        return False
+
+    if not stat.S_ISDIR(dir_stat.st_mode):
+        LOGGER.warning('The discovery cache directory %s is not a directory, '
+                       'the on disk cache is disabled.', cache_dir)
+        return False
+    if dir_stat.st_uid != os.getuid():
+        LOGGER.warning('The discovery cache directory %s is owned by another '
+                       'user, the on disk cache is disabled.', cache_dir)
+        return False
+    if dir_stat.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        LOGGER.warning('The discovery cache directory %s is writable by '
+                       'other users, the on disk cache is disabled.',
+                       cache_dir)
+        return False
+    return True
+
+
+class DiscoveryCache(base.Cache):
+    """Discovery document cache of one API service and version."""
+
+    def __init__(self, service_name, version, cache_dir=None):
+        """Initialize.
+
+        Args:
+            service_name (str): The name of the API.
+            version (str): The version of the API.
+            cache_dir (str): The directory of the on disk cache, defaults to
+                get_cache_dir().
+        """
+        self.service_name = service_name
+        self.version = version
+        self.cache_dir = cache_dir or get_cache_dir()
+        self._lock = threading.Lock()
+        # url -> (document content, time the document was fetched).
+        self._documents = {}
+        # Whether the cache directory is private, checked on first use.
+        self._private_dir = None
+
+    def _is_usable(self):
+        """Whether the on disk cache can be used.
+
+        Returns:
+            bool: True if the cache directory is private to the current user.
+        """
+        if self._private_dir is None:
+            self._private_dir = is_private_dir(self.cache_dir)
+        return self._private_dir
+
+    def _path(self, url):
+        """The path of the cached document of a discovery URL.
+
+        Args:
+            url (str): The discovery URL, which may include an API key.
+
+        Returns:
+            str: The path of the cache file.
+        """
+        url_hash = hashlib.sha1(url.encode('utf-8')).hexdigest()[:12]
+        return os.path.join(self.cache_dir, '{}_{}_{}.json'.format(
+            self.service_name, self.version, url_hash))
+
+    def _read(self, url):
+        """Read a document from the on disk cache.
+
+        Args:
+            url (str): The discovery URL.
+
+        Returns:
+            tuple: The document and the time it was fetched, or None if it is
+                not cached or expired.
+        """
+        if not self._is_usable():
+            return None
+        path = self._path(url)
+        try:
+            fetched = os.path.getmtime(path)
+            if time.time() - fetched > MAX_AGE_SECONDS:
+                return None
+            with open(path, 'r') as infile:
+                return infile.read(), fetched
+        except (IOError, OSError):
+            return None
+
+    def _write(self, url, content):
+        """Write a document to the on disk cache.
+
+        The file is replaced atomically, so concurrent processes never read
+        a partial document.
+
+        Args:
+            url (str): The discovery URL.
+            content (str): The document.
+        """
+        if not self._is_usable():
+            return
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir,
+                                            suffix='.tmp')
+            with os.fdopen(fd, 'w') as outfile:
+                outfile.write(content)
+            os.replace(tmp_path, self._path(url))
+        except (IOError, OSError) as e:
+            LOGGER.warning('Unable to cache the discovery document of %s %s '
+                           'in %s: %s', self.service_name, self.version,
+                           self.cache_dir, e)
+
+    def get(self, url):
+        """Get a cached discovery document.
+
+        Args:
+            url (str): The discovery URL.
+
+        Returns:
+            str: The document, or None if it is not cached.
+        """
+        with self._lock:
+            cached = self._documents.get(url)
+            if cached is None or time.time() - cached[1] > MAX_AGE_SECONDS:
+                cached = self._read(url)
+                if cached is None:
+                    self._documents.pop(url, None)
+                    return None
+                LOGGER.debug('Loaded the discovery document of %s %s from '
+                             '%s.', self.service_name, self.version,
+                             self.cache_dir)
+                self._documents[url] = cached
+            return cached[0]
+
+    def set(self, url, content):
+        """Cache a discovery document.
+
+        Args:
+            url (str): The discovery URL.
+            content (str): The document.
+        """
+        if isinstance(content, bytes):
+            content = content.decode('utf-8')
+        with self._lock:
+            self._documents[url] = (content, time.time())
+            self._write(url, content)
+
+
+def get_cache(service_name, version):
+    """Get the shared discovery document cache of an API version.
+
+    Args:
+        service_name (str): The name of the API.
+        version (str): The version of the API.
+
+    Returns:
+        DiscoveryCache: The cache, created on first use.
+    """
+    key = (service_name, version)
+    with _CACHES_LOCK:
+        cache = _CACHES.get(key)
+        if cache is None:
+            cache = DiscoveryCache(service_name, version)
+            _CACHES[key] = cache
+        return cache
+
+
+def load_document(document_path):
+    """Load a local discovery document, parsing it once per process.
+
+    Args:
+        document_path (str): The path of the discovery document.
+
+    Returns:
+        dict: The parsed discovery document.
+    """
+    with _CACHES_LOCK:
+        document = _LOCAL_DOCUMENTS.get(document_path)
+        if document is None:
+            with open(document_path, 'r') as f:
+                document = json.load(f)
+            _LOCAL_DOCUMENTS[document_path] = document
+        return document
@@ -49,7 +49,8 @@ class AdminDirectoryRepositoryClient(_base_repository.BaseRepositoryClient):
                  credentials,
                  quota_max_calls=None,
                  quota_period=1.0,
-                 use_rate_limiter=True):
+                 use_rate_limiter=True,
+                 prefetch_pages=0):
         """Constructor.
 
         Args:
@@ -61,6 +62,8 @@ class AdminDirectoryRepositoryClient(_base_repository.BaseRepositoryClient):
             quota_period (float): The time period to track requests over.
             use_rate_limiter (bool): Set to false to disable the use of a rate
                 limiter for this service.
+            prefetch_pages (int): The number of pages of paged queries fetched
+                ahead of the caller, 0 disables prefetching.
         """
         if not quota_max_calls:
             use_rate_limiter = False
@@ -74,7 +77,8 @@ class AdminDirectoryRepositoryClient(_base_repository.BaseRepositoryClient):
             credentials=credentials,
             quota_max_calls=quota_max_calls,
             quota_period=quota_period,
-            use_rate_limiter=use_rate_limiter)
+            use_rate_limiter=use_rate_limiter,
+            prefetch_pages=prefetch_pages)
 
     # Turn off docstrings for properties.
     # pylint: disable=missing-return-doc, missing-return-type-doc
@@ -170,7 +174,8 @@ class AdminDirectoryClient(object):
             credentials=credentials,
             quota_max_calls=max_calls,
             quota_period=quota_period,
-            use_rate_limiter=kwargs.get('use_rate_limiter', True))
+            use_rate_limiter=kwargs.get('use_rate_limiter', True),
+            prefetch_pages=global_configs.get('prefetch_pages', 0))
 
     def get_group_members(self, group_key):
         """Get all the members for specified groups.
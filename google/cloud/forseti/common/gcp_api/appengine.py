@@ -56,7 +56,8 @@ class AppEngineRepositoryClient(_base_repository.BaseRepositoryClient):
     def __init__(self,
                  quota_max_calls=None,
                  quota_period=1.0,
-                 use_rate_limiter=True):
+                 use_rate_limiter=True,
+                 prefetch_pages=0):
         """Constructor.
 
         Args:
@@ -65,6 +66,8 @@ class AppEngineRepositoryClient(_base_repository.BaseRepositoryClient):
             quota_period (float): The time period to track requests over.
             use_rate_limiter (bool): Set to false to disable the use of a rate
                 limiter for this service.
+            prefetch_pages (int): The number of pages of paged queries fetched
+                ahead of the caller, 0 disables prefetching.
         """
         if not quota_max_calls:
             use_rate_limiter = False
@@ -78,7 +81,8 @@ class AppEngineRepositoryClient(_base_repository.BaseRepositoryClient):
             API_NAME, versions=['v1'],
             quota_max_calls=quota_max_calls,
             quota_period=quota_period,
-            use_rate_limiter=use_rate_limiter)
+            use_rate_limiter=use_rate_limiter,
+            prefetch_pages=prefetch_pages)
 
     # Turn off docstrings for properties.
     # pylint: disable=missing-return-doc, missing-return-type-doc
@@ -265,7 +269,8 @@ class AppEngineClient(object):
         self.repository = AppEngineRepositoryClient(
             quota_max_calls=max_calls,
             quota_period=quota_period,
-            use_rate_limiter=kwargs.get('use_rate_limiter', True))
+            use_rate_limiter=kwargs.get('use_rate_limiter', True),
+            prefetch_pages=global_configs.get('prefetch_pages', 0))
 
     def get_app(self, project_id):
         """Gets information about an application.
@@ -33,7 +33,8 @@ class BigQueryRepositoryClient(_base_repository.BaseRepositoryClient):
     def __init__(self,
                  quota_max_calls=None,
                  quota_period=100.0,
-                 use_rate_limiter=True):
+                 use_rate_limiter=True,
+                 prefetch_pages=0):
         """Constructor.
 
         Args:
@@ -42,6 +43,8 @@ class BigQueryRepositoryClient(_base_repository.BaseRepositoryClient):
             quota_period (float): The time period to track requests over.
             use_rate_limiter (bool): Set to false to disable the use of a rate
                 limiter for this service.
+            prefetch_pages (int): The number of pages of paged queries fetched
+                ahead of the caller, 0 disables prefetching.
         """
         if not quota_max_calls:
             use_rate_limiter = False
@@ -54,7 +57,8 @@ class BigQueryRepositoryClient(_base_repository.BaseRepositoryClient):
             API_NAME, versions=['v2'],
             quota_max_calls=quota_max_calls,
             quota_period=quota_period,
-            use_rate_limiter=use_rate_limiter)
+            use_rate_limiter=use_rate_limiter,
+            prefetch_pages=prefetch_pages)
 
     # Turn off docstrings for properties.
     # pylint: disable=missing-return-doc, missing-return-type-doc
@@ -147,7 +151,8 @@ class BigQueryClient(object):
         self.repository = BigQueryRepositoryClient(
             quota_max_calls=max_calls,
             quota_period=quota_period,
-            use_rate_limiter=kwargs.get('use_rate_limiter', True))
+            use_rate_limiter=kwargs.get('use_rate_limiter', True),
+            prefetch_pages=global_configs.get('prefetch_pages', 0))
 
     def get_bigquery_projectids(self):
         """Request and page through bigquery projectids.
@@ -237,6 +242,31 @@ class BigQueryClient(object):
         except (errors.HttpError, HttpLib2Error) as e:
             raise api_errors.ApiExecutionError(project_id, e)
 
+    def get_datasets_access(self, project_id, dataset_ids):
+        """Return the access portion of datasets in batch requests.
+
+        The datasets whose access could not be fetched are left out,
+        get_dataset_access handles their errors.
+
+        Args:
+            project_id (str): String representing the project id.
+            dataset_ids (list): The ids of the datasets in the project.
+
+        Returns:
+            dict: The access lists by dataset id.
+        """
+        access = {}
+        results = self.repository.datasets.get_many(
+            project_id, dataset_ids, fields='access')
+        for dataset_id, (result, error) in zip(dataset_ids, results):
+            if error is None:
+                access[dataset_id] = result.get('access', [])
+            else:
+                LOGGER.warning('Batched access fetch failed for dataset %s in '
+                               'project %s: %s', dataset_id, project_id,
+                               error)
+        return access
+
     def get_tables(self, project_id, dataset_id):
         """Return BigQuery tables stored in the requested project_id.
 
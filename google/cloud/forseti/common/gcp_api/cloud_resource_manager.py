@@ -39,7 +39,8 @@ class CloudResourceManagerRepositoryClient(
                  quota_max_calls=None,
                  quota_period=100.0,
                  use_rate_limiter=True,
-                 credentials=None):
+                 credentials=None,
+                 prefetch_pages=0):
         """Constructor.
 
         Args:
@@ -50,6 +51,8 @@ class CloudResourceManagerRepositoryClient(
                 limiter for this service.
             credentials (OAuth2Credentials): Credentials that will be used to
                 authenticate the API calls.
+            prefetch_pages (int): The number of pages of paged queries fetched
+                ahead of the caller, 0 disables prefetching.
         """
         if not quota_max_calls:
             use_rate_limiter = False
@@ -65,7 +68,8 @@ class CloudResourceManagerRepositoryClient(
             quota_max_calls=quota_max_calls,
             quota_period=quota_period,
             use_rate_limiter=use_rate_limiter,
-            credentials=credentials)
+            credentials=credentials,
+            prefetch_pages=prefetch_pages)
 
     # Turn off docstrings for properties.
     # pylint: disable=missing-return-doc, missing-return-type-doc
@@ -278,7 +282,8 @@ class CloudResourceManagerClient(object):
             quota_max_calls=max_calls,
             quota_period=quota_period,
             use_rate_limiter=kwargs.get('use_rate_limiter', True),
-            credentials=kwargs.get('credentials', None))
+            credentials=kwargs.get('credentials', None),
+            prefetch_pages=global_configs.get('prefetch_pages', 0))
 
     def get_project(self, project_id):
         """Get all the projects from organization.
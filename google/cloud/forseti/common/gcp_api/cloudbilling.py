@@ -33,7 +33,8 @@ class CloudBillingRepositoryClient(_base_repository.BaseRepositoryClient):
     def __init__(self,
                  quota_max_calls=None,
                  quota_period=60.0,
-                 use_rate_limiter=True):
+                 use_rate_limiter=True,
+                 prefetch_pages=0):
         """Constructor.
 
         Args:
@@ -42,6 +43,8 @@ class CloudBillingRepositoryClient(_base_repository.BaseRepositoryClient):
             quota_period (float): The time period to track requests over.
             use_rate_limiter (bool): Set to false to disable the use of a rate
                 limiter for this service.
+            prefetch_pages (int): The number of pages of paged queries fetched
+                ahead of the caller, 0 disables prefetching.
         """
         if not quota_max_calls:
             use_rate_limiter = False
@@ -53,7 +56,8 @@ class CloudBillingRepositoryClient(_base_repository.BaseRepositoryClient):
             API_NAME, versions=['v1'],
             quota_max_calls=quota_max_calls,
             quota_period=quota_period,
-            use_rate_limiter=use_rate_limiter)
+            use_rate_limiter=use_rate_limiter,
+            prefetch_pages=prefetch_pages)
 
     # Turn off docstrings for properties.
     # pylint: disable=missing-return-doc, missing-return-type-doc
@@ -172,7 +176,8 @@ class CloudBillingClient(object):
         self.repository = CloudBillingRepositoryClient(
             quota_max_calls=max_calls,
             quota_period=quota_period,
-            use_rate_limiter=kwargs.get('use_rate_limiter', True))
+            use_rate_limiter=kwargs.get('use_rate_limiter', True),
+            prefetch_pages=global_configs.get('prefetch_pages', 0))
 
     def get_billing_info(self, project_id):
         """Gets the billing information for a project.
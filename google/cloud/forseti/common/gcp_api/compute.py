@@ -181,7 +181,8 @@ class ComputeRepositoryClient(_base_repository.BaseRepositoryClient):
                  quota_max_calls=None,
                  quota_period=100.0,
                  use_rate_limiter=True,
-                 read_only=False):
+                 read_only=False,
+                 prefetch_pages=0):
         """Constructor.
 
         Args:
@@ -192,6 +193,8 @@ class ComputeRepositoryClient(_base_repository.BaseRepositoryClient):
                 limiter for this service.
             read_only (bool): When set to true, disables any API calls that
                 would modify a resource within the repository.
+            prefetch_pages (int): The number of pages of paged queries fetched
+                ahead of the caller, 0 disables prefetching.
         """
         if not quota_max_calls:
             use_rate_limiter = False
@@ -217,7 +220,8 @@ class ComputeRepositoryClient(_base_repository.BaseRepositoryClient):
             quota_max_calls=quota_max_calls,
             quota_period=quota_period,
             use_rate_limiter=use_rate_limiter,
-            read_only=read_only)
+            read_only=read_only,
+            prefetch_pages=prefetch_pages)
 
     # Turn off docstrings for properties.
     # pylint: disable=missing-return-doc, missing-return-type-doc
@@ -708,7 +712,8 @@ class ComputeClient(object):
             quota_max_calls=max_calls,
             quota_period=quota_period,
             read_only=read_only,
-            use_rate_limiter=kwargs.get('use_rate_limiter', True))
+            use_rate_limiter=kwargs.get('use_rate_limiter', True),
+            prefetch_pages=global_configs.get('prefetch_pages', 0))
 
     def get_backend_services(self, project_id):
         """Get the backend services for a project.
@@ -1085,6 +1090,67 @@ class ComputeClient(object):
                 raise api_errors.ApiNotEnabledError(details, e)
             raise api_errors.ApiExecutionError(project_id, e)
 
+    def get_global_operations(self, project_id, operation_ids):
+        """Get the status of operations in batch requests.
+
+        The operations whose batched call failed are fetched again one at a
+        time.
+
+        Args:
+            project_id (str): The project id.
+            operation_ids (list): The operation ids.
+
+        Returns:
+            dict: Global Operation status and info by operation id. The
+                operations whose status could not be fetched are left out.
+            https://cloud.google.com/compute/docs/reference/latest/globalOperations/get
+        """
+        operations = {}
+        results = self.repository.global_operations.get_many(
+            project_id, operation_ids)
+        for operation_id, (operation, error) in zip(operation_ids, results):
+            if error is None:
+                operations[operation_id] = operation
+                continue
+            LOGGER.warning('Batched status fetch of operation %s on project '
+                           '%s failed, fetching it alone: %s', operation_id,
+                           project_id, error)
+            try:
+                operations[operation_id] = self.get_global_operation(
+                    project_id, operation_id)
+            except (api_errors.ApiExecutionError,
+                    api_errors.ApiNotEnabledError) as e:
+                LOGGER.warning('Unable to get the status of operation %s on '
+                               'project %s: %s', operation_id, project_id, e)
+        return operations
+
+    def poll_operations(self, project_id, operations):
+        """Refresh the status of the operations that are not done, in bulk.
+
+        Args:
+            project_id (str): The project id.
+            operations (list): The global operation responses from API calls.
+
+        Returns:
+            list: The operations, in order, with the latest status of the
+                operations that were not done. An operation whose status could
+                not be fetched is returned unchanged.
+        """
+        pending = [operation['name'] for operation in operations
+                   if operation.get('status', '') != 'DONE']
+        if not pending:
+            return list(operations)
+
+        latest = self.get_global_operations(project_id, pending)
+        results = []
+        for operation in operations:
+            if operation['name'] in latest:
+                operation = latest[operation['name']]
+                if operation.get('status', '') == 'DONE':
+                    _debug_operation_response_time(project_id, operation)
+            results.append(operation)
+        return results
+
     def get_image(self, project_id, image_name):
         """Get an image from a project.
 
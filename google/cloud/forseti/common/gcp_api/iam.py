@@ -36,7 +36,8 @@ class IamRepositoryClient(_base_repository.BaseRepositoryClient):
     def __init__(self,
                  quota_max_calls=None,
                  quota_period=1.0,
-                 use_rate_limiter=True):
+                 use_rate_limiter=True,
+                 prefetch_pages=0):
         """Constructor.
 
         Args:
@@ -45,6 +46,8 @@ class IamRepositoryClient(_base_repository.BaseRepositoryClient):
             quota_period (float): The time period to limit the requests within.
             use_rate_limiter (bool): Set to false to disable the use of a rate
                 limiter for this service.
+            prefetch_pages (int): The number of pages of paged queries fetched
+                ahead of the caller, 0 disables prefetching.
         """
         if not quota_max_calls:
             use_rate_limiter = False
@@ -59,7 +62,8 @@ class IamRepositoryClient(_base_repository.BaseRepositoryClient):
             API_NAME, versions=['v1'],
             quota_max_calls=quota_max_calls,
             quota_period=quota_period,
-            use_rate_limiter=use_rate_limiter)
+            use_rate_limiter=use_rate_limiter,
+            prefetch_pages=prefetch_pages)
 
     # Turn off docstrings for properties.
     # pylint: disable=missing-return-doc, missing-return-type-doc
@@ -205,6 +209,30 @@ class _IamProjectsServiceAccountsRepository(
             self, resource, fields=fields, verb=verb, include_body=include_body,
             resource_field=resource_field, **kwargs)
 
+    def get_iam_policies(self, resources, fields=None, verb='getIamPolicy',
+                         include_body=False, resource_field='resource',
+                         **kwargs):
+        """Get the IAM Policies of Service Accounts in batch requests.
+
+        Args:
+            self (GCPRespository): An instance of a GCPRespository class.
+            resources (list): The ids of the resources to fetch.
+            fields (str): Fields to include in the response - partial response.
+            verb (str): The method to call on the API.
+            include_body (bool): If true, include an empty body parameter in the
+                method args.
+            resource_field (str): The parameter name of the resource field to
+                pass to the method.
+            **kwargs (dict): Optional additional arguments to pass to the query.
+
+        Returns:
+            list: A (response, error) tuple per service account, in order.
+        """
+        return repository_mixins.GetIamPolicyQueryMixin.get_iam_policies(
+            self, resources, fields=fields, verb=verb,
+            include_body=include_body, resource_field=resource_field,
+            **kwargs)
+
     @staticmethod
     def get_name(project_id):
         """Returns a formatted name field to pass in to the API.
@@ -271,7 +299,8 @@ class IAMClient(object):
         self.repository = IamRepositoryClient(
             quota_max_calls=max_calls,
             quota_period=quota_period,
-            use_rate_limiter=kwargs.get('use_rate_limiter', True))
+            use_rate_limiter=kwargs.get('use_rate_limiter', True),
+            prefetch_pages=global_configs.get('prefetch_pages', 0))
 
     def get_curated_roles(self, parent=None):
         """Get information about organization roles
@@ -417,6 +446,30 @@ class IAMClient(object):
             LOGGER.exception(api_exception)
             raise api_exception
 
+    def get_service_account_iam_policies(self, names):
+        """Get the IAM policies of service accounts in batch requests.
+
+        The service accounts whose policy could not be fetched are left out,
+        get_service_account_iam_policy handles their errors.
+
+        Args:
+            names (list): The service account names to query, in the format
+                projects/{PROJECT_ID}/serviceAccounts/{SERVICE_ACCOUNT_EMAIL}
+
+        Returns:
+            dict: The IAM policies by service account name.
+        """
+        policies = {}
+        results = self.repository.projects_serviceaccounts.get_iam_policies(
+            names)
+        for name, (policy, error) in zip(names, results):
+            if error is None:
+                policies[name] = policy
+            else:
+                LOGGER.warning('Batched IAM policy fetch failed for service '
+                               'account %s: %s', name, error)
+        return policies
+
     def get_service_account_keys(self, name, key_type=None):
         """Get keys associated with the given Service Account.
 
@@ -127,6 +127,43 @@ class GetQueryMixin(object):
             verb_arguments=arguments,
         )
 
+    def get_many(self, resource, targets, fields=None, verb='get', **kwargs):
+        """Get API entities in batch requests.
+
+        Args:
+            self (GCPRespository): An instance of a GCPRespository class.
+            resource (str): The id of the resource to query.
+            targets (list): Names of the entities to fetch.
+            fields (str): Fields to include in the response - partial response.
+            verb (str): The method to call on the API.
+            **kwargs (dict): Optional additional arguments to pass to the query.
+
+        Returns:
+            list: A (response, error) tuple per target, in order. error is
+                the exception raised by a failed call and None on success.
+
+        Raises:
+            ValueError: When get_key_field or entity_field was not defined in
+                the base GCPRepository instance.
+        """
+        if not self._get_key_field or not self._entity_field:
+            raise ValueError('Repository was created without a valid '
+                             'get_key_field or entity_field argument. Cannot '
+                             'execute batch get requests.')
+
+        arguments_list = []
+        for target in targets:
+            arguments = {self._get_key_field: resource,
+                         self._entity_field: target,
+                         'fields': fields}
+            if kwargs:
+                arguments.update(kwargs)
+            arguments_list.append(arguments)
+        return self.execute_batch_query(
+            verb=verb,
+            verb_arguments_list=arguments_list,
+        )
+
 
 class GetIamPolicyQueryMixin(object):
     """Mixin that implements getIamPolicy query."""
@@ -164,6 +201,40 @@ class GetIamPolicyQueryMixin(object):
             verb_arguments=arguments,
         )
 
+    def get_iam_policies(self, resources, fields=None, verb='getIamPolicy',
+                         include_body=True, resource_field='resource',
+                         **kwargs):
+        """Get the IAM Policies of resources in batch requests.
+
+        Args:
+            self (GCPRespository): An instance of a GCPRespository class.
+            resources (list): The ids of the resources to fetch.
+            fields (str): Fields to include in the response - partial response.
+            verb (str): The method to call on the API.
+            include_body (bool): If true, include an empty body parameter in the
+                method args.
+            resource_field (str): The parameter name of the resource field to
+                pass to the method.
+            **kwargs (dict): Optional additional arguments to pass to the query.
+
+        Returns:
+            list: A (response, error) tuple per resource, in order. error is
+                the exception raised by a failed call and None on success.
+        """
+        arguments_list = []
+        for resource in resources:
+            arguments = {resource_field: resource,
+                         'fields': fields}
+            if include_body:
+                arguments['body'] = {}
+            if kwargs:
+                arguments.update(kwargs)
+            arguments_list.append(arguments)
+        return self.execute_batch_query(
+            verb=verb,
+            verb_arguments_list=arguments_list,
+        )
+
 
 class OrgPolicyQueryMixin(object):
     """Mixin that implements getOrgPolicy and listOrgPolicies query."""
@@ -489,6 +560,51 @@ class PatchResourceMixin(_ModifyResourceBaseMixin):
         """
         return self._modify_resource(resource, data, target, verb, **kwargs)
 
+    def patch_many(self, resources, verb='patch', **kwargs):
+        """Patch existing resources in batch requests.
+
+        Args:
+            self (GCPRespository): An instance of a GCPRespository class.
+            resources (list): The (resource name, data) pairs of the resources
+                to patch.
+            verb (str): The method to call on the API.
+            **kwargs (dict): Optional additional arguments to pass to the api.
+
+        Returns:
+            list: A (response, error) tuple per resource, in order. error is
+                the exception raised by a failed call and None on success.
+
+        Raises:
+            ValueError: When get_key_field was not defined in the base
+                GCPRepository instance.
+        """
+        if not self._get_key_field:
+            raise ValueError('Repository was created without a valid '
+                             'key_field argument. Cannot execute batch patch '
+                             'requests.')
+
+        arguments_list = []
+        for resource, data in resources:
+            arguments = {self._get_key_field: resource, 'body': data}
+            if kwargs:
+                arguments.update(kwargs)
+            arguments_list.append(arguments)
+
+        if self.read_only:
+            LOGGER.info('%s called on a read only repository, no action taken '
+                        'on %d resources.', verb, len(arguments_list))
+            results = []
+            for arguments in arguments_list:
+                resource_link = self._build_resource_link(**arguments)
+                results.append(
+                    (_create_fake_operation(resource_link, verb, None), None))
+            return results
+
+        return self.execute_batch_query(
+            verb=verb,
+            verb_arguments_list=arguments_list,
+        )
+
 
 class UpdateResourceMixin(_ModifyResourceBaseMixin):
     """Mixin that implements the Update API command for resources."""
@@ -14,6 +14,7 @@
 
 """Wrapper for Cloud Security Command Center API client."""
 from builtins import object
+from concurrent import futures
 import json
 from googleapiclient import errors
 from httplib2 import HttpLib2Error
@@ -27,6 +28,26 @@ from google.cloud.forseti.common.util import logger
 LOGGER = logger.get_logger(__name__)
 API_NAME = 'securitycenter'
 
+# Number of findings patched per batch request.
+FINDINGS_BATCH_SIZE = _base_repository.MAX_BATCH_SIZE
+
+# Client errors of a batched call that a single call would get too.
+FINDING_REJECTED_STATUSES = frozenset([400, 403, 404, 409])
+
+
+def _is_finding_rejected(error):
+    """Whether the API rejected a finding, rather than failing the call.
+
+    Args:
+        error (Exception): The error of a batched call.
+
+    Returns:
+        bool: True if patching the finding on its own would fail the same
+            way.
+    """
+    return (isinstance(error, errors.HttpError) and
+            error.resp.status in FINDING_REJECTED_STATUSES)
+
 
 class SecurityCenterRepositoryClient(_base_repository.BaseRepositoryClient):
     """SecurityCenter API Respository."""
@@ -205,3 +226,58 @@ class SecurityCenterClient(object):
             violation_data = (
                 finding.get('source_properties').get('violation_data'))
             raise api_errors.ApiExecutionError(violation_data, e)
+
+    def patch_findings(self, findings, update_mask=None, max_workers=1):
+        """Creates or updates findings in CSCC with batch requests.
+
+        The batch requests are sent concurrently, sharing the rate limiter of
+        the API. The findings whose batched call failed, other than the
+        findings rejected by the API, are patched again one at a time.
+
+        Args:
+            findings (list): The (finding name, finding) pairs to patch, the
+                name is source_id/findings/finding_id.
+            update_mask (str): The fields to update, all the fields if not
+                set.
+            max_workers (int): The number of batch requests sent at the same
+                time.
+
+        Returns:
+            list: A (response, error) tuple per finding, in order. error is
+                the exception raised by a failed call and None on success.
+        """
+        kwargs = {'updateMask': update_mask} if update_mask else {}
+        batches = [findings[i:i + FINDINGS_BATCH_SIZE]
+                   for i in range(0, len(findings), FINDINGS_BATCH_SIZE)]
+
+        def patch_batch(batch):
+            """Patch a batch of findings.
+
+            Args:
+                batch (list): The (finding name, finding) pairs to patch.
+
+            Returns:
+                list: A (response, error) tuple per finding.
+            """
+            results = self.repository.findings.patch_many(batch, **kwargs)
+            for index, (name, finding) in enumerate(batch):
+                error = results[index][1]
+                if error is None or _is_finding_rejected(error):
+                    continue
+                LOGGER.warning('Batched patch of CSCC finding %s failed, '
+                               'patching it alone: %s', name, error)
+                try:
+                    results[index] = (self.repository.findings.patch(
+                        name, finding, **kwargs), None)
+                except (errors.HttpError, HttpLib2Error) as e:
+                    results[index] = (None, e)
+            return results
+
+        results = []
+        with futures.ThreadPoolExecutor(
+                max_workers=max(max_workers, 1)) as executor:
+            for batch_results in executor.map(patch_batch, batches):
+                results.extend(batch_results)
+        LOGGER.debug('Patched %d findings in %d batch requests.',
+                     len(findings), len(batches))
+        return results
@@ -112,7 +112,8 @@ class StorageRepositoryClient(_base_repository.BaseRepositoryClient):
                  credentials=None,
                  quota_max_calls=None,
                  quota_period=1.0,
-                 use_rate_limiter=True):
+                 use_rate_limiter=True,
+                 prefetch_pages=0):
         """Constructor.
 
         Args:
@@ -123,6 +124,8 @@ class StorageRepositoryClient(_base_repository.BaseRepositoryClient):
             quota_period (float): The time period to limit the requests within.
             use_rate_limiter (bool): Set to false to disable the use of a rate
                 limiter for this service.
+            prefetch_pages (int): The number of pages of paged queries fetched
+                ahead of the caller, 0 disables prefetching.
         """
         if not quota_max_calls:
             use_rate_limiter = False
@@ -138,7 +141,8 @@ class StorageRepositoryClient(_base_repository.BaseRepositoryClient):
             credentials=credentials,
             quota_max_calls=quota_max_calls,
             quota_period=quota_period,
-            use_rate_limiter=use_rate_limiter)
+            use_rate_limiter=use_rate_limiter,
+            prefetch_pages=prefetch_pages)
 
     # Turn off docstrings for properties.
     # pylint: disable=missing-return-doc, missing-return-type-doc
@@ -218,6 +222,21 @@ class _StorageBucketsRepository(
         return repository_mixins.GetIamPolicyQueryMixin.get_iam_policy(
             self, bucket, fields=fields, include_body=False,
             resource_field='bucket', **kwargs)
+
+    def get_iam_policies(self, buckets, fields=None, **kwargs):
+        """Get the IAM Policies of Buckets in batch requests.
+
+        Args:
+            buckets (list): The ids of the buckets to fetch.
+            fields (str): Fields to include in the response - partial response.
+            **kwargs (dict): Optional additional arguments to pass to the query.
+
+        Returns:
+            list: A (response, error) tuple per bucket, in order.
+        """
+        return repository_mixins.GetIamPolicyQueryMixin.get_iam_policies(
+            self, buckets, fields=fields, include_body=False,
+            resource_field='bucket', **kwargs)
     # pylint: enable=arguments-differ
 
 
@@ -414,11 +433,12 @@ class StorageClient(object):
         """Initialize.
 
         Args:
-            *args (dict): Default args passed to all API Clients, not used by
-                the StorageClient.
+            *args (dict): Default args passed to all API Clients, only the
+                page prefetching of the global configs is used by the
+                StorageClient.
             **kwargs (dict): The kwargs.
         """
-        del args
+        global_configs = args[0] if args and args[0] else {}
         # Storage API has unlimited rate.
         if 'user_project' in kwargs:
             self._user_project = kwargs['user_project']
@@ -428,7 +448,8 @@ class StorageClient(object):
         self.repository = StorageRepositoryClient(
             credentials=kwargs.get('credentials'),
             quota_max_calls=None,
-            use_rate_limiter=False)
+            use_rate_limiter=False,
+            prefetch_pages=global_configs.get('prefetch_pages', 0))
 
     def put_text_file(self, local_file_path, full_bucket_path):
         """Put a text object into a bucket.
@@ -603,6 +624,28 @@ class StorageClient(object):
             LOGGER.exception(api_exception)
             raise api_exception
 
+    def get_bucket_iam_policies(self, buckets):
+        """Gets the IAM policies of buckets in batch requests.
+
+        The buckets whose policy could not be fetched, e.g. requester pays
+        buckets, are left out, get_bucket_iam_policy handles their errors.
+
+        Args:
+            buckets (list): The buckets to fetch the policies for.
+
+        Returns:
+            dict: The IAM policies by bucket.
+        """
+        policies = {}
+        results = self.repository.buckets.get_iam_policies(buckets)
+        for bucket, (policy, error) in zip(buckets, results):
+            if error is None:
+                policies[bucket] = policy
+            else:
+                LOGGER.warning('Batched IAM policy fetch failed for bucket '
+                               '%s: %s', bucket, error)
+        return policies
+
     def get_default_object_acls(self, bucket, user_project=None):
         """Gets acls for GCS bucket.
 
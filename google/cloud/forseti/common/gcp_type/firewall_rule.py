@@ -20,6 +20,8 @@ See: https://cloud.google.com/compute/docs/reference/latest/firewalls
 from builtins import str
 from builtins import range
 from builtins import object
+import bisect
+import functools
 import json
 import netaddr
 
@@ -32,6 +34,7 @@ LOGGER = logger.get_logger(__name__)
 # pylint: disable=too-many-instance-attributes
 
 ALL_REPRESENTATIONS = ('all', '0-65355', '1-65535')
+ALL_PORTS = (0, 65535)
 ALLOWED_RULE_ITEMS = frozenset(('allowed', 'denied', 'description', 'direction',
                                 'name', 'network', 'priority', 'sourceRanges',
                                 'destinationRanges', 'sourceTags',
@@ -101,6 +104,8 @@ class FirewallRule(object):
         if self.allowed is None and self.denied is None:
             raise InvalidFirewallRuleError('Must have allowed or denied rules')
         self._firewall_action = None
+        self._source_ip_ranges = None
+        self._destination_ip_ranges = None
         if validate:
             self.validate()
 
@@ -460,6 +465,28 @@ class FirewallRule(object):
         """
         return sorted(self._target_service_accounts)
 
+    @property
+    def source_ip_ranges(self):
+        """The source ranges for this policy as integer intervals.
+
+        Returns:
+          IpRanges: The source ips ranges.
+        """
+        if self._source_ip_ranges is None:
+            self._source_ip_ranges = IpRanges(self._source_ranges)
+        return self._source_ip_ranges
+
+    @property
+    def destination_ip_ranges(self):
+        """The destination ranges for this policy as integer intervals.
+
+        Returns:
+          IpRanges: The destination ips ranges.
+        """
+        if self._destination_ip_ranges is None:
+            self._destination_ip_ranges = IpRanges(self._destination_ranges)
+        return self._destination_ip_ranges
+
     @property
     def priority(self):
         """The effective priority of the firewall rule.
@@ -515,22 +542,20 @@ class FirewallRule(object):
                      other.direction is None)
         network = (self.network == other.network or
                    other.network is None)
-        source_tags = (set(self.source_tags).issubset(other.source_tags) or not
-                       other.source_tags)
-        target_tags = (set(self.target_tags).issubset(other.target_tags) or not
-                       other.target_tags)
-        firewall_action = self.firewall_action < other.firewall_action
-        source_ranges = ips_in_list(self.source_ranges, other.source_ranges)
-        destination_ranges = ips_in_list(self.destination_ranges,
-                                         other.destination_ranges)
+        source_tags = (self._source_tags.issubset(other._source_tags) or not
+                       other._source_tags)
+        target_tags = (self._target_tags.issubset(other._target_tags) or not
+                       other._target_tags)
 
+        # The actions and ranges are only compared if everything else matches.
         result = (direction and
                   network and
                   source_tags and
                   target_tags and
-                  firewall_action and
-                  source_ranges and
-                  destination_ranges)
+                  self.firewall_action < other.firewall_action and
+                  self.source_ip_ranges.in_ranges(other.source_ip_ranges) and
+                  self.destination_ip_ranges.in_ranges(
+                      other.destination_ip_ranges))
         return result
 
     def __gt__(self, other):
@@ -552,21 +577,19 @@ class FirewallRule(object):
         network = (self.network is None or
                    other.network is None or
                    self.network == other.network)
-        source_tags = (set(other.source_tags).issubset(self.source_tags) or not
-                       self.source_tags)
-        target_tags = (set(other.target_tags).issubset(self.target_tags) or not
-                       self.target_tags)
-        firewall_action = self.firewall_action > other.firewall_action
-        source_ranges = ips_in_list(other.source_ranges, self.source_ranges)
-        destination_ranges = ips_in_list(other.destination_ranges,
-                                         self.destination_ranges)
+        source_tags = (other._source_tags.issubset(self._source_tags) or not
+                       self._source_tags)
+        target_tags = (other._target_tags.issubset(self._target_tags) or not
+                       self._target_tags)
+        # The actions and ranges are only compared if everything else matches.
         result = (direction and
                   network and
                   source_tags and
                   target_tags and
-                  firewall_action and
-                  source_ranges and
-                  destination_ranges)
+                  self.firewall_action > other.firewall_action and
+                  other.source_ip_ranges.in_ranges(self.source_ip_ranges) and
+                  other.destination_ip_ranges.in_ranges(
+                      self.destination_ip_ranges))
         return result
 
     def __eq__(self, other):
@@ -654,6 +677,7 @@ class FirewallAction(object):
         self._applies_to_all = None
 
         self._expanded_rules = None
+        self._port_ranges = None
 
     def __str__(self):
         """String representation.
@@ -738,6 +762,26 @@ class FirewallAction(object):
                     self._expanded_rules[protocol] = current_ports
         return self._expanded_rules
 
+    @property
+    def port_ranges(self):
+        """Returns the ports of each protocol as merged ranges.
+
+        Returns:
+          dict: A dict of protocol to a sorted tuple of disjoint (start, end)
+            port ranges.
+        """
+        if self._port_ranges is None:
+            self._port_ranges = {}
+            if not self.any_value:
+                ports_by_protocol = {}
+                for rule in self.rules:
+                    ports_by_protocol.setdefault(
+                        rule.get('IPProtocol'), []).extend(
+                            parse_port_ranges(rule.get('ports', ['all'])))
+                for protocol, ports in ports_by_protocol.items():
+                    self._port_ranges[protocol] = merge_port_ranges(ports)
+        return self._port_ranges
+
     @staticmethod
     def ports_are_subset(ports_1, ports_2):
         """Returns whether one port list is a subset of another.
@@ -780,13 +824,7 @@ class FirewallAction(object):
         """
         return (self.action == other.action and
                 (self.any_value or other.any_value or
-                 list(self.expanded_rules.keys()) ==
-                 list(other.expanded_rules.keys()) and all([
-                     self.ports_are_equal(
-                         self.expanded_rules.get(protocol, []),
-                         other.expanded_rules.get(protocol, []))
-                     for protocol in self.expanded_rules
-                 ])))
+                 self.port_ranges == other.port_ranges))
 
     def __lt__(self, other):
         """Less than.
@@ -801,12 +839,10 @@ class FirewallAction(object):
                 (self.any_value or
                  other.any_value or
                  other.applies_to_all or not
-                 other.expanded_rules or
-                 all([
-                     self.ports_are_subset(
-                         self.expanded_rules.get(protocol, []),
-                         other.expanded_rules.get(protocol, []))
-                     for protocol in self.expanded_rules])))
+                 other.port_ranges or
+                 all(port_ranges_in(self.port_ranges[protocol],
+                                    other.port_ranges.get(protocol, ()))
+                     for protocol in self.port_ranges)))
 
     def __gt__(self, other):
         """Greater than.
@@ -821,12 +857,10 @@ class FirewallAction(object):
                 (self.any_value or
                  other.any_value or
                  self.applies_to_all or not
-                 self.expanded_rules or
-                 all([
-                     self.ports_are_subset(
-                         other.expanded_rules.get(protocol, []),
-                         self.expanded_rules.get(protocol, []))
-                     for protocol in other.expanded_rules])))
+                 self.port_ranges or
+                 all(port_ranges_in(other.port_ranges[protocol],
+                                    self.port_ranges.get(protocol, ()))
+                     for protocol in other.port_ranges)))
 
     def __eq__(self, other):
         """Equals.
@@ -866,6 +900,97 @@ def sort_rules(rules):
     return sorted_rules
 
 
+class IpRanges(object):
+    """IP addresses and ranges as sorted integer intervals.
+
+    CIDR ranges are either nested or disjoint. Once the ranges contained in
+    other ranges are dropped, the remaining intervals are disjoint and sorted,
+    and the only one that can contain a range is the last one starting before
+    it, found by binary search.
+    """
+
+    def __init__(self, ips):
+        """Initialize.
+
+        Args:
+          ips (iterable): String IP addresses and CIDR ranges.
+        """
+        self.count = 0
+        # IP version -> sorted interval starts and the matching ends.
+        self._starts = {}
+        self._ends = {}
+        intervals = sorted(ip_interval(ip_addr) for ip_addr in ips)
+        for version, first, last in intervals:
+            self.count += 1
+            ends = self._ends.setdefault(version, [])
+            starts = self._starts.setdefault(version, [])
+            if ends and last <= ends[-1]:
+                continue
+            if starts and starts[-1] == first:
+                # Larger range with the same start, replaces the previous one.
+                ends[-1] = last
+                continue
+            starts.append(first)
+            ends.append(last)
+
+    def intervals(self):
+        """Yields the intervals not contained in other intervals.
+
+        Yields:
+          tuple: The IP version, first and last address as integers.
+        """
+        for version, starts in self._starts.items():
+            for first, last in zip(starts, self._ends[version]):
+                yield version, first, last
+
+    def contains(self, version, first, last):
+        """Whether a single range contains the interval.
+
+        Args:
+          version (int): The IP version.
+          first (int): The first address of the interval.
+          last (int): The last address of the interval.
+
+        Returns:
+          bool: Whether the interval is in one of the ranges.
+        """
+        starts = self._starts.get(version)
+        if not starts:
+            return False
+        index = bisect.bisect_right(starts, first) - 1
+        return index >= 0 and self._ends[version][index] >= last
+
+    def in_ranges(self, other):
+        """Checks whether the ips and ranges are all in the other ranges.
+
+        Same as ips_in_list, each ip or range must be in a single range of the
+        other ranges, and empty ranges match everything.
+
+        Args:
+          other (IpRanges): The ranges to check against.
+
+        Returns:
+          bool: Whether the ips are all in the other ranges.
+        """
+        if not self.count or not other.count:
+            return True
+        return all(other.contains(*interval) for interval in self.intervals())
+
+
+@functools.lru_cache(maxsize=65536)
+def ip_interval(ip_addr):
+    """Parses an ip or ip range into an integer interval.
+
+    Args:
+      ip_addr (str): A string IP address or CIDR range.
+
+    Returns:
+      tuple: The IP version, first and last address as integers.
+    """
+    ip_network = netaddr.IPNetwork(ip_addr)
+    return ip_network.version, ip_network.first, ip_network.last
+
+
 def ips_in_list(ips, ips_list):
     """Checks whether the ips and ranges are all in a list.
 
@@ -883,14 +1008,7 @@ def ips_in_list(ips, ips_list):
     Returns:
       bool: Whether the ips are all in the given ips_list.
     """
-    if not ips or not ips_list:
-        return True
-    for ip_addr in ips:
-        if not ips_list:
-            return False
-        if not any([ip_in_range(ip_addr, addr) for addr in ips_list]):
-            return False
-    return True
+    return IpRanges(ips).in_ranges(IpRanges(ips_list))
 
 
 def ip_in_range(ip_addr, ip_range):
@@ -908,9 +1026,10 @@ def ip_in_range(ip_addr, ip_range):
     Returns:
       bool: Whether the ip / ip range is in another ip range.
     """
-    ip_network = netaddr.IPNetwork(ip_addr)
-    ip_range_network = netaddr.IPNetwork(ip_range)
-    return ip_network in ip_range_network
+    version, first, last = ip_interval(ip_addr)
+    range_version, range_first, range_last = ip_interval(ip_range)
+    return (version == range_version and
+            range_first <= first and last <= range_last)
 
 
 def expand_port_range(port_range):
@@ -953,6 +1072,67 @@ def expand_ports(ports):
     return expanded_ports
 
 
+def parse_port_ranges(ports):
+    """Parses ports into integer ranges.
+
+    From https://cloud.google.com/compute/docs/reference/beta/firewalls, ports
+    can be of the form "<number" or "<number>-<number>". "all" is every port.
+
+    Args:
+      ports (list): A list of strings of format "<number>" or
+        "<number_1>-<number_2>", or "all".
+
+    Returns:
+      list: A list of (start, end) integer port ranges.
+    """
+    if not ports:
+        return []
+    if ports == 'all' or 'all' in ports:
+        return [ALL_PORTS]
+    port_ranges = []
+    for port_str in ports:
+        start, _, end = port_str.partition('-')
+        port_ranges.append((int(start), int(end or start)))
+    return port_ranges
+
+
+def merge_port_ranges(port_ranges):
+    """Merges overlapping and adjacent port ranges.
+
+    Args:
+      port_ranges (list): A list of (start, end) integer port ranges.
+
+    Returns:
+      tuple: A sorted tuple of disjoint (start, end) port ranges.
+    """
+    merged = []
+    for start, end in sorted(port_ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return tuple(merged)
+
+
+def port_ranges_in(port_ranges_1, port_ranges_2):
+    """Returns whether all ports of one set of ranges are in another.
+
+    Args:
+      port_ranges_1 (tuple): Merged (start, end) port ranges.
+      port_ranges_2 (tuple): Merged (start, end) port ranges.
+
+    Returns:
+      bool: Whether port_ranges_1 are a subset of port_ranges_2 or not.
+    """
+    if ALL_PORTS in port_ranges_2:
+        return True
+    for start, end in port_ranges_1:
+        index = bisect.bisect_right(port_ranges_2, (start, ALL_PORTS[1])) - 1
+        if index < 0 or port_ranges_2[index][1] < end:
+            return False
+    return True
+
+
 def validate_port(port):
     """Validates that a string is a valid port number.
 
@@ -244,10 +244,22 @@ class IamPolicyMember(object):
                 'Invalid policy member: {}'.format(member_type))
         self.type = member_type
         self.name = member_name
-        self.name_pattern = None
-        if member_name:
-            self.name_pattern = re.compile(escape_and_globify(self.name),
-                                           flags=re.IGNORECASE)
+        self._name_pattern = None
+
+    @property
+    def name_pattern(self):
+        """The compiled pattern of the member name.
+
+        Only members of rules are matched against, so the pattern is compiled
+        on first use.
+
+        Returns:
+            re.Pattern: The pattern, or None if the member has no name.
+        """
+        if self._name_pattern is None and self.name:
+            self._name_pattern = re.compile(escape_and_globify(self.name),
+                                            flags=re.IGNORECASE)
+        return self._name_pattern
 
     def __eq__(self, other):
         """Tests equality of IamPolicyMember.
@@ -99,6 +99,19 @@ _RESOURCE_TYPE_MAP = {
 }
 
 
+def can_create_resource(resource_type):
+    """Whether create_resource supports a resource type.
+
+    Args:
+        resource_type (str): The resource type.
+
+    Returns:
+        bool: True if create_resource returns a Resource for the type.
+    """
+    return bool(_RESOURCE_TYPE_MAP.get(resource_type, {}).get(
+        'can_create_resource'))
+
+
 def create_resource(resource_id, resource_type, **kwargs):
     """Factory to create a certain kind of Resource.
 
@@ -35,7 +35,8 @@ def upload_json(data, gcs_upload_path):
     """
     try:
         with tempfile.NamedTemporaryFile() as tmp_data:
-            tmp_data.write(parser.json_stringify(data).encode())
+            for chunk in parser.json_stringify_iter(data):
+                tmp_data.write(chunk.encode())
             tmp_data.flush()
             storage_client = StorageClient()
             storage_client.put_text_file(tmp_data.name, gcs_upload_path)
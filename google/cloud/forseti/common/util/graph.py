@@ -0,0 +1,202 @@
+# Copyright 2020 The Forseti Security Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Util for computing reachability in directed graphs."""
+
+from builtins import range
+
+
+def strongly_connected_components(adjacency):
+    """Find the strongly connected components of a graph.
+
+    This is an iterative version of Tarjan's algorithm, so deeply nested
+    graphs don't hit the recursion limit.
+
+    Args:
+        adjacency (list): For each node index, the list of successor node
+            indices.
+
+    Returns:
+        list: The components as lists of node indices. A component is only
+            listed after every component reachable from it, i.e. in reverse
+            topological order.
+    """
+    node_count = len(adjacency)
+    index = [None] * node_count
+    lowlink = [0] * node_count
+    on_stack = [False] * node_count
+    stack = []
+    components = []
+    next_index = 0
+
+    for start in range(node_count):
+        if index[start] is not None:
+            continue
+        index[start] = lowlink[start] = next_index
+        next_index += 1
+        stack.append(start)
+        on_stack[start] = True
+        work = [(start, 0)]
+        while work:
+            node, edge = work[-1]
+            successors = adjacency[node]
+            if edge < len(successors):
+                work[-1] = (node, edge + 1)
+                successor = successors[edge]
+                if index[successor] is None:
+                    index[successor] = lowlink[successor] = next_index
+                    next_index += 1
+                    stack.append(successor)
+                    on_stack[successor] = True
+                    work.append((successor, 0))
+                elif on_stack[successor]:
+                    lowlink[node] = min(lowlink[node], index[successor])
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+            if lowlink[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(component)
+    return components
+
+
+def _iter_bits(bits, offset):
+    """Iterate the positions of the set bits in a bitset.
+
+    Args:
+        bits (int): The bitset.
+        offset (int): Value added to every bit position.
+
+    Yields:
+        int: The position of a set bit plus the offset.
+    """
+    # Converting to a string once is much faster than shifting and masking
+    # a large integer for every bit.
+    binary = bin(bits)[:1:-1]
+    position = binary.find('1')
+    while position != -1:
+        yield position + offset
+        position = binary.find('1', position + 1)
+
+
+def _bitset_union(first, second):
+    """Union of two bitsets stored as (offset, bits).
+
+    Args:
+        first (tuple): The first bitset.
+        second (tuple): The second bitset.
+
+    Returns:
+        tuple: The union, as (offset, bits).
+    """
+    if not first[1]:
+        return second
+    if not second[1]:
+        return first
+    first_offset, first_bits = first
+    second_offset, second_bits = second
+    if first_offset <= second_offset:
+        return (first_offset,
+                first_bits | second_bits << (second_offset - first_offset))
+    return (second_offset,
+            second_bits | first_bits << (first_offset - second_offset))
+
+
+def transitive_closure(edges):
+    """Compute the transitive closure of a directed graph.
+
+    Nodes are interned to integers and the graph is condensed into its
+    strongly connected components, so cycles are resolved once. The nodes
+    reachable from each component are then computed as bitsets in reverse
+    topological order, every component being the union of its successors.
+
+    Nodes are numbered in the order of their components, which keeps the
+    nodes reachable from a component close to each other. Bitsets are
+    stored shifted by their lowest bit, so their size is bounded by the span
+    of the reachable nodes rather than by the size of the graph.
+
+    Args:
+        edges (iterable): The (source, target) pairs of the graph.
+
+    Yields:
+        tuple: Every (source, target) pair where target is reachable from
+            source through one or more edges. A node is only paired with
+            itself if it is part of a cycle.
+    """
+    names = []
+    node_ids = {}
+    adjacency = []
+    for source, target in edges:
+        for name in (source, target):
+            if name not in node_ids:
+                node_ids[name] = len(names)
+                names.append(name)
+                adjacency.append([])
+        adjacency[node_ids[source]].append(node_ids[target])
+
+    components = strongly_connected_components(adjacency)
+
+    # Renumber the nodes by component, components are emitted after all the
+    # components they reach.
+    component_of = [0] * len(names)
+    position = [0] * len(names)
+    next_position = 0
+    for component_id, component in enumerate(components):
+        for node in component:
+            component_of[node] = component_id
+            position[node] = next_position
+            next_position += 1
+
+    # Bitset of reachable node positions per component, as (offset, bits).
+    reachable = [None] * len(components)
+    for component_id, component in enumerate(components):
+        bitset = (0, 0)
+        members = set(component)
+        cyclic = len(component) > 1
+        for node in component:
+            for successor in adjacency[node]:
+                if successor in members:
+                    cyclic = True
+                    continue
+                bitset = _bitset_union(bitset, (position[successor], 1))
+                bitset = _bitset_union(bitset,
+                                       reachable[component_of[successor]])
+        if cyclic:
+            for node in component:
+                bitset = _bitset_union(bitset, (position[node], 1))
+        reachable[component_id] = bitset
+
+    node_at = [0] * len(names)
+    for node, node_position in enumerate(position):
+        node_at[node_position] = node
+
+    for component_id, component in enumerate(components):
+        offset, bits = reachable[component_id]
+        if not bits:
+            continue
+        targets = [names[node_at[target]]
+                   for target in _iter_bits(bits, offset)]
+        for node in component:
+            source = names[node]
+            for target in targets:
+                yield source, target
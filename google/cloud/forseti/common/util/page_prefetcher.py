@@ -0,0 +1,258 @@
+# Copyright 2020 The Forseti Security Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Prefetch the pages of paged API queries on a background thread.
+
+The next page is requested as soon as the previous page is received, while
+the caller processes it, so the network wait overlaps the caller's work. At
+most a bounded number of fetched pages wait for the caller.
+
+The pages are fetched by a small pool of persistent threads, which keep
+their thread local http objects across queries. When every thread of the
+pool is busy, the pages are fetched on the caller's thread.
+"""
+
+import queue
+import threading
+import time
+
+from google.cloud.forseti.common.util import logger
+
+LOGGER = logger.get_logger(__name__)
+
+# How often a fetcher blocked on a full queue checks if it was stopped.
+_STOP_CHECK_SECONDS = 0.1
+
+# Maximum number of threads fetching pages at the same time.
+MAX_FETCHER_THREADS = 8
+
+
+class PagerMetrics(object):
+    """Page throughput of the paged queries of a repository."""
+
+    def __init__(self):
+        """Initialize."""
+        self._lock = threading.Lock()
+        self.pages = 0
+        self.blocked_seconds = 0.0
+        self.elapsed_seconds = 0.0
+
+    def record(self, pages, blocked_seconds, elapsed_seconds):
+        """Record a paged query.
+
+        Args:
+            pages (int): The number of pages returned.
+            blocked_seconds (float): The time the caller waited for pages.
+            elapsed_seconds (float): The duration of the query.
+        """
+        with self._lock:
+            self.pages += pages
+            self.blocked_seconds += blocked_seconds
+            self.elapsed_seconds += elapsed_seconds
+
+    def get_metrics(self):
+        """Get the page throughput.
+
+        Returns:
+            dict: The number of pages, the pages per second of the queries
+                and the time in seconds the callers were blocked waiting for
+                pages.
+        """
+        with self._lock:
+            return {'pages': self.pages,
+                    'pages_per_second': (
+                        self.pages / max(self.elapsed_seconds, 1e-6)),
+                    'blocked_seconds': self.blocked_seconds}
+
+
+class _Fetcher(object):
+    """Iterates the pages of a query into a bounded queue."""
+
+    def __init__(self, pages, pages_in_flight):
+        """Initialize.
+
+        Args:
+            pages (iterator): The pages of the query.
+            pages_in_flight (int): The size of the queue.
+        """
+        self.queue = queue.Queue(maxsize=pages_in_flight)
+        self.stopped = threading.Event()
+        self._pages = pages
+
+    def _put(self, item):
+        """Queue an item, unless the fetcher is stopped first.
+
+        Args:
+            item (tuple): The page, the error raised or None at the end of
+                the pages.
+
+        Returns:
+            bool: False if the fetcher was stopped.
+        """
+        while not self.stopped.is_set():
+            try:
+                self.queue.put(item, timeout=_STOP_CHECK_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def run(self):
+        """Fetch the pages until they are exhausted or the caller stops."""
+        try:
+            for page in self._pages:
+                if not self._put((page, None)):
+                    return
+            self._put(None)
+        except Exception as e:  # pylint: disable=broad-except
+            self._put((None, e))
+        finally:
+            close = getattr(self._pages, 'close', None)
+            if close:
+                close()
+
+
+class _FetcherThread(threading.Thread):
+    """Persistent thread of the pool, running one fetcher at a time."""
+
+    def __init__(self, pool):
+        """Initialize.
+
+        Args:
+            pool (_FetcherPool): The pool the thread returns to when idle.
+        """
+        super(_FetcherThread, self).__init__(name='page-prefetcher')
+        self.daemon = True
+        self._pool = pool
+        self._fetchers = queue.Queue()
+
+    def submit(self, fetcher):
+        """Run a fetcher on the thread.
+
+        Args:
+            fetcher (_Fetcher): The fetcher, the thread must be idle.
+        """
+        self._fetchers.put(fetcher)
+
+    def run(self):
+        """Run the submitted fetchers."""
+        while True:
+            fetcher = self._fetchers.get()
+            fetcher.run()
+            self._pool.release(self)
+
+
+class _FetcherPool(object):
+    """Bounded pool of persistent fetcher threads."""
+
+    def __init__(self, max_threads):
+        """Initialize.
+
+        Args:
+            max_threads (int): The maximum number of threads.
+        """
+        self._max_threads = max_threads
+        self._lock = threading.Lock()
+        self._idle = []
+        self._thread_count = 0
+
+    def start(self, fetcher):
+        """Run a fetcher on an idle thread, starting one if needed.
+
+        Fetchers are never queued, a query waiting for a thread held by the
+        query of its caller would wait forever.
+
+        Args:
+            fetcher (_Fetcher): The fetcher to run.
+
+        Returns:
+            bool: False if every thread is busy and the pool is full.
+        """
+        with self._lock:
+            if self._idle:
+                thread = self._idle.pop()
+            elif self._thread_count < self._max_threads:
+                self._thread_count += 1
+                thread = _FetcherThread(self)
+                thread.start()
+            else:
+                return False
+        thread.submit(fetcher)
+        return True
+
+    def release(self, thread):
+        """Return a thread to the pool once its fetcher is done.
+
+        Args:
+            thread (_FetcherThread): The idle thread.
+        """
+        with self._lock:
+            self._idle.append(thread)
+
+
+_POOL = _FetcherPool(MAX_FETCHER_THREADS)
+
+
+def prefetch(pages, pages_in_flight, metrics=None):
+    """Iterate pages, fetching the next pages on a background thread.
+
+    Errors raised while fetching are raised to the caller when it reaches
+    the failed page. The fetching stops when the caller stops iterating.
+
+    Args:
+        pages (iterator): The pages of the query, requested while iterated.
+        pages_in_flight (int): The number of pages fetched ahead of the
+            caller, 0 iterates the pages on the caller's thread, as do
+            queries started while every thread of the pool is busy.
+        metrics (PagerMetrics): Records the query throughput if set.
+
+    Yields:
+        object: The pages.
+    """
+    started = time.time()
+    blocked_seconds = 0.0
+    count = 0
+    fetcher = None
+    pages = iter(pages)
+    try:
+        if pages_in_flight > 0:
+            fetcher = _Fetcher(pages, pages_in_flight)
+            if not _POOL.start(fetcher):
+                fetcher = None
+        while True:
+            wait_started = time.time()
+            if fetcher:
+                item = fetcher.queue.get()
+                if item is None:
+                    break
+                page, error = item
+                if error is not None:
+                    raise error
+            else:
+                try:
+                    page = next(pages)
+                except StopIteration:
+                    break
+            blocked_seconds += time.time() - wait_started
+            count += 1
+            yield page
+    finally:
+        if fetcher:
+            fetcher.stopped.set()
+        elif hasattr(pages, 'close'):
+            pages.close()
+        if metrics is not None:
+            metrics.record(count, blocked_seconds, time.time() - started)
+        LOGGER.debug('Fetched %d pages, blocked %.3f seconds, prefetching %d '
+                     'pages.', count, blocked_seconds, pages_in_flight)
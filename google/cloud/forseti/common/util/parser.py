@@ -85,6 +85,30 @@ def json_stringify(obj_to_jsonify):
     return json.dumps(obj_to_jsonify, sort_keys=True)
 
 
+def json_stringify_iter(obj_to_jsonify):
+    """Convert a python object to json string, one chunk at a time.
+
+    The items of lists and other iterables are converted one at a time, so
+    they don't need to be held in memory. The chunks join into the same
+    string as json_stringify().
+
+    Args:
+        obj_to_jsonify (object): The object to json stringify.
+
+    Yields:
+        str: The chunks of the json-stringified object.
+    """
+    if isinstance(obj_to_jsonify, (dict, str, bytes)) or not hasattr(
+            obj_to_jsonify, '__iter__'):
+        yield json_stringify(obj_to_jsonify)
+        return
+
+    yield '['
+    for i, item in enumerate(obj_to_jsonify):
+        yield ', ' + json_stringify(item) if i else json_stringify(item)
+    yield ']'
+
+
 def json_unstringify(json_to_objify, default=None):
     """Convert a json string to a python object.
 
@@ -12,13 +12,23 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-"""Wrapper functions used to record and replay API responses."""
+"""Wrapper functions used to record and replay API responses.
+
+Recordings are streamed to the record file as length prefixed, append-only
+records, one per API call, followed by an index of the records by request key
+written when the recording is closed. Replay memory-maps the recording and
+only unpickles the responses that are requested.
+"""
 
 from builtins import str
+import atexit
 import collections
 import functools
+import mmap
 import os
 import pickle
+import struct
+import threading
 from googleapiclient import errors
 from google.cloud.forseti.common.util import logger
 
@@ -26,6 +36,18 @@ LOGGER = logger.get_logger(__name__)
 RECORD_ENVIRONMENT_VAR = 'FORSETI_RECORD_FILE'
 REPLAY_ENVIRONMENT_VAR = 'FORSETI_REPLAY_FILE'
 
+# Start of a streaming recording.
+RECORD_FILE_MAGIC = b'FSREPLAY\x01\n'
+# End of a closed recording, preceded by the offset of the index.
+INDEX_MAGIC = b'FSINDEX\n'
+
+# Lengths of the request key and the pickled response of a record.
+_RECORD_HEADER = struct.Struct('>IQ')
+# Offset of the pickled index.
+_TRAILER = struct.Struct('>Q')
+
+_FILES_LOCK = threading.Lock()
+
 
 def _key_from_request(request):
     """Generate a unique key from a request.
@@ -39,12 +61,317 @@ def _key_from_request(request):
     return '{}{}'.format(request.uri, request.body)
 
 
+class _RecordWriter(object):
+    """Appends recorded responses to a record file."""
+
+    def __init__(self, record_file):
+        """Initialize.
+
+        The record file is truncated, a recording starts from scratch in
+        each process.
+
+        Args:
+            record_file (str): The path of the record file.
+        """
+        self.record_file = record_file
+        self._lock = threading.Lock()
+        # request key -> offsets of the records, in recording order.
+        self._index = collections.defaultdict(list)
+        self._outfile = open(record_file, 'wb')
+        self._outfile.write(RECORD_FILE_MAGIC)
+        self._outfile.flush()
+
+    def append(self, request_key, obj):
+        """Append a recorded response.
+
+        The record is flushed, a recording interrupted before it is closed
+        can still be replayed.
+
+        Args:
+            request_key (str): The key of the request.
+            obj (dict): The recorded response.
+        """
+        key = request_key.encode('utf-8')
+        payload = pickle.dumps(obj, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            if self._outfile is None:
+                LOGGER.warning('Recording %s is closed, not recording key %s',
+                               self.record_file, request_key)
+                return
+            self._index[request_key].append(self._outfile.tell())
+            self._outfile.write(_RECORD_HEADER.pack(len(key), len(payload)))
+            self._outfile.write(key)
+            self._outfile.write(payload)
+            self._outfile.flush()
+
+    def close(self):
+        """Write the index of the records and close the record file."""
+        with self._lock:
+            if self._outfile is None:
+                return
+            index_offset = self._outfile.tell()
+            pickle.dump(dict(self._index), self._outfile,
+                        pickle.HIGHEST_PROTOCOL)
+            self._outfile.write(_TRAILER.pack(index_offset))
+            self._outfile.write(INDEX_MAGIC)
+            self._outfile.close()
+            self._outfile = None
+            LOGGER.info('Closed recording %s with %d request keys.',
+                        self.record_file, len(self._index))
+
+
+class _RecordReader(object):
+    """Looks up recorded responses lazily in a memory-mapped record file."""
+
+    def __init__(self, replay_file):
+        """Initialize.
+
+        Args:
+            replay_file (str): The path of the record file.
+        """
+        self.replay_file = replay_file
+        self._lock = threading.Lock()
+        self._mmap = None
+        # request key -> offsets of the records not replayed yet.
+        self._index = {}
+        # request key -> responses not replayed yet, for legacy recordings.
+        self._responses = {}
+
+        with open(replay_file, 'rb') as infile:
+            if not os.fstat(infile.fileno()).st_size:
+                return
+            self._mmap = mmap.mmap(infile.fileno(), 0,
+                                   access=mmap.ACCESS_READ)
+
+        if self._mmap[:len(RECORD_FILE_MAGIC)] != RECORD_FILE_MAGIC:
+            # Recordings written before the streaming format pickle a single
+            # dict of all responses by request key.
+            self._responses = pickle.loads(self._mmap)
+            self._mmap.close()
+            self._mmap = None
+            return
+
+        index = self._read_index()
+        if index is None:
+            LOGGER.info('Recording %s has no index, scanning records.',
+                        replay_file)
+            index = self._scan_records()
+        self._index = {key: collections.deque(offsets)
+                       for key, offsets in index.items()}
+
+    def _read_index(self):
+        """Read the index written when the recording was closed.
+
+        Returns:
+            dict: The offsets of the records by request key, or None if the
+                recording was not closed.
+        """
+        size = len(self._mmap)
+        trailer_offset = size - len(INDEX_MAGIC) - _TRAILER.size
+        if (trailer_offset < len(RECORD_FILE_MAGIC) or
+                self._mmap[size - len(INDEX_MAGIC):] != INDEX_MAGIC):
+            return None
+        index_offset, = _TRAILER.unpack_from(self._mmap, trailer_offset)
+        return pickle.loads(self._mmap[index_offset:trailer_offset])
+
+    def _scan_records(self):
+        """Build the index by reading the record headers.
+
+        A truncated last record, e.g. from an interrupted recording, is
+        ignored.
+
+        Returns:
+            dict: The offsets of the records by request key.
+        """
+        index = collections.defaultdict(list)
+        offset = len(RECORD_FILE_MAGIC)
+        size = len(self._mmap)
+        while offset + _RECORD_HEADER.size <= size:
+            key_length, payload_length = _RECORD_HEADER.unpack_from(
+                self._mmap, offset)
+            key_offset = offset + _RECORD_HEADER.size
+            if key_offset + key_length + payload_length > size:
+                break
+            key = self._mmap[key_offset:key_offset + key_length]
+            index[key.decode('utf-8')].append(offset)
+            offset = key_offset + key_length + payload_length
+        return index
+
+    def _load_record(self, offset):
+        """Unpickle the response of a record.
+
+        Args:
+            offset (int): The offset of the record.
+
+        Returns:
+            dict: The recorded response.
+        """
+        key_length, payload_length = _RECORD_HEADER.unpack_from(
+            self._mmap, offset)
+        payload_offset = offset + _RECORD_HEADER.size + key_length
+        return pickle.loads(
+            self._mmap[payload_offset:payload_offset + payload_length])
+
+    def pop(self, request_key):
+        """Pop the next recorded response of a request.
+
+        Args:
+            request_key (str): The key of the request.
+
+        Returns:
+            dict: The recorded response, or None if there is none left.
+        """
+        with self._lock:
+            if request_key in self._responses:
+                results = self._responses[request_key]
+                return results.popleft() if results else None
+            offsets = self._index.get(request_key)
+            if not offsets:
+                return None
+            return self._load_record(offsets.popleft())
+
+
+def _get_writer(requests, record_file):
+    """Returns the writer of a record file, opening it on first use.
+
+    Args:
+        requests (dict): The open writers by record file.
+        record_file (str): The path of the record file.
+
+    Returns:
+        _RecordWriter: The writer of the record file.
+    """
+    with _FILES_LOCK:
+        writer = requests.get(record_file)
+        if writer is None:
+            writer = _RecordWriter(record_file)
+            requests[record_file] = writer
+            atexit.register(writer.close)
+            LOGGER.info('Recording API responses to %s.', record_file)
+        return writer
+
+
+def _get_reader(requests, replay_file):
+    """Returns the reader of a record file, opening it on first use.
+
+    Args:
+        requests (dict): The open readers by record file.
+        replay_file (str): The path of the record file.
+
+    Returns:
+        _RecordReader: The reader of the record file.
+    """
+    with _FILES_LOCK:
+        reader = requests.get(replay_file)
+        if reader is None:
+            LOGGER.info('Loading replay file %s.', replay_file)
+            reader = _RecordReader(replay_file)
+            requests[replay_file] = reader
+        return reader
+
+
+def close_recordings(requests):
+    """Write the indexes of the open recordings and close them.
+
+    Recordings are also closed when the interpreter exits.
+
+    Args:
+        requests (dict): The open writers by record file, as passed to record.
+    """
+    with _FILES_LOCK:
+        writers = list(requests.values())
+        requests.clear()
+    for writer in writers:
+        writer.close()
+
+
+def _recorded_result(request, result):
+    """Build the record of a successful API call.
+
+    Args:
+        request (HttpRequest): The executed HttpRequest object.
+        result (object): The response of the API.
+
+    Returns:
+        dict: The record to append to the recording.
+    """
+    return {
+        'exception_args': None,
+        'raised': False,
+        'request': request.to_json(),
+        'result': result,
+        'uri': request.uri}
+
+
+def _recorded_exception(request, e):
+    """Build the record of a failed API call.
+
+    Args:
+        request (HttpRequest): The executed HttpRequest object.
+        e (Exception): The exception raised by the call.
+
+    Returns:
+        dict: The record to append to the recording.
+    """
+    if isinstance(e, errors.HttpError):
+        # HttpError won't unpickle without all three arguments.
+        exception_args = (e.resp, e.content, e.uri)
+    else:
+        LOGGER.exception(e)
+        exception_args = [str(e)]
+    return {
+        'raised': True,
+        'request': request.to_json(),
+        'result': e.__class__,
+        'uri': request.uri,
+        'exception_args': exception_args}
+
+
+def _replayed_record(requests, replay_file, request):
+    """Pop the recorded response of a request from a replay file.
+
+    Args:
+        requests (dict): The open readers by record file.
+        replay_file (str): The path of the record file.
+        request (HttpRequest): The HttpRequest object to replay.
+
+    Returns:
+        dict: The recorded response, or None if the request was not
+            recorded.
+    """
+    reader = _get_reader(requests, replay_file)
+    obj = reader.pop(_key_from_request(request))
+    if obj is None:
+        LOGGER.warning(
+            'Request URI %s with body %s not found in recorded '
+            'requests, executing live http request instead.',
+            request.uri, request.body)
+    return obj
+
+
+def _replay_result(obj):
+    """Return or raise the recorded result of an API call.
+
+    Args:
+        obj (dict): The recorded response.
+
+    Returns:
+        object: The result object from the previous recording.
+
+    Raises:
+        Exception: Any exception raised during the previous recording.
+    """
+    if obj['raised']:
+        raise obj['result'](*obj['exception_args'])
+    return obj['result']
+
+
 def record(requests):
     """Record and serialize GCP API call answers.
 
     Args:
-        requests (dict): A dictionary to store a copy of all requests and
-            responses in, before pickling.
+        requests (dict): A dictionary to store the open record file writers
+            in, by record file.
 
     Returns:
         function: Decorator function.
@@ -81,47 +408,83 @@ def record(requests):
             if not record_file:
                 return f(self, request, *args, **kwargs)
 
-            with open(record_file, 'wb') as outfile:
-                pickler = pickle.Pickler(outfile)
-                request_key = _key_from_request(request)
-                results = requests.setdefault(
-                    request_key, collections.deque())
-                try:
-                    result = f(self, request, *args, **kwargs)
-                    obj = {
-                        'exception_args': None,
-                        'raised': False,
-                        'request': request.to_json(),
-                        'result': result,
-                        'uri': request.uri}
-                    results.append(obj)
-                    return result
-                except errors.HttpError as e:
-                    # HttpError won't unpickle without all three arguments.
-                    obj = {
-                        'raised': True,
-                        'request': request.to_json(),
-                        'result': e.__class__,
-                        'uri': request.uri,
-                        'exception_args': (e.resp, e.content, e.uri)
-                    }
-                    results.append(obj)
-                    raise
-                except Exception as e:
-                    LOGGER.exception(e)
-                    obj = {
-                        'raised': True,
-                        'request': request.to_json(),
-                        'result': e.__class__,
-                        'uri': request.uri,
-                        'exception_args': [str(e)]
-                    }
-                    results.append(obj)
-                    raise
-                finally:
+            writer = _get_writer(requests, record_file)
+            request_key = _key_from_request(request)
+            obj = None
+            try:
+                result = f(self, request, *args, **kwargs)
+                obj = _recorded_result(request, result)
+                return result
+            except Exception as e:
+                obj = _recorded_exception(request, e)
+                raise
+            finally:
+                if obj is not None:
+                    LOGGER.debug('Recording key %s', request_key)
+                    writer.append(request_key, obj)
+
+        return record_wrapper
+
+    return decorate
+
+
+def record_async(requests):
+    """Record and serialize GCP API call answers of coroutines.
+
+    The records are written in the same recordings as record, so calls made
+    through the async transport can be replayed by either path.
+
+    Args:
+        requests (dict): A dictionary to store the open record file writers
+            in, by record file.
+
+    Returns:
+        function: Decorator function.
+    """
+    def decorate(f):
+        """Decorator function for the wrapper.
+
+        Args:
+            f(function): passes a coroutine function into the wrapper.
+
+        Returns:
+            function: Wrapped coroutine function.
+        """
+        @functools.wraps(f)
+        async def record_wrapper(self, request, *args, **kwargs):
+            """Record and serialize GCP API call answers.
+
+            Args:
+                self (object): Self of the caller.
+                request (HttpRequest): The HttpRequest object to execute.
+                **args (list): Additional args to pass through to function.
+                **kwargs (dict): Additional key word args to pass through to
+                    function.
+
+            Returns:
+                object: The result from the wrapped function.
+
+            Raises:
+                Exception: Any exception raised by the wrapped function.
+            """
+            record_file = os.environ.get(RECORD_ENVIRONMENT_VAR, None)
+            if not record_file:
+                return await f(self, request, *args, **kwargs)
+
+            writer = _get_writer(requests, record_file)
+            request_key = _key_from_request(request)
+            obj = None
+            try:
+                result = await f(self, request, *args, **kwargs)
+                obj = _recorded_result(request, result)
+                return result
+            except Exception as e:
+                obj = _recorded_exception(request, e)
+                raise
+            finally:
+                if obj is not None:
                     LOGGER.debug('Recording key %s', request_key)
-                    pickler.dump(requests)
-                    outfile.flush()
+                    writer.append(request_key, obj)
 
         return record_wrapper
 
@@ -132,8 +495,8 @@ def replay(requests):
     """Record and serialize GCP API call answers.
 
     Args:
-        requests (dict): A dictionary to store a copy of all requests and
-            responses in, after unpickling.
+        requests (dict): A dictionary to store the readers of the replayed
+            record files in, by record file.
 
     Returns:
         function: Decorator function.
@@ -160,34 +523,62 @@ def replay(requests):
 
             Returns:
                 object: The result object from the previous recording.
-
-            Raises:
-                Exception: Any exception raised during the previous recording.
             """
             replay_file = os.environ.get(REPLAY_ENVIRONMENT_VAR, None)
             if not replay_file:
                 return f(self, request, *args, **kwargs)
 
-            if not requests:
-                LOGGER.info('Loading replay file %s.', replay_file)
-                with open(replay_file, 'rb') as infile:
-                    unpickler = pickle.Unpickler(infile)
-                    requests.update(unpickler.load())
+            obj = _replayed_record(requests, replay_file, request)
+            if obj is not None:
+                return _replay_result(obj)
+            return f(self, request, *args, **kwargs)
 
-            request_key = _key_from_request(request)
-            if request_key in requests:
-                results = requests[request_key]
-                # Pull the first result from the queue.
-                obj = results.popleft()
-                if obj['raised']:
-                    raise obj['result'](*obj['exception_args'])
-                return obj['result']
-            else:
-                LOGGER.warning(
-                    'Request URI %s with body %s not found in recorded '
-                    'requests, executing live http request instead.',
-                    request.uri, request.body)
-                return f(self, request, *args, **kwargs)
+        return replay_wrapper
+
+    return decorate
+
+
+def replay_async(requests):
+    """Replay GCP API call answers of coroutines.
+
+    Args:
+        requests (dict): A dictionary to store the readers of the replayed
+            record files in, by record file.
+
+    Returns:
+        function: Decorator function.
+    """
+    def decorate(f):
+        """Replay GCP API call answers.
+
+        Args:
+            f (function): Coroutine function to decorate
+
+        Returns:
+            function: Wrapped coroutine function.
+        """
+        @functools.wraps(f)
+        async def replay_wrapper(self, request, *args, **kwargs):
+            """Replay and deserialize GCP API call answers.
+
+            Args:
+                self (object): Self of the caller.
+                request (HttpRequest): The HttpRequest object to execute.
+                **args (list): Additional args to pass through to function.
+                **kwargs (dict): Additional key word args to pass through to
+                    function.
+
+            Returns:
+                object: The result object from the previous recording.
+            """
+            replay_file = os.environ.get(REPLAY_ENVIRONMENT_VAR, None)
+            if not replay_file:
+                return await f(self, request, *args, **kwargs)
+
+            obj = _replayed_record(requests, replay_file, request)
+            if obj is not None:
+                return _replay_result(obj)
+            return await f(self, request, *args, **kwargs)
 
         return replay_wrapper
 
@@ -0,0 +1,225 @@
+# Copyright 2020 The Forseti Security Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Per API token buckets used to rate limit and measure API calls.
+
+The buckets are shared by all the repositories of an API in the process, so
+callers can check which APIs have quota left before making calls, e.g. the
+inventory crawler schedules work for the APIs with available tokens first.
+"""
+
+import asyncio
+import threading
+import time
+
+from google.cloud.forseti.common.util import logger
+
+LOGGER = logger.get_logger(__name__)
+
+# HTTP status of responses throttled by the API.
+THROTTLED_STATUS = 429
+
+_BUCKETS = {}
+_BUCKETS_LOCK = threading.Lock()
+
+
+class TokenBucket(object):
+    """Token bucket rate limiter with call metrics for one API.
+
+    The bucket holds up to max_calls tokens and is refilled with max_calls
+    tokens per period. Each call takes a token, waiting for one if the
+    bucket is empty. Can be used as a context manager, like RateLimiter.
+    """
+
+    def __init__(self, name, max_calls, period):
+        """Initialize.
+
+        Args:
+            name (str): The name of the API.
+            max_calls (int): Allowed calls per period.
+            period (float): The period in seconds.
+        """
+        self.name = name
+        self.capacity = float(max_calls)
+        self.rate = max_calls / float(period)
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._updated = time.time()
+
+        self._started = self._updated
+        self.calls = 0
+        self.throttled = 0
+        self.latency_seconds = 0.0
+
+    def reset_metrics(self):
+        """Restart the call metrics, the tokens are kept."""
+        with self._lock:
+            self._started = time.time()
+            self.calls = 0
+            self.throttled = 0
+            self.latency_seconds = 0.0
+
+    def _refill(self, now):
+        """Add the tokens accumulated since the last update.
+
+        Args:
+            now (float): The current time.
+        """
+        self._tokens = min(self.capacity,
+                           self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self):
+        """Time until a token is available.
+
+        Returns:
+            float: The time in seconds, 0 if a token is available.
+        """
+        with self._lock:
+            self._refill(time.time())
+            if self._tokens >= 1:
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def try_acquire(self):
+        """Take a token if one is available, without waiting.
+
+        Returns:
+            float: 0 if a token was taken, else the time in seconds until one
+                is available.
+        """
+        with self._lock:
+            self._refill(time.time())
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self):
+        """Take a token, waiting until one is available."""
+        wait = self.try_acquire()
+        while wait:
+            time.sleep(wait)
+            wait = self.try_acquire()
+
+    async def acquire_async(self):
+        """Take a token, yielding to the event loop until one is available."""
+        wait = self.try_acquire()
+        while wait:
+            await asyncio.sleep(wait)
+            wait = self.try_acquire()
+
+    def record(self, latency_seconds, status=None):
+        """Record a call to the API.
+
+        Args:
+            latency_seconds (float): The duration of the call.
+            status (int): The HTTP status of an error response, if any.
+        """
+        with self._lock:
+            self.calls += 1
+            self.latency_seconds += latency_seconds
+            if status == THROTTLED_STATUS:
+                self.throttled += 1
+
+    def get_metrics(self):
+        """Get the call metrics of the API.
+
+        Returns:
+            dict: The number of calls, throttled calls, the total latency in
+                seconds and the calls per second since the bucket was
+                created or its metrics were reset.
+        """
+        with self._lock:
+            elapsed = max(time.time() - self._started, 1e-6)
+            return {'calls': self.calls,
+                    'throttled': self.throttled,
+                    'latency_seconds': self.latency_seconds,
+                    'calls_per_second': self.calls / elapsed}
+
+    def __enter__(self):
+        """Take a token.
+
+        Returns:
+            TokenBucket: The bucket.
+        """
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Nothing to release, tokens are refilled over time.
+
+        Args:
+            exc_type (type): The exception type, if any.
+            exc_value (Exception): The exception, if any.
+            traceback (traceback): The traceback, if any.
+        """
+
+
+def get_token_bucket(name, max_calls, period):
+    """Get the shared token bucket of an API, creating it on first use.
+
+    Args:
+        name (str): The name of the API.
+        max_calls (int): Allowed calls per period.
+        period (float): The period in seconds.
+
+    Returns:
+        TokenBucket: The bucket shared by the callers with the same API and
+            quota.
+    """
+    key = (name, max_calls, period)
+    with _BUCKETS_LOCK:
+        bucket = _BUCKETS.get(key)
+        if bucket is None:
+            bucket = TokenBucket(name, max_calls, period)
+            _BUCKETS[key] = bucket
+        return bucket
+
+
+def get_token_buckets(name=None):
+    """Get the token buckets in use.
+
+    Args:
+        name (str): Only return the buckets of this API if set.
+
+    Returns:
+        list: The token buckets.
+    """
+    with _BUCKETS_LOCK:
+        return [bucket for bucket in _BUCKETS.values()
+                if name is None or bucket.name == name]
+
+
+def reset_metrics():
+    """Restart the call metrics of all the token buckets.
+
+    The buckets live as long as the process, so the metrics are reset when a
+    new measurement starts, e.g. at the start of each inventory crawl.
+    """
+    for bucket in get_token_buckets():
+        bucket.reset_metrics()
+
+
+def wait_time(name):
+    """Time until a call to an API is allowed by its token buckets.
+
+    Args:
+        name (str): The name of the API.
+
+    Returns:
+        float: The time in seconds, 0 if the API has no token bucket.
+    """
+    return max([bucket.wait_time() for bucket in get_token_buckets(name)] +
+               [0.0])
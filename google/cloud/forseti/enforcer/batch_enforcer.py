@@ -59,9 +59,9 @@ class BatchFirewallEnforcer(object):
           project_sema (threading.BoundedSemaphore): An optional semaphore
               object, used to limit the number of concurrent projects getting
               written to.
-          max_running_operations (int): [DEPRECATED] Used to limit the number of
-              concurrent write operations on a single project's firewall rules.
-              Set to 0 to allow unlimited in flight asynchronous operations.
+          max_running_operations (int): The maximum number of write operations
+              in flight at once on each network of a project's firewall. Set to
+              0 to apply the changes one at a time.
         """
         self.global_configs = global_configs
         self.enforcement_log = enforcer_log_pb2.EnforcerLog()
@@ -70,10 +70,7 @@ class BatchFirewallEnforcer(object):
 
         self._project_sema = project_sema
 
-        if max_running_operations:
-            LOGGER.warning(
-                'Max running operations is deprecated. Argument ignored.')
-        self._max_running_operations = None
+        self._max_running_operations = max_running_operations
         self._local = LOCAL_THREAD
 
     @property
@@ -221,7 +218,8 @@ class BatchFirewallEnforcer(object):
             project_id,
             compute_client=self.compute_client,
             dry_run=self._dry_run,
-            project_sema=self._project_sema)
+            project_sema=self._project_sema,
+            max_running_operations=self._max_running_operations)
 
         result = enforcer.enforce_firewall_policy(
             firewall_policy,
@@ -52,17 +52,15 @@ def initialize_batch_enforcer(global_configs, concurrent_threads,
             execute.
         max_write_threads (str): The maximum number of enforcement threads that
             can be actively updating project firewalls.
-        max_running_operations (str): [DEPRECATED] The maximum number of write
-            operations per enforcement thread.
+        max_running_operations (str): The maximum number of write operations
+            in flight per enforcement thread, 0 to apply the changes one at a
+            time.
         dry_run (boolean): If True, will simply log what action would have been
             taken without actually applying any modifications.
 
     Returns:
         BatchFirewallEnforcer: A BatchFirewallEnforcer instance.
     """
-    if max_running_operations:
-        LOGGER.warning('Deprecated argument max_running_operations set.')
-
     if max_write_threads:
         project_sema = threading.BoundedSemaphore(value=max_write_threads)
     else:
@@ -72,7 +70,8 @@ def initialize_batch_enforcer(global_configs, concurrent_threads,
         global_configs=global_configs,
         dry_run=dry_run,
         concurrent_workers=concurrent_threads,
-        project_sema=project_sema)
+        project_sema=project_sema,
+        max_running_operations=int(max_running_operations or 0))
 
     return enforcer
 
@@ -144,13 +143,14 @@ def main():
         help='The number concurrent worker threads to use.')
 
     arg_parser.add_argument(
-        '--maximum_firewall_write_operations', default=10,
+        '--maximum_firewall_write_operations', default=0,
         help='The maximum number of in flight write operations'
-             'on project firewalls. Each running thread is '
+             ' on project firewalls. Each running thread is '
              'allowed up to this many running operations, '
              'so to limit the over all number of operations, '
              'limit the number of write threads using the'
-             ' maximum_project_writer_threads flag.')
+             ' maximum_project_writer_threads flag. The default '
+             'of 0 applies the changes one at a time.')
 
     arg_parser.add_argument(
         '--maximum_project_writer_threads', default=1,
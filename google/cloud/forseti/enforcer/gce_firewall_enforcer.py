@@ -15,11 +15,13 @@
 
 Simplifies the interface with the compute API for managing firewall policies.
 """
+import collections
 import hashlib
 import json
 import operator
 import socket
 import ssl
+import time
 
 import http.client
 import httplib2
@@ -50,6 +52,11 @@ OPERATION_TIMEOUT = 120.0
 # The number of times to retry an operation if it times out before completion.
 OPERATION_RETRY_COUNT = 5
 
+# The initial and maximum time to wait between two bulk status checks of the
+# operations in flight, when changes are applied concurrently.
+OPERATION_POLL_INITIAL_DELAY = 1.0
+OPERATION_POLL_MAX_DELAY = 16.0
+
 
 class Error(Exception):
     """Base error class for the module."""
@@ -493,7 +500,8 @@ class FirewallEnforcer(object):
                  current_rules=None,
                  project_sema=None,
                  operation_sema=None,
-                 add_rule_callback=None):
+                 add_rule_callback=None,
+                 max_running_operations=0):
         """Constructor.
 
         Args:
@@ -515,6 +523,9 @@ class FirewallEnforcer(object):
             add_rule_callback (function): A callback function that checks
                 whether a firewall rule should be applied. If the callback
                 returns False, that rule will not be modified.
+            max_running_operations (int): The maximum number of rule changes
+                in flight at once on each network of the project. Set to 0 to
+                apply the changes one at a time.
         """
         self.project = project
         self.compute_client = compute_client
@@ -532,6 +543,8 @@ class FirewallEnforcer(object):
         self.operation_sema = None
 
         self._add_rule_callback = add_rule_callback
+        self._max_running_operations = max(int(max_running_operations or 0),
+                                           0)
 
         # Initialize private parameters
         self._rules_to_delete = []
@@ -928,9 +941,8 @@ class FirewallEnforcer(object):
     def _apply_change(self, firewall_function, rules):
         """Modify the firewall using the passed in function and rules.
 
-        If self.operation_sema is defined, then the number of outstanding
-        changes is limited to the number of semaphore locks that can be
-        acquired.
+        If self._max_running_operations is set, then the changes are applied
+        concurrently, see _apply_change_concurrently.
 
         Args:
             firewall_function (function): The delete|insert|update function to
@@ -947,6 +959,9 @@ class FirewallEnforcer(object):
         if not rules:
             return applied_rules, failed_rules, change_errors
 
+        if self._max_running_operations:
+            return self._apply_change_concurrently(firewall_function, rules)
+
         for rule in rules:
             try:
                 response = firewall_function(self.project,
@@ -979,3 +994,94 @@ class FirewallEnforcer(object):
                 failed_rules.append(rule)
 
         return applied_rules, failed_rules, change_errors
+
+    def _apply_change_concurrently(self, firewall_function, rules):
+        """Modify the firewall with several changes in flight at once.
+
+        Up to self._max_running_operations changes are submitted without
+        waiting for their operations to complete. The operations in flight are
+        checked in bulk, backing off while none of them completes, and a new
+        change is submitted as soon as one completes. All the operations are
+        done when this returns, so the changes of the next set are only
+        applied once these are done.
+
+        An operation that is not done after the timeouts of all the retries of
+        a blocking change fails with an OperationTimeoutError.
+
+        Args:
+            firewall_function (function): The delete|insert|update function to
+                call for this set of rules
+            rules (list): A list of rules to pass to the firewall_function.
+
+        Returns:
+            tuple: A tuple with the rules successfully changed by this function
+                and the rules that failed.
+        """
+        applied_rules = []
+        failed_rules = []
+        change_errors = []
+        rules_to_submit = collections.deque(rules)
+        # (rule, operation, deadline) of the operations in flight.
+        running = []
+        delay = OPERATION_POLL_INITIAL_DELAY
+        max_wait = OPERATION_TIMEOUT * (OPERATION_RETRY_COUNT + 1)
+
+        while rules_to_submit or running:
+            while (rules_to_submit and
+                   len(running) < self._max_running_operations):
+                rule = rules_to_submit.popleft()
+                try:
+                    operation = firewall_function(self.project,
+                                                  rule,
+                                                  blocking=False)
+                except (api_errors.ApiNotEnabledError,
+                        api_errors.ApiExecutionError) as e:
+                    LOGGER.exception(
+                        'Error changing firewall rule %s for project %s: %s',
+                        rule.get('name', ''), self.project, e)
+                    error_str = 'Rule: %s\nError: %s' % (
+                        rule.get('name', ''), e)
+                    change_errors.append(error_str)
+                    failed_rules.append(rule)
+                    continue
+                running.append((rule, operation, time.time() + max_wait))
+
+            if not running:
+                continue
+
+            if not any(operation.get('status', '') == 'DONE'
+                       for _, operation, _ in running):
+                time.sleep(delay)
+                operations = self.compute_client.poll_operations(
+                    self.project, [operation for _, operation, _ in running])
+                running = [(rule, operation, deadline) for
+                           (rule, _, deadline), operation in
+                           zip(running, operations)]
+
+            still_running = []
+            for rule, operation, deadline in running:
+                if operation.get('status', '') == 'DONE':
+                    if _is_successful(operation):
+                        applied_rules.append(rule)
+                    else:
+                        failed_rules.append(rule)
+                elif time.time() > deadline:
+                    e = api_errors.OperationTimeoutError(self.project,
+                                                         operation)
+                    LOGGER.error(
+                        'Timeout changing firewall rule %s for project %s: %s',
+                        rule.get('name', ''), self.project, e)
+                    error_str = 'Rule: %s\nError: %s' % (
+                        rule.get('name', ''), e)
+                    change_errors.append(error_str)
+                    failed_rules.append(rule)
+                else:
+                    still_running.append((rule, operation, deadline))
+
+            if len(still_running) < len(running):
+                delay = OPERATION_POLL_INITIAL_DELAY
+            else:
+                delay = min(delay * 2, OPERATION_POLL_MAX_DELAY)
+            running = still_running
+
+        return applied_rules, failed_rules, change_errors
@@ -66,8 +66,9 @@ class ProjectEnforcer(object):
             project_sema (threading.BoundedSemaphore): An optional semaphore
                 object, used to limit the number of concurrent projects getting
                 written to.
-            max_running_operations (int): [DEPRECATED] Used to limit the number
-                of concurrent running operations on an API.
+            max_running_operations (int): The maximum number of rule changes
+                in flight at once on each network of the project. Set to 0 to
+                apply the changes one at a time.
         """
         self.project_id = project_id
 
@@ -85,9 +86,7 @@ class ProjectEnforcer(object):
         self._dry_run = dry_run
 
         self._project_sema = project_sema
-        if max_running_operations:
-            LOGGER.warning(
-                'Max running operations is deprecated. Argument ignored.')
+        self._max_running_operations = max_running_operations
 
         self._operation_sema = None
 
@@ -281,7 +280,8 @@ class ProjectEnforcer(object):
             rules_before_enforcement,
             project_sema=self._project_sema,
             operation_sema=self._operation_sema,
-            add_rule_callback=add_rule_callback)
+            add_rule_callback=add_rule_callback,
+            max_running_operations=self._max_running_operations)
 
         return enforcer
 
@@ -14,6 +14,7 @@
 """Notifier runner."""
 
 from builtins import str
+from concurrent import futures
 import importlib
 import inspect
 import traceback
@@ -21,6 +22,7 @@ import traceback
 # pylint: disable=line-too-long
 from google.cloud.forseti.common.util import logger
 from google.cloud.forseti.common.util import string_formats
+from google.cloud.forseti.notifier import violation_spool
 from google.cloud.forseti.notifier.notifiers.base_notification import BaseNotification
 from google.cloud.forseti.notifier.notifiers import cscc_notifier
 from google.cloud.forseti.notifier.notifiers.inventory_summary import InventorySummary
@@ -31,6 +33,9 @@ from google.cloud.forseti.services.scanner import dao as scanner_dao
 
 LOGGER = logger.get_logger(__name__)
 
+# Number of notifiers run at the same time.
+DEFAULT_MAX_CONCURRENT_NOTIFIERS = 4
+
 
 # pylint: disable=inconsistent-return-statements
 def find_notifiers(notifier_name):
@@ -78,6 +83,54 @@ def convert_to_timestamp(violations):
     return violations
 
 
+def spool_violations(violation_access, scanner_index_id, spools,
+                     all_violations=None):
+    """Read the violations of a scanner run and spool them by resource.
+
+    The violations are read in blocks and appended one at a time to the
+    spool of their resource, so at most a block of violations is held in
+    memory.
+
+    Args:
+        violation_access (ViolationAccess): The violations table access.
+        scanner_index_id (int64): Scanner index id.
+        spools (dict): The ViolationSpool of each resource, filled with the
+            spools of the resources with violations, in the order they are
+            found.
+        all_violations (ViolationSpool): Spool of all the violations, if
+            set.
+    """
+    for violation in violation_access.iter(scanner_index_id):
+        v_data = scanner_dao.convert_sqlalchemy_object_to_dict(violation)
+        convert_to_timestamp([v_data])
+        resource = scanner_dao.decode_violation(v_data)
+        if all_violations is not None:
+            all_violations.append(v_data)
+        if not resource:
+            continue
+        if resource not in spools:
+            spools[resource] = violation_spool.ViolationSpool(resource)
+        spools[resource].append(v_data)
+
+
+def run_notifiers(notifiers, max_workers):
+    """Run the notifiers concurrently.
+
+    Args:
+        notifiers (list): The functions running the notifiers.
+        max_workers (int): The number of notifiers run at the same time.
+
+    Raises:
+        Exception: The first error raised by a notifier, once all the
+            notifiers are done.
+    """
+    with futures.ThreadPoolExecutor(
+            max_workers=max(int(max_workers), 1)) as executor:
+        results = [executor.submit(notifier) for notifier in notifiers]
+    for result in results:
+        result.result()
+
+
 # pylint: disable=too-many-branches
 # pylint: disable=too-many-statements
 def run(inventory_index_id,
@@ -119,72 +172,89 @@ def run(inventory_index_id,
                 'No success or partial success scanner index found for '
                 'inventory index: "%s".', str(inventory_index_id))
         else:
-            # get violations
-            violation_access = scanner_dao.ViolationAccess(session)
-            violations = violation_access.list(
-                scanner_index_id=scanner_index_id)
-            violations_as_dict = []
-            for violation in violations:
-                violations_as_dict.append(
-                    scanner_dao.convert_sqlalchemy_object_to_dict(violation))
-            violations_as_dict = convert_to_timestamp(violations_as_dict)
-            violation_map = scanner_dao.map_by_resource(violations_as_dict)
-
-            for retrieved_v in violation_map:
-                log_message = (
-                    'Retrieved {} violations for resource \'{}\''.format(
-                        len(violation_map[retrieved_v]), retrieved_v))
-                LOGGER.info(log_message)
-                progress_queue.put(log_message)
-
-            # build notification notifiers
-            notifiers = []
-            for resource in notifier_configs['resources']:
-                if violation_map.get(resource['resource']) is None:
-                    log_message = 'Resource \'{}\' has no violations'.format(
-                        resource['resource'])
-                    progress_queue.put(log_message)
-                    LOGGER.info(log_message)
-                    continue
-                if not resource['should_notify']:
-                    LOGGER.debug('Not notifying for: %s', resource['resource'])
-                    continue
-                for notifier in resource['notifiers']:
+            violation_configs = notifier_configs.get('violation') or {}
+            cscc_configs = violation_configs.get('cscc') or {}
+            # CSCC gets the violations of all the resources.
+            cscc_violations = None
+            if cscc_configs.get('enabled'):
+                cscc_violations = violation_spool.ViolationSpool('cscc')
+            violation_map = {}
+            try:
+                spool_violations(scanner_dao.ViolationAccess(session),
+                                 scanner_index_id,
+                                 violation_map,
+                                 cscc_violations)
+
+                for retrieved_v in violation_map:
                     log_message = (
-                        'Running \'{}\' notifier for resource \'{}\''.format(
-                            notifier['name'], resource['resource']))
-                    progress_queue.put(log_message)
+                        'Retrieved {} violations for resource \'{}\''.format(
+                            len(violation_map[retrieved_v]), retrieved_v))
                     LOGGER.info(log_message)
-                    try:
-                        chosen_pipeline = find_notifiers(notifier['name'])
-                        notifiers.append(chosen_pipeline(
-                            resource['resource'], inventory_index_id,
-                            violation_map[resource['resource']], global_configs,
-                            notifier_configs, notifier.get('configuration')))
-                    except Exception as e:  # pylint: disable=broad-except
-                        error_message = ('Error running \'{}\' notifier for '
-                                         'resource \'{}\':  \'{}\''.format(
-                                             notifier['name'],
-                                             resource['resource'],
-                                             traceback.format_exc()))
-                        progress_queue.put(error_message)
-                        LOGGER.exception(e)
-            # Run the notifiers.
-            for notifier in notifiers:
-                notifier.run()
-
-            # Run the CSCC notifier.
-            violation_configs = notifier_configs.get('violation')
-            if violation_configs:
-                if violation_configs.get('cscc').get('enabled'):
-                    source_id = violation_configs.get('cscc').get('source_id')
+                    progress_queue.put(log_message)
+
+                # build notification notifiers
+                notifiers = []
+                for resource in notifier_configs['resources']:
+                    if violation_map.get(resource['resource']) is None:
+                        log_message = (
+                            'Resource \'{}\' has no violations'.format(
+                                resource['resource']))
+                        progress_queue.put(log_message)
+                        LOGGER.info(log_message)
+                        continue
+                    if not resource['should_notify']:
+                        LOGGER.debug('Not notifying for: %s',
+                                     resource['resource'])
+                        continue
+                    for notifier in resource['notifiers']:
+                        log_message = (
+                            'Running \'{}\' notifier for resource '
+                            '\'{}\''.format(
+                                notifier['name'], resource['resource']))
+                        progress_queue.put(log_message)
+                        LOGGER.info(log_message)
+                        try:
+                            chosen_pipeline = find_notifiers(notifier['name'])
+                            notifiers.append(chosen_pipeline(
+                                resource['resource'], inventory_index_id,
+                                violation_map[resource['resource']],
+                                global_configs, notifier_configs,
+                                notifier.get('configuration')).run)
+                        except Exception as e:  # pylint: disable=broad-except
+                            error_message = (
+                                'Error running \'{}\' notifier for '
+                                'resource \'{}\':  \'{}\''.format(
+                                    notifier['name'],
+                                    resource['resource'],
+                                    traceback.format_exc()))
+                            progress_queue.put(error_message)
+                            LOGGER.exception(e)
+
+                # Run the CSCC notifier.
+                if cscc_violations is not None:
+                    source_id = cscc_configs.get('source_id')
                     # beta mode
                     LOGGER.debug(
                         'Running CSCC notifier with beta API. source_id: '
                         '%s', source_id)
-                    (cscc_notifier.CsccNotifier(inventory_index_id,
-                                                api_quota)
-                     .run(violations_as_dict, source_id=source_id))
+                    cscc = cscc_notifier.CsccNotifier(
+                        inventory_index_id,
+                        api_quota,
+                        max_concurrent_batches=cscc_configs.get(
+                            'max_concurrent_batches',
+                            cscc_notifier.DEFAULT_MAX_CONCURRENT_BATCHES))
+                    notifiers.append(
+                        lambda: cscc.run(cscc_violations, source_id=source_id))
+
+                # Run the notifiers.
+                run_notifiers(notifiers, notifier_configs.get(
+                    'max_concurrent_notifiers',
+                    DEFAULT_MAX_CONCURRENT_NOTIFIERS))
+            finally:
+                for spool in violation_map.values():
+                    spool.close()
+                if cscc_violations is not None:
+                    cscc_violations.close()
 
         # Inventory Summary - Save to GCS and/or send email
         inventory_summary = InventorySummary(
@@ -14,11 +14,11 @@
 
 """Upload violations to GCS bucket as Findings."""
 from builtins import object
-import ast
+import hashlib
 import json
+import math
 import tempfile
 
-from google.cloud.forseti.common.gcp_api import errors as api_errors
 from google.cloud.forseti.common.gcp_api import securitycenter
 from google.cloud.forseti.common.gcp_api import storage
 from google.cloud.forseti.common.util import logger
@@ -29,11 +29,62 @@ from google.cloud.forseti.common.util import string_formats
 
 LOGGER = logger.get_logger(__name__)
 
+# Number of batch requests sent to CSCC at the same time.
+DEFAULT_MAX_CONCURRENT_BATCHES = 4
+
+# Source properties that change on every scan, they are not part of the
+# finding fingerprint so findings found again are not updated.
+SCAN_SOURCE_PROPERTIES = frozenset(
+    ['db_source', 'inventory_index_id', 'scanner_index_id'])
+
+
+def _normalize_property(value):
+    """Normalize a source property value read from the API.
+
+    The API returns the integer properties as floats.
+
+    Args:
+        value (object): The property value.
+
+    Returns:
+        object: The normalized value.
+    """
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def finding_fingerprint(finding):
+    """Content hash of a finding.
+
+    The event time and the source properties of the scan are excluded. The
+    findings sent to the API have snake_case fields, the findings read from
+    the API have camelCase fields.
+
+    Args:
+        finding (dict): The finding, as sent to or read from the API.
+
+    Returns:
+        bytes: The fingerprint.
+    """
+    source_properties = (finding.get('source_properties') or
+                         finding.get('sourceProperties') or {})
+    content = [
+        finding.get('category'),
+        finding.get('resource_name') or finding.get('resourceName'),
+        finding.get('state'),
+        sorted((key, _normalize_property(value))
+               for key, value in source_properties.items()
+               if key not in SCAN_SOURCE_PROPERTIES)]
+    return hashlib.sha1(
+        json.dumps(content, sort_keys=True).encode('utf-8')).digest()
+
 
 class CsccNotifier(object):
     """Send violations to CSCC via API or via GCS bucket."""
 
-    def __init__(self, inv_index_id, api_quota):
+    def __init__(self, inv_index_id, api_quota,
+                 max_concurrent_batches=DEFAULT_MAX_CONCURRENT_BATCHES):
         """`Findingsnotifier` initializer.
 
         # TODO: Find out why the InventoryConfig is empty.
@@ -41,10 +92,13 @@ class CsccNotifier(object):
         Args:
             inv_index_id (str): inventory index ID
             api_quota (dict): API quota configs
+            max_concurrent_batches (int): The number of batch requests sent
+                to CSCC at the same time.
         """
         self.inv_index_id = inv_index_id
 
         self.api_quota = api_quota
+        self.max_concurrent_batches = max(int(max_concurrent_batches), 1)
 
     def _transform_for_gcs(self, violations, gcs_upload_path):
         """Transform forseti violations to GCS findings format.
@@ -126,8 +180,19 @@ class CsccNotifier(object):
         Returns:
             list: violations in findings format; each violation is a dict.
         """
-        findings = []
+        return list(self._iter_findings(violations, source_id=source_id))
+
+    def _iter_findings(self, violations, source_id=None):
+        """Transform forseti violations to findings, one at a time.
+
+        Args:
+            violations (iterable): Violations to be sent to CSCC as findings.
+            source_id (str): Unique ID assigned by CSCC, to the organization
+                that the violations are originating from.
 
+        Yields:
+            list: The finding id and the finding of a violation.
+        """
         LOGGER.debug('Transforming findings. source_id: %s',
                      source_id)
         for violation in violations:
@@ -159,112 +224,139 @@ class CsccNotifier(object):
                                    sort_keys=True))
                 },
             }
-            findings.append([finding_id, finding])
-        return findings
+            yield [finding_id, finding]
 
     @staticmethod
-    def find_inactive_findings(new_findings, findings_in_cscc):
-        """Finds the currently ACTIVE findings
-           that do not correspond to the latest scanner run
-           and updates their states to inactive.
+    def _get_findings_in_cscc(client, source_id):
+        """Get the fingerprints of the ACTIVE findings in CSCC.
 
         Args:
-            new_findings (list): Latest violations that are transformed to
-                findings.
-            findings_in_cscc (list): Findings pulled from CSCC that
-                corresponds to the previous scanner run.
+            client (SecurityCenterClient): The CSCC client.
+            source_id (str): Unique ID assigned by CSCC, to the organization
+                that the violations are originating from.
 
         Returns:
-            list: Findings to be marked as 'INACTIVE'.
+            dict: The fingerprint of the findings, by finding id.
         """
+        fingerprints = {}
+        # No need to use the next page token, as the results here will
+        # return all the pages.
+        for page in client.list_findings(source_id=source_id) or []:
+            for result in page.get('listFindingsResults') or []:
+                finding = result.get('finding')
+                if finding:
+                    fingerprints[finding['name'][-32:]] = (
+                        finding_fingerprint(finding))
+        return fingerprints
+
+    def _patch_findings(self, client, findings, source_id, update_mask=None):
+        """Patch findings in CSCC in concurrent batch requests.
 
-        inactive_findings = []
-        new_findings_map = {}
-
-        for finding_list in new_findings:
-            finding_id = finding_list[0]
-            finding = finding_list[1]
-            add_to_dict = {finding_id: finding}
-            new_findings_map.update(add_to_dict)
-
-        for finding_list in findings_in_cscc:
-            finding_id = finding_list[0]
-            to_be_updated_finding = finding_list[1]
+        Args:
+            client (SecurityCenterClient): The CSCC client.
+            findings (list): The [finding_id, finding] pairs to patch.
+            source_id (str): Unique ID assigned by CSCC, to the organization
+                that the violations are originating from.
+            update_mask (str): The fields to update, all the fields if not
+                set.
 
-            if finding_id not in new_findings_map:
-                to_be_updated_finding['state'] = 'INACTIVE'
-                current_time = date_time.get_utc_now_datetime()
-                actual_time = current_time.strftime(
-                    string_formats.TIMESTAMP_TIMEZONE)
-                to_be_updated_finding['event_time'] = actual_time
-                inactive_findings.append([finding_id, to_be_updated_finding])
-        return inactive_findings
+        Returns:
+            int: The number of findings that failed to be patched.
+        """
+        if not findings:
+            return 0
+        results = client.patch_findings(
+            [('{}/findings/{}'.format(source_id, finding_id), finding)
+             for finding_id, finding in findings],
+            update_mask=update_mask,
+            max_workers=self.max_concurrent_batches)
+
+        failed = 0
+        for (finding_id, _), (_, error) in zip(findings, results):
+            if error is not None:
+                failed += 1
+                LOGGER.error('Unable to patch CSCC finding %s: %s',
+                             finding_id, error)
+        return failed
 
     # pylint: disable=too-many-locals
     def _send_findings_to_cscc(self, violations, source_id=None):
         """Send violations to CSCC directly via the CSCC API.
 
+        Only the differences with the ACTIVE findings in CSCC are sent: new
+        and changed findings are created or updated, findings no longer
+        found are marked INACTIVE and unchanged findings are skipped.
+
         Args:
             violations (dict): Violations to be uploaded as findings.
             source_id (str): Unique ID assigned by CSCC, to the organization
                 that the violations are originating from.
-        """
 
-        if source_id:
-            formatted_cscc_findings = []
-            LOGGER.debug('Sending findings to CSCC. source_id: '
-                         '%s', source_id)
-            new_findings = self._transform_for_api(violations,
-                                                   source_id=source_id)
-
-            client = securitycenter.SecurityCenterClient(self.api_quota)
-
-            paged_findings_in_cscc = client.list_findings(source_id=source_id)
-
-            # No need to use the next page token, as the results here will
-            # return all the pages.
-            for page in paged_findings_in_cscc:
-                formated_findings_in_page = (
-                    ast.literal_eval(json.dumps(page)))
-                list_findings_result_paged = (
-                    formated_findings_in_page.get('listFindingsResults'))
-                if not list_findings_result_paged:
-                    continue
-                for findings_in_page in list_findings_result_paged:
-                    finding_data = findings_in_page.get('finding')
-                    name = finding_data.get('name')
-                    finding_id = name[-32:]
-                    formatted_cscc_findings.append([finding_id,
-                                                    finding_data])
-
-            inactive_findings = self.find_inactive_findings(
-                new_findings,
-                formatted_cscc_findings)
-
-            for finding_list in new_findings:
-                finding_id = finding_list[0]
-                finding = finding_list[1]
-                LOGGER.debug('Creating finding CSCC:\n%s.', finding)
-                try:
-                    client.create_finding(finding, source_id=source_id,
-                                          finding_id=finding_id)
-                except api_errors.ApiExecutionError:
-                    LOGGER.exception('Encountered CSCC API error.')
-                    continue
-
-            for finding_list in inactive_findings:
-                finding_id = finding_list[0]
-                finding = finding_list[1]
-                LOGGER.debug('Updating finding CSCC:\n%s.', finding)
-                try:
-                    client.update_finding(finding,
-                                          finding_id,
-                                          source_id=source_id)
-                except api_errors.ApiExecutionError:
-                    LOGGER.exception('Encountered CSCC API error.')
-                    continue
-
-            return
+        Returns:
+            dict: The number of findings created, updated, marked INACTIVE,
+                unchanged and failed, and the API requests saved.
+        """
+        if not source_id:
+            return None
+
+        LOGGER.debug('Sending findings to CSCC. source_id: '
+                     '%s', source_id)
+        client = securitycenter.SecurityCenterClient(self.api_quota)
+        fingerprints_in_cscc = self._get_findings_in_cscc(client, source_id)
+
+        # The new and changed findings are sent as soon as there are enough
+        # to fill a batch request per worker.
+        flush_size = (securitycenter.FINDINGS_BATCH_SIZE *
+                      self.max_concurrent_batches)
+        summary = {'created': 0, 'updated': 0, 'inactive': 0,
+                   'unchanged': 0, 'failed': 0}
+        batches = 0
+        findings = 0
+        pending = []
+        for finding_id, finding in self._iter_findings(violations,
+                                                       source_id=source_id):
+            findings += 1
+            fingerprint = fingerprints_in_cscc.pop(finding_id, None)
+            if fingerprint is None:
+                summary['created'] += 1
+            elif fingerprint != finding_fingerprint(finding):
+                summary['updated'] += 1
+            else:
+                summary['unchanged'] += 1
+                continue
+            pending.append([finding_id, finding])
+            if len(pending) >= flush_size:
+                summary['failed'] += self._patch_findings(client, pending,
+                                                          source_id)
+                batches += self.max_concurrent_batches
+                pending = []
+        summary['failed'] += self._patch_findings(client, pending, source_id)
+        batches += int(math.ceil(float(len(pending)) /
+                                 securitycenter.FINDINGS_BATCH_SIZE))
+
+        # The ACTIVE findings that were not found again.
+        event_time = date_time.get_utc_now_datetime().strftime(
+            string_formats.TIMESTAMP_TIMEZONE)
+        inactive = [[finding_id, {'state': 'INACTIVE',
+                                  'event_time': event_time}]
+                    for finding_id in fingerprints_in_cscc]
+        summary['inactive'] = len(inactive)
+        summary['failed'] += self._patch_findings(
+            client, inactive, source_id, update_mask='state,event_time')
+        batches += int(math.ceil(float(len(inactive)) /
+                                 securitycenter.FINDINGS_BATCH_SIZE))
+
+        # One request per finding was sent before, for every new finding and
+        # every finding marked INACTIVE.
+        summary['requests_saved'] = findings + len(inactive) - batches
+        LOGGER.info('Synchronized %d findings with CSCC in %d batch '
+                    'requests: %d created, %d updated, %d marked INACTIVE, '
+                    '%d unchanged, %d failed, %d API requests saved.',
+                    findings + len(inactive) - summary['unchanged'], batches,
+                    summary['created'], summary['updated'],
+                    summary['inactive'], summary['unchanged'],
+                    summary['failed'], summary['requests_saved'])
+        return summary
 
     def run(self, violations, source_id=None):
         """Generate the temporary json file and upload to GCS.
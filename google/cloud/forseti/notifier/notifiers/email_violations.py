@@ -98,8 +98,8 @@ class EmailViolations(base_notification.BaseNotification):
         output_filename = self._get_output_filename(
             string_formats.VIOLATION_JSON_FMT)
         with tempfile.NamedTemporaryFile() as tmp_violations:
-            tmp_violations.write(parser.json_stringify(self.violations)
-                                 .encode())
+            for chunk in parser.json_stringify_iter(self.violations):
+                tmp_violations.write(chunk.encode())
             tmp_violations.flush()
             LOGGER.info('JSON filename: %s', tmp_violations.name)
             attachment = self.connector.create_attachment(
@@ -0,0 +1,105 @@
+# Copyright 2020 The Forseti Security Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Violations spooled to disk for the notifiers.
+
+The notifier reads the violations of a scan once, in blocks, and appends them
+to the spool of their resource. The notifiers of the resource then iterate
+over the spool, each with its own file handle, so the violations are never
+all held in memory.
+"""
+
+import json
+import os
+import tempfile
+import threading
+
+from google.cloud.forseti.common.util import logger
+
+LOGGER = logger.get_logger(__name__)
+
+
+class ViolationSpool(object):
+    """Iterable of the violations of a resource, stored in a temporary file.
+
+    The violations are stored as json lines. The spool can be iterated any
+    number of times, also concurrently, once the violations are appended.
+    """
+
+    def __init__(self, resource):
+        """Initialize.
+
+        Args:
+            resource (str): Violation resource name.
+        """
+        self.resource = resource
+        self._lock = threading.Lock()
+        self._count = 0
+        self._file = tempfile.NamedTemporaryFile(
+            mode='w', prefix='forseti-violations-', suffix='.jsonl',
+            delete=False)
+
+    def __len__(self):
+        """The number of violations.
+
+        Returns:
+            int: The number of violations.
+        """
+        return self._count
+
+    def __repr__(self):
+        """String representation.
+
+        Returns:
+            str: The resource and the number of violations.
+        """
+        return '<ViolationSpool(resource={}, violations={})>'.format(
+            self.resource, self._count)
+
+    def __iter__(self):
+        """Iterate over the violations, in the order they were appended.
+
+        Yields:
+            dict: The violations.
+        """
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+        with open(self._file.name, 'r') as spool_file:
+            for line in spool_file:
+                yield json.loads(line)
+
+    def append(self, violation):
+        """Append a violation.
+
+        Args:
+            violation (dict): The violation, must be json serializable.
+        """
+        line = json.dumps(violation, sort_keys=True)
+        with self._lock:
+            self._file.write(line)
+            self._file.write('\n')
+            self._count += 1
+
+    def close(self):
+        """Remove the temporary file."""
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.close()
+        try:
+            os.remove(self._file.name)
+        except OSError as e:
+            LOGGER.warning('Unable to remove the violations of %s in %s: %s',
+                           self.resource, self._file.name, e)
@@ -531,7 +531,7 @@ class Rule(object):
           iterable: A generator of RuleViolations.
         """
         for policy in firewall_policies:
-            if not any([policy > rule for rule in self.match_rules]):
+            if not any(policy > rule for rule in self.match_rules):
                 continue
             if is_whitelist_violation(self.verify_rules, policy):
                 yield self._create_violation(
@@ -550,7 +550,7 @@ class Rule(object):
           iterable: A generator of RuleViolations.
         """
         for policy in firewall_policies:
-            if not any([policy > rule for rule in self.match_rules]):
+            if not any(policy > rule for rule in self.match_rules):
                 continue
             if is_blacklist_violation(self.verify_rules, policy):
                 yield self._create_violation(
@@ -616,14 +616,7 @@ def is_whitelist_violation(rules, policy):
     Returns:
       bool: If the policy is a subset of one of the allowed rules or not.
     """
-    policy_subset_check = []
-    for rule in rules:
-        if policy < rule:
-            policy_subset_check.append(True)
-        else:
-            policy_subset_check.append(False)
-    result = not any(policy_subset_check)
-    return result
+    return not any(policy < rule for rule in rules)
 
 
 def is_blacklist_violation(rules, policy):
@@ -636,14 +629,7 @@ def is_blacklist_violation(rules, policy):
     Returns:
       bool: If the policy is a superset of one of the blacklisted rules or not.
     """
-    policy_superset_check = []
-    for rule in rules:
-        if policy > rule:
-            policy_superset_check.append(True)
-        else:
-            policy_superset_check.append(False)
-    result = any(policy_superset_check)
-    return result
+    return any(policy > rule for rule in rules)
 
 
 def is_rule_exists_violation(rule, policies, exact_match=True):
@@ -21,6 +21,7 @@ determine whether there are violations.
 
 from builtins import object
 import itertools
+import re
 import threading
 
 from google.cloud.forseti.common.gcp_type import errors as resource_errors
@@ -28,10 +29,11 @@ from google.cloud.forseti.common.gcp_type import iam_policy
 from google.cloud.forseti.common.gcp_type import resource as resource_mod
 from google.cloud.forseti.common.gcp_type import resource_util
 from google.cloud.forseti.common.util import logger
-from google.cloud.forseti.common.util import relationship
+from google.cloud.forseti.common.util import regular_exp
 from google.cloud.forseti.scanner.audit import base_rules_engine as bre
 from google.cloud.forseti.scanner.audit import rules as scanner_rules
 from google.cloud.forseti.scanner.audit import errors as audit_errors
+from google.cloud.forseti.services import utils
 
 LOGGER = logger.get_logger(__name__)
 
@@ -104,6 +106,107 @@ def _check_required_members(rule_members=None, policy_members=None):
     return violating_members
 
 
+class _MemberMatcher(object):
+    """The members of a rule binding, compiled for matching policy members.
+
+    Matches a policy member like any(rule_member.matches(policy_member)),
+    with set lookups for member names without wildcards and a single
+    regular expression per member type for the rest.
+    """
+
+    def __init__(self, rule_members):
+        """Initialize.
+
+        Args:
+            rule_members (list): IamPolicyMembers of the rule binding.
+        """
+        self.rule_members = rule_members
+        self.member_types = set()
+        self.exact_names = {}
+        self.name_patterns = {}
+        self.domains = set()
+        patterns = {}
+        for rule_member in rule_members:
+            if rule_member.type in (iam_policy.IamPolicyMember.ALL_USERS,
+                                    iam_policy.IamPolicyMember.ALL_AUTH_USERS):
+                self.member_types.add(rule_member.type)
+            if not rule_member.name:
+                continue
+            if rule_member.type == 'domain':
+                self.domains.add(rule_member.name)
+            if '*' not in rule_member.name and _is_ascii(rule_member.name):
+                self.exact_names.setdefault(rule_member.type, set()).add(
+                    rule_member.name.lower())
+            patterns.setdefault(rule_member.type, []).append(
+                regular_exp.escape_and_globify(rule_member.name))
+
+        for member_type, type_patterns in patterns.items():
+            self.name_patterns[member_type] = re.compile(
+                '|'.join('(?:{})'.format(p) for p in type_patterns),
+                flags=re.IGNORECASE)
+
+    def matches(self, policy_member):
+        """Whether any rule member matches the policy member.
+
+        Args:
+            policy_member (IamPolicyMember): The policy binding member.
+
+        Returns:
+            bool: True if a rule member matches the policy member.
+        """
+        if policy_member.type in self.member_types:
+            return True
+
+        name = policy_member.name
+        if not name:
+            return False
+
+        if _is_ascii(name):
+            exact_names = self.exact_names.get(policy_member.type)
+            if exact_names and name.lower() in exact_names:
+                return True
+        name_pattern = self.name_patterns.get(policy_member.type)
+        if name_pattern and name_pattern.match(name):
+            return True
+
+        if self.domains and policy_member.type == 'user' and '@' in name:
+            return name.rsplit('@', 1)[1] in self.domains
+        return False
+
+    def count_matches(self, policy_member):
+        """Count the rule members matching the policy member.
+
+        Args:
+            policy_member (IamPolicyMember): The policy binding member.
+
+        Returns:
+            int: The number of matching rule members.
+        """
+        if not self.matches(policy_member):
+            return 0
+        return sum(1 for rule_member in self.rule_members
+                   if rule_member.matches(policy_member))
+
+
+def _is_ascii(name):
+    """Whether a name only has ASCII characters.
+
+    Case insensitive comparison of lowered ASCII names is the same as case
+    insensitive regular expression matching.
+
+    Args:
+        name (str): The name.
+
+    Returns:
+        bool: True if all characters are ASCII.
+    """
+    try:
+        name.encode('ascii')
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
 class IamRulesEngine(bre.BaseRulesEngine):
     """Rules engine for org resources."""
 
@@ -214,6 +317,10 @@ class IamRuleBook(bre.BaseRuleBook):
         super(IamRuleBook, self).__init__()
         self._rules_sema = threading.BoundedSemaphore(value=1)
         self.resource_rules_map = {}
+        # Compiled from resource_rules_map on first use, see
+        # _get_rule_index.
+        self._rule_index = None
+        self._ancestor_rules = {}
         if not rule_defs:
             self.rule_defs = {}
         else:
@@ -366,26 +473,111 @@ class IamRuleBook(bre.BaseRuleBook):
                     # If the rule isn't in the mapping, add it.
                     if rule not in resource_rules.rules:
                         resource_rules.rules.add(rule)
+            self._rule_index = None
+            self._ancestor_rules = {}
         finally:
             self._rules_sema.release()
 
-    def _get_resource_rules(self, resource):
-        """Get all the resource rules for (resource, RuleAppliesTo.*).
+    def _get_rule_index(self):
+        """Get the ResourceRules by resource type and id.
+
+        Returns:
+            dict: Maps (resource type, resource id) to the list of
+                ResourceRules of the resource, ordered as
+                RuleAppliesTo.apply_types.
+        """
+        rule_index = self._rule_index
+        if rule_index is None:
+            rule_index = {}
+            for rule_applies_to in scanner_rules.RuleAppliesTo.apply_types:
+                for (gcp_resource, applies_to), resource_rules in (
+                        self.resource_rules_map.items()):
+                    if gcp_resource is None or applies_to != rule_applies_to:
+                        continue
+                    rule_index.setdefault(
+                        (gcp_resource.type, gcp_resource.id), []).append(
+                            resource_rules)
+            self._rule_index = rule_index
+        return rule_index
+
+    def _get_level_rules(self, resource_type, resource_id, applies_to_self):
+        """Get the ResourceRules applying at one level of the hierarchy.
+
+        Args:
+            resource_type (str): The type of the resource at this level.
+            resource_id (str): The id of the resource at this level.
+            applies_to_self (bool): True if this is the resource the policy
+                belongs to, False if it is an ancestor.
+
+        Returns:
+            tuple: The list of ResourceRules applying, and the
+                inherit_from_parents value of the last of them, or None if
+                no rule applies.
+        """
+        rule_index = self._get_rule_index()
+        excluded = (scanner_rules.RuleAppliesTo.CHILDREN if applies_to_self
+                    else scanner_rules.RuleAppliesTo.SELF)
+        level_rules = []
+        inherit_from_parents = None
+        for resource_rule in itertools.chain(
+                rule_index.get((resource_type, resource_id), []),
+                rule_index.get((resource_type, '*'), [])):
+            if resource_rule.applies_to == excluded:
+                continue
+            level_rules.append(resource_rule)
+            inherit_from_parents = resource_rule.inherit_from_parents
+        return level_rules, inherit_from_parents
+
+    def _get_ancestor_rules(self, ancestors):
+        """Get the ResourceRules inherited from the ancestors of a resource.
+
+        The result is cached by ancestry path, so the ancestry is walked
+        once for all resources sharing it.
 
         Args:
-            resource (Resource): The resource to find in the ResourceRules map.
+            ancestors (tuple): The (resource type, resource id) of the
+                ancestors, in ascending order in the resource hierarchy.
 
         Returns:
-            list: A list of ResourceRules.
+            list: The ResourceRules applying to the resource.
         """
-        resource_rules = []
+        ancestor_rules = self._ancestor_rules.get(ancestors)
+        if ancestor_rules is None:
+            ancestor_rules = []
+            if ancestors:
+                ancestor_rules, inherit_from_parents = self._get_level_rules(
+                    ancestors[0][0], ancestors[0][1], False)
+                if inherit_from_parents or inherit_from_parents is None:
+                    ancestor_rules = (ancestor_rules +
+                                      self._get_ancestor_rules(ancestors[1:]))
+            self._ancestor_rules[ancestors] = ancestor_rules
+        return ancestor_rules
+
+    def _find_resource_rules(self, resource, full_name):
+        """Find the ResourceRules applying to a resource.
+
+        Walks up the resource hierarchy, like relationship.find_ancestors,
+        while the rules found inherit from the parents.
 
-        for rule_applies_to in scanner_rules.RuleAppliesTo.apply_types:
-            if (resource, rule_applies_to) in self.resource_rules_map:
-                resource_rules.append(self.resource_rules_map.get(
-                    (resource, rule_applies_to)))
+        Args:
+            resource (Resource): The resource that the policy belongs to.
+            full_name (str): Full name of the policy in hierarchical format.
 
-        return resource_rules
+        Returns:
+            list: The ResourceRules applying to the resource.
+        """
+        resource_rules, inherit_from_parents = self._get_level_rules(
+            resource.type, resource.id, True)
+        if not inherit_from_parents and inherit_from_parents is not None:
+            return resource_rules
+
+        ancestors = tuple(
+            (resource_type, resource_id) for resource_type, resource_id in
+            utils.get_resources_from_full_name(full_name)
+            if (resource_type != resource.type or
+                resource_id != resource.id) and
+            resource_util.can_create_resource(resource_type))
+        return resource_rules + self._get_ancestor_rules(ancestors)
 
     def find_violations(self, resource, policy, policy_bindings):
         """Find policy binding violations in the rule book.
@@ -404,72 +596,10 @@ class IamRuleBook(bre.BaseRuleBook):
         Returns:
             iterable: A generator of the rule violations.
         """
-        violations = itertools.chain()
-
-        resource_ancestors = (
-            relationship.find_ancestors(resource, policy.full_name))
-
-        for curr_resource in resource_ancestors:
-            wildcard_resource = resource_util.create_resource(
-                resource_id='*', resource_type=curr_resource.type)
-            resource_rules = self._get_resource_rules(curr_resource)
-            resource_rules.extend(self._get_resource_rules(wildcard_resource))
-
-            # Set to None, because if the direct resource (e.g. project)
-            # doesn't have a specific rule, we still should check the
-            # ancestry to see if the resource's parents have any rules
-            # that apply to the children.
-            inherit_from_parents = None
-
-            for resource_rule in resource_rules:
-                if not self._rule_applies_to_resource(
-                        resource, curr_resource, resource_rule):
-                    continue
-
-                violations = itertools.chain(
-                    violations,
-                    resource_rule.find_mismatches(resource, policy_bindings))
-
-                inherit_from_parents = resource_rule.inherit_from_parents
-
-            # If the rule does not inherit the parents' rules, stop.
-            # Due to the way rules are structured, we only define the
-            # "inherit" property once per rule. So even though a rule
-            # may apply to multiple resources, it will only have one
-            # value for "inherit_from_parents".
-            if not inherit_from_parents and inherit_from_parents is not None:
-                break
-
-        return violations
-
-    @staticmethod
-    def _rule_applies_to_resource(resource, curr_resource, resource_rule):
-        """Check whether rules match if the applies_to condition is met.
-
-        SELF: check rules if the starting resource == current resource
-        CHILDREN: check rules if starting resource != current resource
-        SELF_AND_CHILDREN: always check rules
-
-        Args:
-            resource (Resource): The main resource we're checking the rule
-                against.
-            curr_resource (Resource): A resource that is in the main resource's
-                ancestry.
-            resource_rule (ResourceRule): The rule associated with the resource.
-
-        Returns:
-            bool: True if rule applies to the resource, otherwise false.
-        """
-        applies_to_self = (resource_rule.applies_to ==
-                           scanner_rules.RuleAppliesTo.SELF and
-                           resource == curr_resource)
-        applies_to_children = (resource_rule.applies_to ==
-                               scanner_rules.RuleAppliesTo.CHILDREN and
-                               resource != curr_resource)
-        applies_to_both = (resource_rule.applies_to ==
-                           scanner_rules.RuleAppliesTo.SELF_AND_CHILDREN)
-
-        return applies_to_self or applies_to_children or applies_to_both
+        return itertools.chain.from_iterable(
+            resource_rule.find_mismatches(resource, policy_bindings)
+            for resource_rule in self._find_resource_rules(
+                resource, policy.full_name))
 
 
 class ResourceRules(object):
@@ -502,6 +632,8 @@ class ResourceRules(object):
             scanner_rules.RuleMode.BLACKLIST: _check_blacklist_members,
             scanner_rules.RuleMode.REQUIRED: _check_required_members,
         }
+        # Compiled members by rule binding, see _get_member_matcher.
+        self._member_matchers = {}
 
     def __eq__(self, other):
         """Equals
@@ -639,10 +771,8 @@ class ResourceRules(object):
                 # match, according to the rule mode.
                 violating_members = None
                 if rule_binding.role_pattern.match(policy_binding.role_name):
-                    violating_members = (self._dispatch_rule_mode_check(
-                        mode=rule.mode,
-                        rule_members=rule_binding.members,
-                        policy_members=policy_binding.members))
+                    violating_members = self._check_members(
+                        rule.mode, rule_binding, policy_binding.members)
                 if violating_members:
                     yield scanner_rules.RuleViolation(
                         resource_type=resource.type,
@@ -655,6 +785,49 @@ class ResourceRules(object):
                         members=tuple(violating_members),
                         resource_data=resource.data)
 
+    def _get_member_matcher(self, rule_binding):
+        """Get the compiled members of a rule binding.
+
+        Args:
+            rule_binding (IamPolicyBinding): The rule binding.
+
+        Returns:
+            _MemberMatcher: The compiled members of the rule binding.
+        """
+        # The binding is kept with its matcher so its id is not reused.
+        _, matcher = self._member_matchers.get(id(rule_binding),
+                                               (None, None))
+        if matcher is None:
+            matcher = _MemberMatcher(rule_binding.members)
+            self._member_matchers[id(rule_binding)] = (rule_binding, matcher)
+        return matcher
+
+    def _check_members(self, mode, rule_binding, policy_members):
+        """Check the policy members against a whitelist or blacklist binding.
+
+        Same as _check_whitelist_members and _check_blacklist_members, using
+        the compiled rule binding members.
+
+        Args:
+            mode (str): The rule mode.
+            rule_binding (IamPolicyBinding): The rule binding.
+            policy_members (list): The policy binding members.
+
+        Returns:
+            list: The violating policy members.
+        """
+        matcher = self._get_member_matcher(rule_binding)
+        if mode == scanner_rules.RuleMode.WHITELIST:
+            return [policy_member for policy_member in policy_members
+                    if not matcher.matches(policy_member)]
+        if mode == scanner_rules.RuleMode.BLACKLIST:
+            return [policy_member for policy_member in policy_members
+                    for _ in range(matcher.count_matches(policy_member))]
+        return self._dispatch_rule_mode_check(
+            mode=mode,
+            rule_members=rule_binding.members,
+            policy_members=policy_members)
+
     def _dispatch_rule_mode_check(self, mode, rule_members=None,
                                   policy_members=None):
         """Determine which rule mode method to execute for rule audit.
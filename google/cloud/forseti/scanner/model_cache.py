@@ -0,0 +1,279 @@
+# Copyright 2020 The Forseti Security Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Model resources shared by the scanners of a scan session.
+
+Several scanners read the same resource types from the model, e.g. the IAM
+policies. While a scan session is active, scanner_iter streams every resource
+type from the model once and serves the following reads from memory, within
+a configurable size limit. The cache is disabled unless a size is configured.
+"""
+
+from collections import OrderedDict
+import contextlib
+import json
+import threading
+
+from google.cloud.forseti.common.util import logger
+
+LOGGER = logger.get_logger(__name__)
+
+# Estimated memory used by a cached resource in addition to its data.
+RESOURCE_OVERHEAD_BYTES = 512
+
+_ACTIVE_CACHES = {}
+_ACTIVE_CACHES_LOCK = threading.Lock()
+
+
+class CachedResource(object):
+    """Read-only copy of a model Resource, detached from the session."""
+
+    __slots__ = ('cai_resource_name', 'cai_resource_type', 'full_name',
+                 'type_name', 'parent_type_name', 'name', 'type',
+                 'display_name', 'email', 'data', 'parent', '_parsed_data')
+
+    def __init__(self, resource, parent):
+        """Initialize.
+
+        Args:
+            resource (Resource): The model resource to copy.
+            parent (CachedResource): The copy of the parent resource.
+        """
+        self.cai_resource_name = resource.cai_resource_name
+        self.cai_resource_type = resource.cai_resource_type
+        self.full_name = resource.full_name
+        self.type_name = resource.type_name
+        self.parent_type_name = resource.parent_type_name
+        self.name = resource.name
+        self.type = resource.type
+        self.display_name = resource.display_name
+        self.email = resource.email
+        self.data = resource.data
+        self.parent = parent
+        self._parsed_data = None
+
+    @property
+    def parsed_data(self):
+        """The json decoded data, decoded once and shared by all scanners.
+
+        Returns:
+            object: The decoded data, must not be modified.
+        """
+        if self._parsed_data is None and self.data:
+            self._parsed_data = json.loads(self.data)
+        return self._parsed_data
+
+    def __repr__(self):
+        """String representation.
+
+        Returns:
+            str: Resource represented as (full_name='{}', name='{}' type='{}')
+        """
+        return '<CachedResource(full_name={}, name={} type={})>'.format(
+            self.full_name, self.name, self.type)
+
+
+class ScannerModelCache(object):
+    """Least recently used cache of model resources by type."""
+
+    def __init__(self, max_bytes):
+        """Initialize.
+
+        Args:
+            max_bytes (int): The estimated maximum memory used by the cached
+                resources.
+        """
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        # resource_type -> (resources, size)
+        self._entries = OrderedDict()
+        self._uncacheable = set()
+
+    def scanner_iter(self, data_access, session, resource_type,
+                     parent_type_name=None):
+        """Iterate over all resources with the specified type.
+
+        The first read of a resource type loads all its resources from the
+        model, following reads are served from the cache whatever the parent
+        type name they filter on. Resource types too large for the cache are
+        streamed from the model on every read.
+
+        Args:
+            data_access (ModelAccess): The model to read resources from.
+            session (object): Database session.
+            resource_type (str): type of the resource to scan
+            parent_type_name (str): type_name of the parent resource
+
+        Returns:
+            iterable: The resources that match the query.
+        """
+        with self._lock:
+            key_lock = self._key_locks.setdefault(resource_type,
+                                                  threading.Lock())
+
+        # Only one scanner loads a resource type, the others wait for it.
+        with key_lock:
+            try:
+                with self._lock:
+                    resources = None
+                    if resource_type in self._entries:
+                        self._entries.move_to_end(resource_type)
+                        resources = self._entries[resource_type][0]
+                    uncacheable = resource_type in self._uncacheable
+                if resources is None and not uncacheable:
+                    resources = self._load(data_access, session,
+                                           resource_type)
+                if resources is None:
+                    return data_access.scanner_iter(session, resource_type,
+                                                    parent_type_name)
+                if parent_type_name:
+                    return iter([resource for resource in resources
+                                 if resource.parent_type_name ==
+                                 parent_type_name])
+                return iter(resources)
+            finally:
+                # Scanners waiting for the lock still hold it, the next ones
+                # find the resources in the cache or know they don't fit.
+                with self._lock:
+                    self._key_locks.pop(resource_type, None)
+
+    def _load(self, data_access, session, resource_type):
+        """Copy the resources of a type from the model and cache them.
+
+        Whether the type fits the cache is decided from the size of its data
+        in the model, before reading any resource. The results are streamed
+        with yield_per, so the resources are only copied, loading their
+        ancestors with new queries, once the stream is consumed.
+
+        Args:
+            data_access (ModelAccess): The model to read resources from.
+            session (object): Database session.
+            resource_type (str): The type of the resources.
+
+        Returns:
+            list: The copied resources, or None if the type does not fit the
+                cache.
+        """
+        count, data_length = data_access.scanner_type_size(session,
+                                                           resource_type)
+        size = data_length + count * RESOURCE_OVERHEAD_BYTES
+        if size > self.max_bytes:
+            LOGGER.info('Resources of type %s exceed the scanner model cache '
+                        'size, not caching them.', resource_type)
+            with self._lock:
+                self._uncacheable.add(resource_type)
+            return None
+
+        rows = list(data_access.scanner_iter(session, resource_type))
+        parents = {}
+        resources = [self._copy(resource, parents) for resource in rows]
+        with self._lock:
+            self._entries[resource_type] = (resources, size)
+            self.size += size
+            while self.size > self.max_bytes:
+                evicted_key, (_, evicted_size) = self._entries.popitem(
+                    last=False)
+                self.size -= evicted_size
+                LOGGER.debug('Evicted %s from the scanner model cache.',
+                             evicted_key)
+        return resources
+
+    @staticmethod
+    def _copy(resource, parents):
+        """Copy a resource and its ancestors.
+
+        Args:
+            resource (Resource): The model resource.
+            parents (dict): Copies of ancestors by type_name, shared by the
+                resources of one type.
+
+        Returns:
+            CachedResource: The copy of the resource.
+        """
+        parent = resource.parent
+        if parent is None:
+            return CachedResource(resource, None)
+        parent_copy = parents.get(parent.type_name)
+        if parent_copy is None:
+            parent_copy = ScannerModelCache._copy(parent, parents)
+            parents[parent.type_name] = parent_copy
+        return CachedResource(resource, parent_copy)
+
+
+@contextlib.contextmanager
+def scan_session(data_access, max_bytes):
+    """Share the model resources read by the scanners in this context.
+
+    Args:
+        data_access (ModelAccess): The model scanned.
+        max_bytes (int): The estimated maximum memory used by the cache, no
+            cache is used if 0.
+
+    Yields:
+        ScannerModelCache: The cache, or None if disabled.
+    """
+    if not max_bytes:
+        yield None
+        return
+
+    cache = ScannerModelCache(max_bytes)
+    with _ACTIVE_CACHES_LOCK:
+        _ACTIVE_CACHES[data_access] = cache
+    try:
+        yield cache
+    finally:
+        with _ACTIVE_CACHES_LOCK:
+            _ACTIVE_CACHES.pop(data_access, None)
+
+
+def scanner_iter(data_access, session, resource_type, parent_type_name=None):
+    """Iterate over all resources with the specified type.
+
+    Reads through the cache of the active scan session of the model, if any.
+
+    Args:
+        data_access (ModelAccess): The model to read resources from.
+        session (object): Database session.
+        resource_type (str): type of the resource to scan
+        parent_type_name (str): type_name of the parent resource
+
+    Returns:
+        iterable: The resources that match the query.
+    """
+    with _ACTIVE_CACHES_LOCK:
+        cache = _ACTIVE_CACHES.get(data_access)
+    if cache is not None:
+        return cache.scanner_iter(data_access, session, resource_type,
+                                  parent_type_name)
+    if parent_type_name:
+        return data_access.scanner_iter(session, resource_type,
+                                        parent_type_name=parent_type_name)
+    return data_access.scanner_iter(session, resource_type)
+
+
+def load_data(resource):
+    """Returns the json decoded data of a resource.
+
+    Args:
+        resource (object): A model Resource or a CachedResource.
+
+    Returns:
+        object: The decoded data, which may be shared and must not be
+            modified.
+    """
+    if isinstance(resource, CachedResource):
+        return resource.parsed_data
+    return json.loads(resource.data)
@@ -13,15 +13,26 @@
 # limitations under the License.
 """GCP Resource scanner."""
 
+import time
 import traceback
 
+import concurrent.futures
+
 from google.cloud.forseti.common.util import logger
 from google.cloud.forseti.common.util.index_state import IndexState
+from google.cloud.forseti.scanner import model_cache
 from google.cloud.forseti.scanner import scanner_builder
 from google.cloud.forseti.services.scanner import dao as scanner_dao
 
 LOGGER = logger.get_logger(__name__)
 
+# Number of scanners run at the same time, unless configured otherwise.
+DEFAULT_MAX_CONCURRENT_SCANNERS = 1
+
+# Size of the model resources shared by the scanners, unless configured
+# otherwise. Disabled by default.
+DEFAULT_MODEL_CACHE_SIZE_MB = 0
+
 
 def init_scanner_index(session, inventory_index_id):
     """Initialize the 'scanner_index' table.
@@ -79,6 +90,84 @@ def mark_scanner_index_complete(
     session.flush()
 
 
+def _run_scanner(scanner, progress_queue):
+    """Run a single scanner and report its progress.
+
+    Args:
+        scanner (BaseScanner): The scanner to run.
+        progress_queue (Queue): The progress queue.
+
+    Returns:
+        bool: True if the scanner ran successfully.
+    """
+    scanner_name = scanner.__class__.__name__
+    progress_queue.put('Running {}...'.format(scanner_name))
+    start_time = time.time()
+    try:
+        scanner.run()
+    except Exception:  # pylint: disable=broad-except
+        log_message = 'Error running scanner: {}: \'{}\''.format(
+            scanner_name, traceback.format_exc())
+        progress_queue.put(log_message)
+        LOGGER.exception(log_message)
+        return False
+    log_message = '{} completed in {:.1f} seconds.'.format(
+        scanner_name, time.time() - start_time)
+    progress_queue.put(log_message)
+    LOGGER.info(log_message)
+    return True
+
+
+def _run_scanners(runnable_scanners, progress_queue, violation_access,
+                  max_workers):
+    """Run the scanners, concurrently if more than one worker is configured.
+
+    Every scanner reads the model with its own session, violations are
+    written and committed through the shared violation access, which
+    serializes the writes of all scanners.
+
+    Args:
+        runnable_scanners (list): The scanners to run.
+        progress_queue (Queue): The progress queue.
+        violation_access (ViolationAccess): The violation writer.
+        max_workers (int): The maximum number of scanners to run at once.
+
+    Returns:
+        tuple: The names of the scanners that succeeded and failed.
+    """
+    succeeded = []
+    failed = []
+
+    def _record(scanner, success):
+        """Commit the violations of a scanner and record its result.
+
+        Args:
+            scanner (BaseScanner): The scanner that ran.
+            success (bool): True if the scanner ran successfully.
+        """
+        if success:
+            succeeded.append(scanner.__class__.__name__)
+        else:
+            failed.append(scanner.__class__.__name__)
+        with violation_access.lock:
+            violation_access.session.commit()
+
+    if max_workers <= 1:
+        for scanner in runnable_scanners:
+            _record(scanner, _run_scanner(scanner, progress_queue))
+        return succeeded, failed
+
+    LOGGER.info('Running %s scanners with %s workers.',
+                len(runnable_scanners), max_workers)
+    with concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers) as executor:
+        futures = {executor.submit(_run_scanner, scanner, progress_queue):
+                   scanner for scanner in runnable_scanners}
+        for future in concurrent.futures.as_completed(futures):
+            _record(futures[future], future.result())
+    return succeeded, failed
+
+
 def run(model_name=None,
         progress_queue=None,
         service_config=None,
@@ -98,7 +187,8 @@ def run(model_name=None,
     global_configs = service_config.get_global_config()
     scanner_configs = service_config.get_scanner_config()
     with service_config.scoped_session() as session:
-        service_config.violation_access = scanner_dao.ViolationAccess(session)
+        violation_access = scanner_dao.ViolationAccess(session)
+        service_config.violation_access = violation_access
         model_description = (
             service_config.model_manager.get_description(model_name))
         inventory_index_id = (
@@ -108,27 +198,20 @@ def run(model_name=None,
             global_configs, scanner_configs, service_config, model_name,
             None, scanner_name).build()
 
-        succeeded = []
-        failed = []
-
         progress_queue.put('Scanner Index ID: {} is created'.
                            format(scanner_index_id))
 
-        for scanner in runnable_scanners:
-            try:
-                scanner.run()
-                progress_queue.put('Running {}...'.format(
-                    scanner.__class__.__name__))
-            except Exception:  # pylint: disable=broad-except
-                log_message = 'Error running scanner: {}: \'{}\''.format(
-                    scanner.__class__.__name__, traceback.format_exc())
-                progress_queue.put(log_message)
-                LOGGER.exception(log_message)
-                failed.append(scanner.__class__.__name__)
-            else:
-                succeeded.append(scanner.__class__.__name__)
-            session.commit()
-        # pylint: enable=bare-except
+        max_workers = scanner_configs.get('max_concurrent_scanners',
+                                          DEFAULT_MAX_CONCURRENT_SCANNERS)
+        cache_size_mb = scanner_configs.get('model_cache_size_mb',
+                                            DEFAULT_MODEL_CACHE_SIZE_MB)
+        _, data_access = service_config.model_manager.get(model_name)
+        with model_cache.scan_session(data_access,
+                                      cache_size_mb * 1024 * 1024):
+            succeeded, failed = _run_scanners(
+                runnable_scanners, progress_queue, violation_access,
+                min(max_workers, len(runnable_scanners)))
+
         log_message = 'Scan completed!'
         mark_scanner_index_complete(
             session, scanner_index_id, succeeded, failed)
@@ -15,11 +15,11 @@
 """Scanner for Audit Logging."""
 
 from builtins import next
-import json
 
 from google.cloud.forseti.common.gcp_type import iam_policy
 from google.cloud.forseti.common.gcp_type.project import Project
 from google.cloud.forseti.common.util import logger
+from google.cloud.forseti.scanner import model_cache
 from google.cloud.forseti.scanner.audit import audit_logging_rules_engine
 from google.cloud.forseti.scanner.scanners import base_scanner
 from google.cloud.forseti.services import utils
@@ -128,11 +128,12 @@ class AuditLoggingScanner(base_scanner.BaseScanner):
             audit_policy_types = frozenset([
                 'organization', 'folder', 'project'])
 
-            for policy in data_access.scanner_iter(session, 'iam_policy'):
+            for policy in model_cache.scanner_iter(
+                    data_access, session, 'iam_policy'):
                 if policy.parent.type not in audit_policy_types:
                     continue
                 audit_config = iam_policy.IamAuditConfig.create_from(
-                    json.loads(policy.data).get('auditConfigs', []))
+                    model_cache.load_data(policy).get('auditConfigs', []))
 
                 if policy.parent.type == 'project':
                     project_configs.append(
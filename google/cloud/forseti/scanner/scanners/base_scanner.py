@@ -112,7 +112,10 @@ class BaseScanner(with_metaclass(abc.ABCMeta, object)):
             model_description.get('source_info').get('inventory_index_id'))
 
         violation_access = self.service_config.violation_access
-        scanner_index_id = scanner_dao.get_latest_scanner_index_id(
-            violation_access.session, inventory_index_id,
-            index_state=IndexState.RUNNING)
+        with violation_access.lock:
+            scanner_index_id = scanner_dao.get_latest_scanner_index_id(
+                violation_access.session, inventory_index_id,
+                index_state=IndexState.RUNNING)
+        # The violations may be a generator running the scanner rules, create
+        # only holds the lock while it inserts a batch.
         violation_access.create(violations, scanner_index_id)
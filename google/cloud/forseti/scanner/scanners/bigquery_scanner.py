@@ -21,6 +21,7 @@ from google.cloud.forseti.common.gcp_type.bigquery_access_controls import (
 
 from google.cloud.forseti.common.gcp_type import project
 from google.cloud.forseti.common.util import logger
+from google.cloud.forseti.scanner import model_cache
 from google.cloud.forseti.scanner.audit import bigquery_rules_engine
 from google.cloud.forseti.scanner.scanners import base_scanner
 
@@ -132,7 +133,8 @@ class BigqueryScanner(base_scanner.BaseScanner):
         with scoped_session as session:
             bq_acl_data = []
             policies = []
-            for policy in data_access.scanner_iter(session, 'dataset_policy'):
+            for policy in model_cache.scanner_iter(
+                    data_access, session, 'dataset_policy'):
                 policies.append(policy)
 
             for policy in policies:
@@ -17,6 +17,7 @@
 from google.cloud.forseti.common.gcp_type import project
 from google.cloud.forseti.common.gcp_type import instance
 from google.cloud.forseti.common.util import logger
+from google.cloud.forseti.scanner import model_cache
 from google.cloud.forseti.scanner.audit import blacklist_rules_engine
 from google.cloud.forseti.scanner.scanners import base_scanner
 
@@ -99,8 +100,8 @@ class BlacklistScanner(base_scanner.BaseScanner):
 
         instance_from_data_models = []
         with scoped_session as session:
-            for instance_from_data_model in data_access.scanner_iter(
-                    session, 'instance'):
+            for instance_from_data_model in model_cache.scanner_iter(
+                    data_access, session, 'instance'):
                 instance_from_data_models.append(instance_from_data_model)
 
         network_interfaces = []
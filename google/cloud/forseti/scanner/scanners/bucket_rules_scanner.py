@@ -19,6 +19,7 @@ import json
 from google.cloud.forseti.common.gcp_type.bucket_access_controls import (
     BucketAccessControls)
 from google.cloud.forseti.common.util import logger
+from google.cloud.forseti.scanner import model_cache
 from google.cloud.forseti.scanner.audit import buckets_rules_engine
 from google.cloud.forseti.scanner.scanners import base_scanner
 
@@ -121,8 +122,8 @@ class BucketsAclScanner(base_scanner.BaseScanner):
         scoped_session, data_access = model_manager.get(self.model_name)
         with scoped_session as session:
             bucket_acls = []
-            gcs_policies = [policy for policy in
-                            data_access.scanner_iter(session, 'gcs_policy')]
+            gcs_policies = list(model_cache.scanner_iter(
+                data_access, session, 'gcs_policy'))
             for gcs_policy in gcs_policies:
                 bucket = gcs_policy.parent
                 project_id = bucket.parent.name
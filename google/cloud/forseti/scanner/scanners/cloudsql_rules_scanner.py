@@ -17,6 +17,7 @@
 from google.cloud.forseti.common.gcp_type.cloudsql_access_controls import (
     CloudSqlAccessControl)
 from google.cloud.forseti.common.util import logger
+from google.cloud.forseti.scanner import model_cache
 from google.cloud.forseti.scanner.audit import cloudsql_rules_engine
 from google.cloud.forseti.scanner.scanners import base_scanner
 
@@ -119,7 +120,7 @@ class CloudSqlAclScanner(base_scanner.BaseScanner):
         with scoped_session as session:
             cloudsql_acls = []
 
-            for instance in data_access.scanner_iter(session,
+            for instance in model_cache.scanner_iter(data_access, session,
                                                      'cloudsqlinstance'):
                 project_id = instance.parent.name
                 cloudsql_acls.append(
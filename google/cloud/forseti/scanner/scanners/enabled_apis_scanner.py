@@ -18,6 +18,7 @@ import json
 
 from google.cloud.forseti.common.gcp_type.project import Project
 from google.cloud.forseti.common.util import logger
+from google.cloud.forseti.scanner import model_cache
 from google.cloud.forseti.scanner.audit import enabled_apis_rules_engine
 from google.cloud.forseti.scanner.scanners import base_scanner
 
@@ -122,7 +123,8 @@ class EnabledApisScanner(base_scanner.BaseScanner):
         with scoped_session as session:
             enabled_apis_data = []
 
-            for apis in data_access.scanner_iter(session, 'enabled_apis'):
+            for apis in model_cache.scanner_iter(
+                    data_access, session, 'enabled_apis'):
                 enabled_apis = []
 
                 for enabled_api in json.loads(apis.data):
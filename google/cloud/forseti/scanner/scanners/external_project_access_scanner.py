@@ -16,6 +16,9 @@
 
 # pylint: disable=line-too-long
 
+from collections import OrderedDict
+from concurrent import futures
+import threading
 import time
 
 from google.auth.exceptions import RefreshError
@@ -24,6 +27,8 @@ from google.cloud.forseti.common.gcp_api.errors import ApiExecutionError
 from google.cloud.forseti.common.gcp_api import api_helpers # noqa=E501
 from google.cloud.forseti.common.gcp_type import resource_util # noqa=E501
 from google.cloud.forseti.common.gcp_api.cloud_resource_manager import CloudResourceManagerClient # noqa=E501
+from google.cloud.forseti.scanner import model_cache
+from google.cloud.forseti.services import utils
 from google.cloud.forseti.services.inventory.storage import DataAccess
 from google.cloud.forseti.scanner.audit import external_project_access_rules_engine as epa_rules_engine # noqa=E501
 from google.cloud.forseti.scanner.scanners import base_scanner
@@ -32,6 +37,14 @@ LOGGER = logger.get_logger(__name__)
 
 SCOPES = ['https://www.googleapis.com/auth/cloudplatformprojects.readonly']
 
+# Number of users whose projects are queried at the same time.
+DEFAULT_MAX_WORKERS = 8
+
+# Maximum number of ancestries of projects outside of the model cached.
+DEFAULT_ANCESTRY_CACHE_SIZE = 10000
+
+ANCESTRY_RESOURCE_TYPES = frozenset(['organization', 'folder', 'project'])
+
 
 def get_user_emails(service_config, member_types=None):
     """Retrieves the list of user email addresses from inventory.
@@ -76,50 +89,138 @@ def extract_project_ids(crm_client):
     return [project['projectId'] for project in projects]
 
 
-def memoize_ancestry(ancestry_function):
-    # pylint: disable=C0301
-    """A decorator function to intelligently retrieve project ancestries, only if necessary.
+class AncestryCache(object):
+    """Thread safe LRU cache of the project ancestries fetched from the API."""
+
+    def __init__(self, max_size=DEFAULT_ANCESTRY_CACHE_SIZE):
+        """Initialize.
+
+        Args:
+            max_size (int): The maximum number of cached ancestries, 0
+                disables the cache.
+        """
+        self.max_size = max(int(max_size), 0)
+        self._lock = threading.Lock()
+        self._ancestries = OrderedDict()
+
+    def __len__(self):
+        """The number of cached ancestries.
+
+        Returns:
+            int: The number of cached ancestries.
+        """
+        with self._lock:
+            return len(self._ancestries)
+
+    def get(self, project_id):
+        """Get the cached ancestry of a project.
+
+        Args:
+            project_id (str): A project ID
+
+        Returns:
+            list: The ancestry, or None if it is not cached.
+        """
+        with self._lock:
+            ancestry = self._ancestries.get(project_id)
+            if ancestry is not None:
+                self._ancestries.move_to_end(project_id)
+            return ancestry
+
+    def set(self, project_id, ancestry):
+        """Cache the ancestry of a project, evicting the least recently used.
+
+        Args:
+            project_id (str): A project ID
+            ancestry (list): Resource objects defining the ancestry chain
+                from the Project to the Organization
+        """
+        if not self.max_size:
+            return
+        with self._lock:
+            self._ancestries[project_id] = ancestry
+            self._ancestries.move_to_end(project_id)
+            while len(self._ancestries) > self.max_size:
+                self._ancestries.popitem(last=False)
+
+
+def get_model_ancestries(service_config, model_name):
+    """Get the ancestries of the projects in the model.
 
     Args:
-        ancestry_function (function): The ancestry
-            retrieval function.
+        service_config (ServiceConfig): Forseti 2.0 service configs
+        model_name (str): name of the data model
 
     Returns:
-        function: The helper
+        dict: Project ID to the full name of the project in the model.
     """
-    discovered_ancestries = {}
-    # pylint: disable=W9011,W9012,C0111
+    scoped_session, data_access = (
+        service_config.model_manager.get(model_name))
+    full_names = {}
+    with scoped_session as session:
+        for project in model_cache.scanner_iter(data_access, session,
+                                                'project'):
+            full_names[project.name] = project.full_name
+    return full_names
+
 
-    def helper(crm_client, project_id):
-        if project_id not in discovered_ancestries:
-            discovered_ancestries[project_id] = (
-                ancestry_function(crm_client, project_id))
-        return discovered_ancestries[project_id]
-    return helper
+def ancestry_from_full_name(full_name):
+    """Get a project ancestry from the full name of the project in the model.
 
+    Args:
+        full_name (str): Full name of the project, e.g.
+            organization/1234/folder/56/project/my-project/
 
-@memoize_ancestry
-def get_project_ancestry(crm_client, project_id):
+    Returns:
+        list: Resource objects defining the ancestry
+            chain from the Project to the Organization
+    """
+    return resource_util.cast_to_gcp_resources(
+        {'resourceId': {'id': resource_id, 'type': resource_type}}
+        for resource_type, resource_id in (
+            utils.get_resources_from_full_name(full_name))
+        if resource_type in ANCESTRY_RESOURCE_TYPES)
+
+
+def get_project_ancestry(crm_client, project_id, model_ancestries=None,
+                         ancestry_cache=None):
     """Get project ancestry as a list of type Resource.
 
+    Projects in the model get their ancestry from the model, the others
+    from the API, through the cache if set.
+
     Args:
         crm_client (CloudResourceManagerClient):
             crm client
         project_id (str): A project ID
+        model_ancestries (dict): Project ID to the full name of the project
+            in the model.
+        ancestry_cache (AncestryCache): The cache of the ancestries fetched
+            from the API.
 
     Returns:
         list: Resource objects defining the ancestry
             chain from the Project to the Organization
     """
+    if model_ancestries and project_id in model_ancestries:
+        return ancestry_from_full_name(model_ancestries[project_id])
+
+    if ancestry_cache is not None:
+        ancestry_resources = ancestry_cache.get(project_id)
+        if ancestry_resources is not None:
+            return ancestry_resources
 
     ancestries = crm_client.get_project_ancestry(project_id)
     ancestry_resources = (
         resource_util.cast_to_gcp_resources(ancestries))
 
+    if ancestry_cache is not None:
+        ancestry_cache.set(project_id, ancestry_resources)
     return ancestry_resources
 
 
-def get_project_ancestries(crm_client, project_id_list):
+def get_project_ancestries(crm_client, project_id_list,
+                           model_ancestries=None, ancestry_cache=None):
     """Get the ancestries from a list of project ID's
 
     Args:
@@ -127,6 +228,10 @@ def get_project_ancestries(crm_client, project_id_list):
             crm client
         project_id_list (list): A list of project ID's
             as strings
+        model_ancestries (dict): Project ID to the full name of the project
+            in the model.
+        ancestry_cache (AncestryCache): The cache of the ancestries fetched
+            from the API.
 
     Returns:
         list: A list of lists ofResource objects
@@ -136,7 +241,9 @@ def get_project_ancestries(crm_client, project_id_list):
     ancestry_list = []
     for project_id in project_id_list:
         ancestry_list.append(get_project_ancestry(crm_client,
-                                                  project_id))
+                                                  project_id,
+                                                  model_ancestries,
+                                                  ancestry_cache))
     return ancestry_list
 
 
@@ -168,7 +275,11 @@ class ExternalProjectAccessScanner(base_scanner.BaseScanner):
                 rules_file_path=self.rules,
                 snapshot_timestamp=self.snapshot_timestamp))
         self.rules_engine.build_rule_book(self.inventory_configs)
-        self._ancestries = dict()
+        self.max_workers = max(int(self.scanner_configs.get(
+            'external_project_access_max_workers', DEFAULT_MAX_WORKERS)), 1)
+        self.ancestry_cache = AncestryCache(self.scanner_configs.get(
+            'external_project_access_ancestry_cache_size',
+            DEFAULT_ANCESTRY_CACHE_SIZE))
 
     def _output_results(self, all_violations):
         """Output results.
@@ -252,9 +363,37 @@ class ExternalProjectAccessScanner(base_scanner.BaseScanner):
 
         return client
 
+    def _retrieve_user_ancestries(self, user_email, model_ancestries):
+        """Retrieve the ancestries of the projects accessible to a user.
+
+        Args:
+            user_email (str): The e-mail address of the user.
+            model_ancestries (dict): Project ID to the full name of the
+                project in the model.
+
+        Returns:
+            list: The project ancestries, or None if the user projects can
+                not be accessed.
+        """
+        try:
+            user_crm_client = self._get_crm_client(user_email)
+
+            project_ids = extract_project_ids(user_crm_client)
+            return get_project_ancestries(user_crm_client,
+                                          project_ids,
+                                          model_ancestries,
+                                          self.ancestry_cache)
+        except (RefreshError, ApiExecutionError):
+            LOGGER.debug('Unable to access project ancestry %s.',
+                         user_email)
+            return None
+
     def _retrieve(self):
         """Retrieve the project ancestries for all users.
 
+        The users are queried concurrently, the CRM clients of the users
+        share the rate limiting of the API.
+
         Returns:
             dict: User project relationship.
             {"user1@example.com": [[Project("1234"), Organization("1234567")],
@@ -267,32 +406,32 @@ class ExternalProjectAccessScanner(base_scanner.BaseScanner):
         # This dictionary is the result of the scan.  The key
         # is the user ID.  The value is a list of lists of ancestries.
         user_to_project_ancestries_map = {}
-        user_count = 0
 
         start_time = time.time()
 
         user_emails = get_user_emails(self.service_config)
-
-        for user_email in user_emails:
-            user_count += 1
-            try:
-                user_crm_client = self._get_crm_client(user_email)
-
-                project_ids = extract_project_ids(user_crm_client)
-                ancestries = get_project_ancestries(user_crm_client,
-                                                    project_ids)
-
-                user_to_project_ancestries_map[user_email] = ancestries
-            except (RefreshError, ApiExecutionError):
-                LOGGER.debug('Unable to access project ancestry %s.',
-                             user_email)
+        model_ancestries = get_model_ancestries(self.service_config,
+                                                self.model_name)
+
+        with futures.ThreadPoolExecutor(
+                max_workers=self.max_workers) as executor:
+            all_ancestries = executor.map(
+                lambda email: self._retrieve_user_ancestries(
+                    email, model_ancestries),
+                user_emails)
+            for user_email, ancestries in zip(user_emails, all_ancestries):
+                if ancestries is not None:
+                    user_to_project_ancestries_map[user_email] = ancestries
 
         # TODO: Remove when instrumentation is implemented.
         elapsed_time = time.time() - start_time
 
-        LOGGER.debug('It took %f seconds to query projects for %d users',
+        LOGGER.debug('It took %f seconds to query projects for %d users, '
+                     '%d projects in the model, %d ancestries cached',
                      elapsed_time,
-                     user_count)
+                     len(user_emails),
+                     len(model_ancestries),
+                     len(self.ancestry_cache))
 
         return user_to_project_ancestries_map
 
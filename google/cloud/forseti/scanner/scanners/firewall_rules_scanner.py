@@ -20,6 +20,7 @@ from google.cloud.forseti.common.gcp_type import firewall_rule
 from google.cloud.forseti.common.gcp_type import resource as resource_type
 from google.cloud.forseti.common.gcp_type import resource_util
 from google.cloud.forseti.common.util import logger
+from google.cloud.forseti.scanner import model_cache
 from google.cloud.forseti.scanner.audit import firewall_rules_engine
 from google.cloud.forseti.scanner.scanners import base_scanner
 
@@ -130,8 +131,8 @@ class FirewallPolicyScanner(base_scanner.BaseScanner):
         count = -1
         with scoped_session as session:
 
-            for cnt, i in enumerate(data_access.scanner_iter(
-                    session, 'firewall')):
+            for cnt, i in enumerate(model_cache.scanner_iter(
+                    data_access, session, 'firewall')):
                 count = cnt
                 firewall_data_for_scanner = json.loads(i.data)
                 firewall_data_for_scanner['project_id'] = i.parent.name
@@ -15,6 +15,7 @@
 """Scanner for the Forwarding Rules rules engine."""
 from google.cloud.forseti.common.gcp_type.forwarding_rule import ForwardingRule
 from google.cloud.forseti.common.util import logger
+from google.cloud.forseti.scanner import model_cache
 from google.cloud.forseti.scanner.audit import forwarding_rule_rules_engine
 from google.cloud.forseti.scanner.scanners import base_scanner
 
@@ -102,8 +103,8 @@ class ForwardingRuleScanner(base_scanner.BaseScanner):
         scoped_session, data_access = model_manager.get(self.model_name)
         with scoped_session as session:
             forwarding_rules = []
-            for forwarding_rule in data_access.scanner_iter(
-                    session, 'forwardingrule'):
+            for forwarding_rule in model_cache.scanner_iter(
+                    data_access, session, 'forwardingrule'):
                 project_id = forwarding_rule.parent.name
                 forwarding_rules.append(
                     ForwardingRule.from_json(
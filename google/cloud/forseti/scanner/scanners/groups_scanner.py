@@ -14,7 +14,9 @@
 
 """Scanner for Google Groups."""
 
-import anytree
+import array
+import collections
+import itertools
 
 from google.cloud.forseti.common.util import logger
 from google.cloud.forseti.common.util import file_loader
@@ -24,6 +26,9 @@ from google.cloud.forseti.scanner.scanners import base_scanner
 LOGGER = logger.get_logger(__name__)
 MY_CUSTOMER = 'my_customer'
 
+# Translation table inverting bytes of 0 and 1 flags.
+_INVERT_FLAGS = bytes.maketrans(b'\x00\x01', b'\x01\x00')
+
 
 class GroupsScanner(base_scanner.BaseScanner):
     """Scanner for group members data."""
@@ -72,178 +77,175 @@ class GroupsScanner(base_scanner.BaseScanner):
         all_violations = self._flatten_violations(all_violations)
         self._output_results_to_db(all_violations)
 
-    # pylint: disable=too-many-branches
     @staticmethod
-    def _find_violations(root):
-        """Find violations, starting from the given root.
+    def _violating_members(tree, rule_indexes, masks):
+        """Find the members that fulfil none of the whitelist rules.
+
+        A node is in violation if it fulfils none of its whitelist rules, so
+        the members fulfilling each rule are combined for all the groups with
+        the same rules at once, as bytes with one flag per member.
+
+        Args:
+            tree (GroupTree): The group tree, with the rules applied.
+            rule_indexes (tuple): The indexes of the rules of the groups.
+            masks (dict): Cache of the members fulfilling each rule, by
+                rule index.
 
-        At this point, we can start to find violations at each node!
+        Returns:
+            bytes: 1 for each member in violation of the rules, 0 otherwise.
+        """
+        # The org and the auto-generated group, containing all the users in
+        # the org, are never in violation.
+        fulfilled = int.from_bytes(tree.skipped_members, 'little')
+        for rule_index in rule_indexes:
+            rule = tree.rules[rule_index]
+            if rule.get('mode') != 'whitelist':
+                continue
+            if rule_index not in masks:
+                emails = [condition.get('member_email')
+                          for condition in rule.get('conditions')]
+                masks[rule_index] = int.from_bytes(bytes(
+                    any(email in member_email for email in emails)
+                    for member_email in tree.member_emails), 'little')
+            fulfilled |= masks[rule_index]
+        return fulfilled.to_bytes(len(tree.member_emails), 'little').translate(
+            _INVERT_FLAGS)
 
-        We have a tree, with data populated at each node.
-        ...and rules are also applied at each node.
-        Traversal order should not matter, since we need to evaluate all nodes.
+    @staticmethod
+    def _find_violations(tree):
+        """Find violations in the group tree.
 
         Each node can have multiple rules.
         Each rule can have multiple conditions.
 
-        If a rule is violated, then the node is in violation.
-        i.e. if all rules pass, then the node is not in violation.
+        If a whitelist rule is fulfilled, i.e. any of its conditions matches
+        the member, then the node is not in violation.
+
+        The rules are the same for all the members of a group, so they are
+        evaluated once per member and combination of rules, instead of once
+        per node.
 
         Args:
-            root (node): The nodes (tree structure) to find violations in.
+            tree (GroupTree): The group tree, with the rules applied.
 
         Returns:
-            list: Nodes that are in violation.
+            list: MemberNodes that are in violation.
         """
         all_violations = []
+        root = MemberNode(MY_CUSTOMER, MY_CUSTOMER)
+        masks = {}
+        # rule indexes -> (violating members flags, violated rule names)
+        violating_by_rules = {}
 
-        for node in anytree.iterators.PreOrderIter(root):
+        for position, group_index in enumerate(tree.groups):
+            rule_indexes = tuple(tree.group_rules[position])
 
-            # No need to evaluate these nodes.
-            # This represents the org, i.e. is not a group.
-            if node.member_email == MY_CUSTOMER:
-                continue
-            # This represents the auto-generated group, containing all the users
-            # in the org.
-            if not node.member_email:
+            # Skip the group if there is no rules to check against.
+            if not rule_indexes:
                 continue
 
-            # Skip the member if there is no rules to check against.
-            if not node.rules:
-                continue
-
-            node.violated_rule_names = []
-            whitelist_rule_statuses = []
-            for rule in node.rules:
-                condition_statuses = []
-
-                if rule.get('mode') == 'whitelist':
-                    for condition in rule.get('conditions'):
-                        if condition.get('member_email') in node.member_email:
-                            condition_statuses.append(True)
-                        else:
-                            condition_statuses.append(False)
-
-                    # All the conditions of this rule have evaluated.
-                    # The rule is fulfilled, if any condition matches.
-                    if any(condition_statuses):
-                        whitelist_rule_statuses.append(True)
-                    else:
-                        whitelist_rule_statuses.append(False)
-                        node.violated_rule_names.append(rule.get('name'))
-
-                elif rule.get('mode') == 'blacklist':
-                    pass  # TODO
-
-                elif rule.get('mode') == 'required':
-                    pass  # TODO
-
-                else:
-                    pass  # TODO
-
-            # Determine if the node is in violations or not.
-            # All rules must be fulfilled, for a node to not be in violation.
-            # If any rule is not fulfilled, then node is in violation.
-            if not any(whitelist_rule_statuses):
+            if rule_indexes not in violating_by_rules:
+                violated_rule_names = [
+                    tree.rules[i].get('name') for i in rule_indexes
+                    if tree.rules[i].get('mode') == 'whitelist']
+                violating_by_rules[rule_indexes] = (
+                    GroupsScanner._violating_members(tree, rule_indexes,
+                                                     masks),
+                    violated_rule_names)
+            violating, violated_rule_names = violating_by_rules[rule_indexes]
+
+            group_node = tree.node(group_index, root)
+            if violating[group_index]:
+                group_node.violated_rule_names = list(violated_rule_names)
+                all_violations.append(group_node)
+
+            members = tree.group_members[position]
+            for member_index in itertools.compress(
+                    members, map(violating.__getitem__, members)):
+                node = tree.node(member_index, group_node)
+                node.violated_rule_names = list(violated_rule_names)
                 all_violations.append(node)
 
         return all_violations
 
     @staticmethod
-    def _apply_one_rule(starting_node, rule):
-        """Append the rule to all the applicable nodes.
+    def _apply_all_rules(tree, group_rules):
+        """Apply all rules to all the applicable groups.
 
-        Args:
-            starting_node (node): Member node from which to start appending
-                the rule.
-            rule (dict): A dictionary representation of a rule.
-
-        Returns:
-            node: Member node with all its recursive members,
-                with the rule appended.
-        """
-        for node in anytree.iterators.PreOrderIter(starting_node):
-            node.rules.append(rule)
-        return starting_node
-
-    def _apply_all_rules(self, starting_node, group_rules):
-        """Apply all rules to all the applicable nodes.
+        The rules of a group apply to the group and all its recursive
+        members.
 
         Args:
-            starting_node (node): Member node from which to start appending the
-                rule.
-            group_rules (dict): A list of rules, in dictionary form.
+            tree (GroupTree): The group tree.
+            group_rules (list): A list of rules, in dictionary form.
 
         Returns:
-            node: Member node with all the rules applied to all the nodes.
+            GroupTree: The group tree with all the rules applied.
         """
-        for rule in group_rules:
+        tree.rules = list(group_rules)
+        positions_by_email = collections.defaultdict(list)
+        for position, group_index in enumerate(tree.groups):
+            positions_by_email[tree.member_emails[group_index]].append(
+                position)
+
+        for rule_index, rule in enumerate(group_rules):
             if rule.get('group_email') == MY_CUSTOMER:
-                # Apply rule to every node.
-                # Because this is simply the root node, there is no need
-                # to find this node, i.e. just start at the root.
-                # Traversal order should not matter.
-                starting_node = self._apply_one_rule(starting_node, rule)
+                # Apply rule to every group.
+                positions = range(len(tree.groups))
             else:
-                # Apply rule to only specific node.
-                # Need to find this node.
-                # Traversal should not matter since we need to find all
-                # instances of the group (because a group can be added
-                # to multiple groups).
-                #
-                # Start at the tree root, find all instances of the specified
-                # group, then add the rule to all the members of the specified
-                # group.
-                for node in anytree.iterators.PreOrderIter(starting_node):
-                    if node.member_email == rule.get('group_email'):
-                        self._apply_one_rule(node, rule)
-                        break  # Avoid visiting the same group more than once.
-
-        return starting_node
-
-    def _get_recursive_members(self, starting_node):
-        """Get all the recursive members of a group.
+                # Apply rule to only the specified group.
+                positions = positions_by_email.get(rule.get('group_email'),
+                                                   [])
+            for position in positions:
+                tree.group_rules[position].append(rule_index)
 
-        Args:
-            starting_node (node): Member node from which to start getting
-                the recursive members.
-        """
-        model_manager = self.service_config.model_manager
-        scoped_session, data_access = model_manager.get(self.model_name)
-        with scoped_session as session:
-            members = data_access.expand_members(session,
-                                                 [starting_node.member_id])
-            for member in members:
-                MemberNode(member.name,
-                           member.member_name,
-                           member.type,
-                           'ACTIVE',
-                           starting_node)
+        return tree
 
     def _build_group_tree(self):
         """Build a tree of all the groups in the organization.
 
+        The members, the direct group memberships and the denormalized
+        group-in-group relation are each read once. The recursive members of a
+        group are its direct members and the direct members of all the groups
+        in it.
+
         Returns:
-            node: The tree structure of all the groups in the organization.
+            GroupTree: All the groups in the organization with their recursive
+                members.
         """
-        root = MemberNode(MY_CUSTOMER, MY_CUSTOMER)
+        tree = GroupTree()
+        direct_members = collections.defaultdict(list)
+        nested_groups = collections.defaultdict(list)
         model_manager = self.service_config.model_manager
         scoped_session, data_access = model_manager.get(self.model_name)
         with scoped_session as session:
-            all_groups = data_access.iter_groups(session)
+            for name, member_name, member_type in (
+                    data_access.iter_member_details(session)):
+                tree.add_member(name, member_name, member_type)
+
+            indexes = tree.member_indexes
+            for group_name, member_name in (
+                    data_access.iter_direct_group_members(session)):
+                direct_members[indexes[group_name]].append(
+                    indexes[member_name])
 
-            for group in all_groups:
-                group_node = MemberNode(group.name,
-                                        group.member_name,
-                                        group.type,
-                                        'ACTIVE',
-                                        root)
-                self._get_recursive_members(group_node)
+            for parent, member in data_access.iter_group_in_group(session):
+                nested_groups[indexes[parent]].append(indexes[member])
 
-        LOGGER.debug(anytree.RenderTree(
-            root, style=anytree.AsciiStyle()).by_attr('member_email'))
+        for group_index, member_type in enumerate(tree.member_types):
+            if member_type != 'group':
+                continue
+            # Like expand_members, a group is one of its recursive members.
+            members = {group_index}
+            members.update(direct_members[group_index])
+            for nested_group in nested_groups[group_index]:
+                members.update(direct_members[nested_group])
+            tree.add_group(group_index, members)
+
+        LOGGER.debug('Built the group tree: %d groups, %d members.',
+                     len(tree.groups), len(tree.member_ids))
 
-        return root
+        return tree
 
     def _retrieve(self):
         """Retrieves the group tree.
@@ -252,27 +254,97 @@ class GroupsScanner(base_scanner.BaseScanner):
             None
 
         Returns:
-            node: The tree structure of all the groups in the organization.
+            GroupTree: All the groups in the organization.
         """
-        root = self._build_group_tree()
-        return root
+        return self._build_group_tree()
 
     def run(self):
         """Runs the groups scanner."""
 
-        root = self._retrieve()
+        tree = self._retrieve()
 
         group_rules = file_loader.read_and_parse_file(self.rules)
 
-        root = self._apply_all_rules(root, group_rules)
+        tree = self._apply_all_rules(tree, group_rules)
 
-        all_violations = self._find_violations(root)
+        all_violations = self._find_violations(tree)
 
         self._output_results(all_violations)
 
 
-class MemberNode(anytree.node.NodeMixin):
-    """A custom anytree node with Group Member attributes."""
+class GroupTree(object):
+    """All the groups of an organization with their recursive members.
+
+    The members are stored once, in arrays indexed by member, and the groups
+    hold the indexes of their members.
+    """
+
+    def __init__(self):
+        """Initialization."""
+        self.member_ids = []
+        self.member_emails = []
+        self.member_types = []
+        self.member_indexes = {}
+        # 1 for the members never in violation.
+        self.skipped_members = bytearray()
+
+        # The member index of each group, its sorted recursive member indexes
+        # and the indexes of its rules.
+        self.groups = array.array('i')
+        self.group_members = []
+        self.group_rules = []
+        self.rules = []
+
+    def add_member(self, member_id, member_email, member_type):
+        """Add a member.
+
+        Args:
+            member_id (str): id of the member
+            member_email (str): email of the member
+            member_type (str): type of the member
+
+        Returns:
+            int: The index of the member.
+        """
+        index = len(self.member_ids)
+        self.member_ids.append(member_id)
+        self.member_emails.append(member_email or '')
+        self.member_types.append(member_type)
+        self.member_indexes[member_id] = index
+        self.skipped_members.append(
+            not member_email or member_email == MY_CUSTOMER)
+        return index
+
+    def add_group(self, group_index, members):
+        """Add a group.
+
+        Args:
+            group_index (int): The member index of the group.
+            members (iterable): The member indexes of its recursive members.
+        """
+        self.groups.append(group_index)
+        self.group_members.append(array.array('i', sorted(members)))
+        self.group_rules.append([])
+
+    def node(self, member_index, parent=None):
+        """Get the node of a member.
+
+        Args:
+            member_index (int): The index of the member.
+            parent (MemberNode): The node of the group of the member.
+
+        Returns:
+            MemberNode: The node.
+        """
+        return MemberNode(self.member_ids[member_index],
+                          self.member_emails[member_index],
+                          self.member_types[member_index],
+                          'ACTIVE',
+                          parent)
+
+
+class MemberNode(object):
+    """A group member, as a node of the group tree."""
 
     def __init__(self, member_id, member_email,
                  member_type=None, member_status=None, parent=None,):
@@ -291,4 +363,4 @@ class MemberNode(anytree.node.NodeMixin):
         self.member_type = member_type
         self.member_status = member_status
         self.parent = parent
-        self.rules = []
+        self.violated_rule_names = []
@@ -32,6 +32,7 @@ from google.cloud.forseti.common.gcp_type import project as project_type
 from google.cloud.forseti.common.gcp_type import network as network_type
 from google.cloud.forseti.common.gcp_type.resource import ResourceType
 from google.cloud.forseti.common.util import logger
+from google.cloud.forseti.scanner import model_cache
 from google.cloud.forseti.scanner.audit import iap_rules_engine
 from google.cloud.forseti.scanner.scanners import base_scanner
 
@@ -502,8 +503,8 @@ class IapScanner(base_scanner.BaseScanner):
         """
         backend_services = []
         with self.scoped_session as session:
-            for backend_service in self.data_access.scanner_iter(
-                    session, 'backendservice',
+            for backend_service in model_cache.scanner_iter(
+                    self.data_access, session, 'backendservice',
                     parent_type_name=parent_type_name):
                 backend_services.append(
                     backend_service_type.BackendService.from_json(
@@ -523,8 +524,9 @@ class IapScanner(base_scanner.BaseScanner):
         """
         firewall_rules = []
         with self.scoped_session as session:
-            for firewall_rule in self.data_access.scanner_iter(
-                    session, 'firewall', parent_type_name=parent_type_name):
+            for firewall_rule in model_cache.scanner_iter(
+                    self.data_access, session, 'firewall',
+                    parent_type_name=parent_type_name):
                 firewall_rules.append(
                     firewall_rule_type.FirewallRule.from_json(
                         project_id=firewall_rule.parent.name,
@@ -542,8 +544,9 @@ class IapScanner(base_scanner.BaseScanner):
         """
         instances = []
         with self.scoped_session as session:
-            for instance in self.data_access.scanner_iter(
-                    session, 'instance', parent_type_name=parent_type_name):
+            for instance in model_cache.scanner_iter(
+                    self.data_access, session, 'instance',
+                    parent_type_name=parent_type_name):
                 project = project_type.Project(
                     project_id=instance.parent.name,
                     full_name=instance.parent.full_name,
@@ -565,8 +568,8 @@ class IapScanner(base_scanner.BaseScanner):
         """
         instance_groups = []
         with self.scoped_session as session:
-            for instance_group in self.data_access.scanner_iter(
-                    session, 'instancegroup',
+            for instance_group in model_cache.scanner_iter(
+                    self.data_access, session, 'instancegroup',
                     parent_type_name=parent_type_name):
                 instance_groups.append(
                     instance_group_type.InstanceGroup.from_json(
@@ -585,8 +588,8 @@ class IapScanner(base_scanner.BaseScanner):
         """
         instance_group_managers = []
         with self.scoped_session as session:
-            for instance_group_manager in self.data_access.scanner_iter(
-                    session, 'instancegroupmanager',
+            for instance_group_manager in model_cache.scanner_iter(
+                    self.data_access, session, 'instancegroupmanager',
                     parent_type_name=parent_type_name):
                 instance_group_managers.append(
                     instance_group_manager_type.InstanceGroupManager.from_json(
@@ -605,8 +608,8 @@ class IapScanner(base_scanner.BaseScanner):
         """
         instance_templates = []
         with self.scoped_session as session:
-            for instance_template in self.data_access.scanner_iter(
-                    session, 'instancetemplate',
+            for instance_template in model_cache.scanner_iter(
+                    self.data_access, session, 'instancetemplate',
                     parent_type_name=parent_type_name):
                 instance_templates.append(
                     instance_template_type.InstanceTemplate.from_json(
@@ -624,7 +627,8 @@ class IapScanner(base_scanner.BaseScanner):
         """
         projects = []
         with self.scoped_session as session:
-            for project in self.data_access.scanner_iter(session, 'project'):
+            for project in model_cache.scanner_iter(
+                    self.data_access, session, 'project'):
                 projects.append(project)
 
         for parent in projects:
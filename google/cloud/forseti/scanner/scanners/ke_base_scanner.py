@@ -19,6 +19,7 @@ import json
 from google.cloud.forseti.common.gcp_type import ke_cluster
 from google.cloud.forseti.common.gcp_type import project
 from google.cloud.forseti.common.util import logger
+from google.cloud.forseti.scanner import model_cache
 from google.cloud.forseti.scanner.audit import base_rules_engine as bre
 from google.cloud.forseti.scanner.scanners.base_scanner import BaseScanner
 
@@ -182,8 +183,8 @@ def ke_scanner_factory(scanner_name, rules_engine_cls):
             scoped_session, data_access = model_manager.get(self.model_name)
             with scoped_session as session:
                 ke_clusters = []
-                for cluster in data_access.scanner_iter(
-                        session, 'kubernetes_cluster'):
+                for cluster in model_cache.scanner_iter(
+                        data_access, session, 'kubernetes_cluster'):
                     proj = project.Project(
                         project_id=cluster.parent.name,
                         full_name=cluster.parent.full_name,
@@ -203,8 +204,8 @@ def ke_scanner_factory(scanner_name, rules_engine_cls):
                     ke_cluster_type_name = (
                         cluster.full_name[position:][:-1])
 
-                    service_config = list(data_access.scanner_iter(
-                        session, 'kubernetes_service_config',
+                    service_config = list(model_cache.scanner_iter(
+                        data_access, session, 'kubernetes_service_config',
                         parent_type_name=ke_cluster_type_name))[0]
 
                     cluster.server_config = json.loads(service_config.data)
@@ -16,6 +16,7 @@
 
 from google.cloud.forseti.common.gcp_type import crypto_key
 from google.cloud.forseti.common.util import logger
+from google.cloud.forseti.scanner import model_cache
 from google.cloud.forseti.scanner.audit import kms_rules_engine
 from google.cloud.forseti.scanner.scanners import base_scanner
 
@@ -120,7 +121,8 @@ class KMSScanner(base_scanner.BaseScanner):
         model_manager = self.service_config.model_manager
         scoped_session, data_access = model_manager.get(self.model_name)
         with scoped_session as session:
-            for key in data_access.scanner_iter(session, 'kms_cryptokey'):
+            for key in model_cache.scanner_iter(
+                    data_access, session, 'kms_cryptokey'):
                 if not key.parent_type_name.startswith('kms_keyring'):
                     raise ValueError(
                         'Unexpected type of parent resource type: '
@@ -17,6 +17,7 @@
 from google.cloud.forseti.common.gcp_type import lien
 from google.cloud.forseti.common.gcp_type import project
 from google.cloud.forseti.common.util import logger
+from google.cloud.forseti.scanner import model_cache
 from google.cloud.forseti.scanner.audit import lien_rules_engine
 from google.cloud.forseti.scanner.scanners import base_scanner
 
@@ -74,8 +75,8 @@ class LienScanner(base_scanner.BaseScanner):
             parent_resource_to_liens = {}
 
             # liens can only be defined on a project currently
-            for project_resource in data_access.scanner_iter(
-                    session, 'project'):
+            for project_resource in model_cache.scanner_iter(
+                    data_access, session, 'project'):
 
                 proj = project.Project(
                     project_id=project_resource.name,
@@ -84,7 +85,8 @@ class LienScanner(base_scanner.BaseScanner):
 
                 parent_resource_to_liens[proj] = []
 
-            for lien_resource in data_access.scanner_iter(session, 'lien'):
+            for lien_resource in model_cache.scanner_iter(
+                    data_access, session, 'lien'):
                 parent_resource = lien_resource.parent
 
                 if lien_resource.parent.type != 'project':
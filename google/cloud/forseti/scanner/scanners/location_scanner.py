@@ -18,6 +18,7 @@
 from google.cloud.forseti.common.gcp_type import project
 from google.cloud.forseti.common.gcp_type import resource_util
 from google.cloud.forseti.common.util import logger
+from google.cloud.forseti.scanner import model_cache
 from google.cloud.forseti.scanner.audit import location_rules_engine as lre
 from google.cloud.forseti.scanner.scanners import base_scanner
 
@@ -72,8 +73,8 @@ class LocationScanner(base_scanner.BaseScanner):
             self.model_name)
         with scoped_session as session:
             for resource_type in lre.SUPPORTED_LOCATION_RESOURCE_TYPES:
-                for resource in data_access.scanner_iter(
-                        session, resource_type):
+                for resource in model_cache.scanner_iter(
+                        data_access, session, resource_type):
 
                     if resource.parent.type != 'project':
                         raise ValueError(
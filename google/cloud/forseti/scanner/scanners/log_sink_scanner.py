@@ -19,6 +19,7 @@ import collections
 from google.cloud.forseti.common.gcp_type import resource_util
 from google.cloud.forseti.common.gcp_type.log_sink import LogSink
 from google.cloud.forseti.common.util import logger
+from google.cloud.forseti.scanner import model_cache
 from google.cloud.forseti.scanner.audit import log_sink_rules_engine
 from google.cloud.forseti.scanner.scanners import base_scanner
 
@@ -122,14 +123,15 @@ class LogSinkScanner(base_scanner.BaseScanner):
             log_sink_data = []
 
             sinks = collections.defaultdict(list)
-            for sink in data_access.scanner_iter(session, 'sink'):
+            for sink in model_cache.scanner_iter(data_access, session, 'sink'):
                 sinks[sink.parent_type_name].append(LogSink.from_json(
                     sink.parent, sink.data))
 
             # Create a list (possibly empty) of sinks for each parent resource.
             for parent_type in ['organization', 'billing_account', 'folder',
                                 'project']:
-                for parent in data_access.scanner_iter(session, parent_type):
+                for parent in model_cache.scanner_iter(
+                        data_access, session, parent_type):
                     parent_resource = resource_util.create_resource(
                         resource_id=parent.name,
                         resource_type=parent_type,
@@ -17,6 +17,7 @@
 
 from google.cloud.forseti.common.gcp_type import resource_util
 from google.cloud.forseti.common.util import logger
+from google.cloud.forseti.scanner import model_cache
 from google.cloud.forseti.scanner.audit import resource_rules_engine
 from google.cloud.forseti.scanner.scanners import base_scanner
 
@@ -72,8 +73,8 @@ class ResourceScanner(base_scanner.BaseScanner):
             self.model_name)
         with scoped_session as session:
             for resource_type in resource_types:
-                for resource in data_access.scanner_iter(
-                        session, resource_type):
+                for resource in model_cache.scanner_iter(
+                        data_access, session, resource_type):
 
                     resources.append(
                         resource_util.create_resource_from_db_row(resource)
@@ -15,6 +15,7 @@
 """Scanner for the retention rules engine."""
 
 from google.cloud.forseti.common.util import logger
+from google.cloud.forseti.scanner import model_cache
 from google.cloud.forseti.scanner.audit import retention_rules_engine as rre
 from google.cloud.forseti.scanner.scanners import base_scanner
 from google.cloud.forseti.common.gcp_type import resource_util
@@ -113,8 +114,8 @@ class RetentionScanner(base_scanner.BaseScanner):
         retention_res = []
         with scoped_session as session:
             for resource_type in rre.SUPPORTED_RETENTION_RES_TYPES:
-                for resource in data_access.scanner_iter(
-                        session, resource_type):
+                for resource in model_cache.scanner_iter(
+                        data_access, session, resource_type):
                     parent = resource_util.create_resource(
                         resource_id=resource.parent.name,
                         resource_type=resource.parent.type
@@ -15,6 +15,7 @@
 """Scanner for the role rules engine."""
 
 from google.cloud.forseti.common.util import logger
+from google.cloud.forseti.scanner import model_cache
 from google.cloud.forseti.scanner.audit import role_rules_engine as rre
 from google.cloud.forseti.scanner.scanners import base_scanner
 from google.cloud.forseti.common.gcp_type import resource_util
@@ -111,8 +112,8 @@ class RoleScanner(base_scanner.BaseScanner):
         scoped_session, data_access = model_manager.get(self.model_name)
         role_res = []
         with scoped_session as session:
-            for resource in data_access.scanner_iter(
-                    session, 'role'):
+            for resource in model_cache.scanner_iter(
+                    data_access, session, 'role'):
                 parent = resource_util.create_resource(
                     resource_id=resource.parent.name,
                     resource_type=resource.parent.type
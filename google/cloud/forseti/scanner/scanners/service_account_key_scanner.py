@@ -16,6 +16,7 @@
 
 from google.cloud.forseti.common.gcp_type.service_account import ServiceAccount
 from google.cloud.forseti.common.util import logger
+from google.cloud.forseti.scanner import model_cache
 from google.cloud.forseti.scanner.audit import service_account_key_rules_engine
 from google.cloud.forseti.scanner.scanners import base_scanner
 
@@ -120,8 +121,8 @@ class ServiceAccountKeyScanner(base_scanner.BaseScanner):
         scoped_session, data_access = model_manager.get(self.model_name)
         with scoped_session as session:
             service_accounts = []
-            for service_account in data_access.scanner_iter(
-                    session, 'serviceaccount'):
+            for service_account in model_cache.scanner_iter(
+                    data_access, session, 'serviceaccount'):
                 project_id = service_account.parent.name
                 service_accounts.append(
                     ServiceAccount.from_json(project_id,
@@ -137,8 +138,8 @@ class ServiceAccountKeyScanner(base_scanner.BaseScanner):
                 service_acc_type_name = (
                     service_account.full_name[position:][:-1])
 
-                keys = list(data_access.scanner_iter(
-                    session, 'serviceaccount_key',
+                keys = list(model_cache.scanner_iter(
+                    data_access, session, 'serviceaccount_key',
                     parent_type_name=service_acc_type_name))
                 service_account.keys = ServiceAccount.parse_json_keys(keys)
 
@@ -196,7 +196,10 @@ class InventoryConfig(AbstractInventoryConfig):
                  retention_days,
                  cai_configs,
                  composite_root_resources=None,
-                 excluded_resources=None):
+                 excluded_resources=None,
+                 incremental_configs=None,
+                 memory_lean=False,
+                 prefetch_pages=0):
         """Initialize.
 
         Args:
@@ -208,6 +211,11 @@ class InventoryConfig(AbstractInventoryConfig):
             composite_root_resources (list): The list of resources to use crawl
                 using a composite root.
             excluded_resources (list): The list of resources to exclude.
+            incremental_configs (dict): Settings for incremental inventories.
+            memory_lean (bool): Release the data of crawled resources once
+                they are stored.
+            prefetch_pages (int): The number of pages of paged API queries
+                fetched ahead of the caller, 0 disables prefetching.
 
         Raises:
             ValueError: Raised if neither or both root_resource_id and
@@ -237,6 +245,9 @@ class InventoryConfig(AbstractInventoryConfig):
         self.composite_root_resources = composite_root_resources
         self.excluded_resources = self._filter_valid_resources(
             excluded_resources)
+        self.incremental_configs = incremental_configs or {}
+        self.memory_lean = bool(memory_lean)
+        self.prefetch_pages = int(prefetch_pages or 0)
 
     def use_composite_root(self):
         """Checks if inventory is configured to use a composite root resource.
@@ -339,6 +350,48 @@ class InventoryConfig(AbstractInventoryConfig):
         """
         return self.cai_configs.get('api_timeout', 3600)
 
+    def get_cai_storage(self):
+        """Returns the backend used to store the Cloud Asset data locally.
+
+        Returns:
+            str: 'sqlite' for a temporary sqlite database or 'indexed' for an
+                in-memory index over a memory mapped file, defaults to
+                'sqlite'.
+        """
+        return self.cai_configs.get('storage', 'sqlite')
+
+    def get_incremental_enabled(self):
+        """Returns True if unchanged subtrees are copied from prior inventory.
+
+        Returns:
+            bool: Whether the inventory is incremental, defaults to False.
+        """
+        return bool(self.incremental_configs.get('enabled', False))
+
+    def get_incremental_max_age_hours(self):
+        """Returns the maximum age of data copied from a prior inventory.
+
+        Returns:
+            int: Maximum age in hours, defaults to 24 hours.
+        """
+        return int(self.incremental_configs.get('max_age_hours', 24))
+
+    def get_memory_lean(self):
+        """Returns True if crawled resources release their data once stored.
+
+        Returns:
+            bool: Whether the crawl is memory lean, defaults to False.
+        """
+        return self.memory_lean
+
+    def get_prefetch_pages(self):
+        """Returns the number of pages of paged queries fetched ahead.
+
+        Returns:
+            int: The number of pages, defaults to 0, no prefetching.
+        """
+        return self.prefetch_pages
+
     def get_service_config(self):
         """Return the attached service configuration.
 
@@ -387,6 +440,7 @@ class ServiceConfig(AbstractServiceConfig):
         self.forseti_config_file_path = forseti_config_file_path
 
         self.inventory_config = None
+        self.model_config = None
         self.scanner_config = None
         self.notifier_config = None
         self.global_config = None
@@ -461,11 +515,19 @@ class ServiceConfig(AbstractServiceConfig):
                             'composite_root_resources')
                     ),
                     excluded_resources=forseti_inventory_config.get(
-                        'excluded_resources', [])
+                        'excluded_resources', []),
+                    incremental_configs=forseti_inventory_config.get(
+                        'incremental', {}),
+                    memory_lean=forseti_inventory_config.get(
+                        'memory_lean', False),
+                    prefetch_pages=forseti_inventory_config.get(
+                        'prefetch_pages', 0)
                 )
             except ValueError as e:
                 return False, str(e)
 
+            forseti_model_config = forseti_config.get('model', {})
+
             # TODO: Create Config classes to store scanner and notifier configs.
             forseti_scanner_config = forseti_config.get('scanner', {})
             # The suffix is used to indicate which major feature is enabled for
@@ -484,6 +546,7 @@ class ServiceConfig(AbstractServiceConfig):
             self.inventory_config = inventory_config
             self.inventory_config.set_service_config(self)
 
+            self.model_config = forseti_model_config
             self.scanner_config = forseti_scanner_config
             self.notifier_config = forseti_notifier_config
 
@@ -508,6 +571,15 @@ class ServiceConfig(AbstractServiceConfig):
 
         return self.inventory_config
 
+    def get_model_config(self):
+        """Get the model config.
+
+        Returns:
+            dict: Model config.
+        """
+
+        return self.model_config
+
     def get_scanner_config(self):
         """Get the scanner config.
 
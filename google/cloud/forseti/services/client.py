@@ -33,6 +33,9 @@ from google.cloud.forseti.services.server_config import server_pb2
 from google.cloud.forseti.services.server_config import server_pb2_grpc
 from google.cloud.forseti.services.utils import oneof
 
+# The number of replies of each call of the paged explain listings.
+LIST_PAGE_SIZE = 10000
+
 
 # pylint: disable=too-many-instance-attributes
 
@@ -478,36 +481,77 @@ class ExplainClient(ForsetiClient):
         return self.stub.Ping(explain_pb2.PingRequest(data=data)).data == data
 
     @require_model
-    def list_resources(self, resource_name_prefix):
+    def _list_pages(self, method, request, token_field):
+        """Stream a listing in pages, resuming each page after the last reply.
+
+        Each call of the listing returns at most request.page_size replies,
+        so the server never holds a single long lived stream and cursor
+        over a large listing.
+
+        Args:
+            method (object): The gRPC method of the listing.
+            request (object): The proto message of the request.
+            token_field (str): The field of the replies to resume after.
+
+        Yields:
+            object: The proto messages of the replies.
+        """
+        while True:
+            replies = 0
+            for reply in method(request, metadata=self.metadata()):
+                replies += 1
+                request.page_token = getattr(reply, token_field)
+                yield reply
+            if not request.page_size or replies != request.page_size:
+                return
+
+    @require_model
+    def list_resources(self, resource_name_prefix, page_token='',
+                       page_size=LIST_PAGE_SIZE):
         """List resources by name prefix.
 
         Args:
             resource_name_prefix (str): the prefix of resource_name to query.
+            page_token (str): the full_resource_name of the last resource
+                received, to resume a listing after it.
+            page_size (int): the number of resources of each call, 0 to list
+                all the resources in a single call.
 
         Returns:
             object: generator of proto message of resources.
         """
 
-        return self.stub.ListResources(
+        return self._list_pages(
+            self.stub.ListResources,
             explain_pb2.ListResourcesRequest(
-                prefix=resource_name_prefix),
-            metadata=self.metadata())
+                prefix=resource_name_prefix,
+                page_token=page_token,
+                page_size=page_size),
+            'full_resource_name')
 
     @require_model
-    def list_members(self, member_name_prefix):
+    def list_members(self, member_name_prefix, page_token='',
+                     page_size=LIST_PAGE_SIZE):
         """List members by prefix.
 
         Args:
             member_name_prefix (str): the prefix of member_name to query
+            page_token (str): the member_name of the last member received,
+                to resume a listing after it.
+            page_size (int): the number of members of each call, 0 to list
+                all the members in a single call.
 
         Returns:
             object: generator of proto message of members.
         """
 
-        return self.stub.ListGroupMembers(
+        return self._list_pages(
+            self.stub.ListGroupMembers,
             explain_pb2.ListGroupMembersRequest(
-                prefix=member_name_prefix),
-            metadata=self.metadata())
+                prefix=member_name_prefix,
+                page_token=page_token,
+                page_size=page_size),
+            'member_name')
 
     @require_model
     def list_roles(self, role_name_prefix):
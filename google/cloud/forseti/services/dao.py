@@ -22,6 +22,7 @@ from builtins import object
 import binascii
 import collections
 import hmac
+import itertools
 import json
 import os
 import struct
@@ -36,8 +37,11 @@ from sqlalchemy import Sequence
 from sqlalchemy import ForeignKey
 from sqlalchemy import Text
 from sqlalchemy import create_engine as sqlalchemy_create_engine
+from sqlalchemy import func
+from sqlalchemy import inspect as sqlalchemy_inspect
 from sqlalchemy import Table
 from sqlalchemy import DateTime
+from sqlalchemy import LargeBinary
 from sqlalchemy import or_
 from sqlalchemy import and_
 from sqlalchemy import not_
@@ -47,13 +51,17 @@ from sqlalchemy.orm import reconstructor
 from sqlalchemy.orm import relationship
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.orm.exc import NoResultFound
+from sqlalchemy.sql import bindparam
 from sqlalchemy.sql import select
 from sqlalchemy.sql import union
 from sqlalchemy.ext.declarative import declarative_base
 
 from google.cloud.forseti.common.util import date_time
+from google.cloud.forseti.common.util import graph
+from google.cloud.forseti.services.utils import get_resources_from_full_name
 from google.cloud.forseti.services.utils import mutual_exclusive
 from google.cloud.forseti.services.utils import to_full_resource_name
+from google.cloud.forseti.services.utils import to_type_name
 from google.cloud.forseti.services import db
 from google.cloud.forseti.services.utils import get_sql_dialect
 from google.cloud.forseti.common.util import logger
@@ -62,7 +70,14 @@ from google.cloud.forseti.common.util import logger
 LOGGER = logger.get_logger(__name__)
 
 POOL_RECYCLE_SECONDS = 300
+# How long a SQLite connection waits for the write lock held by another
+# connection, e.g. another worker of a parallel model import.
+SQLITE_BUSY_TIMEOUT_MS = 60000
 PER_YIELD = 4096
+DENORM_INSERT_BATCH_SIZE = 10000
+# The effective access entries held in memory are written to the index once
+# there are this many, at the end of the bindings of a resource.
+ACCESS_INDEX_FLUSH_SIZE = 100000
 
 
 def page_query(query, block_size=PER_YIELD):
@@ -88,6 +103,35 @@ def page_query(query, block_size=PER_YIELD):
                               (block_number + 1) * block_size).all()
 
 
+def keyset_query(query, key_column, after=None, block_size=PER_YIELD):
+    """Page query by block, seeking past the last key of the previous block.
+
+    Unlike page_query, each block is a range scan of the key's index, so the
+    cost of a block does not grow with its position in the results, and the
+    rows are not buffered by the database driver like with yield_per.
+
+    Args:
+        query (Query): sqlalchemy query of a single entity.
+        key_column (InstrumentedAttribute): A unique column of the entity.
+        after (object): Only return the rows whose key is greater.
+        block_size (int): Block size per page.
+
+    Yields:
+        object: The query result object, ordered by the key.
+    """
+    query = query.order_by(key_column.asc())
+    while True:
+        block = query
+        if after is not None:
+            block = block.filter(key_column > after)
+        results = block.limit(block_size).all()
+        for obj in results:
+            yield obj
+        if len(results) < block_size:
+            return
+        after = getattr(results[-1], key_column.key)
+
+
 def generate_model_handle():
     """Generate random model handle.
 
@@ -108,6 +152,108 @@ def generate_model_seed():
     return binascii.hexlify(os.urandom(16)).decode('utf-8')
 
 
+def _int_to_bitset(bits):
+    """Encode an integer bitset as bytes.
+
+    Args:
+        bits (int): The bitset.
+
+    Returns:
+        bytes: The little endian bitset.
+    """
+    return bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+
+
+def _bitset_to_int(bitset):
+    """Decode a bitset encoded by _int_to_bitset.
+
+    Args:
+        bitset (bytes): The little endian bitset.
+
+    Returns:
+        int: The bitset.
+    """
+    return int.from_bytes(bitset or b'', 'little')
+
+
+def _number_resource_tree(resources):
+    """Number the resources of a hierarchy in pre-order.
+
+    Resources whose parent is not one of the resources are roots.
+
+    Args:
+        resources (iterable): The (type_name, parent_type_name) of every
+            resource.
+
+    Returns:
+        list: The (type_name, pre_order, post_order, depth) of every resource
+            in pre-order, post_order being the largest pre_order in the
+            subtree of the resource.
+    """
+    children = collections.defaultdict(list)
+    type_names = set()
+    for type_name, parent_type_name in resources:
+        type_names.add(type_name)
+        children[parent_type_name].append(type_name)
+
+    roots = [type_name
+             for parent_type_name, child_names in children.items()
+             if parent_type_name not in type_names
+             for type_name in child_names]
+
+    numbering = []
+    positions = {}
+    # Depth first walk, a resource is pushed again once its children are
+    # numbered to set its post order number.
+    stack = [(type_name, 0, False) for type_name in reversed(roots)]
+    while stack:
+        type_name, depth, visited = stack.pop()
+        if visited:
+            position = positions[type_name]
+            numbering[position][2] = len(numbering) - 1
+            continue
+        if type_name in positions:
+            continue
+        positions[type_name] = len(numbering)
+        numbering.append([type_name, len(numbering), None, depth])
+        stack.append((type_name, depth, True))
+        stack.extend((child, depth + 1, False)
+                     for child in reversed(children[type_name]))
+    return [tuple(row) for row in numbering]
+
+
+def _create_missing_columns(dbengine, table):
+    """Add the columns missing from a table created by a previous version.
+
+    Models are kept across upgrades, the columns added to the model tables
+    since are created empty by the model manager when it starts, along with
+    their indexes.
+
+    Args:
+        dbengine (object): db engine
+        table (Table): The table.
+    """
+    existing_columns = set(
+        column['name'] for column in
+        sqlalchemy_inspect(dbengine).get_columns(table.name))
+    added_columns = set()
+    for column in table.columns:
+        if column.name not in existing_columns:
+            LOGGER.info('Adding column %s to table %s.', column.name,
+                        table.name)
+            dbengine.execute('ALTER TABLE {} ADD COLUMN {} {}'.format(
+                table.name, column.name,
+                column.type.compile(dialect=dbengine.dialect)))
+            added_columns.add(column.name)
+
+    for index in table.indexes:
+        if added_columns.intersection(
+                column.name for column in index.columns):
+            LOGGER.info('Adding index %s to table %s.', index.name,
+                        table.name)
+            index.create(dbengine)
+
+
 MODEL_BASE = declarative_base()
 
 
@@ -253,6 +399,13 @@ def define_model(model_name, dbengine, model_seed):
     permissions_tablename = '{}_permissions'.format(model_name)
     members_tablename = '{}_members'.format(model_name)
     resources_tablename = '{}_resources'.format(model_name)
+    access_members_tablename = '{}_access_members'.format(model_name)
+    access_roles_tablename = '{}_access_roles'.format(model_name)
+    access_permissions_tablename = '{}_access_permissions'.format(model_name)
+    access_resources_tablename = '{}_access_resources'.format(model_name)
+    access_entries_tablename = '{}_access_entries'.format(model_name)
+    # Session info key caching whether the resources are numbered.
+    resources_numbered_key = '{}_resources_numbered'.format(model_name)
 
     role_permissions = Table('{}_role_permissions'.format(model_name),
                              base.metadata,
@@ -333,6 +486,12 @@ def define_model(model_name, dbengine, model_seed):
         display_name = Column(String(256), default='')
         email = Column(String(256), default='')
         data = Column(Text(16777215))
+        # Pre-order numbering of the hierarchy, set by number_resources. The
+        # descendants of a resource have a pre_order between its pre_order
+        # and post_order.
+        pre_order = Column(Integer, index=True)
+        post_order = Column(Integer)
+        depth = Column(Integer)
 
         parent = relationship('Resource', remote_side=[type_name])
         bindings = relationship('Binding', back_populates='resource')
@@ -492,6 +651,63 @@ def define_model(model_name, dbengine, model_seed):
             """
             return '<Permission(name=%s)>' % self.name
 
+    class AccessMember(base):
+        """Row for a member interned in the effective access index."""
+
+        __tablename__ = access_members_tablename
+        id = Column(Integer, primary_key=True, autoincrement=False)
+        name = Column(String(256), nullable=False, index=True)
+
+    class AccessRole(base):
+        """Row for a role and its permissions in the effective access index.
+
+        The permissions are stored as a little endian bitset of the ids of
+        the AccessPermission rows.
+        """
+
+        __tablename__ = access_roles_tablename
+        id = Column(Integer, primary_key=True, autoincrement=False)
+        name = Column(get_string_by_dialect(dbengine.dialect.name, 256),
+                      nullable=False, index=True)
+        permissions = Column(LargeBinary)
+
+    class AccessPermission(base):
+        """Row for a permission interned in the effective access index."""
+
+        __tablename__ = access_permissions_tablename
+        id = Column(Integer, primary_key=True, autoincrement=False)
+        name = Column(get_string_by_dialect(dbengine.dialect.name, 256),
+                      nullable=False, index=True)
+
+    class AccessResource(base):
+        """Row for a resource in the effective access index.
+
+        Resources are numbered in pre-order, the descendants of a resource
+        are the resources with a pre number between its pre and post number.
+        """
+
+        __tablename__ = access_resources_tablename
+        id = Column(Integer, primary_key=True, autoincrement=False)
+        type_name = Column(get_string_by_dialect(dbengine.dialect.name, 700),
+                           nullable=False, index=True)
+        name = Column(String(512), nullable=False)
+        pre = Column(Integer, nullable=False, index=True)
+        post = Column(Integer, nullable=False)
+
+    class AccessEntry(base):
+        """Row for a member granted a role on a resource by a binding.
+
+        Members of the groups in a binding are granted the role indirectly.
+        """
+
+        __tablename__ = access_entries_tablename
+        member_id = Column(Integer, primary_key=True, autoincrement=False)
+        role_id = Column(Integer, primary_key=True, autoincrement=False,
+                         index=True)
+        resource_id = Column(Integer, primary_key=True, autoincrement=False,
+                             index=True)
+        direct = Column(Boolean, nullable=False)
+
     # pylint: disable=too-many-public-methods
     class ModelAccess(object):
         """Data model facade, implement main API against database."""
@@ -503,6 +719,11 @@ def define_model(model_name, dbengine, model_seed):
         TBL_ROLE = Role
         TBL_RESOURCE = Resource
         TBL_MEMBERSHIP = group_members
+        ACCESS_INDEX_TABLES = [AccessEntry.__table__,
+                               AccessResource.__table__,
+                               AccessRole.__table__,
+                               AccessPermission.__table__,
+                               AccessMember.__table__]
 
         # Set of member binding types that expand like groups.
         GROUP_TYPES = {'group',
@@ -527,6 +748,9 @@ def define_model(model_name, dbengine, model_seed):
             group_members.drop(engine)
             groups_settings.drop(engine)
 
+            for table in cls.ACCESS_INDEX_TABLES:
+                table.drop(engine)
+
             Binding.__table__.drop(engine)
             Permission.__table__.drop(engine)
             GroupInGroup.__table__.drop(engine)
@@ -634,6 +858,69 @@ def define_model(model_name, dbengine, model_seed):
                 session.commit()
             return iterations
 
+        @classmethod
+        def denorm_group_in_group_in_memory(cls, session):
+            """Denormalize group-in-group relation in memory.
+
+            Produces the same GroupInGroup table as denorm_group_in_group,
+            but reads the group-to-group memberships once and computes the
+            transitive closure in Python instead of joining the table with
+            itself until no new rows are found. Better suited for large and
+            deeply nested group hierarchies.
+
+            Args:
+                session (object): Database session to use.
+
+            Returns:
+                int: Number of iterations, the closure is computed in a single
+                    pass.
+
+            Raises:
+                Exception: dernomalize fail
+            """
+
+            if get_sql_dialect(session) != 'sqlite':
+                locked_tables = [
+                    '`{}` WRITE'.format(GroupInGroup.__tablename__),
+                    '`{}` READ'.format(group_members.name)]
+                query = 'LOCK TABLES {}'.format(', '.join(locked_tables))
+                session.execute(query)
+            try:
+                # Write first, a SQLite transaction that read before its
+                # first write fails if another connection wrote meanwhile.
+                session.execute(GroupInGroup.__table__.delete())
+
+                edges = session.execute(
+                    select([group_members.c.group_name,
+                            group_members.c.members_name]).where(
+                                group_members.c.group_name.startswith('group/')
+                            ).where(
+                                group_members.c.members_name.startswith(
+                                    'group/'))).fetchall()
+
+                row_count = 0
+                rows = []
+                for parent, member in graph.transitive_closure(edges):
+                    rows.append({'parent': parent, 'member': member})
+                    if len(rows) >= DENORM_INSERT_BATCH_SIZE:
+                        session.execute(GroupInGroup.__table__.insert(), rows)
+                        row_count += len(rows)
+                        rows = []
+                if rows:
+                    session.execute(GroupInGroup.__table__.insert(), rows)
+                    row_count += len(rows)
+                LOGGER.debug('Denormalized %d group-in-group relations.',
+                             row_count)
+            except Exception as e:
+                LOGGER.exception(e)
+                session.rollback()
+                raise
+            finally:
+                if get_sql_dialect(session) != 'sqlite':
+                    session.execute('UNLOCK TABLES')
+                session.commit()
+            return 1
+
         @classmethod
         def expand_special_members(cls, session):
             """Create dynamic groups for project(Editor|Owner|Viewer).
@@ -675,6 +962,347 @@ def define_model(model_name, dbengine, model_seed):
                             member=member.name))
             session.commit()
 
+        @classmethod
+        def build_access_index(cls, session):
+            """Materialize the effective access index of the model.
+
+            Members, roles, permissions and resources are interned to
+            integers. Every binding grants its role on its resource to its
+            members, and indirectly to the transitive members of its groups,
+            one AccessEntry per (member, role, resource). Role permissions
+            are stored as bitsets and resources are numbered in pre-order, so
+            the access queries can resolve permissions and expand resources
+            without joining the model tables.
+
+            The bindings are expanded in resource pre-order and the entries
+            are written out by resource subtree, once there are
+            ACCESS_INDEX_FLUSH_SIZE of them, so the whole index is never held
+            in memory.
+
+            Should be called once the model is imported, the index is cleared
+            by the methods changing the model.
+
+            Args:
+                session (object): Database session to use.
+
+            Returns:
+                int: Number of entries in the index.
+            """
+            cls.clear_access_index(session)
+
+            resource_ids = cls._build_access_index_resources(session)
+
+            permission_ids = {}
+            role_permissions_bits = collections.defaultdict(int)
+            for role_name in session.query(Role.name):
+                role_permissions_bits[role_name[0]] = 0
+            for role_name, permission_name in session.execute(
+                    select([role_permissions.c.roles_name,
+                            role_permissions.c.permissions_name])):
+                permission_id = permission_ids.setdefault(
+                    permission_name, len(permission_ids))
+                role_permissions_bits[role_name] |= 1 << permission_id
+
+            binding_members_map = collections.defaultdict(list)
+            for binding_id, member_name in session.execute(
+                    select([binding_members.c.bindings_id,
+                            binding_members.c.members_name])):
+                binding_members_map[binding_id].append(member_name)
+
+            bound_members = set(itertools.chain.from_iterable(
+                binding_members_map.values()))
+            expansion = collections.defaultdict(set)
+            memberships = session.execute(
+                select([group_members.c.group_name,
+                        group_members.c.members_name])).fetchall()
+            for group_name, member_name in graph.transitive_closure(
+                    memberships):
+                if group_name in bound_members:
+                    expansion[group_name].add(member_name)
+
+            bindings = []
+            for binding_id, resource_type_name, role_name in session.query(
+                    Binding.id, Binding.resource_type_name, Binding.role_name):
+                resource_id = resource_ids.get(resource_type_name)
+                if resource_id is not None:
+                    bindings.append((resource_id, binding_id, role_name))
+            bindings.sort()
+
+            member_ids = {}
+            role_ids = {}
+            entries = {}
+            entry_count = 0
+            current_resource_id = None
+            for resource_id, binding_id, role_name in bindings:
+                # The entries of different resources never share a key, so
+                # they are written out between two resources.
+                if (resource_id != current_resource_id and
+                        len(entries) >= ACCESS_INDEX_FLUSH_SIZE):
+                    entry_count += cls._insert_access_entries(session,
+                                                              entries)
+                    entries = {}
+                current_resource_id = resource_id
+                if role_name not in role_ids:
+                    role_ids[role_name] = len(role_ids)
+                role_id = role_ids[role_name]
+                for member_name in binding_members_map[binding_id]:
+                    for name, direct in itertools.chain(
+                            [(member_name, True)],
+                            ((child, False)
+                             for child in expansion[member_name])):
+                        if name not in member_ids:
+                            member_ids[name] = len(member_ids)
+                        key = (member_ids[name], role_id, resource_id)
+                        entries[key] = entries.get(key, False) or direct
+            entry_count += cls._insert_access_entries(session, entries)
+
+            for role_name in role_permissions_bits:
+                if role_name not in role_ids:
+                    role_ids[role_name] = len(role_ids)
+
+            cls._insert_rows(session, AccessPermission.__table__, (
+                {'id': permission_id, 'name': name}
+                for name, permission_id in permission_ids.items()))
+            cls._insert_rows(session, AccessRole.__table__, (
+                {'id': role_id,
+                 'name': name,
+                 'permissions': _int_to_bitset(role_permissions_bits[name])}
+                for name, role_id in role_ids.items()))
+            cls._insert_rows(session, AccessMember.__table__, (
+                {'id': member_id, 'name': name}
+                for name, member_id in member_ids.items()))
+            session.commit()
+            LOGGER.info('Built the effective access index: %s members, %s '
+                        'roles, %s resources, %s entries.', len(member_ids),
+                        len(role_ids), len(resource_ids), entry_count)
+            return entry_count
+
+        @classmethod
+        def _insert_access_entries(cls, session, entries):
+            """Insert effective access entries in the index.
+
+            Args:
+                session (object): Database session to use.
+                entries (dict): Whether the access is direct, by (member id,
+                    role id, resource id).
+
+            Returns:
+                int: Number of entries inserted.
+            """
+            return cls._insert_rows(session, AccessEntry.__table__, (
+                {'member_id': member_id,
+                 'role_id': role_id,
+                 'resource_id': resource_id,
+                 'direct': direct}
+                for (member_id, role_id, resource_id), direct in
+                entries.items()))
+
+        @classmethod
+        def _build_access_index_resources(cls, session):
+            """Number the resources in pre-order and store them in the index.
+
+            Args:
+                session (object): Database session to use.
+
+            Returns:
+                dict: The resource ids by type_name.
+            """
+            names = {}
+            resources = []
+            for type_name, parent_type_name, name in session.query(
+                    Resource.type_name, Resource.parent_type_name,
+                    Resource.name):
+                names[type_name] = name
+                resources.append((type_name, parent_type_name))
+
+            resource_ids = {}
+            rows = []
+            for type_name, pre_order, post_order, _ in _number_resource_tree(
+                    resources):
+                resource_ids[type_name] = pre_order
+                rows.append({'id': pre_order,
+                             'type_name': type_name,
+                             'name': names[type_name],
+                             'pre': pre_order,
+                             'post': post_order})
+
+            cls._insert_rows(session, AccessResource.__table__, rows)
+            return resource_ids
+
+        @classmethod
+        def _insert_rows(cls, session, table, rows):
+            """Insert rows in batches.
+
+            Args:
+                session (object): Database session to use.
+                table (Table): The table to insert into.
+                rows (iterable): The rows as dicts.
+
+            Returns:
+                int: Number of rows inserted.
+            """
+            return cls._execute_batches(session, table.insert(), rows)
+
+        @classmethod
+        def _execute_batches(cls, session, statement, rows):
+            """Execute a statement for rows in batches.
+
+            Args:
+                session (object): Database session to use.
+                statement (object): The statement to execute.
+                rows (iterable): The parameters of the statement, as dicts.
+
+            Returns:
+                int: Number of rows.
+            """
+            row_count = 0
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= DENORM_INSERT_BATCH_SIZE:
+                    session.execute(statement, batch)
+                    row_count += len(batch)
+                    batch = []
+            if batch:
+                session.execute(statement, batch)
+                row_count += len(batch)
+            return row_count
+
+        @classmethod
+        def number_resources(cls, session):
+            """Number the resource hierarchy in pre-order.
+
+            Sets the pre_order, post_order and depth of every resource, so
+            the descendants of a resource are an integer range query. Called
+            by the importer when number_resources is set in the model
+            config, resources added later are not numbered and the queries
+            fall back to the full names.
+
+            Args:
+                session (object): Database session to use.
+
+            Returns:
+                int: Number of resources numbered.
+            """
+            table = Resource.__table__
+            session.info.pop(resources_numbered_key, None)
+            numbering = _number_resource_tree(
+                session.query(Resource.type_name, Resource.parent_type_name))
+            statement = (
+                table.update()
+                .where(table.c.type_name == bindparam('b_type_name'))
+                .values(pre_order=bindparam('b_pre_order'),
+                        post_order=bindparam('b_post_order'),
+                        depth=bindparam('b_depth'))
+            )
+            row_count = cls._execute_batches(session, statement, (
+                {'b_type_name': type_name,
+                 'b_pre_order': pre_order,
+                 'b_post_order': post_order,
+                 'b_depth': depth}
+                for type_name, pre_order, post_order, depth in numbering))
+            session.commit()
+            session.info[resources_numbered_key] = True
+            return row_count
+
+        @classmethod
+        def resources_numbered(cls, session):
+            """Whether all resources are numbered by number_resources.
+
+            The answer is cached for the life of the session, resources added
+            through the session reset it.
+
+            Args:
+                session (object): Database session to use.
+
+            Returns:
+                bool: True if the descendants of the resources can be found
+                    by their pre_order.
+            """
+            numbered = session.info.get(resources_numbered_key)
+            if numbered is None:
+                numbered = session.query(Resource.type_name).filter(
+                    Resource.pre_order.is_(None)).first() is None
+                session.info[resources_numbered_key] = numbered
+            return numbered
+
+        @classmethod
+        def _descendant_clause(cls, session, ancestor, descendant):
+            """Return the condition for a resource to be in another's subtree.
+
+            Args:
+                session (object): Database session to use.
+                ancestor (object): The ancestor Resource alias.
+                descendant (object): The descendant Resource alias.
+
+            Returns:
+                object: The condition, true for the ancestor itself.
+            """
+            if cls.resources_numbered(session):
+                return descendant.pre_order.between(ancestor.pre_order,
+                                                    ancestor.post_order)
+            return descendant.full_name.startswith(ancestor.full_name)
+
+        @classmethod
+        def clear_access_index(cls, session):
+            """Delete the effective access index.
+
+            The access queries use the model tables until the index is built
+            again.
+
+            Args:
+                session (object): Database session to use.
+            """
+            for table in cls.ACCESS_INDEX_TABLES:
+                session.execute(table.delete())
+
+        @classmethod
+        def has_access_index(cls, session):
+            """Whether the effective access index of the model is built.
+
+            Args:
+                session (object): Database session to use.
+
+            Returns:
+                bool: True if the access queries can use the index.
+            """
+            return session.query(AccessResource.id).first() is not None
+
+        @classmethod
+        def _access_index_roles(cls, session, permission_names):
+            """Return the roles covering the permissions from the index.
+
+            Same as get_roles_by_permission_names, with the permissions of
+            each role tested as a bitset.
+
+            Args:
+                session (object): db session
+                permission_names (list): permissions to be covered by.
+
+            Returns:
+                dict: The names of the roles covering the permissions, by
+                    role id.
+            """
+            permission_set = set(permission_names)
+            mask = 0
+            if permission_set:
+                permission_ids = [
+                    permission_id for permission_id, in
+                    session.query(AccessPermission.id).filter(
+                        AccessPermission.name.in_(permission_set))]
+                if len(permission_ids) < len(permission_set):
+                    return {}
+                for permission_id in permission_ids:
+                    mask |= 1 << permission_id
+
+            roles = {}
+            for role_id, role_name, permissions in session.query(
+                    AccessRole.id, AccessRole.name, AccessRole.permissions):
+                bits = _bitset_to_int(permissions)
+                if bits and bits & mask == mask:
+                    roles[role_id] = role_name
+            return roles
+
         @classmethod
         def explain_granted(cls, session, member_name, resource_type_name,
                             role, permission):
@@ -773,6 +1401,25 @@ def define_model(model_name, dbengine, model_seed):
             for row in results:
                 yield row
 
+        @classmethod
+        def scanner_type_size(cls, session, resource_type):
+            """Count the resources with the specified type and their data.
+
+            Args:
+                session (object): Database session.
+                resource_type (str): type of the resources to count
+
+            Returns:
+                tuple: The number of resources and the total length of their
+                    data.
+            """
+            count, data_length = (
+                session.query(func.count(),
+                              func.sum(func.length(Resource.data)))
+                .filter(Resource.type == resource_type)
+                .one())
+            return count, int(data_length or 0)
+
         @classmethod
         def scanner_fetch_groups_settings(cls, session, only_iam_groups):
             """Fetch Groups Settings.
@@ -938,6 +1585,11 @@ def define_model(model_name, dbengine, model_seed):
                 list: list of access tuples, ("role_name", "resource_type_name")
             """
 
+            if cls.has_access_index(session):
+                return cls._query_access_index_by_member(
+                    session, member_name, permission_names,
+                    expand_resources, reverse_expand_members)
+
             if reverse_expand_members:
                 member_names = [m.name for m in
                                 cls.reverse_expand_members(session,
@@ -974,6 +1626,61 @@ def define_model(model_name, dbengine, model_seed):
                      res_exp[binding.resource_type_name])
                     for binding in bindings]
 
+        @classmethod
+        def _query_access_index_by_member(cls, session, member_name,
+                                          permission_names, expand_resources,
+                                          reverse_expand_members):
+            """Return the resources the member has access to from the index.
+
+            Args:
+                session (object): Database session.
+                member_name (str): name of the member
+                permission_names (list): list of names of permissions to query
+                expand_resources (bool): whether to expand resources
+                reverse_expand_members (bool): whether to expand members
+
+            Returns:
+                list: list of access tuples, ("role_name", "resource_type_name")
+            """
+            roles = cls._access_index_roles(session, permission_names)
+
+            member_names = [member_name]
+            qry = (
+                session.query(AccessEntry.role_id, AccessResource)
+                .filter(AccessEntry.member_id == AccessMember.id)
+                .filter(AccessEntry.resource_id == AccessResource.id)
+            )
+            if reverse_expand_members:
+                # Entries of indirect members are the bindings of the groups
+                # the member is in.
+                member_names.extend(cls.ALL_USER_MEMBERS)
+            else:
+                qry = qry.filter(AccessEntry.direct.is_(True))
+            qry = qry.filter(AccessMember.name.in_(member_names))
+
+            accesses = []
+            seen = set()
+            for role_id, resource in qry.yield_per(PER_YIELD):
+                if role_id not in roles or (role_id, resource.id) in seen:
+                    continue
+                seen.add((role_id, resource.id))
+                accesses.append((roles[role_id], resource))
+
+            if not expand_resources:
+                return [(role_name, [resource.type_name])
+                        for role_name, resource in accesses]
+
+            expansion = {}
+            for _, resource in accesses:
+                if resource.id not in expansion:
+                    expansion[resource.id] = [
+                        type_name for type_name, in
+                        session.query(AccessResource.type_name).filter(
+                            AccessResource.pre.between(resource.pre,
+                                                       resource.post))]
+            return [(role_name, expansion[resource.id])
+                    for role_name, resource in accesses]
+
         @classmethod
         def query_access_by_permission(cls,
                                        session,
@@ -1003,17 +1710,25 @@ def define_model(model_name, dbengine, model_seed):
                 ValueError: If neither role nor permission is set.
             """
 
+            if not role_name and not permission_name:
+                error_message = 'Either role or permission must be set'
+                LOGGER.error(error_message)
+                raise ValueError(error_message)
+
+            if cls.has_access_index(session):
+                for access in cls._query_access_index_by_permission(
+                        session, role_name, permission_name, expand_groups,
+                        expand_resources):
+                    yield access
+                return
+
             if role_name:
                 role_names = [role_name]
-            elif permission_name:
+            else:
                 role_names = [p.name for p in
                               cls.get_roles_by_permission_names(
                                   session,
                                   [permission_name])]
-            else:
-                error_message = 'Either role or permission must be set'
-                LOGGER.error(error_message)
-                raise ValueError(error_message)
 
             if expand_resources:
                 expanded_resources = aliased(Resource)
@@ -1021,8 +1736,8 @@ def define_model(model_name, dbengine, model_seed):
                     session.query(expanded_resources, Binding, Member)
                     .filter(binding_members.c.bindings_id == Binding.id)
                     .filter(binding_members.c.members_name == Member.name)
-                    .filter(expanded_resources.full_name.startswith(
-                        Resource.full_name))
+                    .filter(cls._descendant_clause(
+                        session, Resource, expanded_resources))
                     .filter((Resource.type_name ==
                              Binding.resource_type_name))
                     .filter(Binding.role_name.in_(role_names))
@@ -1067,6 +1782,77 @@ def define_model(model_name, dbengine, model_seed):
             if cur_resource is not None:
                 yield cur_role, cur_resource, cur_members
 
+        @classmethod
+        def _query_access_index_by_permission(cls, session, role_name,
+                                              permission_name, expand_groups,
+                                              expand_resources):
+            """Query access via the specified permission from the index.
+
+            The members of the groups are the indirect members of the
+            entries, the descendants of a resource are found by their
+            pre-order numbers.
+
+            Args:
+                session (object): Database session.
+                role_name (str): Role name to query for
+                permission_name (str): Permission name to query for.
+                expand_groups (bool): Whether or not to expand groups.
+                expand_resources (bool): Whether or not to expand resources.
+
+            Yields:
+                obejct: A generator of access tuples.
+            """
+            if role_name:
+                role_ids = [role_id for role_id, in
+                            session.query(AccessRole.id).filter(
+                                AccessRole.name == role_name)]
+            else:
+                role_ids = list(cls._access_index_roles(
+                    session, [permission_name]))
+            if not role_ids:
+                return
+
+            binding_resource = aliased(AccessResource)
+            if expand_resources:
+                resource = aliased(AccessResource)
+                qry = (
+                    session.query(resource.type_name, AccessRole.name,
+                                  AccessMember.name, AccessEntry.direct)
+                    .filter(resource.pre.between(binding_resource.pre,
+                                                 binding_resource.post))
+                )
+            else:
+                resource = binding_resource
+                qry = session.query(resource.type_name, AccessRole.name,
+                                    AccessMember.name, AccessEntry.direct)
+            qry = (
+                qry.filter(AccessEntry.resource_id == binding_resource.id)
+                .filter(AccessEntry.role_id == AccessRole.id)
+                .filter(AccessEntry.member_id == AccessMember.id)
+                .filter(AccessEntry.role_id.in_(role_ids))
+                .order_by(resource.name.asc(), AccessRole.name.asc(),
+                          resource.type_name.asc())
+            )
+            if not expand_groups:
+                qry = qry.filter(AccessEntry.direct.is_(True))
+
+            cur_resource = None
+            cur_role = None
+            cur_members = set()
+            for resource_type_name, binding_role, member_name, direct in (
+                    qry.yield_per(PER_YIELD)):
+                if cur_resource != resource_type_name:
+                    if cur_resource is not None:
+                        yield cur_role, cur_resource, cur_members
+                    cur_resource = resource_type_name
+                    cur_role = binding_role
+                    cur_members = set()
+                # Groups are only listed if they are bound directly.
+                if direct or not member_name.startswith('group/'):
+                    cur_members.add(member_name)
+            if cur_resource is not None:
+                yield cur_role, cur_resource, cur_members
+
         @classmethod
         def query_access_by_resource(cls, session, resource_type_name,
                                      permission_names, expand_groups=False):
@@ -1089,6 +1875,11 @@ def define_model(model_name, dbengine, model_seed):
                 dict: role_member_mapping, <"role_name", "member_names">
             """
 
+            if cls.has_access_index(session):
+                return cls._query_access_index_by_resource(
+                    session, resource_type_name, permission_names,
+                    expand_groups)
+
             roles = cls.get_roles_by_permission_names(
                 session, permission_names)
             resources = cls.find_resource_path(session, resource_type_name)
@@ -1113,6 +1904,46 @@ def define_model(model_name, dbengine, model_seed):
 
             return role_member_mapping
 
+        @classmethod
+        def _query_access_index_by_resource(cls, session, resource_type_name,
+                                            permission_names, expand_groups):
+            """Query access by resource from the index.
+
+            Args:
+                session (object): db session
+                resource_type_name (str): type_name of the resource to query
+                permission_names (list): list of strs, names of the permissions
+                    to query
+                expand_groups (bool): whether to expand groups
+
+            Returns:
+                dict: role_member_mapping, <"role_name", "member_names">
+            """
+            role_member_mapping = collections.defaultdict(set)
+            path = [r.type_name for r in
+                    cls.find_resource_path(session, resource_type_name)]
+            if not path:
+                return role_member_mapping
+
+            roles = cls._access_index_roles(session, permission_names)
+            qry = (
+                session.query(AccessEntry.role_id, AccessMember.name)
+                .filter(AccessEntry.member_id == AccessMember.id)
+                .filter(AccessEntry.resource_id == AccessResource.id)
+                .filter(AccessResource.type_name.in_(path))
+            )
+            if not expand_groups:
+                qry = qry.filter(AccessEntry.direct.is_(True))
+
+            for role_id, member_name in qry.yield_per(PER_YIELD):
+                if role_id in roles:
+                    role_member_mapping[roles[role_id]].add(member_name)
+
+            if expand_groups:
+                for role in role_member_mapping:
+                    role_member_mapping[role] = list(role_member_mapping[role])
+            return role_member_mapping
+
         @classmethod
         def query_permissions_by_roles(cls, session, role_names, role_prefixes,
                                        _=1024):
@@ -1276,6 +2107,7 @@ def define_model(model_name, dbengine, model_seed):
             resource = session.query(Resource).filter(
                 Resource.type_name == resource_type_name).one()
             resource.increment_update_counter()
+            cls.clear_access_index(session)
             session.commit()
 
         @classmethod
@@ -1392,6 +2224,7 @@ def define_model(model_name, dbengine, model_seed):
                 session.add(perm)
             cls.add_role(session, role_name,
                          existing_permissions + new_permissions)
+            cls.clear_access_index(session)
             session.commit()
 
         @classmethod
@@ -1420,6 +2253,33 @@ def define_model(model_name, dbengine, model_seed):
                            denorm)
             session.commit()
 
+        @classmethod
+        def iter_group_members(cls,
+                               session,
+                               member_name_prefix,
+                               member_types=None,
+                               after=None):
+            """Returns iterator of members filtered by prefix.
+
+            Args:
+                session (object): db session
+                member_name_prefix (str): the prefix of the member_name
+                member_types (list): an optional list of member types to filter
+                    the results by.
+                after (str): only return the members whose name is greater,
+                    to resume a listing after its last member.
+
+            Yields:
+                str: the names of the Members that match the query, in order
+            """
+
+            qry = session.query(Member).filter(
+                Member.member_name.startswith(member_name_prefix))
+            if member_types:
+                qry = qry.filter(Member.type.in_(member_types))
+            for member in keyset_query(qry, Member.name, after):
+                yield member.name
+
         @classmethod
         def list_group_members(cls,
                                session,
@@ -1437,11 +2297,9 @@ def define_model(model_name, dbengine, model_seed):
                 list: list of Members that match the query
             """
 
-            qry = session.query(Member).filter(
-                Member.member_name.startswith(member_name_prefix))
-            if member_types:
-                qry = qry.filter(Member.type.in_(member_types))
-            return [m.name for m in qry.all()]
+            return list(cls.iter_group_members(session,
+                                               member_name_prefix,
+                                               member_types))
 
         @classmethod
         def iter_groups(cls, session):
@@ -1458,13 +2316,61 @@ def define_model(model_name, dbengine, model_seed):
             for group in qry.yield_per(1024):
                 yield group
 
+        @classmethod
+        def iter_member_details(cls, session):
+            """Returns iterator of the name, email and type of all members.
+
+            Args:
+                session (object): db session
+
+            Yields:
+                tuple: (name, member_name, type) of each member in the model
+            """
+
+            qry = session.query(Member.name, Member.member_name, Member.type)
+            for member in qry.yield_per(PER_YIELD):
+                yield member
+
+        @classmethod
+        def iter_direct_group_members(cls, session):
+            """Returns iterator of the direct group memberships.
+
+            Args:
+                session (object): db session
+
+            Yields:
+                tuple: (group name, member name) of each direct membership
+            """
+
+            qry = session.query(group_members.c.group_name,
+                                group_members.c.members_name)
+            for membership in qry.yield_per(PER_YIELD):
+                yield membership
+
+        @classmethod
+        def iter_group_in_group(cls, session):
+            """Returns iterator of the denormalized group-in-group relation.
+
+            Args:
+                session (object): db session
+
+            Yields:
+                tuple: (parent, member) for each group member of a group,
+                    directly or through other groups
+            """
+
+            qry = session.query(GroupInGroup.parent, GroupInGroup.member)
+            for membership in qry.yield_per(PER_YIELD):
+                yield membership
+
         @classmethod
         def iter_resources_by_prefix(cls,
                                      session,
                                      full_resource_name_prefix=None,
                                      type_name_prefix=None,
                                      type_prefix=None,
-                                     name_prefix=None):
+                                     name_prefix=None,
+                                     after=None):
             """Returns iterator to resources filtered by prefix.
 
             Args:
@@ -1474,9 +2380,11 @@ def define_model(model_name, dbengine, model_seed):
                 type_name_prefix (str): the prefix of the type_name
                 type_prefix (str): the prefix of the type
                 name_prefix (ste): the prefix of the name
+                after (str): only return the resources whose type_name is
+                    greater, to resume a listing after its last resource.
 
             Yields:
-                Resource: that match the query
+                Resource: that match the query, ordered by type_name
 
             Raises:
                 Exception: No prefix given
@@ -1504,7 +2412,7 @@ def define_model(model_name, dbengine, model_seed):
                 qry = qry.filter(Resource.name.startswith(
                     name_prefix))
 
-            for resource in qry.yield_per(1024):
+            for resource in keyset_query(qry, Resource.type_name, after):
                 yield resource
 
         @classmethod
@@ -1564,6 +2472,7 @@ def define_model(model_name, dbengine, model_seed):
                     Resource.type_name == parent_type_name).one()
             else:
                 parent = None
+            cls.clear_access_index(session)
             return cls.add_resource(session, resource_type_name, parent)
 
         @classmethod
@@ -1595,6 +2504,8 @@ def define_model(model_name, dbengine, model_seed):
                                 type=res_type,
                                 parent=parent)
             session.add(resource)
+            # Resources added later are not numbered.
+            session.info[resources_numbered_key] = False
             return resource
 
         @classmethod
@@ -1699,6 +2610,7 @@ def define_model(model_name, dbengine, model_seed):
                             type=res_type,
                             parents=parents)
             session.add(member)
+            cls.clear_access_index(session)
             session.commit()
             if denorm and res_type == 'group' and parents:
                 cls.denorm_group_in_group(session)
@@ -1728,8 +2640,8 @@ def define_model(model_name, dbengine, model_seed):
             res = (
                 session.query(res_key, res_values)
                 .filter(res_key.type_name.in_(res_type_names))
-                .filter(res_values.full_name.startswith(
-                    res_key.full_name))
+                .filter(cls._descendant_clause(
+                    session, res_key, res_values))
                 .yield_per(1024)
             )
 
@@ -1960,35 +2872,17 @@ def define_model(model_name, dbengine, model_seed):
                 dict: <parent, childs> graph of the resource hierarchy
             """
 
-            resource_names = resource_type_names
             resource_graph = collections.defaultdict(set)
-
-            res_childs = aliased(Resource, name='res_childs')
-            res_anc = aliased(Resource, name='resource_parent')
-
-            resources_set = set(resource_names)
-            resources_new = set(resource_names)
-
-            for resource in resources_new:
+            for resource in resource_type_names:
                 resource_graph[resource] = set()
 
-            while resources_new:
-                resources_new = set()
-                for parent, child in (
-                        session.query(res_anc, res_childs)
-                        .filter(res_childs.type_name.in_(resources_set))
-                        .filter(res_childs.parent_type_name ==
-                                res_anc.type_name)
-                        .all()):
-
-                    if parent.type_name not in resources_set:
-                        resources_new.add(parent.type_name)
-
-                    resources_set.add(parent.type_name)
-                    resources_set.add(child.type_name)
-
-                    resource_graph[parent.type_name].add(child.type_name)
-
+            resources = session.query(Resource).filter(
+                Resource.type_name.in_(resource_type_names)).all()
+            ancestors = cls._query_ancestors(session, resources)
+            for ancestor in ancestors.values():
+                if ancestor.parent_type_name in ancestors:
+                    resource_graph[ancestor.parent_type_name].add(
+                        ancestor.type_name)
             return resource_graph
 
         @classmethod
@@ -2012,34 +2906,77 @@ def define_model(model_name, dbengine, model_seed):
             )
 
             resources = qry.all()
-            return cls._find_resource_path(session, resources)
-
-        @classmethod
-        def _find_resource_path(cls, _, resources):
-            """Find the list of transitive ancestors for the given resource.
-
-            Args:
-                _ (object): position holder
-                resources (list): list of the resources to query
-
-            Returns:
-                list: list of Resources, transitive ancestors for the given
-                    resource
-            """
-
             if not resources:
                 return []
 
+            if cls.resources_numbered(session):
+                resource = resources[0]
+                path = (
+                    session.query(Resource)
+                    .filter(Resource.pre_order <= resource.pre_order,
+                            Resource.post_order >= resource.post_order)
+                    .order_by(Resource.pre_order)
+                    .all())
+                return path[::-1]
+
+            ancestors = cls._query_ancestors(session, resources)
             path = []
             resource = resources[0]
-
-            path.append(resource)
-            while resource.parent:
-                resource = resource.parent
+            while resource is not None:
                 path.append(resource)
-
+                resource = ancestors.get(resource.parent_type_name)
             return path
 
+        @classmethod
+        def _query_ancestors(cls, session, resources):
+            """Query the resources and all their ancestors.
+
+            When the resources are numbered, the ancestors are the resources
+            whose pre-order range contains the range of a resource. Otherwise
+            the ancestors are named by the full name of a resource and are
+            fetched with one query by type_name. The parents still missing,
+            like the composite root or names with embedded slashes shortened
+            in the full name, are then fetched one hierarchy level at a time.
+
+            Args:
+                session (object): db session
+                resources (list): list of Resources
+
+            Returns:
+                dict: The resources and their ancestors by type_name.
+            """
+            found = {resource.type_name: resource for resource in resources}
+            if cls.resources_numbered(session):
+                for ancestor in (
+                        session.query(Resource)
+                        .filter(or_(*[
+                            and_(Resource.pre_order <= resource.pre_order,
+                                 Resource.post_order >= resource.post_order)
+                            for resource in resources]))
+                        .order_by(Resource.pre_order)):
+                    found[ancestor.type_name] = ancestor
+                return found
+
+            queried = set(found)
+            missing = set()
+            for resource in resources:
+                missing.update(
+                    to_type_name(resource_type, resource_id)
+                    for resource_type, resource_id in
+                    get_resources_from_full_name(resource.full_name))
+
+            while True:
+                missing -= queried
+                if not missing:
+                    return found
+                queried.update(missing)
+                for ancestor in session.query(Resource).filter(
+                        Resource.type_name.in_(missing)):
+                    found[ancestor.type_name] = ancestor
+                missing = set(
+                    resource.parent_type_name for resource in found.values()
+                    if resource.parent_type_name)
+
         @classmethod
         def get_roles_by_permission_names(cls, session, permission_names):
             """Return the list of roles covering the specified permissions.
@@ -2121,6 +3058,7 @@ class ModelManager(object):
         self.engine = dbengine
         self.modelmaker = self._create_model_session()
         self.sessionmakers = {}
+        self._migrate_models()
 
     def _create_model_session(self):
         """Create a session to read from the models table.
@@ -2135,6 +3073,22 @@ class ModelManager(object):
                 bind=self.engine),
             auto_commit=True)
 
+    def _migrate_models(self):
+        """Add the columns missing from the models of a previous version.
+
+        Run once when the model manager starts, the models created later
+        have all the columns.
+        """
+        table_names = set(sqlalchemy_inspect(self.engine).get_table_names())
+        for model in self.models():
+            if '{}_resources'.format(model.handle) not in table_names:
+                continue
+            session_maker, data_access = define_model(
+                model.handle, self.engine, model.etag_seed)
+            _create_missing_columns(self.engine,
+                                    data_access.TBL_RESOURCE.__table__)
+            self.sessionmakers[model.handle] = session_maker, data_access
+
     @mutual_exclusive(LOCK)
     def create(self, name):
         """Create a new model entry in the database.
@@ -2426,6 +3380,8 @@ def create_engine(*args, **kwargs):
             # 512 MB of RAM max for mmap operations, ensure shared memory for
             # indexes across connections. (Size set in bytes)
             dbapi_connection.execute('pragma mmap_size=536870912;')
+            dbapi_connection.execute(
+                'pragma busy_timeout={};'.format(SQLITE_BUSY_TIMEOUT_MS))
             if kwargs.get(sqlite_enforce_fks, False):
                 # Enable foreign key constraints
                 dbapi_connection.execute('pragma foreign_keys=ON')
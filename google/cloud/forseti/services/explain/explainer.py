@@ -31,43 +31,55 @@ class Explainer(object):
         """
         self.config = config
 
-    def list_resources(self, model_name, full_resource_name_prefix):
+    def list_resources(self, model_name, full_resource_name_prefix,
+                       page_token=None):
         """Lists resources by resource name prefix.
 
         Args:
             model_name (str): Model to operate on.
             full_resource_name_prefix (ste): the prefix of the resource name
+            page_token (str): the type_name of the last resource of a previous
+                listing, to resume the listing after it.
 
-        Returns:
-            list: list of Resources match the query
+        Yields:
+            Resource: the Resources that match the query, ordered by
+                type_name
         """
 
         LOGGER.debug('Listing resources, model_name = %s,'
-                     ' full_resource_name_prefix = %s',
-                     model_name, full_resource_name_prefix)
+                     ' full_resource_name_prefix = %s, page_token = %s',
+                     model_name, full_resource_name_prefix, page_token)
         model_manager = self.config.model_manager
         scoped_session, data_access = model_manager.get(model_name)
         with scoped_session as session:
-            return data_access.list_resources_by_prefix(
-                session, full_resource_name_prefix)
+            for resource in data_access.iter_resources_by_prefix(
+                    session, full_resource_name_prefix,
+                    after=page_token or None):
+                yield resource
 
-    def list_group_members(self, model_name, member_name_prefix):
+    def list_group_members(self, model_name, member_name_prefix,
+                           page_token=None):
         """Lists a member from the model.
 
         Args:
             model_name (str): Model to operate on.
             member_name_prefix (str): the prefix of the member_name
+            page_token (str): the name of the last member of a previous
+                listing, to resume the listing after it.
 
-        Returns:
-            list: list of Members that match the query
-            """
+        Yields:
+            str: the names of the Members that match the query, in order
+        """
 
         LOGGER.debug('Listing Group members, model_name = %s,'
-                     ' member_name_prefix = %s', model_name, member_name_prefix)
+                     ' member_name_prefix = %s, page_token = %s',
+                     model_name, member_name_prefix, page_token)
         model_manager = self.config.model_manager
         scoped_session, data_access = model_manager.get(model_name)
         with scoped_session as session:
-            return data_access.list_group_members(session, member_name_prefix)
+            for member_name in data_access.iter_group_members(
+                    session, member_name_prefix, after=page_token or None):
+                yield member_name
 
     def list_roles(self, model_name, role_name_prefix):
         """Lists the role in the model matching the prefix.
@@ -16,6 +16,7 @@
 
 from builtins import object
 from collections import defaultdict
+import itertools
 
 from grpc import StatusCode
 
@@ -87,6 +88,21 @@ class GrpcExplainer(explain_pb2_grpc.ExplainServicer):
         context.set_details(FAILED_PRECONDITION_MESSAGE)
         return reply
 
+    @staticmethod
+    def _page(results, page_size):
+        """Limit a listing to a page of results.
+
+        Args:
+            results (iterator): The results of the listing.
+            page_size (int): The maximum number of results, 0 for all.
+
+        Returns:
+            iterator: The results of the page.
+        """
+        if page_size > 0:
+            return itertools.islice(results, page_size)
+        return results
+
     def __init__(self, explainer_api):
         """Initialize
 
@@ -128,8 +144,9 @@ class GrpcExplainer(explain_pb2_grpc.ExplainServicer):
 
         handle = self._get_handle(context)
         resources = self.explainer.list_resources(handle,
-                                                  request.prefix)
-        for resource in resources:
+                                                  request.prefix,
+                                                  request.page_token)
+        for resource in self._page(resources, request.page_size):
             yield explain_pb2.Resource(
                 full_resource_name=resource.type_name)
 
@@ -151,9 +168,10 @@ class GrpcExplainer(explain_pb2_grpc.ExplainServicer):
 
         handle = self._get_handle(context)
         member_names = self.explainer.list_group_members(handle,
-                                                         request.prefix)
+                                                         request.prefix,
+                                                         request.page_token)
 
-        for member in member_names:
+        for member in self._page(member_names, request.page_size):
             yield explain_pb2.GroupMember(member_name=member)
 
     @autoclose_stream
@@ -23,6 +23,8 @@ from google.cloud.forseti.services.inventory.base import gcp
 from google.cloud.forseti.services.inventory.base import iam_helpers
 from google.cloud.forseti.services.inventory.cai_temporary_storage import (
     CaiDataAccess)
+from google.cloud.forseti.services.inventory.cai_temporary_storage import (
+    CaiIndexedStore)
 from google.cloud.forseti.services.inventory.cai_temporary_storage import (
     ContentTypes)
 
@@ -79,8 +81,9 @@ class CaiApiClientImpl(gcp.ApiClientImpl):
 
         Args:
             config (dict): GCP API client configuration.
-            engine (object): Database engine to operate on.
-            tmpfile (str): The temporary file storing the cai sqlite database.
+            engine (object): Database engine or CaiIndexedStore to operate on.
+            tmpfile (str): The temporary file storing the cai sqlite database
+                or the indexed asset data.
         """
         super(CaiApiClientImpl, self).__init__(config)
         self.dao = CaiDataAccess()
@@ -89,6 +92,8 @@ class CaiApiClientImpl(gcp.ApiClientImpl):
 
     def __del__(self):
         """Destructor."""
+        if isinstance(self.engine, CaiIndexedStore):
+            self.engine.close()
         if os.path.exists(self.tmpfile):
             os.unlink(self.tmpfile)
 
@@ -125,6 +130,19 @@ class CaiApiClientImpl(gcp.ApiClientImpl):
 
         return {}, None
 
+    def fetch_bigquery_dataset_policies(self, project_id, dataset_ids):
+        """Dataset policies are read one at a time from Cloud Asset data.
+
+        Args:
+            project_id (str): id of the project to query.
+            dataset_ids (list): ids of the datasets to query.
+
+        Returns:
+            dict: An empty dict, no policy is fetched in batch.
+        """
+        del project_id, dataset_ids  # Unused.
+        return {}
+
     def fetch_bigquery_dataset_policy(self, project_id, project_number,
                                       dataset_id):
         """Dataset policy Iterator for a dataset from Cloud Asset data.
@@ -1430,6 +1448,19 @@ class CaiApiClientImpl(gcp.ApiClientImpl):
         for version in resources:
             yield version
 
+    def fetch_iam_serviceaccount_iam_policies(self, names):
+        """Service Account IAM policies are read one at a time from Cloud Asset
+        data.
+
+        Args:
+            names (list): The service account names to query.
+
+        Returns:
+            dict: An empty dict, no policy is fetched in batch.
+        """
+        del names  # Unused.
+        return {}
+
     def fetch_iam_serviceaccount_iam_policy(self, name, unique_id):
         """Service Account IAM policy from Cloud Asset data.
 
@@ -1772,6 +1803,18 @@ class CaiApiClientImpl(gcp.ApiClientImpl):
         # Return empty list if IAM policy isn't present.
         return [], None
 
+    def fetch_storage_bucket_iam_policies(self, bucket_ids):
+        """Bucket IAM policies are read one at a time from Cloud Asset data.
+
+        Args:
+            bucket_ids (list): ids of the buckets to query.
+
+        Returns:
+            dict: An empty dict, no policy is fetched in batch.
+        """
+        del bucket_ids  # Unused.
+        return {}
+
     def fetch_storage_bucket_iam_policy(self, bucket_id):
         """Bucket IAM policy Iterator from Cloud Asset data.
 
@@ -185,7 +185,7 @@ def load_cloudasset_data(engine, config, inventory_index_id):
     LOGGER.info('%i assets imported to database.', imported_assets)
 
     # Optimize the new database before returning
-    engine.execute('pragma optimize;')
+    cai_temporary_storage.CaiDataAccess.optimize_cai_data(engine)
     return imported_assets
 
 
@@ -47,11 +47,24 @@ class Crawler(object):
         """
         raise NotImplementedError('The visit function of the crawler')
 
-    def dispatch(self, callback):
+    def copy_unchanged_subtree(self, resource):
+        """Copy the subtree of an unchanged resource from a prior inventory.
+
+        Args:
+            resource (object): Resource whose subtree to copy.
+
+        Returns:
+            bool: False, subtrees are always crawled.
+        """
+        del resource  # Unused.
+        return False
+
+    def dispatch(self, callback, api_name=None):
         """Dispatch crawling of a subtree.
 
         Args:
             callback (function): Callback to dispatch.
+            api_name (str): The API called first by the callback, if known.
 
         Raises:
             NotImplementedError: Because not implemented.
@@ -111,6 +111,16 @@ class ApiClient(with_metaclass(abc.ABCMeta, object)):
             dataset_id (str): id of the dataset to query.
         """
 
+    @abc.abstractmethod
+    def fetch_bigquery_dataset_policies(self, project_id, dataset_ids):
+        """Dataset policies of the datasets of a project from batched gcp API
+        calls.
+
+        Args:
+            project_id (str): id of the project to query.
+            dataset_ids (list): ids of the datasets to query.
+        """
+
     @abc.abstractmethod
     def fetch_bigquery_iam_policy(self, project_id, project_number, dataset_id):
         """Gets IAM policy of a bigquery dataset from gcp API call.
@@ -726,6 +736,15 @@ class ApiClient(with_metaclass(abc.ABCMeta, object)):
             unique_id (str): The unique id of the service account.
         """
 
+    @abc.abstractmethod
+    def fetch_iam_serviceaccount_iam_policies(self, names):
+        """Service Account IAM policies from batched gcp API calls.
+
+        Args:
+            names (list): The service account names to query, in the format
+                projects/{PROJECT_ID}/serviceAccounts/{SERVICE_ACCOUNT_EMAIL}
+        """
+
     @abc.abstractmethod
     def iter_iam_curated_roles(self):
         """Iterate Curated roles in an organization from GCP API.
@@ -1029,6 +1048,14 @@ class ApiClient(with_metaclass(abc.ABCMeta, object)):
             bucket_id (str): id of the bucket to query.
         """
 
+    @abc.abstractmethod
+    def fetch_storage_bucket_iam_policies(self, bucket_ids):
+        """Bucket IAM policies from batched gcp API calls.
+
+        Args:
+            bucket_ids (list): ids of the buckets to query.
+        """
+
     @abc.abstractmethod
     def fetch_storage_object_iam_policy(self, bucket_name, object_name):
         """Object IAM policy Iterator for an object from gcp API call.
@@ -1361,6 +1388,21 @@ class ApiClientImpl(ApiClient):
         return self.bigquery.get_dataset_access(
             project_number, dataset_id), None
 
+    @create_lazy('bigquery', _create_bq)
+    def fetch_bigquery_dataset_policies(self, project_id, dataset_ids):
+        """Dataset policies of the datasets of a project from batched gcp API
+        calls.
+
+        Args:
+            project_id (str): id of the project to query.
+            dataset_ids (list): ids of the datasets to query.
+
+        Returns:
+            dict: The Dataset Policies by dataset id, without the datasets
+                whose policy could not be fetched.
+        """
+        return self.bigquery.get_datasets_access(project_id, dataset_ids)
+
     def fetch_bigquery_iam_policy(self, project_id, project_number, dataset_id):
         """Gets IAM policy of a bigquery dataset from gcp API call.
 
@@ -2417,6 +2459,20 @@ class ApiClientImpl(ApiClient):
         del unique_id  # Used by CAI, not the API.
         return self.iam.get_service_account_iam_policy(name), None
 
+    @create_lazy('iam', _create_iam)
+    def fetch_iam_serviceaccount_iam_policies(self, names):
+        """Service Account IAM policies from batched gcp API calls.
+
+        Args:
+            names (list): The service account names to query, in the format
+                projects/{PROJECT_ID}/serviceAccounts/{SERVICE_ACCOUNT_EMAIL}
+
+        Returns:
+            dict: The Service Account IAM policies by name, without the
+                service accounts whose policy could not be fetched.
+        """
+        return self.iam.get_service_account_iam_policies(names)
+
     @create_lazy('iam', _create_iam)
     def iter_iam_curated_roles(self):
         """Iterate Curated roles in an organization from GCP API.
@@ -2868,6 +2924,19 @@ class ApiClientImpl(ApiClient):
         """
         return self.storage.get_bucket_iam_policy(bucket_id), None
 
+    @create_lazy('storage', _create_storage)
+    def fetch_storage_bucket_iam_policies(self, bucket_ids):
+        """Bucket IAM policies from batched gcp API calls.
+
+        Args:
+            bucket_ids (list): ids of the buckets to query.
+
+        Returns:
+            dict: The Bucket IAM policies by bucket id, without the buckets
+                whose policy could not be fetched.
+        """
+        return self.storage.get_bucket_iam_policies(bucket_ids)
+
     @create_lazy('storage', _create_storage)
     def fetch_storage_object_iam_policy(self, bucket_name, object_name):
         """Object IAM policy Iterator for an object from gcp API call.
@@ -34,6 +34,10 @@ from google.cloud.forseti.services.inventory.base import iam_helpers
 
 LOGGER = logger.get_logger(__name__)
 
+# Number of new resources whose data is fetched together in batch requests,
+# the maximum number of calls in a batch request of the GCP APIs.
+PREFETCH_BATCH_SIZE = 100
+
 
 def size_t_hash(key):
     """Hash the key using size_t.
@@ -85,7 +89,6 @@ def cached(field_name):
     Returns:
         wrapper: Function wrapper to perform caching.
     """
-    field_name = '__cached_{}'.format(field_name)
 
     def _cached(f):
         """Cache wrapper.
@@ -105,12 +108,16 @@ def cached(field_name):
                 **kwargs: kwargs to be passed to the function.
 
             Returns:
-                object: Results of executing f.
+                object: Results of executing f, None once the payload of the
+                    resource has been released.
             """
-            if hasattr(args[0], field_name):
-                return getattr(args[0], field_name)
+            cache = args[0]._cache  # pylint: disable=protected-access
+            if cache is None:
+                return None
+            if field_name in cache:
+                return cache[field_name]
             result = f(*args, **kwargs)
-            setattr(args[0], field_name, result)
+            cache[field_name] = result
             return result
 
         return wrapper
@@ -149,6 +156,14 @@ class ResourceFactory(object):
 class Resource(object):
     """The base Resource class."""
 
+    __slots__ = ('_data', '_metadata', '_root', '_parent', '_visitor',
+                 '_contains', '_warning', '_timestamp', '_inventory_key',
+                 '_full_resource_name', '_cache')
+
+    # Number of new resources of this type prefetched together, 0 if the
+    # type has nothing to prefetch.
+    prefetch_batch_size = 0
+
     def __init__(self, data, root=False,
                  contains=None, metadata=None, **kwargs):
         """Initialize.
@@ -164,13 +179,14 @@ class Resource(object):
         self._data = data
         self._metadata = metadata
         self._root = root
-        self._stack = None
+        self._parent = None
         self._visitor = None
         self._contains = [] if contains is None else contains
         self._warning = []
         self._timestamp = self._utcnow()
         self._inventory_key = None
         self._full_resource_name = None
+        self._cache = {}
 
     @staticmethod
     def _utcnow():
@@ -284,10 +300,7 @@ class Resource(object):
         """
         if self._root:
             return self
-        try:
-            return self._stack[-1]
-        except IndexError:
-            return None
+        return self._parent
 
     def key(self):
         """Get key of this resource.
@@ -314,33 +327,32 @@ class Resource(object):
         return '\n'.join(self._warning)
 
     # pylint: disable=broad-except
-    def try_accept(self, visitor, stack=None):
+    def try_accept(self, visitor, parent=None):
         """Handle exceptions on the call the accept.
 
         Args:
             visitor (object): The class implementing the visitor pattern.
-            stack (list): The resource stack from the root to immediate parent
-                of this resource.
+            parent (Resource): The immediate parent of this resource.
         """
         try:
-            self.accept(visitor, stack)
+            self.accept(visitor, parent)
         except Exception as e:
             err_msg = 'Exception raised processing %s: %s' % (self, e)
             LOGGER.exception(err_msg)
             visitor.on_child_error(self.get_full_resource_name(), e)
 
-    def accept(self, visitor, stack=None):
+    def accept(self, visitor, parent=None):
         """Accept of resource in visitor pattern.
 
         Args:
             visitor (Crawler): visitor instance.
-            stack (list): resource hierarchy stack.
+            parent (Resource): The immediate parent of this resource, the
+                ancestors are reached through the parent chain.
         """
         skip_errors = ['Not found',
                        'Unknown project id',
                        'scheduled for deletion']
-        stack = [] if not stack else stack
-        self._stack = stack
+        self._parent = parent
 
         # Skip the current resource if it's in the excluded_resources list.
         excluded_resources = visitor.config.variables.get(
@@ -358,20 +370,23 @@ class Resource(object):
         self._visitor = visitor
         visitor.visit(self)
 
+        if visitor.copy_unchanged_subtree(self):
+            if visitor.config.variables.get('release_payloads'):
+                self.release_payload()
+            return
+
         for yielder_cls in self._contains:
             yielder = yielder_cls(self, visitor.get_client())
             try:
                 for resource in yielder.iter():
-                    new_stack = stack + [self]
-
                     # Parallelization for resource subtrees.
                     if resource.should_dispatch():
                         callback = partial(resource.try_accept,
                                            visitor,
-                                           new_stack)
-                        visitor.dispatch(callback)
+                                           self)
+                        visitor.dispatch(callback, resource.dispatch_api())
                     else:
-                        resource.try_accept(visitor, new_stack)
+                        resource.try_accept(visitor, self)
             except Exception as e:
                 # Use string phrases and not error codes since error codes
                 # can mean multiple things.
@@ -386,8 +401,36 @@ class Resource(object):
         if self._warning:
             visitor.on_child_error(self.get_full_resource_name(),
                                    self.get_warning())
+
+        if visitor.config.variables.get('release_payloads'):
+            self.release_payload()
     # pylint: enable=broad-except
 
+    def release_payload(self):
+        """Release the data and policies of a resource written to storage.
+
+        Called once the children of the resource have been crawled. Dispatched
+        descendants may still reference the resource, the top level scalar
+        fields are kept for them, as they identify the resource, while nested
+        fields and the cached policies are dropped.
+        """
+        if self._inventory_key is None:
+            return
+        self.get_full_resource_name()
+        self._data = {field: value for field, value in self._data.items()
+                      if isinstance(value, (str, int, float, bool))}
+        self._cache = None
+
+    def _set_cache(self, field_name, value):
+        """Manually set a cache value if it isn't already set.
+
+        Args:
+            field_name (str): The name of the attribute to cache.
+            value (str): The value to cache.
+        """
+        if self._cache is not None and self._cache.get(field_name) is None:
+            self._cache[field_name] = value
+
     @cached('iam_policy')
     def get_iam_policy(self, client=None):
         """Get iam policy template.
@@ -496,18 +539,31 @@ class Resource(object):
         """
         return self._timestamp.strftime(string_formats.TIMESTAMP_UTC_OFFSET)
 
+    def get_fingerprint(self):
+        """Get a fingerprint of the state of this resource.
+
+        Resources with a fingerprint can have their subtree copied from the
+        previous inventory when the fingerprint did not change.
+
+        Returns:
+            str: The fingerprint, or None if the resource has none.
+        """
+        return None
+
     def stack(self):
         """Get resource hierarchy stack of this resource.
 
         Returns:
-            list: resource hierarchy stack of this resource.
-
-        Raises:
-            Exception: 'Stack not initialized yet'.
+            list: The ancestors of this resource, from the root to the
+                immediate parent.
         """
-        if self._stack is None:
-            raise Exception('Stack not initialized yet')
-        return self._stack
+        stack = []
+        parent = self._parent
+        while parent is not None:
+            stack.append(parent)
+            parent = parent._parent  # pylint: disable=protected-access
+        stack.reverse()
+        return stack
 
     def visitor(self):
         """Get visitor on this resource.
@@ -530,6 +586,29 @@ class Resource(object):
         """
         return False
 
+    @classmethod
+    def prefetch(cls, client, resources):
+        """Fetch the data of new resources of this type in bulk.
+
+        Called by the resource iterators with up to prefetch_batch_size
+        resources before they are crawled. The fetched data is cached in the
+        resources, the data that could not be fetched is fetched again one
+        resource at a time when the resources are crawled.
+
+        Args:
+            client (object): GCP API client.
+            resources (list): The new resources.
+        """
+        del client, resources  # Unused.
+
+    def dispatch_api(self):
+        """The API called first when crawling a dispatched resource.
+
+        Returns:
+            str: The name of the API, or None if unknown.
+        """
+        return None
+
     def __repr__(self):
         """String Representation.
 
@@ -562,6 +641,8 @@ def resource_class_factory(resource_type, key_field, hash_key=False):
     class ResourceSubclass(Resource):
         """Subclass of Resource."""
 
+        __slots__ = ()
+
         @staticmethod
         def type():
             """Get type of this resource.
@@ -601,6 +682,8 @@ def k8_resource_class_factory(resource_type):
     class ResourceSubclass(Resource):
         """Subclass of Resource."""
 
+        __slots__ = ()
+
         @staticmethod
         def type():
             """Get type of this resource.
@@ -627,6 +710,8 @@ def k8_resource_class_factory(resource_type):
 class CompositeRootResource(resource_class_factory('composite_root', None)):
     """The Composite Root fake resource."""
 
+    __slots__ = ()
+
     @classmethod
     def create(cls, composite_root_resources):
         """Creates a new composite root.
@@ -657,6 +742,8 @@ class CompositeRootResource(resource_class_factory('composite_root', None)):
 class ResourceManagerOrganization(resource_class_factory('organization', None)):
     """The Resource implementation for Organization."""
 
+    __slots__ = ()
+
     @classmethod
     def fetch(cls, client, resource_key, root=True):
         """Get Organization.
@@ -770,6 +857,8 @@ class ResourceManagerAccessPolicy(resource_class_factory('crm_access_policy',
                                                          None)):
     """The Resource implementation for Resource Manager Access Policy."""
 
+    __slots__ = ()
+
     def key(self):
         """Gets key of thisf resource.
 
@@ -783,15 +872,21 @@ class ResourceManagerAccessLevel(resource_class_factory('crm_access_level',
                                                         'name')):
     """The Resource implementation for Access Level."""
 
+    __slots__ = ()
+
 
 class ResourceManagerServicePerimeter(resource_class_factory(
         'crm_service_perimeter', 'name')):
     """The Resource implementation for Service Perimeter."""
 
+    __slots__ = ()
+
 
 class ResourceManagerOrgPolicy(resource_class_factory('crm_org_policy', None)):
     """The Resource implementation for Resource Manager Organization Policy."""
 
+    __slots__ = ()
+
     def key(self):
         """Get key of this resource.
 
@@ -813,6 +908,8 @@ class ResourceManagerOrgPolicy(resource_class_factory('crm_org_policy', None)):
 class ResourceManagerFolder(resource_class_factory('folder', None)):
     """The Resource implementation for Folder."""
 
+    __slots__ = ()
+
     @classmethod
     def fetch(cls, client, resource_key, root=True):
         """Get Folder.
@@ -854,6 +951,14 @@ class ResourceManagerFolder(resource_class_factory('folder', None)):
         """
         return True
 
+    def dispatch_api(self):
+        """Folders fetch their IAM policy first.
+
+        Returns:
+            str: The name of the API.
+        """
+        return 'cloudresourcemanager'
+
     @cached('iam_policy')
     def get_iam_policy(self, client=None):
         """Get iam policy for this folder.
@@ -900,6 +1005,8 @@ class ResourceManagerFolder(resource_class_factory('folder', None)):
 class ResourceManagerProject(resource_class_factory('project', 'projectId')):
     """The Resource implementation for Project."""
 
+    __slots__ = ('_enabled_service_names',)
+
     def __init__(self, data, root=False, contains=None, **kwargs):
         """Initialize.
 
@@ -1034,6 +1141,27 @@ class ResourceManagerProject(resource_class_factory('project', 'projectId')):
 
         return enabled_apis
 
+    def get_fingerprint(self):
+        """Get a fingerprint of the project and its policies.
+
+        Must only be called after the policies have been fetched.
+
+        Returns:
+            str: The fingerprint, or None if the project had warnings.
+        """
+        if self._warning:
+            return None
+        state = {
+            'billing_info': self.get_billing_info(),
+            'data': self.data(),
+            'enabled_apis': self.get_enabled_apis(),
+            'iam_policy': self.get_iam_policy(),
+            'org_policy': [policy for policy, _ in
+                           self.get_org_policy() or []],
+        }
+        return hashlib.sha256(
+            json.dumps(state, sort_keys=True).encode()).hexdigest()
+
     def should_dispatch(self):
         """Project resources should run in parallel threads.
 
@@ -1042,6 +1170,14 @@ class ResourceManagerProject(resource_class_factory('project', 'projectId')):
         """
         return True
 
+    def dispatch_api(self):
+        """Projects fetch their IAM policy first.
+
+        Returns:
+            str: The name of the API.
+        """
+        return 'cloudresourcemanager'
+
     def enumerable(self):
         """Check if this project is enumerable.
 
@@ -1119,6 +1255,8 @@ class ResourceManagerProject(resource_class_factory('project', 'projectId')):
 class ResourceManagerLien(resource_class_factory('lien', None)):
     """The Resource implementation for Resource Manager Lien."""
 
+    __slots__ = ()
+
     def key(self):
         """Get key of this resource.
 
@@ -1133,36 +1271,68 @@ class AppEngineApp(resource_class_factory('appengine_app', 'name',
                                           hash_key=True)):
     """The Resource implementation for AppEngine App."""
 
+    __slots__ = ()
+
 
 class AppEngineService(resource_class_factory('appengine_service', 'name',
                                               hash_key=True)):
     """The Resource implementation for AppEngine Service."""
 
+    __slots__ = ()
+
 
 class AppEngineVersion(resource_class_factory('appengine_version', 'name',
                                               hash_key=True)):
     """The Resource implementation for AppEngine Version."""
 
+    __slots__ = ()
+
 
 class AppEngineInstance(resource_class_factory('appengine_instance', 'name',
                                                hash_key=True)):
     """The Resource implementation for AppEngine Instance."""
 
+    __slots__ = ()
+
 
 # Bigquery resource classes
 class BigqueryDataSet(resource_class_factory('dataset', 'id')):
     """The Resource implementation for Bigquery DataSet."""
 
-    def _set_cache(self, field_name, value):
-        """Manually set a cache value if it isn't already set.
+    __slots__ = ()
+
+    prefetch_batch_size = PREFETCH_BATCH_SIZE
+
+    @classmethod
+    def prefetch(cls, client, resources):
+        """Fetch the dataset policies of datasets in batch requests.
+
+        The datasets of an iterator all belong to the same project.
 
         Args:
-            field_name (str): The name of the attribute to cache.
-            value (str): The value to cache.
+            client (object): GCP API client.
+            resources (list): The new datasets.
         """
-        field_name = '__cached_{}'.format(field_name)
-        if not hasattr(self, field_name) or getattr(self, field_name) is None:
-            setattr(self, field_name, value)
+        project_id = resources[0]['datasetReference']['projectId']
+        try:
+            policies = client.fetch_bigquery_dataset_policies(
+                project_id,
+                [resource['datasetReference']['datasetId']
+                 for resource in resources])
+        except (api_errors.ApiExecutionError, ResourceNotSupported) as e:
+            LOGGER.warning('Could not prefetch Dataset Policies: %s', e)
+            return
+        for resource in resources:
+            dataset_policy = policies.get(
+                resource['datasetReference']['datasetId'])
+            if dataset_policy is None:
+                continue
+            # pylint: disable=protected-access
+            resource._set_cache('dataset_policy', dataset_policy)
+            resource._set_cache(
+                'iam_policy', iam_helpers.convert_bigquery_policy_to_iam(
+                    dataset_policy, project_id))
+            # pylint: enable=protected-access
 
     @cached('iam_policy')
     def get_iam_policy(self, client=None):
@@ -1221,17 +1391,23 @@ class BigqueryDataSet(resource_class_factory('dataset', 'id')):
 class BigqueryTable(resource_class_factory('bigquery_table', 'id')):
     """The Resource implementation for bigquery table."""
 
+    __slots__ = ()
+
 
 # Bigtable resource classes
 class BigtableCluster(resource_class_factory('bigtable_cluster', 'name',
                                              hash_key=True)):
     """The Resource implementation for Bigtable Cluster."""
 
+    __slots__ = ()
+
 
 class BigtableInstance(resource_class_factory('bigtable_instance', 'name',
                                               hash_key=True)):
     """The Resource implementation for Bigtable Instance."""
 
+    __slots__ = ()
+
     @property
     def instance_id(self):
         """Get instance id of the Bigtable Instance
@@ -1246,11 +1422,15 @@ class BigtableTable(resource_class_factory('bigtable_table', 'name',
                                            hash_key=True)):
     """The Resource implementation for Bigtable Table."""
 
+    __slots__ = ()
+
 
 # Billing resource classes
 class BillingAccount(resource_class_factory('billing_account', None)):
     """The Resource implementation for BillingAccount."""
 
+    __slots__ = ()
+
     def key(self):
         """Get key of this resource.
 
@@ -1285,162 +1465,234 @@ class CloudSqlInstance(resource_class_factory('cloudsqlinstance', 'selfLink',
                                               hash_key=True)):
     """The Resource implementation for CloudSQL Instance."""
 
+    __slots__ = ()
+
 
 # Compute Engine resource classes
 class ComputeAddress(resource_class_factory('compute_address', 'id')):
     """The Resource implementation for Compute Address."""
 
+    __slots__ = ()
+
 
 class ComputeAutoscaler(resource_class_factory('compute_autoscaler', 'id')):
     """The Resource implementation for Compute Autoscaler."""
 
+    __slots__ = ()
+
 
 class ComputeBackendBucket(resource_class_factory('compute_backendbucket',
                                                   'id')):
     """The Resource implementation for Compute Backend Bucket."""
 
+    __slots__ = ()
+
 
 class ComputeBackendService(resource_class_factory('backendservice', 'id')):
     """The Resource implementation for Compute Backend Service."""
 
+    __slots__ = ()
+
 
 class ComputeDisk(resource_class_factory('disk', 'id')):
     """The Resource implementation for Compute Disk."""
 
+    __slots__ = ()
+
 
 class ComputeFirewall(resource_class_factory('firewall', 'id')):
     """The Resource implementation for Compute Firewall."""
 
+    __slots__ = ()
+
 
 class ComputeForwardingRule(resource_class_factory('forwardingrule', 'id')):
     """The Resource implementation for Compute Forwarding Rule."""
 
+    __slots__ = ()
+
 
 class ComputeHealthCheck(resource_class_factory('compute_healthcheck', 'id')):
     """The Resource implementation for Compute HealthCheck."""
 
+    __slots__ = ()
+
 
 class ComputeHttpHealthCheck(resource_class_factory('compute_httphealthcheck',
                                                     'id')):
     """The Resource implementation for Compute HTTP HealthCheck."""
 
+    __slots__ = ()
+
 
 class ComputeHttpsHealthCheck(resource_class_factory('compute_httpshealthcheck',
                                                      'id')):
     """The Resource implementation for Compute HTTPS HealthCheck."""
 
+    __slots__ = ()
+
 
 class ComputeImage(resource_class_factory('image', 'id')):
     """The Resource implementation for Compute Image."""
 
+    __slots__ = ()
+
 
 class ComputeInstance(resource_class_factory('instance', 'id')):
     """The Resource implementation for Compute Instance."""
 
+    __slots__ = ()
+
 
 class ComputeInstanceGroup(resource_class_factory('instancegroup', 'id')):
     """The Resource implementation for Compute InstanceGroup."""
 
+    __slots__ = ()
+
 
 class ComputeInstanceGroupManager(resource_class_factory('instancegroupmanager',
                                                          'id')):
     """The Resource implementation for Compute InstanceGroupManager."""
 
+    __slots__ = ()
+
 
 class ComputeInstanceTemplate(resource_class_factory('instancetemplate', 'id')):
     """The Resource implementation for Compute InstanceTemplate."""
 
+    __slots__ = ()
+
 
 class ComputeInterconnect(resource_class_factory('compute_interconnect', 'id')):
     """The Resource implementation for Compute Interconnect."""
 
+    __slots__ = ()
+
 
 class ComputeInterconnectAttachment(resource_class_factory(
         'compute_interconnect_attachment', 'id')):
     """The Resource implementation for Compute Interconnect Attachment."""
 
+    __slots__ = ()
+
 
 class ComputeLicense(resource_class_factory('compute_license', 'id')):
     """The Resource implementation for Compute License."""
 
+    __slots__ = ()
+
 
 class ComputeNetwork(resource_class_factory('network', 'id')):
     """The Resource implementation for Compute Network."""
 
+    __slots__ = ()
+
 
 class ComputeProject(resource_class_factory('compute_project', 'id')):
     """The Resource implementation for Compute Project."""
 
+    __slots__ = ()
+
 
 class ComputeRouter(resource_class_factory('compute_router', 'id')):
     """The Resource implementation for Compute Router."""
 
+    __slots__ = ()
+
 
 class ComputeSecurityPolicy(resource_class_factory('compute_securitypolicy',
                                                    'id')):
     """The Resource implementation for Compute SecurityPolicy."""
 
+    __slots__ = ()
+
 
 class ComputeSnapshot(resource_class_factory('snapshot', 'id')):
     """The Resource implementation for Compute Snapshot."""
 
+    __slots__ = ()
+
 
 class ComputeSslCertificate(resource_class_factory('compute_sslcertificate',
                                                    'id')):
     """The Resource implementation for Compute SSL Certificate."""
 
+    __slots__ = ()
+
 
 class ComputeSubnetwork(resource_class_factory('subnetwork', 'id')):
     """The Resource implementation for Compute Subnetwork."""
 
+    __slots__ = ()
+
 
 class ComputeTargetHttpProxy(resource_class_factory('compute_targethttpproxy',
                                                     'id')):
     """The Resource implementation for Compute TargetHttpProxy."""
 
+    __slots__ = ()
+
 
 class ComputeTargetHttpsProxy(resource_class_factory('compute_targethttpsproxy',
                                                      'id')):
     """The Resource implementation for Compute TargetHttpsProxy."""
 
+    __slots__ = ()
+
 
 class ComputeTargetInstance(resource_class_factory('compute_targetinstance',
                                                    'id')):
     """The Resource implementation for Compute TargetInstance."""
 
+    __slots__ = ()
+
 
 class ComputeTargetPool(resource_class_factory('compute_targetpool', 'id')):
     """The Resource implementation for Compute TargetPool."""
 
+    __slots__ = ()
+
 
 class ComputeTargetSslProxy(resource_class_factory('compute_targetsslproxy',
                                                    'id')):
     """The Resource implementation for Compute TargetSslProxy."""
 
+    __slots__ = ()
+
 
 class ComputeTargetTcpProxy(resource_class_factory('compute_targettcpproxy',
                                                    'id')):
     """The Resource implementation for Compute TargetTcpProxy."""
 
+    __slots__ = ()
+
 
 class ComputeTargetVpnGateway(resource_class_factory('compute_targetvpngateway',
                                                      'id')):
     """The Resource implementation for Compute TargetVpnGateway."""
 
+    __slots__ = ()
+
 
 class ComputeUrlMap(resource_class_factory('compute_urlmap', 'id')):
     """The Resource implementation for Compute UrlMap."""
 
+    __slots__ = ()
+
 
 class ComputeVpnTunnel(resource_class_factory('compute_vpntunnel', 'id')):
     """The Resource implementation for Compute VpnTunnel."""
 
+    __slots__ = ()
+
 
 # Cloud Dataproc resource classes
 class DataprocCluster(resource_class_factory('dataproc_cluster',
                                              'clusterUuid')):
     """The Resource implementation for Dataproc Cluster."""
 
+    __slots__ = ()
+
     @cached('iam_policy')
     def get_iam_policy(self, client=None):
         """Dataproc Cluster IAM policy.
@@ -1476,15 +1728,21 @@ class DataprocCluster(resource_class_factory('dataproc_cluster',
 class DnsManagedZone(resource_class_factory('dns_managedzone', 'id')):
     """The Resource implementation for Cloud DNS ManagedZone."""
 
+    __slots__ = ()
+
 
 class DnsPolicy(resource_class_factory('dns_policy', 'id')):
     """The Resource implementation for Cloud DNS Policy."""
 
+    __slots__ = ()
+
 
 # IAM resource classes
 class IamCuratedRole(resource_class_factory('role', 'name')):
     """The Resource implementation for IAM Curated Roles."""
 
+    __slots__ = ()
+
     def parent(self):
         """Curated roles have no parent."""
         return None
@@ -1493,10 +1751,36 @@ class IamCuratedRole(resource_class_factory('role', 'name')):
 class IamRole(resource_class_factory('role', 'name')):
     """The Resource implementation for IAM Roles."""
 
+    __slots__ = ()
+
 
 class IamServiceAccount(resource_class_factory('serviceaccount', 'uniqueId')):
     """The Resource implementation for IAM ServiceAccount."""
 
+    __slots__ = ()
+
+    prefetch_batch_size = PREFETCH_BATCH_SIZE
+
+    @classmethod
+    def prefetch(cls, client, resources):
+        """Fetch the IAM policies of service accounts in batch requests.
+
+        Args:
+            client (object): GCP API client.
+            resources (list): The new service accounts.
+        """
+        try:
+            policies = client.fetch_iam_serviceaccount_iam_policies(
+                [resource['name'] for resource in resources])
+        except (api_errors.ApiExecutionError, ResourceNotSupported) as e:
+            LOGGER.warning('Could not prefetch Service Account IAM Policies: '
+                           '%s', e)
+            return
+        for resource in resources:
+            if resource['name'] in policies:
+                resource._set_cache(  # pylint: disable=protected-access
+                    'iam_policy', policies[resource['name']])
+
     @cached('iam_policy')
     def get_iam_policy(self, client=None):
         """Service Account IAM policy for this service account.
@@ -1523,12 +1807,16 @@ class IamServiceAccountKey(resource_class_factory('serviceaccount_key', 'name',
                                                   hash_key=True)):
     """The Resource implementation for IAM ServiceAccountKey."""
 
+    __slots__ = ()
+
 
 # Key Management Service resource classes
 class KmsCryptoKey(resource_class_factory('kms_cryptokey', 'name',
                                           hash_key=True)):
     """The Resource implementation for KMS CryptoKey."""
 
+    __slots__ = ()
+
     @cached('iam_policy')
     def get_iam_policy(self, client=None):
         """KMS CryptoKey IAM policy.
@@ -1554,11 +1842,15 @@ class KmsCryptoKeyVersion(resource_class_factory('kms_cryptokeyversion', 'name',
                                                  hash_key=True)):
     """The Resource implementation for KMS CryptoKeyVersion."""
 
+    __slots__ = ()
+
 
 class KmsKeyRing(resource_class_factory('kms_keyring', 'name',
                                         hash_key=True)):
     """The Resource implementation for KMS KeyRing."""
 
+    __slots__ = ()
+
     @cached('iam_policy')
     def get_iam_policy(self, client=None):
         """KMS Keyring IAM policy.
@@ -1586,6 +1878,8 @@ class KubernetesCluster(resource_class_factory('kubernetes_cluster',
                                                hash_key=True)):
     """The Resource implementation for Kubernetes Cluster."""
 
+    __slots__ = ()
+
     @cached('service_config')
     def get_kubernetes_service_config(self, client=None):
         """Get service config for KubernetesCluster.
@@ -1645,42 +1939,60 @@ class KubernetesCluster(resource_class_factory('kubernetes_cluster',
 class KubernetesNode(k8_resource_class_factory('kubernetes_node')):
     """The Resource implementation for Kubernetes Node."""
 
+    __slots__ = ()
+
 
 class KubernetesPod(k8_resource_class_factory('kubernetes_pod')):
     """The Resource implementation for Kubernetes Pod."""
 
+    __slots__ = ()
+
 
 class KubernetesService(k8_resource_class_factory('kubernetes_service')):
     """The Resource implementation for Kubernetes Service."""
 
+    __slots__ = ()
+
 
 class KubernetesNamespace(k8_resource_class_factory('kubernetes_namespace')):
     """The Resource implementation for Kubernetes Namespace."""
 
+    __slots__ = ()
+
 
 class KubernetesRole(k8_resource_class_factory('kubernetes_role')):
     """The Resource implementation for Kubernetes Role."""
 
+    __slots__ = ()
+
 
 class KubernetesRoleBinding(k8_resource_class_factory(
         'kubernetes_rolebinding')):
     """The Resource implementation for Kubernetes RoleBinding."""
 
+    __slots__ = ()
+
 
 class KubernetesClusterRole(k8_resource_class_factory(
         'kubernetes_clusterrole')):
     """The Resource implementation for Kubernetes ClusterRole."""
 
+    __slots__ = ()
+
 
 class KubernetesClusterRoleBinding(k8_resource_class_factory(
         'kubernetes_clusterrolebinding')):
     """The Resource implementation for Kubernetes ClusterRoleBinding."""
 
+    __slots__ = ()
+
 
 # Stackdriver Logging resource classes
 class LoggingSink(resource_class_factory('sink', None)):
     """The Resource implementation for Stackdriver Logging sink."""
 
+    __slots__ = ()
+
     def key(self):
         """Get key of this resource.
 
@@ -1696,10 +2008,14 @@ class LoggingSink(resource_class_factory('sink', None)):
 class GsuiteUser(resource_class_factory('gsuite_user', 'id')):
     """The Resource implementation for GSuite User."""
 
+    __slots__ = ()
+
 
 class GsuiteGroup(resource_class_factory('gsuite_group', 'id')):
     """The Resource implementation for GSuite User."""
 
+    __slots__ = ()
+
     def should_dispatch(self):
         """GSuite Groups should always dispatch to another thread.
 
@@ -1708,25 +2024,41 @@ class GsuiteGroup(resource_class_factory('gsuite_group', 'id')):
         """
         return True
 
+    def dispatch_api(self):
+        """GSuite Groups list their members first.
+
+        Returns:
+            str: The name of the API.
+        """
+        return 'admin'
+
 
 class GsuiteGroupsSettings(resource_class_factory(
         'gsuite_groups_settings', 'email')):
     """The Resource implementation for GSuite Settings."""
 
+    __slots__ = ()
+
 
 class GsuiteUserMember(resource_class_factory('gsuite_user_member', 'id')):
     """The Resource implementation for GSuite User."""
 
+    __slots__ = ()
+
 
 class GsuiteGroupMember(resource_class_factory('gsuite_group_member', 'id')):
     """The Resource implementation for GSuite User."""
 
+    __slots__ = ()
+
 
 # Cloud Pub/Sub resource classes
 class PubsubSubscription(resource_class_factory('pubsub_subscription', 'name',
                                                 hash_key=True)):
     """The Resource implementation for PubSub Subscription."""
 
+    __slots__ = ()
+
     @cached('iam_policy')
     def get_iam_policy(self, client=None):
         """Get IAM policy for this Pubsub Subscription.
@@ -1753,6 +2085,8 @@ class PubsubTopic(resource_class_factory('pubsub_topic', 'name',
                                          hash_key=True)):
     """The Resource implementation for PubSub Topic."""
 
+    __slots__ = ()
+
     @cached('iam_policy')
     def get_iam_policy(self, client=None):
         """Get IAM policy for this Pubsub Topic.
@@ -1780,22 +2114,51 @@ class ServiceUsageService(resource_class_factory('service', 'name',
                                                  hash_key=True)):
     """The Resource implementation for Service Usage Service."""
 
+    __slots__ = ()
+
 
 # Cloud Spanner resource classes
 class SpannerDatabase(resource_class_factory('spanner_database', 'name',
                                              hash_key=True)):
     """The Resource implementation for Spanner Database."""
 
+    __slots__ = ()
+
 
 class SpannerInstance(resource_class_factory('spanner_instance', 'name',
                                              hash_key=True)):
     """The Resource implementation for Spanner Instance."""
 
+    __slots__ = ()
+
 
 # Cloud storage resource classes
 class StorageBucket(resource_class_factory('bucket', 'id')):
     """The Resource implementation for Storage Bucket."""
 
+    __slots__ = ()
+
+    prefetch_batch_size = PREFETCH_BATCH_SIZE
+
+    @classmethod
+    def prefetch(cls, client, resources):
+        """Fetch the IAM policies of buckets in batch requests.
+
+        Args:
+            client (object): GCP API client.
+            resources (list): The new buckets.
+        """
+        try:
+            policies = client.fetch_storage_bucket_iam_policies(
+                [resource.key() for resource in resources])
+        except (api_errors.ApiExecutionError, ResourceNotSupported) as e:
+            LOGGER.warning('Could not prefetch Bucket IAM Policies: %s', e)
+            return
+        for resource in resources:
+            if resource.key() in policies:
+                resource._set_cache(  # pylint: disable=protected-access
+                    'iam_policy', policies[resource.key()])
+
     @cached('iam_policy')
     def get_iam_policy(self, client=None):
         """Get IAM policy for this Storage bucket.
@@ -1850,6 +2213,8 @@ class StorageBucket(resource_class_factory('bucket', 'id')):
 class StorageObject(resource_class_factory('storage_object', 'id')):
     """The Resource implementation for Storage Object."""
 
+    __slots__ = ()
+
     def get_gcs_policy(self, client=None):
         """Full projection returns GCS policy with the resource.
 
@@ -1902,6 +2267,37 @@ class CompositeRootIterator(ResourceIterator):
             yield resource
 
 
+def _prefetched(client, resource_cls, resources):
+    """Yield new resources after prefetching their data in batches.
+
+    Args:
+        client (object): GCP API client.
+        resource_cls (class): The class of the resources.
+        resources (iterator): The new resources.
+
+    Yields:
+        Resource: The resources, in order.
+    """
+    batch_size = resource_cls.prefetch_batch_size
+    if not batch_size:
+        for resource in resources:
+            yield resource
+        return
+
+    batch = []
+    for resource in resources:
+        batch.append(resource)
+        if len(batch) >= batch_size:
+            resource_cls.prefetch(client, batch)
+            for prefetched in batch:
+                yield prefetched
+            batch = []
+    if batch:
+        resource_cls.prefetch(client, batch)
+        for prefetched in batch:
+            yield prefetched
+
+
 def resource_iter_class_factory(api_method_name,
                                 resource_name,
                                 api_method_arg_key=None,
@@ -1962,9 +2358,14 @@ def resource_iter_class_factory(api_method_name,
                     if additional_arg_keys:
                         args.extend(
                             self.resource[key] for key in additional_arg_keys)
-                    for data, metadata in iter_method(*args, **kwargs):
-                        yield FACTORIES[resource_name].create_new(
+                    resources = (
+                        FACTORIES[resource_name].create_new(
                             data, metadata=metadata)
+                        for data, metadata in iter_method(*args, **kwargs))
+                    for resource in _prefetched(
+                            gcp, FACTORIES[resource_name].attributes['cls'],
+                            resources):
+                        yield resource
                 except ResourceNotSupported as e:
                     # API client doesn't support this resource, ignore.
                     LOGGER.debug(e)
@@ -47,6 +47,28 @@ class Storage(object):
         """
         raise NotImplementedError()
 
+    def enable_incremental(self, max_age_hours):
+        """Allow copying unchanged subtrees from the previous inventory.
+
+        Storages which can't copy subtrees ignore this.
+
+        Args:
+            max_age_hours (int): Maximum age of the copied data in hours.
+        """
+        del max_age_hours  # Unused.
+
+    def copy_unchanged_subtree(self, resource):
+        """Copy the subtree of a resource from the previous inventory.
+
+        Args:
+            resource (object): The resource, already written to the storage.
+
+        Returns:
+            bool: True if the subtree was copied and must not be crawled.
+        """
+        del resource  # Unused.
+        return False
+
     def error(self, message):
         """Not Implemented.
 
@@ -13,9 +13,11 @@
 # limitations under the License.
 """Inventory temporary storage for Cloud Asset data."""
 import json
+import mmap
 import os
 import enum
 import tempfile
+import threading
 
 from retrying import retry
 from sqlalchemy import Column
@@ -282,21 +284,212 @@ class CaiTemporaryStore(BASE):
         return ''
 
 
+class CaiIndexedStore(object):
+    """In-memory index of CAI assets backed by a memory mapped data file.
+
+    The asset data is appended to a temporary file while the dump is loaded
+    and only the asset keys with the byte range of the data in the file are
+    kept in memory. Once loaded the file is memory mapped and the json data
+    of an asset is only decoded when it is accessed.
+    """
+
+    def __init__(self, datafile):
+        """Initialize.
+
+        Args:
+            datafile (str): The path of the file to store the asset data in.
+        """
+        self.datafile = datafile
+        self._lock = threading.Lock()
+        self._file = open(datafile, 'w+b')
+        self._size = 0
+        self._mmap = None
+        self._ready = True
+        # (content_type, asset_type, name) -> (offset, length)
+        self._assets = {}
+        # (content_type, asset_type, parent_name) -> [(name, offset, length)]
+        self._children = {}
+
+    @staticmethod
+    def _content_type_key(content_type):
+        """Returns the index key for a content type.
+
+        Args:
+            content_type (Union[ContentTypes, str]): The content type.
+
+        Returns:
+            str: The name of the content type.
+        """
+        return getattr(content_type, 'name', content_type)
+
+    def populate_cai_data(self, data):
+        """Add assets from a cai data dump to the store.
+
+        Args:
+            data (file): A file like object, line delimeted text dump of json
+                data representing assets from Cloud Asset Inventory exportAssets
+                API.
+
+        Returns:
+            int: The number of assets added.
+        """
+        num_rows = 0
+        for line in data:
+            if not line:
+                continue
+            row = CaiTemporaryStore.from_json(line.strip().encode())
+            if row and self._add(row):
+                num_rows += 1
+        return num_rows
+
+    def _add(self, row):
+        """Append the asset data of a row to the file and index it.
+
+        Args:
+            row (dict): The row dictionary created by CaiTemporaryStore.
+
+        Returns:
+            bool: False if an asset with the same key was already added.
+        """
+        content_type = row['content_type']
+        asset_type = row['asset_type']
+        name = row['name']
+        asset_data = row['asset_data']
+        key = (content_type, asset_type, name)
+        with self._lock:
+            if key in self._assets:
+                LOGGER.debug('Skipping duplicate CAI asset %s.', key)
+                return False
+            location = (self._size, len(asset_data))
+            self._file.write(asset_data)
+            self._size += len(asset_data)
+            self._assets[key] = location
+            self._children.setdefault(
+                (content_type, asset_type, row['parent_name']), []).append(
+                    (name,) + location)
+            self._ready = False
+        return True
+
+    def optimize(self):
+        """Sort the index and memory map the data file after loading."""
+        with self._lock:
+            if self._ready:
+                return
+            for children in self._children.values():
+                children.sort()
+            self._file.flush()
+            if self._size:
+                self._mmap = mmap.mmap(self._file.fileno(), self._size,
+                                       access=mmap.ACCESS_READ)
+            self._ready = True
+
+    def clear_cai_data(self):
+        """Deletes all assets from the store.
+
+        Returns:
+            int: The number of assets deleted.
+        """
+        with self._lock:
+            count = len(self._assets)
+            self._assets = {}
+            self._children = {}
+            self._mmap = None
+            self._file.seek(0)
+            self._file.truncate()
+            self._size = 0
+            self._ready = True
+        return count
+
+    def close(self):
+        """Release the memory map and the data file."""
+        with self._lock:
+            self._mmap = None
+            self._file.close()
+
+    def _extract_asset_data(self, name, asset_type, offset, length):
+        """Decodes the data of an asset from the data file.
+
+        Args:
+            name (str): The CAI name of the asset.
+            asset_type (str): The CAI asset type.
+            offset (int): The offset of the asset data in the file.
+            length (int): The length of the asset data.
+
+        Returns:
+            Tuple[dict, AssetMetadata]: The dict representation of the asset
+                data and an Asset metadata along with it.
+        """
+        asset = json.loads(self._mmap[offset:offset + length].decode('utf-8'))
+        return asset, AssetMetadata(cai_name=name, cai_type=asset_type)
+
+    def iter_cai_assets(self, content_type, asset_type, parent_name):
+        """Iterate the assets of a type under a parent, ordered by name.
+
+        Args:
+            content_type (ContentTypes): The content type to return.
+            asset_type (str): The asset type to return.
+            parent_name (str): The parent resource to iter children under.
+
+        Yields:
+            Tuple[dict, AssetMetadata]: The content_type data for each
+                resource.
+        """
+        self.optimize()
+        children = self._children.get(
+            (self._content_type_key(content_type), asset_type, parent_name),
+            [])
+        for name, offset, length in children:
+            yield self._extract_asset_data(name, asset_type, offset, length)
+
+    def fetch_cai_asset(self, content_type, asset_type, name):
+        """Returns a single asset from the store.
+
+        Args:
+            content_type (ContentTypes): The content type to return.
+            asset_type (str): The asset type to return.
+            name (str): The resource to return.
+
+        Returns:
+            Tuple[dict, AssetMetadata]: The content data for the specified
+                resource, or an empty dict and None if it does not exist.
+        """
+        self.optimize()
+        location = self._assets.get(
+            (self._content_type_key(content_type), asset_type, name))
+        if not location:
+            return {}, None
+        return self._extract_asset_data(name, asset_type, *location)
+
+
 class CaiDataAccess(object):
-    """Access to the CAI temporary store table."""
+    """Access to the CAI temporary store table or an indexed store."""
 
     @staticmethod
     def clear_cai_data(engine):
         """Deletes all temporary CAI data from the cai temporary table.
 
         Args:
-            engine (object): Database engine.
+            engine (object): Database engine or CaiIndexedStore.
 
         Returns:
             int: The number of rows deleted.
         """
+        if isinstance(engine, CaiIndexedStore):
+            return engine.clear_cai_data()
         return CaiTemporaryStore.delete_all(engine)
 
+    @staticmethod
+    def optimize_cai_data(engine):
+        """Optimize the storage for queries once all assets are added.
+
+        Args:
+            engine (object): Database engine or CaiIndexedStore.
+        """
+        if isinstance(engine, CaiIndexedStore):
+            engine.optimize()
+        else:
+            engine.execute('pragma optimize;')
+
     @staticmethod
     def populate_cai_data(data, engine):
         """Add assets from cai data dump into cai temporary table.
@@ -305,11 +498,14 @@ class CaiDataAccess(object):
             data (file): A file like object, line delimeted text dump of json
                 data representing assets from Cloud Asset Inventory exportAssets
                 API.
-            engine (object): Database engine.
+            engine (object): Database engine or CaiIndexedStore.
 
         Returns:
             int: The number of rows inserted
         """
+        if isinstance(engine, CaiIndexedStore):
+            return engine.populate_cai_data(data)
+
         num_rows = 0
         cai_table_insert = CaiTemporaryStore.__table__.insert
         try:
@@ -349,11 +545,16 @@ class CaiDataAccess(object):
             content_type (ContentTypes): The content type to return.
             asset_type (str): The asset type to return.
             parent_name (str): The parent resource to iter children under.
-            engine (object): Database engine.
+            engine (object): Database engine or CaiIndexedStore.
 
         Yields:
             object: The content_type data for each resource.
         """
+        if isinstance(engine, CaiIndexedStore):
+            yield from engine.iter_cai_assets(content_type, asset_type,
+                                              parent_name)
+            return
+
         base_query = CaiTemporaryStore.__table__.select()
         filters = [
             CaiTemporaryStore.parent_name == parent_name,
@@ -382,11 +583,14 @@ class CaiDataAccess(object):
             content_type (ContentTypes): The content type to return.
             asset_type (str): The asset type to return.
             name (str): The resource to return.
-            engine (object): Database engine.
+            engine (object): Database engine or CaiIndexedStore.
 
         Returns:
             dict: The content data for the specified resource.
         """
+        if isinstance(engine, CaiIndexedStore):
+            return engine.fetch_cai_asset(content_type, asset_type, name)
+
         base_query = CaiTemporaryStore.__table__.select()
         filters = [
             CaiTemporaryStore.content_type == content_type,
@@ -449,6 +653,19 @@ def create_sqlite_db(threads=1):
         os.close(dbfile)
 
 
+def create_indexed_store():
+    """Create an indexed in-memory store for use as the CAI temp store.
+
+    Returns:
+        Tuple[CaiIndexedStore, str]: A tuple containing the store, which can
+            be used in place of a database engine with CaiDataAccess, and the
+            path to the temporary file storing the asset data.
+    """
+    datafile, tmpfile = tempfile.mkstemp('.dat', 'forseti-cai-store-')
+    os.close(datafile)
+    return CaiIndexedStore(tmpfile), tmpfile
+
+
 def _initialize(engine):
     """Create all tables in the database if not existing.
 
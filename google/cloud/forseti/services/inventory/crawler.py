@@ -15,14 +15,14 @@
 """Crawler implementation."""
 
 from builtins import str
-from builtins import range
-from queue import Empty
-from queue import Queue
+from collections import deque
+from collections import OrderedDict
 import threading
 import time
 
 from future import standard_library
 from google.cloud.forseti.common.util import logger
+from google.cloud.forseti.common.util import token_bucket
 from google.cloud.forseti.services.inventory import cai_temporary_storage
 from google.cloud.forseti.services.inventory.base import cai_gcp_client
 from google.cloud.forseti.services.inventory.base import cloudasset
@@ -34,6 +34,14 @@ standard_library.install_aliases()
 
 LOGGER = logger.get_logger(__name__)
 
+# The parallel crawler grows up to this many times the configured threads.
+MAX_THREADS_FACTOR = 2
+# Interval between adjustments of the number of parallel crawler threads.
+ADJUST_INTERVAL_SECONDS = 5.0
+# Shrink the threads when the mean API latency exceeds the lowest observed
+# mean latency by this factor.
+LATENCY_SHRINK_FACTOR = 2.0
+
 
 class CrawlerConfig(crawler.CrawlerConfig):
     """Crawler configuration to inject dependencies."""
@@ -59,7 +67,7 @@ class ParallelCrawlerConfig(crawler.CrawlerConfig):
     """Multithreaded crawler configuration, to inject dependencies."""
 
     def __init__(self, storage, progresser, api_client, threads,
-                 variables=None):
+                 variables=None, max_threads=None):
         """Initialize
 
         Args:
@@ -67,14 +75,17 @@ class ParallelCrawlerConfig(crawler.CrawlerConfig):
             progresser (QueueProgresser): The progresser implemented using
                 a queue
             api_client (ApiClientImpl): GCP API client
-            threads (int): how many threads to use
+            threads (int): how many threads to start with
             variables (dict): config variables
+            max_threads (int): how many threads to grow to at most, defaults
+                to MAX_THREADS_FACTOR times threads
         """
         super(ParallelCrawlerConfig, self).__init__()
         self.storage = storage
         self.progresser = progresser
         self.variables = {} if not variables else variables
         self.threads = threads
+        self.max_threads = max_threads or threads * MAX_THREADS_FACTOR
         self.client = api_client
 
 
@@ -131,12 +142,25 @@ class Crawler(crawler.Crawler):
         else:
             progresser.on_new_object(resource)
 
-    def dispatch(self, callback):
+    def copy_unchanged_subtree(self, resource):
+        """Copy the subtree of an unchanged resource from a prior inventory.
+
+        Args:
+            resource (object): Resource whose subtree to copy.
+
+        Returns:
+            bool: True if the subtree was copied and must not be crawled.
+        """
+        return self.config.storage.copy_unchanged_subtree(resource)
+
+    def dispatch(self, callback, api_name=None):
         """Dispatch crawling of a subtree.
 
         Args:
             callback (function): Callback to dispatch.
+            api_name (str): The API called first by the callback, if known.
         """
+        del api_name  # Unused.
         callback()
 
     def write(self, resource):
@@ -171,8 +195,86 @@ class Crawler(crawler.Crawler):
         self.config.progresser.on_warning(error)
 
 
+class DispatchScheduler(object):
+    """Queues of dispatched callbacks by the API they call first.
+
+    Callbacks for the API with the shortest wait for a token in its token
+    bucket are handed out first, so the workers don't wait on the quota of
+    one API while others have quota left. APIs with the same wait are served
+    round robin.
+    """
+
+    def __init__(self):
+        """Initialize."""
+        self._queues = OrderedDict()
+        self._condition = threading.Condition()
+        self._pending = 0
+        self._unfinished = 0
+
+    def put(self, callback, api_name=None):
+        """Queue a callback.
+
+        Args:
+            callback (function): The callback.
+            api_name (str): The API called first by the callback, if known.
+        """
+        with self._condition:
+            self._queues.setdefault(api_name, deque()).append(callback)
+            self._pending += 1
+            self._unfinished += 1
+            self._condition.notify()
+
+    def get(self, timeout):
+        """Get the next callback to run.
+
+        Args:
+            timeout (float): The time in seconds to wait for a callback.
+
+        Returns:
+            function: The callback, or None if none was queued in time.
+        """
+        with self._condition:
+            if not self._pending:
+                self._condition.wait(timeout)
+                if not self._pending:
+                    return None
+            api_name = min(
+                (name for name, queue in self._queues.items() if queue),
+                key=lambda name: token_bucket.wait_time(name) if name else 0)
+            self._queues.move_to_end(api_name)
+            self._pending -= 1
+            return self._queues[api_name].popleft()
+
+    def pending(self):
+        """The number of queued callbacks.
+
+        Returns:
+            int: The number of callbacks not handed out yet.
+        """
+        with self._condition:
+            return self._pending
+
+    def task_done(self):
+        """Indicate a callback handed out by get has completed."""
+        with self._condition:
+            self._unfinished -= 1
+            if not self._unfinished:
+                self._condition.notify_all()
+
+    def join(self):
+        """Wait until all the queued callbacks have completed."""
+        with self._condition:
+            while self._unfinished:
+                self._condition.wait()
+
+
 class ParallelCrawler(Crawler):
-    """Multi-threaded Crawler implementation."""
+    """Multi-threaded Crawler implementation.
+
+    The number of threads adapts to the API feedback: it is halved when
+    calls are throttled, reduced when the API latency degrades and grown,
+    up to the configured maximum, while callbacks are waiting.
+    """
 
     def __init__(self, config):
         """Initialize
@@ -182,27 +284,100 @@ class ParallelCrawler(Crawler):
         """
         super(ParallelCrawler, self).__init__(config)
         self._write_lock = threading.Lock()
-        self._dispatch_queue = Queue()
+        self._scheduler = DispatchScheduler()
         self._shutdown_event = threading.Event()
+        self._workers_lock = threading.Lock()
+        self._workers = 0
+        self._target_workers = config.threads
+        self._last_metrics = (0, 0, 0.0)
+        self._baseline_latency = None
 
     def _start_workers(self):
-        """Start a pool of worker threads for processing the dispatch queue."""
-        self._shutdown_event.clear()
-        for _ in range(self.config.threads):
-            worker = threading.Thread(target=self._process_queue)
-            worker.daemon = True
-            worker.start()
+        """Start worker threads until the target number is running."""
+        with self._workers_lock:
+            while self._workers < self._target_workers:
+                self._workers += 1
+                worker = threading.Thread(target=self._process_queue)
+                worker.daemon = True
+                worker.start()
+
+    def _retire_worker(self):
+        """Check if the calling worker thread should exit.
+
+        Returns:
+            bool: True if more workers than the target are running, the
+                calling worker must exit.
+        """
+        with self._workers_lock:
+            if self._workers > self._target_workers:
+                self._workers -= 1
+                return True
+            return False
 
     def _process_queue(self):
-        """Process items in the queue until the shutdown event is set."""
+        """Process dispatched callbacks until the shutdown event is set."""
         while not self._shutdown_event.is_set():
-            try:
-                callback = self._dispatch_queue.get(timeout=1)
-            except Empty:
+            if self._retire_worker():
+                return
+            callback = self._scheduler.get(timeout=1)
+            if callback is None:
                 continue
 
-            callback()
-            self._dispatch_queue.task_done()
+            try:
+                callback()
+            finally:
+                self._scheduler.task_done()
+        with self._workers_lock:
+            self._workers -= 1
+
+    def _adjust_workers(self):
+        """Grow or shrink the target number of workers from API feedback."""
+        buckets = token_bucket.get_token_buckets()
+        calls = sum(bucket.calls for bucket in buckets)
+        throttled = sum(bucket.throttled for bucket in buckets)
+        latency = sum(bucket.latency_seconds for bucket in buckets)
+        last_calls, last_throttled, last_latency = self._last_metrics
+        self._last_metrics = (calls, throttled, latency)
+
+        mean_latency = None
+        if calls > last_calls:
+            mean_latency = (latency - last_latency) / (calls - last_calls)
+            if (self._baseline_latency is None or
+                    mean_latency < self._baseline_latency):
+                self._baseline_latency = mean_latency
+
+        target = self._target_workers
+        if throttled > last_throttled:
+            target = max(1, target // 2)
+        elif (mean_latency is not None and mean_latency >
+              self._baseline_latency * LATENCY_SHRINK_FACTOR):
+            target = max(1, target - 1)
+        elif self._scheduler.pending():
+            target = min(self.config.max_threads, target + 1)
+
+        if target != self._target_workers:
+            LOGGER.debug('Adjusting crawler threads from %s to %s.',
+                         self._target_workers, target)
+            with self._workers_lock:
+                self._target_workers = target
+            self._start_workers()
+
+    def _monitor_workers(self):
+        """Adjust the number of workers until the shutdown event is set."""
+        while not self._shutdown_event.wait(ADJUST_INTERVAL_SECONDS):
+            self._adjust_workers()
+
+    @staticmethod
+    def _log_api_metrics():
+        """Log the throughput of the APIs called during the crawl."""
+        for bucket in token_bucket.get_token_buckets():
+            metrics = bucket.get_metrics()
+            if not metrics['calls']:
+                continue
+            LOGGER.info('API %s: %s calls, %.1f calls/s, %s throttled, '
+                        '%.0f ms mean latency.', bucket.name, metrics['calls'],
+                        metrics['calls_per_second'], metrics['throttled'],
+                        1000 * metrics['latency_seconds'] / metrics['calls'])
 
     def run(self, resource):
         """Run the crawler, given a start resource.
@@ -213,23 +388,31 @@ class ParallelCrawler(Crawler):
         Returns:
             QueueProgresser: The filled progresser described in inventory
         """
+        token_bucket.reset_metrics()
+        self._last_metrics = (0, 0, 0.0)
         try:
+            self._shutdown_event.clear()
             self._start_workers()
+            monitor = threading.Thread(target=self._monitor_workers)
+            monitor.daemon = True
+            monitor.start()
             resource.accept(self)
-            self._dispatch_queue.join()
+            self._scheduler.join()
         finally:
             self._shutdown_event.set()
             # Wait for threads to exit.
             time.sleep(2)
+        self._log_api_metrics()
         return self.config.progresser
 
-    def dispatch(self, callback):
+    def dispatch(self, callback, api_name=None):
         """Dispatch crawling of a subtree.
 
         Args:
             callback (function): Callback to dispatch.
+            api_name (str): The API called first by the callback, if known.
         """
-        self._dispatch_queue.put(callback)
+        self._scheduler.put(callback, api_name)
 
 
 def _api_client_factory(config, threads, inventory_index_id):
@@ -247,10 +430,14 @@ def _api_client_factory(config, threads, inventory_index_id):
     client_config = config.get_api_quota_configs()
     client_config['domain_super_admin_email'] = config.get_gsuite_admin_email()
     client_config['excluded_resources'] = config.get_excluded_resources()
+    client_config['prefetch_pages'] = config.get_prefetch_pages()
     if config.get_cai_enabled():
         # TODO: When CAI supports resource exclusion, update the following
         #       method to handle resource exclusion during export time.
-        engine, tmpfile = cai_temporary_storage.create_sqlite_db(threads)
+        if config.get_cai_storage() == 'indexed':
+            engine, tmpfile = cai_temporary_storage.create_indexed_store()
+        else:
+            engine, tmpfile = cai_temporary_storage.create_sqlite_db(threads)
         asset_count = cloudasset.load_cloudasset_data(
             engine,
             config,
@@ -267,7 +454,8 @@ def _api_client_factory(config, threads, inventory_index_id):
     return gcp.ApiClientImpl(client_config)
 
 
-def _crawler_factory(storage, progresser, client, parallel, threads):
+def _crawler_factory(storage, progresser, client, parallel, threads,
+                     release_payloads=False):
     """Creates the proper initialized crawler based on the configuration.
 
     Args:
@@ -276,13 +464,16 @@ def _crawler_factory(storage, progresser, client, parallel, threads):
         client (object): The API client instance.
         parallel (bool): If true, use the parallel crawler implementation.
         threads (int): how many threads to use when running in parallel
+        release_payloads (bool): If true, crawled resources release their
+            data once stored.
 
     Returns:
         Union[Crawler, ParallelCrawler]:
             The initialized crawler implementation class.
     """
     excluded_resources = set(client.config.get('excluded_resources', []))
-    config_variables = {'excluded_resources': excluded_resources}
+    config_variables = {'excluded_resources': excluded_resources,
+                        'release_payloads': release_payloads}
     if parallel:
         parallel_config = ParallelCrawlerConfig(storage,
                                                 progresser,
@@ -339,10 +530,13 @@ def run_crawler(storage,
         parallel = False
         threads = 1
 
+    if config.get_incremental_enabled():
+        storage.enable_incremental(config.get_incremental_max_age_hours())
+
     client = _api_client_factory(
         config, threads, progresser.inventory_index_id)
     crawler_impl = _crawler_factory(storage, progresser, client, parallel,
-                                    threads)
+                                    threads, config.get_memory_lean())
     resource = _root_resource_factory(config, client)
 
     progresser = crawler_impl.run(resource)
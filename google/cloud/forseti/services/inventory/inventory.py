@@ -21,6 +21,8 @@ from builtins import object
 import datetime
 from io import StringIO
 from queue import Queue
+import resource as process_resource
+import sys
 import threading
 import traceback
 
@@ -37,6 +39,20 @@ standard_library.install_aliases()
 LOGGER = logger.get_logger(__name__)
 
 
+def get_peak_rss_bytes():
+    """Get the peak resident set size of the process.
+
+    Returns:
+        int: The peak resident set size in bytes.
+    """
+    peak_rss = process_resource.getrusage(
+        process_resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes.
+    if sys.platform != 'darwin':
+        peak_rss *= 1024
+    return peak_rss
+
+
 class Progress(object):
     """Progress state."""
 
@@ -55,6 +71,7 @@ class Progress(object):
         self.errors = 0
         self.last_warning = ''
         self.last_error = ''
+        self.peak_rss_bytes = 0
 
 
 class QueueProgresser(Progress):
@@ -114,10 +131,17 @@ class QueueProgresser(Progress):
     def get_summary(self):
         """Indicate end of updates, and return self as last state.
 
+        The peak memory used by the process is recorded in the last state.
+
         Returns:
             object: Progresser in its last state.
         """
 
+        self.peak_rss_bytes = get_peak_rss_bytes()
+        LOGGER.info('Inventory %s finished with %s warnings and %s errors, '
+                    'peak RSS %.1f MiB.', self.inventory_index_id,
+                    self.warnings, self.errors,
+                    self.peak_rss_bytes / (1024.0 * 1024.0))
         self._notify()
         self._notify_eof()
         return self
@@ -14,12 +14,14 @@
 """Inventory storage implementation."""
 
 from builtins import object
+from queue import Queue
 import json
 import enum
 import threading
 
 from sqlalchemy import and_
 from sqlalchemy import BigInteger
+from sqlalchemy import bindparam
 from sqlalchemy import case
 from sqlalchemy import Column
 from sqlalchemy import DateTime
@@ -29,10 +31,12 @@ from sqlalchemy import ForeignKey
 from sqlalchemy import func
 from sqlalchemy import Index
 from sqlalchemy import Integer
+from sqlalchemy import literal
 from sqlalchemy import or_
 from sqlalchemy import select
 from sqlalchemy import String
 from sqlalchemy import Text
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import aliased
 from sqlalchemy.orm import column_property
@@ -53,6 +57,12 @@ BASE = declarative_base()
 CURRENT_SCHEMA = 1
 PER_YIELD = 1024
 
+# Inventory rows get their ids from blocks reserved in the database, so they
+# can be inserted in bulk by the writer thread.
+ID_BLOCK_SIZE = 1024
+WRITE_BATCH_SIZE = 1024
+WRITE_QUEUE_SIZE = 8192
+
 
 class Categories(enum.Enum):
     """Inventory Categories."""
@@ -402,8 +412,16 @@ class Inventory(BASE):
             'other': json.dumps({'timestamp': resource.get_timestamp()}),
         }
 
+        resource_other = base_row['other']
+        fingerprint = resource.get_fingerprint()
+        if fingerprint:
+            resource_other = json.dumps({
+                'fingerprint': fingerprint,
+                'timestamp': resource.get_timestamp()})
+
         resource_row = dict(
             base_row,
+            other=resource_other,
             category=Categories.resource,
             resource_data=json.dumps(resource.data(), sort_keys=True),
             full_name=resource.get_full_resource_name(),
@@ -842,8 +860,17 @@ class Storage(BaseStorage):
         self.opened = False
         self.inventory_index = None
         self.session_completed = False
+        self.previous_inventory_index_id = None
+        self.incremental_max_age_hours = None
         self._wrote_resources = set()
         self._storage_lock = threading.Lock()
+        self._id_lock = threading.Lock()
+        self._next_id = None
+        self._last_id = None
+        self._last_reserved_id = 0
+        self._write_queue = None
+        self._writer = None
+        self._writer_error = None
 
     def _require_opened(self):
         """Make sure the storage is in 'open' state.
@@ -917,6 +944,7 @@ class Storage(BaseStorage):
             self.inventory_index = self._open(handle)
         else:
             self.inventory_index = self._create()
+            self._start_writer()
 
         self.opened = True
         return self.inventory_index.id
@@ -924,6 +952,11 @@ class Storage(BaseStorage):
     def rollback(self):
         """Roll back the stored inventory, but keep the index entry."""
 
+        try:
+            self._stop_writer()
+        except Exception as e:  # pylint: disable=broad-except
+            LOGGER.warning('Discarding failed inventory writes: %s', e)
+
         try:
             # Delete any rows that had been added to the inventory for this
             # instance of the inventory.
@@ -935,6 +968,13 @@ class Storage(BaseStorage):
 
     def commit(self):
         """Commit the stored inventory."""
+        try:
+            self._stop_writer()
+        except Exception as e:  # pylint: disable=broad-except
+            LOGGER.exception(e)
+            self.inventory_index.set_error(
+                'Unable to write the inventory: {}'.format(e))
+
         if self.inventory_index.inventory_index_warnings:
             status = IndexState.PARTIAL_SUCCESS
         elif self.inventory_index.inventory_index_errors:
@@ -976,6 +1016,10 @@ class Storage(BaseStorage):
     def write(self, resource):
         """Write a resource to the storage and updates its row
 
+        The rows get their ids from a reserved block, the resource gets its
+        inventory key right away, and the rows are queued for the writer
+        thread.
+
         Args:
             resource (object): Resource object to store in db.
         """
@@ -991,21 +1035,375 @@ class Storage(BaseStorage):
         (resource_row, policy_rows) = Inventory.from_resource(
             self.inventory_index, resource)
 
-        # Insert first row to get the primary key for the resource
-        result = self.engine.execute(Inventory.__table__.insert(), resource_row)
-        resource_id = result.inserted_primary_key[0]
+        row_ids = self._allocate_ids(1 + len(policy_rows))
+        resource_id = row_ids[0]
+        resource_row['id'] = resource_id
         resource.set_inventory_key(resource_id)
 
-        # Insert any remaining rows in bulk.
-        if policy_rows:
-            # Set the parent id for policies to the main resource
-            for row in policy_rows:
-                row['parent_id'] = resource_id
-            self.engine.execute(Inventory.__table__.insert(), policy_rows)
+        # Set the parent id for policies to the main resource, all rows need
+        # the same columns to be inserted together.
+        for row, row_id in zip(policy_rows, row_ids[1:]):
+            row['id'] = row_id
+            row['parent_id'] = resource_id
+            row['inventory_errors'] = None
+
+        self._write_rows([resource_row] + policy_rows)
 
         with self._storage_lock:
             self.inventory_index.counter += 1 + len(policy_rows)
 
+    def _allocate_ids(self, count):
+        """Allocate ids for new inventory rows.
+
+        Args:
+            count (int): The number of ids.
+
+        Returns:
+            list: The allocated ids, in increasing order.
+        """
+        with self._id_lock:
+            if self._next_id is None or self._next_id + count > self._last_id:
+                self._reserve_id_block(max(count, ID_BLOCK_SIZE))
+            row_ids = list(range(self._next_id, self._next_id + count))
+            self._next_id += count
+            return row_ids
+
+    def _reserve_id_block(self, size):
+        """Reserve a block of ids in the inventory table.
+
+        The block starts after the highest id in use. On MySQL a placeholder
+        row is inserted at the end of the block and deleted again, which
+        moves the auto increment counter past the block, so rows inserted
+        without an explicit id can't collide with it.
+
+        Args:
+            size (int): The number of ids to reserve.
+        """
+        table = Inventory.__table__
+        is_mysql = self.engine.dialect.name == 'mysql'
+        with self.engine.connect() as connection:
+            if is_mysql:
+                connection.execute(
+                    'LOCK TABLES {} WRITE'.format(table.name))
+            try:
+                max_id = connection.execute(
+                    select([func.max(table.c.id)])).scalar() or 0
+                start = max(max_id, self._last_reserved_id) + 1
+                end = start + size
+                if is_mysql:
+                    connection.execute(table.insert(),
+                                       {'id': end, 'full_name': ''})
+                    connection.execute(table.delete().where(
+                        table.c.id == end))
+            finally:
+                if is_mysql:
+                    connection.execute('UNLOCK TABLES')
+
+        self._next_id = start
+        self._last_id = end
+        self._last_reserved_id = end
+        LOGGER.debug('Reserved inventory ids %s to %s.', start, end - 1)
+
+    def _start_writer(self):
+        """Start the thread writing the queued rows in bulk."""
+        if (self.engine.dialect.name == 'sqlite' and
+                self.engine.url.database in (None, '', ':memory:')):
+            # Every thread has its own in-memory database, write directly.
+            return
+        self._write_queue = Queue(WRITE_QUEUE_SIZE)
+        self._writer = threading.Thread(target=self._process_write_queue)
+        self._writer.daemon = True
+        self._writer.start()
+
+    def _process_write_queue(self):
+        """Write the queued rows until the stop marker is received.
+
+        The queue holds lists of rows, flush events which are set once the
+        rows queued before them are written, and None to stop.
+        """
+        insert = Inventory.__table__.insert()
+        running = True
+        while running:
+            items = [self._write_queue.get()]
+            while items[-1] is not None and len(items) < WRITE_BATCH_SIZE:
+                if self._write_queue.empty():
+                    break
+                items.append(self._write_queue.get())
+
+            rows = []
+            flushed = []
+            for item in items:
+                if item is None:
+                    running = False
+                elif isinstance(item, list):
+                    rows.extend(item)
+                else:
+                    flushed.append(item)
+
+            if rows and not self._writer_error:
+                try:
+                    self.engine.execute(insert, rows)
+                except Exception as e:  # pylint: disable=broad-except
+                    LOGGER.exception('Error writing %s inventory rows: %s',
+                                     len(rows), e)
+                    self._writer_error = e
+            for event in flushed:
+                event.set()
+
+    def _write_rows(self, rows):
+        """Queue rows for the writer thread.
+
+        Args:
+            rows (list): The rows to insert.
+
+        Raises:
+            Exception: Reraises errors from the writer thread.
+        """
+        if self._writer_error:
+            raise self._writer_error
+        if not self._writer:
+            self.engine.execute(Inventory.__table__.insert(), rows)
+            return
+        self._write_queue.put(rows)
+
+    def _flush_writes(self):
+        """Wait until the rows queued so far are written.
+
+        Raises:
+            Exception: Reraises errors from the writer thread.
+        """
+        if self._writer:
+            flushed = threading.Event()
+            self._write_queue.put(flushed)
+            flushed.wait()
+        if self._writer_error:
+            raise self._writer_error
+
+    def _stop_writer(self):
+        """Write the queued rows and stop the writer thread.
+
+        Raises:
+            Exception: Reraises errors from the writer thread.
+        """
+        if self._writer:
+            self._write_queue.put(None)
+            self._writer.join()
+            self._writer = None
+        if self._writer_error:
+            raise self._writer_error
+
+    def enable_incremental(self, max_age_hours):
+        """Allow copying unchanged subtrees from the previous inventory.
+
+        Args:
+            max_age_hours (int): Maximum age of the copied data in hours.
+        """
+        self._require_opened()
+        previous_index = (
+            self.session.query(InventoryIndex.id)
+            .filter(InventoryIndex.id != self.inventory_index.id)
+            .filter(InventoryIndex.inventory_status.in_(
+                [IndexState.SUCCESS, IndexState.PARTIAL_SUCCESS]))
+            .order_by(InventoryIndex.id.desc()).first())
+        if not previous_index:
+            LOGGER.info('No previous inventory, running a full inventory.')
+            return
+
+        self.previous_inventory_index_id = previous_index.id
+        self.incremental_max_age_hours = max_age_hours
+        LOGGER.info('Incremental inventory, unchanged subtrees are copied '
+                    'from inventory %s.', self.previous_inventory_index_id)
+
+    def copy_unchanged_subtree(self, resource):
+        """Copy the subtree of a resource from the previous inventory.
+
+        The subtree is copied if the resource has the same fingerprint as in
+        the previous inventory, its subtree was crawled less than the maximum
+        age ago and no warnings were raised for it.
+
+        The rows are copied into a staging index, then the parent ids are
+        remapped to the new rows and the rows are moved to this inventory,
+        all in one transaction.
+
+        Args:
+            resource (object): The resource, already written to the storage.
+
+        Returns:
+            bool: True if the subtree was copied and must not be crawled.
+        """
+        if not self.previous_inventory_index_id:
+            return False
+        fingerprint = resource.get_fingerprint()
+        if not fingerprint or not resource.inventory_key():
+            return False
+
+        full_name = resource.get_full_resource_name()
+        previous_row = self._get_unchanged_previous_row(resource, fingerprint)
+        if not previous_row:
+            return False
+        previous_id, subtree_index_id = previous_row
+
+        # The resource row must be written before it is updated.
+        self._flush_writes()
+
+        try:
+            with self.engine.begin() as connection:
+                row_count = self._copy_subtree_rows(
+                    connection, full_name, previous_id,
+                    resource.inventory_key())
+                other = json.dumps({
+                    'fingerprint': fingerprint,
+                    'subtree_inventory_index_id': subtree_index_id,
+                    'timestamp': resource.get_timestamp()})
+                connection.execute(
+                    Inventory.__table__.update().where(
+                        Inventory.id == resource.inventory_key()).values(
+                            other=other))
+        except SQLAlchemyError as e:
+            LOGGER.warning('Unable to copy subtree of %s, crawling it: %s',
+                           full_name, e)
+            return False
+
+        with self._storage_lock:
+            self.inventory_index.counter += row_count
+        LOGGER.debug('Copied %s unchanged rows below %s from inventory %s.',
+                     row_count, full_name, self.previous_inventory_index_id)
+        return True
+
+    def _get_unchanged_previous_row(self, resource, fingerprint):
+        """Get the resource from the previous inventory if it is unchanged.
+
+        Args:
+            resource (object): The resource.
+            fingerprint (str): The current fingerprint of the resource.
+
+        Returns:
+            tuple: The id of the row in the previous inventory and the id of
+                the inventory its subtree was crawled in, or None.
+        """
+        full_name = resource.get_full_resource_name()
+        previous_rows = self.engine.execute(
+            select([Inventory.id, Inventory.other]).where(and_(
+                Inventory.inventory_index_id ==
+                self.previous_inventory_index_id,
+                Inventory.category == Categories.resource,
+                Inventory.resource_type == resource.type(),
+                Inventory.full_name == full_name))).fetchall()
+        if len(previous_rows) != 1:
+            return None
+
+        previous_id, previous_other = previous_rows[0]
+        try:
+            previous_other = json.loads(previous_other or '{}')
+        except ValueError:
+            return None
+        if previous_other.get('fingerprint') != fingerprint:
+            return None
+
+        subtree_index_id = previous_other.get(
+            'subtree_inventory_index_id', self.previous_inventory_index_id)
+        subtree_age = (date_time.get_utc_now_datetime() -
+                       date_time.get_date_from_microtimestamp(
+                           subtree_index_id))
+        if subtree_age.total_seconds() > self.incremental_max_age_hours * 3600:
+            return None
+
+        has_warnings = self.engine.execute(
+            select([exists().where(and_(
+                InventoryWarnings.inventory_index_id ==
+                self.previous_inventory_index_id,
+                InventoryWarnings.resource_full_name.startswith(
+                    full_name, autoescape=True)))])).scalar()
+        if has_warnings:
+            return None
+        return previous_id, subtree_index_id
+
+    def _copy_subtree_rows(self, connection, full_name, previous_id,
+                           resource_id):
+        """Copy the rows below a resource from the previous inventory.
+
+        The resource row and its policies are not copied, they are already
+        written to this inventory.
+
+        On MySQL the rows are copied server side with INSERT ... SELECT, the
+        reserved id blocks move the auto increment counter past them. Other
+        engines don't, so the rows are read and given ids from the allocator.
+
+        Args:
+            connection (object): Connection in a transaction.
+            full_name (str): The full name of the resource.
+            previous_id (int): Id of the resource in the previous inventory.
+            resource_id (int): Id of the resource in this inventory.
+
+        Returns:
+            int: The number of copied rows.
+        """
+        table = Inventory.__table__
+        # The staging index is negative and unique per resource, so it can't
+        # collide with inventory index ids, which are timestamps.
+        staging_index_id = -resource_id
+        copied_columns = [column for column in table.columns
+                          if column.name not in ('id', 'inventory_index_id')]
+        subtree_filter = and_(
+            table.c.inventory_index_id == self.previous_inventory_index_id,
+            table.c.full_name.startswith(full_name, autoescape=True),
+            table.c.id != previous_id,
+            or_(table.c.parent_id != previous_id,
+                table.c.category == Categories.resource))
+        if self.engine.dialect.name == 'mysql':
+            connection.execute(
+                table.insert().from_select(
+                    ['inventory_index_id'] + [c.name for c in copied_columns],
+                    select([literal(staging_index_id)] +
+                           copied_columns).where(subtree_filter)))
+        else:
+            copied_rows = connection.execute(
+                select(copied_columns).where(subtree_filter)).fetchall()
+            if copied_rows:
+                row_ids = self._allocate_ids(len(copied_rows))
+                connection.execute(
+                    table.insert(),
+                    [dict(zip([c.name for c in copied_columns], row),
+                          id=row_id, inventory_index_id=staging_index_id)
+                     for row, row_id in zip(copied_rows, row_ids)])
+
+        # Map the ids of the parents in the previous inventory to the ids
+        # of the copied rows, using their unique full names.
+        new_ids = dict(connection.execute(
+            select([table.c.full_name, table.c.id]).where(and_(
+                table.c.inventory_index_id == staging_index_id,
+                table.c.category == Categories.resource))).fetchall())
+        staged_rows = connection.execute(
+            select([table.c.id, table.c.parent_id]).where(
+                table.c.inventory_index_id == staging_index_id)).fetchall()
+        previous_parent_ids = list(
+            set(row.parent_id for row in staged_rows) -
+            set([previous_id, None]))
+        parent_ids = {previous_id: resource_id, None: None}
+        for start in range(0, len(previous_parent_ids), PER_YIELD):
+            batch = previous_parent_ids[start:start + PER_YIELD]
+            for parent_id, parent_name in connection.execute(
+                    select([table.c.id, table.c.full_name]).where(
+                        table.c.id.in_(batch))):
+                if parent_name in new_ids:
+                    parent_ids[parent_id] = new_ids[parent_name]
+
+        unmapped = set(previous_parent_ids).difference(parent_ids)
+        if unmapped:
+            raise SQLAlchemyError(
+                '{} parent rows missing from the copied subtree'.format(
+                    len(unmapped)))
+
+        if staged_rows:
+            connection.execute(
+                table.update().where(table.c.id == bindparam('row_id')).values(
+                    inventory_index_id=self.inventory_index.id,
+                    parent_id=bindparam('new_parent_id')),
+                [{'row_id': row.id,
+                  'new_parent_id': parent_ids[row.parent_id]}
+                 for row in staged_rows])
+        return len(staged_rows)
+
     def error(self, message):
         """Store a fatal error in storage. This will help debug problems.
 
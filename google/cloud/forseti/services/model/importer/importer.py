@@ -17,14 +17,21 @@
 # pylint: disable=too-many-instance-attributes
 
 from builtins import object
+import concurrent.futures
 import json
 from io import StringIO
+from queue import Full
+from queue import Queue
+import threading
+import time
 import traceback
 
 from future import standard_library
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import sessionmaker
 
 from google.cloud.forseti.common.util import logger
+from google.cloud.forseti.services import db
 from google.cloud.forseti.services.inventory.storage import Categories
 from google.cloud.forseti.services.inventory.storage import DataAccess
 from google.cloud.forseti.services.utils import get_resource_id_from_type_name
@@ -108,6 +115,21 @@ GCP_TYPE_LIST = [
     'subnetwork',
 ]
 
+# Resources forming the hierarchy, every other resource belongs to the subtree
+# of one of them. Used to shard the resources in a parallel import.
+HIERARCHY_TYPE_LIST = [
+    'composite_root',
+    'folder',
+    'organization',
+    'project',
+]
+
+# Maximum number of resources buffered per shard in a parallel import.
+SHARD_QUEUE_SIZE = 1000
+# Seconds to wait for room in a full shard queue before checking whether the
+# shard worker is still running.
+SHARD_QUEUE_PUT_TIMEOUT = 1
+
 GSUITE_TYPE_LIST = [
     'gsuite_group',
     'gsuite_user',
@@ -205,14 +227,25 @@ class InventoryImporter(object):
         """
         del args, kwargs  # Unused.
 
-        self.readonly_session = readonly_session
-        self.session = session
+        # Worker threads of a parallel import override the sessions through
+        # thread local storage, see the session properties below.
+        self._local = threading.local()
+        self._readonly_session = readonly_session
+        self._session = session
         self.model = model
         self.dao = dao
         self.service_config = service_config
         self.inventory_index_id = inventory_index_id
         self.session.add(self.model)
 
+        model_config = service_config.get_model_config() or {}
+        self.import_workers = int(model_config.get('import_workers', 1))
+        self.access_index = bool(model_config.get('access_index', False))
+        self.number_resources = bool(
+            model_config.get('number_resources', False))
+        self.denorm_groups_in_memory = bool(
+            model_config.get('denorm_groups_in_memory', False))
+
         self.role_cache = {}
         self.permission_cache = {}
         self.resource_cache = ResourceCache()
@@ -221,9 +254,31 @@ class InventoryImporter(object):
         self.member_cache = {}
         self.member_cache_policies = {}
         self.groups_settings_cache = set()
+        # Guards the member, role and permission caches, which are shared by
+        # the workers of a parallel import.
+        self._cache_lock = threading.Lock()
 
         self.found_root = False
 
+    @property
+    def session(self):
+        """The write session for the current thread.
+
+        Returns:
+            Session: Database session.
+        """
+        return getattr(self._local, 'session', None) or self._session
+
+    @property
+    def readonly_session(self):
+        """The read-only session for the current thread.
+
+        Returns:
+            Session: Database session (read-only).
+        """
+        return (getattr(self._local, 'readonly_session', None) or
+                self._readonly_session)
+
     def _flush_session(self):
         """Flush the session with rollback on errors."""
         try:
@@ -242,7 +297,6 @@ class InventoryImporter(object):
                 'Unexpected SQLAlchemyError occurred during model creation.')
             self.session.rollback()
 
-    # pylint: disable=too-many-statements
     def run(self):
         """Runs the import.
 
@@ -280,101 +334,17 @@ class InventoryImporter(object):
             else:
                 LOGGER.debug('Root resource is not organization: %s.', root)
 
-            item_counter = 0
-            LOGGER.debug('Start storing resources into models.')
-            for resource in DataAccess.iter(self.readonly_session,
-                                            self.inventory_index_id,
-                                            GCP_TYPE_LIST):
-                item_counter += 1
-                self._store_resource(resource)
-                if not item_counter % 1000:
-                    # Flush database every 1000 resources
-                    LOGGER.debug('Flushing model write session: %s',
-                                 item_counter)
-                    self._flush_session()
-                if not item_counter % 100000:
-                    # Commit every 100k resources while iterating
-                    # through all the resources.
-                    LOGGER.debug('Commiting model write session: %s',
-                                 item_counter)
-                    self._commit_session()
-            self._commit_session()
-            LOGGER.debug('Finished storing resources into models.')
-
-            item_counter += self.model_action_wrapper(
-                DataAccess.iter(self.readonly_session,
-                                self.inventory_index_id,
-                                ['role']),
-                self._convert_role
-            )
-
-            item_counter += self.model_action_wrapper(
-                DataAccess.iter(self.readonly_session,
-                                self.inventory_index_id,
-                                GCP_TYPE_LIST,
-                                fetch_category=Categories.dataset_policy),
-                self._convert_dataset_policy
-            )
-
-            item_counter += self.model_action_wrapper(
-                DataAccess.iter(self.readonly_session,
-                                self.inventory_index_id,
-                                GCP_TYPE_LIST,
-                                fetch_category=Categories.gcs_policy),
-                self._convert_gcs_policy
-            )
-
-            item_counter += self.model_action_wrapper(
-                DataAccess.iter(
-                    self.readonly_session,
-                    self.inventory_index_id,
-                    GCP_TYPE_LIST,
-                    fetch_category=Categories.kubernetes_service_config),
-                self._convert_service_config
-            )
-
-            self.model_action_wrapper(
-                DataAccess.iter(self.readonly_session,
-                                self.inventory_index_id,
-                                GSUITE_TYPE_LIST),
-                self._store_gsuite_principal
-            )
-
-            self.model_action_wrapper(
-                DataAccess.iter(self.readonly_session,
-                                self.inventory_index_id,
-                                GCP_TYPE_LIST,
-                                fetch_category=Categories.enabled_apis),
-                self._convert_enabled_apis
-            )
-
-            self.model_action_wrapper(
-                DataAccess.iter(self.readonly_session,
-                                self.inventory_index_id,
-                                MEMBER_TYPE_LIST,
-                                with_parent=True),
-                self._store_gsuite_membership,
-                post_action=self._store_gsuite_membership_post
-            )
-
-            self.model_action_wrapper(
-                DataAccess.iter(self.readonly_session,
-                                self.inventory_index_id,
-                                GROUPS_SETTINGS_LIST),
-                self._store_groups_settings
-            )
-
-            self.dao.denorm_group_in_group(self.session)
+            if self._use_parallel_import():
+                item_counter = self._run_parallel_import()
+            else:
+                item_counter = self._run_serial_import()
 
-            self.model_action_wrapper(
-                DataAccess.iter(self.readonly_session,
-                                self.inventory_index_id,
-                                GCP_TYPE_LIST,
-                                fetch_category=Categories.iam_policy),
-                self._store_iam_policy
-            )
+            if self.number_resources:
+                LOGGER.debug('Numbering the resource hierarchy.')
+                self.dao.number_resources(self.session)
 
-            self.dao.expand_special_members(self.session)
+            if self.access_index:
+                self._build_access_index()
 
         except Exception as e:  # pylint: disable=broad-except
             LOGGER.exception(e)
@@ -395,7 +365,397 @@ class InventoryImporter(object):
             self.session.commit()
             self.session.autocommit = autocommit
             self.session.autoflush = autoflush
-    # pylint: enable=too-many-statements
+
+    def _build_access_index(self):
+        """Materialize the effective access index of the model.
+
+        The explain access queries answer from the index when it is built,
+        and from the model tables otherwise.
+        """
+        LOGGER.info('Building the effective access index.')
+        try:
+            self.dao.build_access_index(self.session)
+        except SQLAlchemyError:
+            LOGGER.exception('Unable to build the effective access index, the '
+                             'access queries will use the model tables.')
+            self.session.rollback()
+
+    def _use_parallel_import(self):
+        """Checks if the model can be imported by multiple workers.
+
+        Returns:
+            bool: True if the parallel import should be used.
+        """
+        if self.import_workers <= 1:
+            return False
+
+        engine = self._session.get_bind()
+        if (engine.dialect.name == 'sqlite' and
+                engine.url.database in (None, '', ':memory:')):
+            LOGGER.warning('Parallel model import is not supported on an '
+                           'in-memory database, importing serially.')
+            return False
+        return True
+
+    def _run_serial_import(self):
+        """Import the inventory one phase after the other on one session.
+
+        Returns:
+            int: Number of items imported.
+        """
+        item_counter = 0
+        LOGGER.debug('Start storing resources into models.')
+        for resource in DataAccess.iter(self.readonly_session,
+                                        self.inventory_index_id,
+                                        GCP_TYPE_LIST):
+            item_counter += 1
+            self._store_resource(resource)
+            if not item_counter % 1000:
+                # Flush database every 1000 resources
+                LOGGER.debug('Flushing model write session: %s',
+                             item_counter)
+                self._flush_session()
+            if not item_counter % 100000:
+                # Commit every 100k resources while iterating
+                # through all the resources.
+                LOGGER.debug('Commiting model write session: %s',
+                             item_counter)
+                self._commit_session()
+        self._commit_session()
+        LOGGER.debug('Finished storing resources into models.')
+
+        item_counter += self._import_roles()
+        item_counter += self._import_dataset_policies()
+        item_counter += self._import_gcs_policies()
+        item_counter += self._import_service_configs()
+        self._import_gsuite()
+        self._import_enabled_apis()
+        self._import_iam_policies()
+        return item_counter
+
+    def _run_parallel_import(self):
+        """Import the inventory with a pool of workers.
+
+        The import runs in three stages:
+
+        1. The resource hierarchy (organizations, folders and projects) is
+           stored and committed on the main session. The remaining resources
+           are then sharded by the subtree they belong to and stored by one
+           worker per shard, while G Suite principals, memberships and
+           groups settings are imported concurrently by another worker.
+        2. Roles and the per-category policies, which only depend on the
+           resources, are imported concurrently.
+        3. IAM policies, which depend on resources, roles and members, are
+           imported on the main session.
+
+        Every worker uses its own write and read-only sessions.
+
+        Returns:
+            int: Number of items imported.
+        """
+        LOGGER.info('Importing model with %s workers.', self.import_workers)
+        item_counter = self._import_resource_hierarchy()
+
+        shard_queues = [Queue(SHARD_QUEUE_SIZE)
+                        for _ in range(self.import_workers)]
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.import_workers + 1) as executor:
+            gsuite_future = executor.submit(
+                self._run_import_unit, 'gsuite', self._import_gsuite)
+            shard_futures = [
+                executor.submit(self._run_import_unit,
+                                'resource shard {}'.format(shard),
+                                self._import_resource_shard,
+                                shard,
+                                shard_queue)
+                for shard, shard_queue in enumerate(shard_queues)]
+            try:
+                self._dispatch_resource_shards(shard_queues, shard_futures)
+            finally:
+                for shard_queue, shard_future in zip(shard_queues,
+                                                     shard_futures):
+                    self._put_in_shard(shard_queue, shard_future, None)
+            for future in shard_futures:
+                item_counter += future.result()
+            gsuite_future.result()
+
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.import_workers) as executor:
+            futures = [
+                executor.submit(self._run_import_unit, name, action)
+                for name, action in [
+                    ('roles', self._import_roles),
+                    ('dataset policies', self._import_dataset_policies),
+                    ('gcs policies', self._import_gcs_policies),
+                    ('service configs', self._import_service_configs),
+                    ('enabled apis', self._import_enabled_apis)]]
+            for future in futures:
+                item_counter += future.result()
+
+        # End the current transaction, so the main session sees all rows
+        # committed by the workers.
+        self._commit_session()
+        self._import_iam_policies()
+        return item_counter
+
+    def _run_import_unit(self, name, action, *args):
+        """Run an import action on new sessions of the current thread.
+
+        Args:
+            name (str): Name of the unit, used for progress reporting.
+            action (func): Import action to run.
+            *args (list): Arguments for the action.
+
+        Returns:
+            int: Number of items imported by the action.
+        """
+        engine = self._session.get_bind()
+        # Objects stay loaded after commit so cached rows, e.g. members,
+        # can be attached to the main session later on.
+        self._local.session = sessionmaker(bind=engine,
+                                           expire_on_commit=False)()
+        self._local.readonly_session = db.create_readonly_session(engine)
+        start_time = time.time()
+        try:
+            count = action(*args)
+            self._commit_session()
+            LOGGER.info('Model import of %s completed, %s items in %.1f '
+                        'seconds.', name, count, time.time() - start_time)
+            return count
+        finally:
+            self._local.session.close()
+            self._local.readonly_session.close()
+            self._local.session = None
+            self._local.readonly_session = None
+
+    def _import_resource_hierarchy(self):
+        """Store the organizations, folders and projects.
+
+        Returns:
+            int: Number of resources imported.
+        """
+        item_counter = self.model_action_wrapper(
+            DataAccess.iter(self.readonly_session,
+                            self.inventory_index_id,
+                            HIERARCHY_TYPE_LIST),
+            self._store_resource)
+        LOGGER.info('Model import of the resource hierarchy completed, %s '
+                    'resources.', item_counter)
+        return item_counter
+
+    @staticmethod
+    def _put_in_shard(shard_queue, shard_future, item):
+        """Put an item in a shard queue, unless the shard worker stopped.
+
+        Args:
+            shard_queue (Queue): The queue of the shard.
+            shard_future (Future): The worker of the shard.
+            item (object): The resource to store, or None to end the shard.
+
+        Returns:
+            bool: False if the worker stopped, e.g. on an error, and the item
+                was not queued.
+        """
+        while True:
+            try:
+                shard_queue.put(item, timeout=SHARD_QUEUE_PUT_TIMEOUT)
+                return True
+            except Full:
+                if shard_future.done():
+                    return False
+
+    def _dispatch_resource_shards(self, shard_queues, shard_futures):
+        """Route all resources below the hierarchy to the shard queues.
+
+        Each organization, folder and project starts a new subtree which is
+        assigned to a shard round robin, every other resource goes to the
+        shard of its parent. Shards receive the resources in inventory id
+        order, so a parent is always stored before its children.
+
+        The dispatch stops when a shard worker stops before the end of its
+        queue, its error is raised by the worker future.
+
+        Args:
+            shard_queues (list): One queue per shard.
+            shard_futures (list): The worker of each shard.
+        """
+        shard_by_id = {}
+        for resource_id in sorted(self.resource_cache):
+            shard_by_id[resource_id] = len(shard_by_id) % len(shard_queues)
+
+        for resource in DataAccess.iter(self.readonly_session,
+                                        self.inventory_index_id,
+                                        GCP_TYPE_LIST):
+            if resource.get_resource_type() in HIERARCHY_TYPE_LIST:
+                continue
+            shard = shard_by_id.get(resource.get_parent_id(), 0)
+            shard_by_id[resource.id] = shard
+            if not self._put_in_shard(shard_queues[shard],
+                                      shard_futures[shard], resource):
+                LOGGER.error('Model import of resource shard %s stopped, '
+                             'stopping the resource dispatch.', shard)
+                return
+
+    def _import_resource_shard(self, shard, shard_queue):
+        """Store the resources routed to a shard.
+
+        Args:
+            shard (int): The shard number.
+            shard_queue (Queue): Resources of the shard, terminated by None.
+
+        Returns:
+            int: Number of resources imported.
+
+        Raises:
+            Exception: The first error raised while storing a resource.
+        """
+        item_counter = 0
+        error = None
+        while True:
+            resource = shard_queue.get()
+            if resource is None:
+                break
+            if error:
+                # Keep draining the queue so the dispatcher never blocks.
+                continue
+            try:
+                self._store_resource(resource)
+            except Exception as e:  # pylint: disable=broad-except
+                error = e
+                continue
+            item_counter += 1
+            if not item_counter % 1000:
+                self._flush_session()
+            if not item_counter % 10000:
+                LOGGER.info('Model import of resource shard %s: %s '
+                            'resources stored.', shard, item_counter)
+            if not item_counter % 100000:
+                self._commit_session()
+        if error:
+            raise error
+        return item_counter
+
+    def _import_roles(self):
+        """Import the roles.
+
+        Returns:
+            int: Number of roles imported.
+        """
+        return self.model_action_wrapper(
+            DataAccess.iter(self.readonly_session,
+                            self.inventory_index_id,
+                            ['role']),
+            self._convert_role
+        )
+
+    def _import_dataset_policies(self):
+        """Import the dataset policies.
+
+        Returns:
+            int: Number of dataset policies imported.
+        """
+        return self.model_action_wrapper(
+            DataAccess.iter(self.readonly_session,
+                            self.inventory_index_id,
+                            GCP_TYPE_LIST,
+                            fetch_category=Categories.dataset_policy),
+            self._convert_dataset_policy
+        )
+
+    def _import_gcs_policies(self):
+        """Import the gcs policies.
+
+        Returns:
+            int: Number of gcs policies imported.
+        """
+        return self.model_action_wrapper(
+            DataAccess.iter(self.readonly_session,
+                            self.inventory_index_id,
+                            GCP_TYPE_LIST,
+                            fetch_category=Categories.gcs_policy),
+            self._convert_gcs_policy
+        )
+
+    def _import_service_configs(self):
+        """Import the Kubernetes service configs.
+
+        Returns:
+            int: Number of service configs imported.
+        """
+        return self.model_action_wrapper(
+            DataAccess.iter(
+                self.readonly_session,
+                self.inventory_index_id,
+                GCP_TYPE_LIST,
+                fetch_category=Categories.kubernetes_service_config),
+            self._convert_service_config
+        )
+
+    def _import_enabled_apis(self):
+        """Import the enabled APIs.
+
+        The count is not part of the model item count.
+
+        Returns:
+            int: Always 0.
+        """
+        self.model_action_wrapper(
+            DataAccess.iter(self.readonly_session,
+                            self.inventory_index_id,
+                            GCP_TYPE_LIST,
+                            fetch_category=Categories.enabled_apis),
+            self._convert_enabled_apis
+        )
+        return 0
+
+    def _import_gsuite(self):
+        """Import G Suite principals, memberships and groups settings.
+
+        The counts are not part of the model item count.
+
+        Returns:
+            int: Always 0.
+        """
+        self.model_action_wrapper(
+            DataAccess.iter(self.readonly_session,
+                            self.inventory_index_id,
+                            GSUITE_TYPE_LIST),
+            self._store_gsuite_principal
+        )
+
+        self.model_action_wrapper(
+            DataAccess.iter(self.readonly_session,
+                            self.inventory_index_id,
+                            MEMBER_TYPE_LIST,
+                            with_parent=True),
+            self._store_gsuite_membership,
+            post_action=self._store_gsuite_membership_post
+        )
+
+        self.model_action_wrapper(
+            DataAccess.iter(self.readonly_session,
+                            self.inventory_index_id,
+                            GROUPS_SETTINGS_LIST),
+            self._store_groups_settings
+        )
+
+        if self.denorm_groups_in_memory:
+            self.dao.denorm_group_in_group_in_memory(self.session)
+        else:
+            self.dao.denorm_group_in_group(self.session)
+        return 0
+
+    def _import_iam_policies(self):
+        """Import the IAM policies and expand the special members."""
+        self.model_action_wrapper(
+            DataAccess.iter(self.readonly_session,
+                            self.inventory_index_id,
+                            GCP_TYPE_LIST,
+                            fetch_category=Categories.iam_policy),
+            self._store_iam_policy
+        )
+
+        self.dao.expand_special_members(self.session)
 
     def model_action_wrapper(self,
                              inventory_iterable,
@@ -467,13 +827,14 @@ class InventoryImporter(object):
         else:
             raise Exception('Unknown gsuite principal: {}'.format(gsuite_type))
 
-        if member not in self.member_cache:
-            m_type, name = member.split('/', 1)
-            self.member_cache[member] = self.dao.TBL_MEMBER(
-                name=member,
-                type=m_type,
-                member_name=name)
-            self.session.add(self.member_cache[member])
+        with self._cache_lock:
+            if member not in self.member_cache:
+                m_type, name = member.split('/', 1)
+                self.member_cache[member] = self.dao.TBL_MEMBER(
+                    name=member,
+                    type=m_type,
+                    member_name=name)
+                self.session.add(self.member_cache[member])
 
     def _store_gsuite_membership_post(self):
         """Flush storing gsuite memberships."""
@@ -521,13 +882,14 @@ class InventoryImporter(object):
         # of this domain, so we might see them for
         # the first time here.
         member = member_name(child)
-        if member not in self.member_cache:
-            m_type, name = member.split('/', 1)
-            self.member_cache[member] = self.dao.TBL_MEMBER(
-                name=member,
-                type=m_type,
-                member_name=name)
-            self.session.add(self.member_cache[member])
+        with self._cache_lock:
+            if member not in self.member_cache:
+                m_type, name = member.split('/', 1)
+                self.member_cache[member] = self.dao.TBL_MEMBER(
+                    name=member,
+                    type=m_type,
+                    member_name=name)
+                self.session.add(self.member_cache[member])
 
         parent_group = group_name(parent)
 
@@ -580,27 +942,8 @@ class InventoryImporter(object):
             db_members = set()
             for member in members:
                 member = member.replace(':', '/', 1).lower()
-
-                # We still might hit external users or groups
-                # that we haven't seen in gsuite.
-                if member in self.member_cache and member not in db_members:
-                    db_members.add(self.member_cache[member])
-                    continue
-
-                if (member not in self.member_cache and
-                        member not in self.member_cache_policies):
-                    try:
-                        # This is the default case, e.g. 'group/foobar'
-                        m_type, name = member.split('/', 1)
-                    except ValueError:
-                        # Special groups like 'allUsers' done specify a type
-                        m_type, name = member, member
-                    self.member_cache_policies[member] = self.dao.TBL_MEMBER(
-                        name=member,
-                        type=m_type,
-                        member_name=name)
-                    self.session.add(self.member_cache_policies[member])
-                db_members.add(self.member_cache_policies[member])
+                with self._cache_lock:
+                    db_members.add(self._get_policy_member(member))
 
             binding_object = self.dao.TBL_BINDING(
                 resource_type_name=policy_type_name,
@@ -609,6 +952,36 @@ class InventoryImporter(object):
             self.session.add(binding_object)
         self._convert_iam_policy(policy)
 
+    def _get_policy_member(self, member):
+        """Get the member of a policy binding, adding it if it is new.
+
+        The caller holds the cache lock.
+
+        Args:
+            member (str): The member, e.g. 'group/foobar'.
+
+        Returns:
+            object: The member row.
+        """
+        # We still might hit external users or groups
+        # that we haven't seen in gsuite.
+        if member in self.member_cache:
+            return self.member_cache[member]
+
+        if member not in self.member_cache_policies:
+            try:
+                # This is the default case, e.g. 'group/foobar'
+                m_type, name = member.split('/', 1)
+            except ValueError:
+                # Special groups like 'allUsers' done specify a type
+                m_type, name = member, member
+            self.member_cache_policies[member] = self.dao.TBL_MEMBER(
+                name=member,
+                type=m_type,
+                member_name=name)
+            self.session.add(self.member_cache_policies[member])
+        return self.member_cache_policies[member]
+
     def _store_resource(self, resource):
         """Store an inventory resource in the database.
 
@@ -711,11 +1084,11 @@ class InventoryImporter(object):
         """
         data = resource.get_resource_data()
         if self._is_root(resource):
-            parent, type_name = None, self._type_name(resource)
+            parent_type_name, type_name = None, self._type_name(resource)
             full_res_name = to_full_resource_name('', type_name)
         else:
-            parent, full_res_name, type_name = self._full_resource_name(
-                resource)
+            parent_type_name, full_res_name, type_name = (
+                self._full_resource_name(resource))
         row = self.dao.TBL_RESOURCE(
             cai_resource_name=resource.get_cai_resource_name(),
             cai_resource_type=resource.get_cai_resource_type(),
@@ -730,7 +1103,7 @@ class InventoryImporter(object):
             # certain cases such as for org policy.
             email=data.get(email_key, '') if isinstance(data, dict) else '',
             data=resource.get_resource_data_raw(),
-            parent=parent)
+            parent_type_name=parent_type_name)
 
         self.session.add(row)
         if cached:
@@ -1043,9 +1416,9 @@ class InventoryImporter(object):
             cloudsqlinstance (object): Cloudsql to store.
         """
         data = cloudsqlinstance.get_resource_data()
-        parent, full_res_name, type_name = self._full_resource_name(
+        parent_type_name, full_res_name, type_name = self._full_resource_name(
             cloudsqlinstance)
-        parent_key = get_resource_id_from_type_name(parent.type_name)
+        parent_key = get_resource_id_from_type_name(parent_type_name)
         resource_identifier = '{}:{}'.format(parent_key,
                                              cloudsqlinstance.get_resource_id())
         type_name = to_type_name(cloudsqlinstance.get_resource_type(),
@@ -1061,7 +1434,7 @@ class InventoryImporter(object):
             display_name=data.get('name', ''),
             email=data.get('email', ''),
             data=cloudsqlinstance.get_resource_data_raw(),
-            parent=parent)
+            parent_type_name=parent_type_name)
 
         self.session.add(resource)
 
@@ -1073,7 +1446,7 @@ class InventoryImporter(object):
         """
         # TODO: Dataset policies should be integrated in the model, not stored
         # as a resource.
-        parent, full_res_name = self._get_parent(dataset_policy)
+        parent_type_name, full_res_name = self._get_parent(dataset_policy)
         policy_type_name = to_type_name(
             dataset_policy.get_category(),
             dataset_policy.get_resource_id())
@@ -1086,7 +1459,7 @@ class InventoryImporter(object):
             name=dataset_policy.get_resource_id(),
             type=dataset_policy.get_category(),
             data=dataset_policy.get_resource_data_raw(),
-            parent=parent)
+            parent_type_name=parent_type_name)
 
         self.session.add(resource)
 
@@ -1096,10 +1469,10 @@ class InventoryImporter(object):
         Args:
             enabled_apis (object): Enabled APIs description to store.
         """
-        parent, full_res_name = self._get_parent(enabled_apis)
+        parent_type_name, full_res_name = self._get_parent(enabled_apis)
         apis_type_name = to_type_name(
             enabled_apis.get_category(),
-            ':'.join(parent.type_name.split('/')))
+            ':'.join(parent_type_name.split('/')))
         apis_res_name = to_full_resource_name(full_res_name, apis_type_name)
         resource = self.dao.TBL_RESOURCE(
             cai_resource_name=enabled_apis.get_cai_resource_name(),
@@ -1109,7 +1482,7 @@ class InventoryImporter(object):
             name=enabled_apis.get_resource_id(),
             type=enabled_apis.get_category(),
             data=enabled_apis.get_resource_data_raw(),
-            parent=parent)
+            parent_type_name=parent_type_name)
 
         self.session.add(resource)
 
@@ -1119,7 +1492,7 @@ class InventoryImporter(object):
         Args:
             gcs_policy (object): Cloud Storage Bucket ACL policy to store.
         """
-        parent, full_res_name = self._get_parent(gcs_policy)
+        parent_type_name, full_res_name = self._get_parent(gcs_policy)
         policy_type_name = to_type_name(
             gcs_policy.get_category(),
             gcs_policy.get_resource_id())
@@ -1132,7 +1505,7 @@ class InventoryImporter(object):
             name=gcs_policy.get_resource_id(),
             type=gcs_policy.get_category(),
             data=gcs_policy.get_resource_data_raw(),
-            parent=parent)
+            parent_type_name=parent_type_name)
 
         self.session.add(resource)
 
@@ -1174,37 +1547,39 @@ class InventoryImporter(object):
         LOGGER.debug('Converting role: %s', role_name)
         LOGGER.debug('role data: %s', data)
 
-        if role_name in self.role_cache:
-            LOGGER.warning('Duplicate role_name: %s', role_name)
-            return
-
         is_custom = not role_name.startswith('roles/')
-        db_permissions = []
-        if 'includedPermissions' not in data:
-            self.model.add_warning(
-                'Role missing permissions: {}'.format(
-                    data.get('name', '<missing name>')))
-        else:
-            for perm_name in data['includedPermissions']:
-                if perm_name not in self.permission_cache:
-                    permission = self.dao.TBL_PERMISSION(name=perm_name)
-                    self.permission_cache[perm_name] = permission
-                    self.session.add(permission)
-                db_permissions.append(self.permission_cache[perm_name])
-
-        dbrole = self.dao.TBL_ROLE(
-            name=role_name,
-            title=data.get('title', ''),
-            stage=data.get('stage', ''),
-            description=data.get('description', ''),
-            custom=is_custom,
-            permissions=db_permissions)
-        self.role_cache[data['name']] = dbrole
+        with self._cache_lock:
+            if role_name in self.role_cache:
+                LOGGER.warning('Duplicate role_name: %s', role_name)
+                return
+
+            db_permissions = []
+            if 'includedPermissions' not in data:
+                self.model.add_warning(
+                    'Role missing permissions: {}'.format(
+                        data.get('name', '<missing name>')))
+            else:
+                for perm_name in data['includedPermissions']:
+                    if perm_name not in self.permission_cache:
+                        permission = self.dao.TBL_PERMISSION(name=perm_name)
+                        self.permission_cache[perm_name] = permission
+                        self.session.add(permission)
+                    db_permissions.append(self.permission_cache[perm_name])
+
+            dbrole = self.dao.TBL_ROLE(
+                name=role_name,
+                title=data.get('title', ''),
+                stage=data.get('stage', ''),
+                description=data.get('description', ''),
+                custom=is_custom,
+                permissions=db_permissions)
+            self.role_cache[data['name']] = dbrole
         self.session.add(dbrole)
         LOGGER.debug('Adding role %s to session', role_name)
 
         if is_custom:
-            parent, full_res_name, type_name = self._full_resource_name(role)
+            parent_type_name, full_res_name, type_name = (
+                self._full_resource_name(role))
             role_resource = self.dao.TBL_RESOURCE(
                 cai_resource_name=role.get_cai_resource_name(),
                 cai_resource_type=role.get_cai_resource_type(),
@@ -1214,7 +1589,7 @@ class InventoryImporter(object):
                 type=role.get_resource_type(),
                 display_name=data.get('title'),
                 data=role.get_resource_data_raw(),
-                parent=parent)
+                parent_type_name=parent_type_name)
 
             self._add_to_cache(role_resource, role.id)
             self.session.add(role_resource)
@@ -1224,8 +1599,11 @@ class InventoryImporter(object):
     def _convert_role_post(self):
         """Executed after all roles were handled. Performs bulk insert."""
 
-        self.session.add_all(list(self.permission_cache.values()))
-        self.session.add_all(list(self.role_cache.values()))
+        with self._cache_lock:
+            permissions = list(self.permission_cache.values())
+            roles = list(self.role_cache.values())
+        self.session.add_all(permissions)
+        self.session.add_all(roles)
 
     def _convert_service_config(self, service_config):
         """Convert Kubernetes Service Config to a database object.
@@ -1233,10 +1611,10 @@ class InventoryImporter(object):
         Args:
             service_config (dict): A Service Config resource to store.
         """
-        parent, full_res_name = self._get_parent(service_config)
+        parent_type_name, full_res_name = self._get_parent(service_config)
         sc_type_name = to_type_name(
             service_config.get_category(),
-            parent.type_name)
+            parent_type_name)
         sc_res_name = to_full_resource_name(full_res_name, sc_type_name)
         resource = self.dao.TBL_RESOURCE(
             cai_resource_name=service_config.get_cai_resource_name(),
@@ -1246,7 +1624,7 @@ class InventoryImporter(object):
             name=service_config.get_resource_id(),
             type=service_config.get_category(),
             data=service_config.get_resource_data_raw(),
-            parent=parent)
+            parent_type_name=parent_type_name)
 
         self.session.add(resource)
 
@@ -1262,38 +1640,43 @@ class InventoryImporter(object):
     def _add_to_cache(self, resource, resource_id):
         """Add a resource to the cache for parent lookup.
 
+        Only the type name and full name are cached, rather than the row
+        object itself, so that children can be written from a different
+        database session than their parent.
+
         Args:
             resource (object): Resource to put in the cache.
             resource_id (int): The database key for the resource.
         """
 
-        full_res_name = resource.full_name
-        self.resource_cache[resource_id] = (resource, full_res_name)
+        self.resource_cache[resource_id] = (resource.type_name,
+                                            resource.full_name)
 
     def _full_resource_name(self, resource):
-        """Returns the parent object, full resource name and type name.
+        """Returns the parent type name, full resource name and type name.
 
         Args:
             resource (object): Resource whose full resource name and parent
             should be returned.
 
         Returns:
-            str: full resource name for the provided resource.
+            tuple: parent type name, full resource name and type name for
+                the provided resource.
         """
 
         type_name = self._type_name(resource)
-        parent, full_res_name = self._get_parent(resource)
+        parent_type_name, full_res_name = self._get_parent(resource)
         full_resource_name = to_full_resource_name(full_res_name, type_name)
-        return parent, full_resource_name, type_name
+        return parent_type_name, full_resource_name, type_name
 
     def _get_parent(self, resource):
-        """Return the parent object for a resource from cache.
+        """Return the parent type name for a resource from cache.
 
         Args:
             resource (object): Resource whose parent to look for.
 
         Returns:
-            tuple: cached object and full resource name
+            tuple: parent type name and full resource name
         """
         parent_id = resource.get_parent_id()
         return self.resource_cache[parent_id]
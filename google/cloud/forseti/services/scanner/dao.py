@@ -19,6 +19,7 @@ from collections import defaultdict
 import hashlib
 import json
 import re
+import threading
 
 from sqlalchemy import BigInteger
 from sqlalchemy import Column
@@ -28,12 +29,14 @@ from sqlalchemy import String
 from sqlalchemy import Text
 from sqlalchemy import and_
 from sqlalchemy import inspect
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.declarative import declarative_base
 
 from google.cloud.forseti.common.data_access import violation_map as vm
 from google.cloud.forseti.common.util import date_time
 from google.cloud.forseti.common.util import logger
 from google.cloud.forseti.common.util.index_state import IndexState
+from google.cloud.forseti.services.dao import keyset_query
 
 LOGGER = logger.get_logger(__name__)
 BASE = declarative_base()
@@ -41,6 +44,14 @@ CURRENT_SCHEMA = 1
 SUCCESS_STATES = [IndexState.SUCCESS, IndexState.PARTIAL_SUCCESS]
 CV_VIOLATION_PATTERN = re.compile('^cv', re.I)
 
+# Violations are inserted in batches of at most this many rows or bytes.
+VIOLATION_BATCH_MAX_ROWS = 1000
+VIOLATION_BATCH_MAX_BYTES = 8 * 1024 * 1024
+# Approximate per row size of the non text columns and statement syntax.
+VIOLATION_ROW_OVERHEAD_BYTES = 256
+# Violations are read in blocks of this many rows by iter().
+VIOLATION_READ_BLOCK_SIZE = 1000
+
 
 class ScannerIndex(BASE):
     """Represents a scanner run."""
@@ -218,41 +229,55 @@ class ViolationAccess(object):
             session (Session): SQLAlchemy session object.
         """
         self.session = session
+        # Serializes the use of the session by concurrently running scanners,
+        # create() takes it for each batch it inserts.
+        self.lock = threading.RLock()
 
     def create(self, violations, scanner_index_id):
         """Save violations to the db table.
 
+        Violations are consumed lazily and inserted in batches with
+        executemany, so memory usage does not grow with the number of
+        violations. The lock is only held while a batch is inserted, so
+        other scanners can use the session while the violations are
+        produced.
+
         Args:
-            violations (list): A list of violations.
+            violations (iterable): The violations, a list or a generator.
             scanner_index_id (int): id of the `ScannerIndex` row for this
                 scanner run.
+
+        Returns:
+            int: The number of violations saved.
         """
         created_at_datetime = date_time.get_utc_now_datetime()
+        with self.lock:
+            max_batch_bytes = _get_max_batch_bytes(self.session)
+        insert = Violation.__table__.insert()
+
+        violation_count = 0
+        batch = []
+        batch_bytes = 0
         for violation in violations:
-            violation_hash = _create_violation_hash(
-                violation.get('full_name', ''),
-                violation.get('resource_data', ''),
-                violation.get('violation_data', ''),
-                violation.get('rule_name', '')
-            )
-
-            violation = Violation(
-                created_at_datetime=created_at_datetime,
-                full_name=violation.get('full_name'),
-                resource_data=violation.get('resource_data'),
-                resource_name=violation.get('resource_name'),
-                resource_id=violation.get('resource_id'),
-                resource_type=violation.get('resource_type'),
-                rule_index=violation.get('rule_index'),
-                rule_name=violation.get('rule_name'),
-                scanner_index_id=scanner_index_id,
-                violation_data=json.dumps(
-                    violation.get('violation_data'), sort_keys=True),
-                violation_hash=violation_hash,
-                violation_message=violation.get('violation_message', ''),
-                violation_type=violation.get('violation_type')
-            )
-            self.session.add(violation)
+            row = _create_violation_row(
+                violation, scanner_index_id, created_at_datetime)
+            batch.append(row)
+            batch_bytes += _estimate_row_size(row)
+            if (len(batch) >= VIOLATION_BATCH_MAX_ROWS or
+                    batch_bytes >= max_batch_bytes):
+                with self.lock:
+                    self.session.execute(insert, batch)
+                violation_count += len(batch)
+                batch = []
+                batch_bytes = 0
+        if batch:
+            with self.lock:
+                self.session.execute(insert, batch)
+            violation_count += len(batch)
+
+        LOGGER.debug('Saved %s violations for scanner index %s.',
+                     violation_count, scanner_index_id)
+        return violation_count
 
     def list(self, inv_index_id=None, scanner_index_id=None):
         """List all violations from the db table.
@@ -307,6 +332,29 @@ class ViolationAccess(object):
             violations.append(violation)
         return violations
 
+    def iter(self, scanner_index_id, block_size=VIOLATION_READ_BLOCK_SIZE):
+        """Iterate over the violations of a successful scanner run.
+
+        The violations are read in blocks ordered by id, so at most a block
+        of violations is held in memory.
+
+        Args:
+            scanner_index_id (int): Id of the scanner index.
+            block_size (int): The number of violations read per query.
+
+        Yields:
+            Violation: The violations, ordered by id.
+        """
+        query = (
+            self.session.query(Violation)
+            .join(ScannerIndex, Violation.scanner_index_id == ScannerIndex.id)
+            .filter(and_(
+                ScannerIndex.scanner_status.in_(SUCCESS_STATES),
+                ScannerIndex.id == scanner_index_id)))
+        for violation in keyset_query(query, Violation.id,
+                                      block_size=block_size):
+            yield violation
+
 
 # pylint: disable=invalid-name
 def convert_sqlalchemy_object_to_dict(sqlalchemy_obj):
@@ -323,6 +371,38 @@ def convert_sqlalchemy_object_to_dict(sqlalchemy_obj):
             for c in inspect(sqlalchemy_obj).mapper.column_attrs}
 
 
+def decode_violation(v_data):
+    """Decode the json data of a violation and get its resource.
+
+    Args:
+        v_data (dict): The violation data, the violation_data and
+            resource_data are decoded in place.
+
+    Returns:
+        str: The violation resource, e.g. iam_policy_violations, or None if
+            the violation type is not mapped to a resource.
+    """
+    try:
+        v_data['violation_data'] = json.loads(v_data['violation_data'])
+    except ValueError:
+        LOGGER.warning('Invalid violation data, unable to parse json '
+                       'for %s',
+                       v_data['violation_data'])
+
+    # resource_data can be regular python string
+    try:
+        v_data['resource_data'] = json.loads(v_data['resource_data'])
+    except ValueError:
+        v_data['resource_data'] = json.loads(
+            json.dumps(v_data['resource_data']))
+
+    violation_type = vm.VIOLATION_RESOURCES.get(v_data['violation_type'])
+    if not violation_type:
+        if bool(CV_VIOLATION_PATTERN.match(v_data['violation_type'])):
+            violation_type = vm.CV_VIOLATION_TYPE
+    return violation_type
+
+
 def map_by_resource(violation_rows):
     """Create a map of violation types to violations of that resource.
 
@@ -338,33 +418,102 @@ def map_by_resource(violation_rows):
     v_by_type = defaultdict(list)
 
     for v_data in violation_rows:
-
-        try:
-            v_data['violation_data'] = json.loads(v_data['violation_data'])
-        except ValueError:
-            LOGGER.warning('Invalid violation data, unable to parse json '
-                           'for %s',
-                           v_data['violation_data'])
-
-        # resource_data can be regular python string
-        try:
-            v_data['resource_data'] = json.loads(v_data['resource_data'])
-        except ValueError:
-            v_data['resource_data'] = json.loads(
-                json.dumps(v_data['resource_data']))
-
-        violation_type = vm.VIOLATION_RESOURCES.get(v_data['violation_type'])
-        if not violation_type:
-            if bool(CV_VIOLATION_PATTERN.match(v_data['violation_type'])):
-                violation_type = vm.CV_VIOLATION_TYPE
-
+        violation_type = decode_violation(v_data)
         if violation_type:
             v_by_type[violation_type].append(v_data)
 
     return dict(v_by_type)
 
 
-def _create_violation_hash(violation_full_name, resource_data, violation_data, rule_name):
+def _get_max_batch_bytes(session):
+    """Get the maximum size of a batch of violation rows.
+
+    MySQL rejects statements larger than max_allowed_packet, so batches are
+    kept well below it. Other dialects use the default limit.
+
+    Args:
+        session (object): session object to work on.
+
+    Returns:
+        int: Maximum number of bytes of violation data in one batch.
+    """
+    if session.bind.dialect.name != 'mysql':
+        return VIOLATION_BATCH_MAX_BYTES
+    try:
+        max_allowed_packet = session.execute(
+            'SELECT @@max_allowed_packet').scalar()
+    except SQLAlchemyError:
+        LOGGER.exception('Unable to read max_allowed_packet, using a '
+                         'violation batch size of %s bytes.',
+                         VIOLATION_BATCH_MAX_BYTES)
+        return VIOLATION_BATCH_MAX_BYTES
+    return min(VIOLATION_BATCH_MAX_BYTES, int(max_allowed_packet) // 2)
+
+
+def _estimate_row_size(row):
+    """Estimate the size of a violation row in an insert statement.
+
+    Args:
+        row (dict): The violation row.
+
+    Returns:
+        int: Approximate number of bytes of the row.
+    """
+    return sum(len(value) for value in row.values()
+               if isinstance(value, str)) + VIOLATION_ROW_OVERHEAD_BYTES
+
+
+def _create_violation_row(violation, scanner_index_id, created_at_datetime):
+    """Create the row of a violation for a bulk insert.
+
+    The violation data is serialized once, the result is stored and reused
+    for the violation hash.
+
+    Args:
+        violation (dict): The violation.
+        scanner_index_id (int): id of the `ScannerIndex` row for this
+            scanner run.
+        created_at_datetime (datetime): The creation time of the row.
+
+    Returns:
+        dict: The values of the violations table columns.
+    """
+    violation_data = json.dumps(
+        violation.get('violation_data'), sort_keys=True)
+    # The hash of a violation without violation data is computed over an
+    # empty string rather than None, this keeps existing hashes stable.
+    if 'violation_data' in violation:
+        hashed_violation_data = violation_data
+    else:
+        hashed_violation_data = json.dumps('')
+
+    violation_hash = _create_violation_hash(
+        violation.get('full_name', ''),
+        violation.get('resource_data', ''),
+        violation.get('violation_data', ''),
+        violation.get('rule_name', ''),
+        violation_data_json=hashed_violation_data
+    )
+
+    return {
+        'created_at_datetime': created_at_datetime,
+        'full_name': violation.get('full_name'),
+        'resource_data': violation.get('resource_data'),
+        'resource_name': violation.get('resource_name'),
+        'resource_id': violation.get('resource_id'),
+        'resource_type': violation.get('resource_type'),
+        'rule_index': violation.get('rule_index'),
+        'rule_name': violation.get('rule_name'),
+        'scanner_index_id': scanner_index_id,
+        'violation_data': violation_data,
+        'violation_hash': violation_hash,
+        'violation_message': violation.get('violation_message', ''),
+        'violation_type': violation.get('violation_type'),
+    }
+
+
+def _create_violation_hash(violation_full_name, resource_data, violation_data,
+                           rule_name, violation_data_json=None):
     """Create a hash of violation data.
 
     Args:
@@ -372,6 +521,8 @@ def _create_violation_hash(violation_full_name, resource_data, violation_data, r
         resource_data (str): The inventory data.
         violation_data (dict): A violation.
         rule_name (str): Rule or constraint name.
+        violation_data_json (str): The violation data already serialized
+            with sorted keys, used instead of serializing violation_data.
 
     Returns:
         str: The resulting hex digest or '' if we can't successfully create
@@ -390,11 +541,13 @@ def _create_violation_hash(violation_full_name, resource_data, violation_data, r
         return ''
 
     try:
+        if violation_data_json is None:
+            violation_data_json = json.dumps(violation_data, sort_keys=True)
         # Group resources do not have full name.  Issue #1072
         violation_hash.update(
             json.dumps(violation_full_name).encode() +
             json.dumps(resource_data, sort_keys=True).encode() +
-            json.dumps(violation_data, sort_keys=True).encode() +
+            violation_data_json.encode() +
             json.dumps(rule_name).encode()
         )
     except TypeError:
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# Copyright 2020 The Forseti Security Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark building the API service objects with the discovery cache.
+
+Builds the service object of the default version of the public supported
+APIs:
+    * without cache, fetching the discovery documents like before,
+    * with an empty cache, which fetches and writes the documents,
+    * with the on disk cache only, like a new server, CLI or scanner process,
+    * with the process wide cache.
+
+Usage:
+    python scripts/benchmarks/discovery_cache_benchmark.py \\
+        --apis compute storage iam
+
+Requires network access to the discovery service.
+"""
+
+from __future__ import print_function
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from google.auth import credentials as google_credentials
+
+from google.cloud.forseti.common.gcp_api import _base_repository
+from google.cloud.forseti.common.gcp_api import _discovery_cache
+from google.cloud.forseti.common.gcp_api import _supported_apis
+
+
+def clear_process_caches():
+    """Drop the in memory documents and service objects."""
+    # pylint: disable=protected-access
+    _discovery_cache._CACHES.clear()
+    _base_repository._SERVICE_APIS.clear()
+    # pylint: enable=protected-access
+
+
+def build_services(credentials, apis, cache_discovery):
+    """Build the service objects of the APIs.
+
+    Args:
+        credentials (Credentials): The credentials of the services.
+        apis (list): The (API name, version) pairs.
+        cache_discovery (bool): Whether to use the discovery cache.
+
+    Returns:
+        float: The time in seconds to build the services.
+    """
+    start = time.time()
+    for api_name, version in apis:
+        # pylint: disable=protected-access
+        _base_repository._get_service_api(
+            credentials, api_name, version, False,
+            cache_discovery=cache_discovery)
+    return time.time() - start
+
+
+def main():
+    """Run the benchmark."""
+    public_apis = sorted(
+        name for name, api in _supported_apis.SUPPORTED_APIS.items()
+        if not api.get('is_private_api'))
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--apis', nargs='+', default=public_apis,
+                        help='The APIs to build, defaults to the public '
+                             'supported APIs.')
+    args = parser.parse_args()
+
+    apis = [(name, _supported_apis.SUPPORTED_APIS[name]['default_version'])
+            for name in args.apis]
+    credentials = google_credentials.AnonymousCredentials()
+    cache_dir = tempfile.mkdtemp(prefix='forseti-discovery-bench-')
+    os.environ[_discovery_cache.CACHE_DIR_ENVIRONMENT_VAR] = cache_dir
+    try:
+        clear_process_caches()
+        print('Building {} APIs: {}'.format(len(apis), ', '.join(args.apis)))
+        uncached = build_services(credentials, apis, False)
+        print('Without cache:      {:.2f}s'.format(uncached))
+        empty = build_services(credentials, apis, True)
+        print('Empty cache:        {:.2f}s'.format(empty))
+        clear_process_caches()
+        on_disk = build_services(credentials, apis, True)
+        print('On disk cache:      {:.2f}s, speedup: {:.1f}x'.format(
+            on_disk, uncached / max(on_disk, 1e-6)))
+        in_process = build_services(credentials, apis, True)
+        print('Process wide cache: {:.4f}s, speedup: {:.1f}x'.format(
+            in_process, uncached / max(in_process, 1e-6)))
+    finally:
+        shutil.rmtree(cache_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,287 @@
+#!/usr/bin/env python
+# Copyright 2020 The Forseti Security Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark the IAM rule book evaluation.
+
+Compares IamRuleBook.find_violations, which uses the compiled rule index and
+member matchers, with a reference evaluation walking the ancestors of every
+policy and matching every member, on a synthetic hierarchy and rule book, and
+checks both find the same violations.
+
+Usage:
+    python scripts/benchmarks/iam_rules_benchmark.py \\
+        --policies 500000 --folders 200 --rules 50
+"""
+
+from __future__ import print_function
+
+import argparse
+import collections
+import itertools
+import random
+import time
+
+from google.cloud.forseti.common.gcp_type import iam_policy
+from google.cloud.forseti.common.gcp_type import resource_util
+from google.cloud.forseti.common.util import relationship
+from google.cloud.forseti.scanner.audit import iam_rules_engine
+from google.cloud.forseti.scanner.audit import rules as scanner_rules
+
+FakePolicy = collections.namedtuple('FakePolicy', ['full_name'])
+
+ROLES = ['roles/owner', 'roles/editor', 'roles/viewer',
+         'roles/storage.admin', 'roles/compute.admin', 'roles/iam.admin']
+DOMAINS = ['company.com', 'partner.com', 'gmail.com']
+
+
+def generate_rule_defs(folder_count, rule_count, seed):
+    """Generate the rule definitions of the benchmark rule book.
+
+    Args:
+        folder_count (int): Number of folders in the hierarchy.
+        rule_count (int): Number of rules in addition to the base rules.
+        seed (int): Random seed.
+
+    Returns:
+        dict: The rule definitions.
+    """
+    rand = random.Random(seed)
+    rules = [
+        {'name': 'org whitelist', 'mode': 'whitelist',
+         'resource': [{'type': 'organization', 'applies_to': 'children',
+                       'resource_ids': ['1']}],
+         'inherit_from_parents': True,
+         'bindings': [{'role': 'roles/*',
+                       'members': ['user:*@company.com',
+                                   'serviceAccount:*@*.gserviceaccount.com',
+                                   'group:*@company.com',
+                                   'domain:company.com']}]},
+        {'name': 'no public access', 'mode': 'blacklist',
+         'resource': [{'type': 'project', 'applies_to': 'self',
+                       'resource_ids': ['*']}],
+         'inherit_from_parents': True,
+         'bindings': [{'role': 'roles/*',
+                       'members': ['allUsers', 'allAuthenticatedUsers',
+                                   'user:*@gmail.com']}]},
+    ]
+    for index in range(rule_count):
+        mode = rand.choice(['whitelist', 'blacklist', 'required'])
+        resource_type = rand.choice(['folder', 'project'])
+        if resource_type == 'folder':
+            resource_ids = ['f{}'.format(rand.randrange(folder_count))]
+        else:
+            resource_ids = ['p{}'.format(rand.randrange(10000))]
+        members = ['user:u{}@{}'.format(rand.randrange(100),
+                                        rand.choice(DOMAINS))
+                   for _ in range(rand.randint(1, 5))]
+        if mode != 'required':
+            members.append('user:admin*@company.com')
+        rules.append(
+            {'name': 'rule {}'.format(index), 'mode': mode,
+             'resource': [{'type': resource_type,
+                           'applies_to': rand.choice(
+                               ['self', 'children', 'self_and_children']),
+                           'resource_ids': resource_ids}],
+             'inherit_from_parents': rand.random() < 0.8,
+             'bindings': [{'role': rand.choice(ROLES + ['roles/*']),
+                           'members': members}]})
+    return {'rules': rules}
+
+
+def generate_policies(policy_count, folder_count, seed):
+    """Generate project IAM policies.
+
+    Args:
+        policy_count (int): Number of policies.
+        folder_count (int): Number of folders in the hierarchy.
+        seed (int): Random seed.
+
+    Yields:
+        tuple: The project, the policy and the policy bindings.
+    """
+    rand = random.Random(seed)
+    for index in range(policy_count):
+        project_id = 'p{}'.format(index)
+        folder_id = 'f{}'.format(rand.randrange(folder_count))
+        full_name = 'organization/1/folder/{}/project/{}/iam_policy/{}/'.format(
+            folder_id, project_id, project_id)
+        bindings = []
+        for role in rand.sample(ROLES, rand.randint(1, 4)):
+            members = ['user:u{}@{}'.format(rand.randrange(1000),
+                                            rand.choice(DOMAINS))
+                       for _ in range(rand.randint(1, 6))]
+            if rand.random() < 0.1:
+                members.append('serviceAccount:sa{}@{}.iam.gserviceaccount'
+                               '.com'.format(index, project_id))
+            if rand.random() < 0.01:
+                members.append('allUsers')
+            bindings.append(iam_policy.IamPolicyBinding.create_from(
+                {'role': role, 'members': members}))
+        yield (resource_util.create_resource(project_id, 'project'),
+               FakePolicy(full_name), bindings)
+
+
+def reference_find_violations(rule_book, resource, policy, policy_bindings):
+    """Find violations by walking the ancestors and matching every member.
+
+    Args:
+        rule_book (IamRuleBook): The rule book.
+        resource (Resource): The resource the policy belongs to.
+        policy (FakePolicy): The policy.
+        policy_bindings (list): The IamPolicyBindings of the policy.
+
+    Returns:
+        list: The violations.
+    """
+    violations = []
+    for curr_resource in relationship.find_ancestors(resource,
+                                                     policy.full_name):
+        wildcard_resource = resource_util.create_resource(
+            resource_id='*', resource_type=curr_resource.type)
+        resource_rules = [
+            rule_book.resource_rules_map[(candidate, applies_to)]
+            for candidate in (curr_resource, wildcard_resource)
+            for applies_to in scanner_rules.RuleAppliesTo.apply_types
+            if (candidate, applies_to) in rule_book.resource_rules_map]
+
+        inherit_from_parents = None
+        for resource_rule in resource_rules:
+            applies_to = resource_rule.applies_to
+            if ((applies_to == scanner_rules.RuleAppliesTo.SELF and
+                 resource != curr_resource) or
+                    (applies_to == scanner_rules.RuleAppliesTo.CHILDREN and
+                     resource == curr_resource)):
+                continue
+            for rule in resource_rule.rules:
+                violations.extend(_reference_mismatches(
+                    resource, rule, policy_bindings))
+            inherit_from_parents = resource_rule.inherit_from_parents
+
+        if not inherit_from_parents and inherit_from_parents is not None:
+            break
+    return violations
+
+
+def _reference_mismatches(resource, rule, policy_bindings):
+    """Find the violations of one rule, matching every member.
+
+    Args:
+        resource (Resource): The resource the policy belongs to.
+        rule (Rule): The rule.
+        policy_bindings (list): The IamPolicyBindings of the policy.
+
+    Returns:
+        list: The violations.
+    """
+    # pylint: disable=protected-access
+    check = {
+        scanner_rules.RuleMode.WHITELIST:
+            iam_rules_engine._check_whitelist_members,
+        scanner_rules.RuleMode.BLACKLIST:
+            iam_rules_engine._check_blacklist_members,
+        scanner_rules.RuleMode.REQUIRED:
+            iam_rules_engine._check_required_members,
+    }[rule.mode]
+    # pylint: enable=protected-access
+
+    def _violation(role, members):
+        return scanner_rules.RuleViolation(
+            resource_type=resource.type, resource_id=resource.id,
+            full_name=resource.full_name, rule_name=rule.rule_name,
+            rule_index=rule.rule_index,
+            violation_type=iam_rules_engine.VIOLATION_TYPE, role=role,
+            members=tuple(members), resource_data=resource.data)
+
+    if rule.mode != scanner_rules.RuleMode.REQUIRED:
+        return [_violation(policy_binding.role_name, members)
+                for policy_binding in policy_bindings
+                for rule_binding in rule.bindings
+                if rule_binding.role_pattern.match(policy_binding.role_name)
+                for members in [check(rule_members=rule_binding.members,
+                                      policy_members=policy_binding.members)]
+                if members]
+
+    found_role = False
+    violating_bindings = {}
+    for rule_binding in rule.bindings:
+        for policy_binding in policy_bindings:
+            if rule_binding.role_pattern.match(policy_binding.role_name):
+                found_role = True
+                members = check(rule_members=rule_binding.members,
+                                policy_members=policy_binding.members)
+                if members:
+                    violating_bindings[rule_binding.role_name] = members
+    if not found_role:
+        violating_bindings = {b.role_name: b.members for b in rule.bindings}
+    return [_violation(role, members)
+            for role, members in violating_bindings.items()]
+
+
+def evaluate(find_violations, policies):
+    """Evaluate all policies.
+
+    Args:
+        find_violations (function): Finds the violations of one policy.
+        policies (list): The policies to evaluate.
+
+    Returns:
+        tuple: The violations, as a Counter, and the time taken.
+    """
+    start = time.time()
+    violations = collections.Counter(itertools.chain.from_iterable(
+        find_violations(resource, policy, bindings)
+        for resource, policy, bindings in policies))
+    return violations, time.time() - start
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--policies', type=int, default=500000,
+                        help='Number of project IAM policies.')
+    parser.add_argument('--folders', type=int, default=200,
+                        help='Number of folders in the hierarchy.')
+    parser.add_argument('--rules', type=int, default=50,
+                        help='Number of generated rules.')
+    parser.add_argument('--seed', type=int, default=1,
+                        help='Random seed.')
+    parser.add_argument('--skip-reference', action='store_true',
+                        help='Only run the compiled rule book.')
+    args = parser.parse_args()
+
+    rule_book = iam_rules_engine.IamRuleBook(
+        {}, generate_rule_defs(args.folders, args.rules, args.seed))
+    policies = list(generate_policies(args.policies, args.folders, args.seed))
+    print('Policies: {}, rules: {}'.format(len(policies), args.rules + 2))
+
+    compiled, compiled_seconds = evaluate(rule_book.find_violations, policies)
+    print('Compiled rule book: {} violations in {:.2f}s'.format(
+        sum(compiled.values()), compiled_seconds))
+
+    if not args.skip_reference:
+        reference, reference_seconds = evaluate(
+            lambda *args: reference_find_violations(rule_book, *args),
+            policies)
+        print('Reference evaluation: {} violations in {:.2f}s'.format(
+            sum(reference.values()), reference_seconds))
+        if reference != compiled:
+            raise SystemExit('Violations differ: {} vs {}'.format(
+                sum(reference.values()), sum(compiled.values())))
+        print('Violations are identical, speedup: {:.1f}x'.format(
+            reference_seconds / max(compiled_seconds, 1e-6)))
+
+
+if __name__ == '__main__':
+    main()
@@ -34,7 +34,6 @@ NAMESPACE_PACKAGES = [
 
 REQUIRED_PACKAGES = [
     # Installation related.
-    'anytree==2.4.3',
     'google-api-python-client==1.7.10',
     'google-auth==1.6.3',
     'google-auth-httplib2==0.0.3',
@@ -45,7 +44,6 @@ REQUIRED_PACKAGES = [
     'pyyaml==4.2b4',
     'python-graph-core==1.8.2',
     'python-dateutil==2.7.5',
-    'ratelimiter==1.2.0.post0',
     'retrying==1.3.3',
     'requests[security]==2.21.0',
     'sendgrid==5.6.0',
@@ -72,6 +70,9 @@ OPTIONAL_PACKAGES = {
     'mailjet': [
         'mailjet-rest==1.3.3'
     ],
+    'async_http': [
+        'httpx[http2]==0.18.2'
+    ],
     'endtoend_tests': [
         'google-cloud-storage==1.25.0',
         'pytest==5.3.3'
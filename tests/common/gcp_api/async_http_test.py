@@ -0,0 +1,96 @@
+# Copyright 2020 The Forseti Security Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests the async HTTP transport."""
+import asyncio
+import collections
+import unittest
+import unittest.mock as mock
+
+from googleapiclient import errors
+from googleapiclient import http
+from googleapiclient import model
+
+from tests import unittest_utils
+from google.cloud.forseti.common.gcp_api import _async_http
+
+FakeResponse = collections.namedtuple(
+    'FakeResponse', ['status_code', 'headers', 'content'])
+
+
+class FakeClient(object):
+    """Client returning canned responses."""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    async def request(self, method, url, content=None, headers=None):
+        self.requests.append((method, url, content, dict(headers)))
+        return self.responses.pop(0)
+
+
+class AsyncHttpTest(unittest_utils.ForsetiTestCase):
+    """Test the async HTTP transport."""
+
+    def setUp(self):
+        """Set up."""
+        self.credentials = mock.Mock(valid=True)
+        self.credentials.apply.side_effect = (
+            lambda headers: headers.update(authorization='Bearer token'))
+        self.request = http.HttpRequest(
+            None, model.JsonModel().response,
+            'https://www.googleapis.com/fake/v1/projects/p', method='GET',
+            headers={'accept': 'application/json'})
+
+    def send(self, responses, num_retries=0):
+        """Send the request with a fake client."""
+        client = FakeClient(responses)
+        with mock.patch.object(_async_http, 'get_client',
+                               return_value=client), \
+                mock.patch.object(_async_http.asyncio, 'sleep',
+                                  side_effect=self.no_sleep):
+            result = asyncio.get_event_loop().run_until_complete(
+                _async_http.send(self.request, self.credentials,
+                                 num_retries))
+        return result, client.requests
+
+    @staticmethod
+    async def no_sleep(_):
+        """Skip the backoff."""
+
+    def test_send(self):
+        """The request is authorized and the response deserialized."""
+        result, requests = self.send(
+            [FakeResponse(200, {}, b'{"projectId": "p"}')])
+        self.assertEqual({'projectId': 'p'}, result)
+        method, url, _, headers = requests[0]
+        self.assertEqual(('GET', self.request.uri), (method, url))
+        self.assertEqual('Bearer token', headers['authorization'])
+
+    def test_send_retries_server_errors(self):
+        """Server errors are retried, client errors raise HttpError."""
+        result, requests = self.send(
+            [FakeResponse(503, {}, b''), FakeResponse(200, {}, b'{}')],
+            num_retries=1)
+        self.assertEqual({}, result)
+        self.assertEqual(2, len(requests))
+
+        with self.assertRaises(errors.HttpError) as ctx:
+            self.send([FakeResponse(404, {}, b'{}')], num_retries=1)
+        self.assertEqual(404, ctx.exception.resp.status)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -14,25 +14,78 @@
 
 """Tests the base repository classes."""
 from builtins import range
+import asyncio
 import datetime
 import threading
 import unittest
 from googleapiclient import discovery
+from googleapiclient import errors
 from googleapiclient import http
+import google_auth_httplib2
+import httplib2
 import unittest.mock as mock
 import google.auth
 from google.oauth2 import credentials
 from google.oauth2 import service_account
 
 from tests import unittest_utils
+from tests.common.gcp_api.test_data import http_mocks
 from google.cloud import forseti as forseti_security
 from google.cloud.forseti.common.gcp_api import _base_repository as base
 from google.cloud.forseti.common.gcp_api import _supported_apis
+from google.cloud.forseti.common.util import http_helpers
+from google.cloud.forseti.common.util import page_prefetcher
+from google.cloud.forseti.common.util import token_bucket
+
+
+FAKE_DISCOVERY_DOCUMENT = {
+    'kind': 'discovery#restDescription',
+    'discoveryVersion': 'v1',
+    'name': 'fake',
+    'version': 'v1',
+    'rootUrl': 'https://fake.googleapis.com/',
+    'servicePath': 'fake/v1/',
+    'batchPath': 'batch',
+    'resources': {
+        'items': {
+            'methods': {
+                'get': {
+                    'id': 'fake.items.get',
+                    'path': 'items/{item}',
+                    'httpMethod': 'GET',
+                    'parameters': {
+                        'item': {'type': 'string', 'required': True,
+                                 'location': 'path'}},
+                    'parameterOrder': ['item'],
+                    'response': {'$ref': 'Item'}}}}},
+    'schemas': {
+        'Item': {'id': 'Item', 'type': 'object',
+                 'properties': {'id': {'type': 'string'}}}}}
+
+FAKE_BATCH_RESPONSE = '''--batch_foobar
+Content-Type: application/http
+Content-Transfer-Encoding: binary
+Content-ID: <response-batch + 0>
+
+HTTP/1.1 200 OK
+Content-Type: application/json\r\n\r\n{"id": "i1"}
+--batch_foobar
+Content-Type: application/http
+Content-Transfer-Encoding: binary
+Content-ID: <response-batch + 1>
+
+HTTP/1.1 200 OK
+Content-Type: application/json\r\n\r\n{"id": "i2"}
+--batch_foobar--'''
 
 
 class BaseRepositoryTest(unittest_utils.ForsetiTestCase):
     """Test the Base Repository methods."""
 
+    def setUp(self):
+        """Drop the service objects built by the previous tests."""
+        base._SERVICE_APIS.clear()
+
     def get_test_credential(self):
         access_token = 'foo'
         client_id = 'some_client_id'
@@ -217,6 +270,23 @@ class BaseRepositoryTest(unittest_utils.ForsetiTestCase):
         self.assertEqual(repo_client.gcp_services['v1'], repo.gcp_service)
         self.assertNotEqual(repo_client.gcp_services['v2'], repo.gcp_service)
 
+    @mock.patch.object(discovery, 'build', autospec=True)
+    def test_init_repository_prefetch_pages(self, mock_discovery_build):
+        """Verify the repositories prefetch the pages of their client."""
+
+        class ZooRepository(base.GCPRepository):
+
+            def __init__(self, **kwargs):
+                super(ZooRepository, self).__init__(component='a', **kwargs)
+
+        mock_discovery_build.return_value = mock.Mock()
+        repo_client = base.BaseRepositoryClient(
+            'zoo', credentials=mock.MagicMock(), versions=['v1'],
+            prefetch_pages=3)
+
+        repo = repo_client._init_repository(ZooRepository)
+        self.assertEqual(3, repo._prefetch_pages)
+
     def test_multiple_threads_unique_http_objects(self):
         """Validate that each thread gets its unique http object.
 
@@ -291,6 +361,168 @@ class BaseRepositoryTest(unittest_utils.ForsetiTestCase):
 
         self.assertEqual(http_objects[0], http_objects[1])
 
+    def get_paged_repository(self, pages, prefetch_pages=0):
+        """Build a repository listing pages of fake responses."""
+        gcp_service_mock = mock.Mock()
+        repo = base.GCPRepository(
+            gcp_service=gcp_service_mock,
+            credentials=mock.Mock(spec=credentials.Credentials),
+            component='fake_component',
+            prefetch_pages=prefetch_pages)
+        component = gcp_service_mock.fake_component.return_value
+        component.list.side_effect = lambda **kwargs: 0
+        component.list_next.side_effect = (
+            lambda request, response: (
+                request + 1 if request + 1 < len(pages) else None))
+        repo._execute = mock.Mock(side_effect=lambda request: pages[request])
+        return repo
+
+    def test_execute_paged_query_async(self):
+        """Async paged queries yield the same pages as the sync queries."""
+        pages = [{'items': [1]}, {'items': [2]}, {'items': [3]}]
+        repo = self.get_paged_repository(pages)
+
+        async def list_pages():
+            return [page async for page in
+                    repo.execute_paged_query_async('list', {'project': 'p'})]
+
+        with mock.patch.object(base._async_http, 'HTTPX_IMPORTED', False):
+            results = asyncio.get_event_loop().run_until_complete(
+                list_pages())
+        self.assertEqual(pages, results)
+        self.assertEqual(pages, list(
+            repo.execute_paged_query('list', {'project': 'p'})))
+
+    @mock.patch.object(base.time, 'sleep')
+    def test_execute_batch_query_retries_failed_calls(self, mock_sleep):
+        """Only the calls failing with retriable errors are sent again."""
+        server_error = errors.HttpError(httplib2.Response({'status': '503'}),
+                                        b'')
+        not_found = errors.HttpError(httplib2.Response({'status': '404'}),
+                                     b'')
+        # resource -> errors of the successive calls.
+        failures = {'r1': [server_error], 'r2': [not_found]}
+        batches = []
+
+        class FakeBatch(object):
+            def __init__(self, callback):
+                self.callback = callback
+                self.calls = []
+
+            def add(self, request, request_id):
+                self.calls.append((request, request_id))
+
+            def execute(self, http):
+                del http
+                batches.append([request for request, _ in self.calls])
+                for request, request_id in self.calls:
+                    errors_left = failures.get(request, [])
+                    if errors_left:
+                        self.callback(request_id, None, errors_left.pop(0))
+                    else:
+                        self.callback(request_id, {'etag': request}, None)
+
+        class FakeRequest(str):
+            """A request that can be given an http object."""
+
+        gcp_service_mock = mock.Mock()
+        gcp_service_mock.new_batch_http_request.side_effect = (
+            lambda callback: FakeBatch(callback))
+        bucket = token_bucket.TokenBucket('fake_api', 1000, 1)
+        repo = base.GCPRepository(
+            gcp_service=gcp_service_mock,
+            credentials=mock.Mock(spec=credentials.Credentials),
+            component='fake_component',
+            rate_limiter=bucket)
+        repo._build_request = (
+            lambda verb, arguments: FakeRequest(arguments['resource']))
+
+        resources = ['r{}'.format(i) for i in range(base.MAX_BATCH_SIZE + 1)]
+        results = repo.execute_batch_query(
+            'getIamPolicy', [{'resource': r} for r in resources])
+
+        self.assertEqual(len(resources), len(results))
+        self.assertEqual(({'etag': 'r0'}, None), results[0])
+        self.assertEqual(({'etag': 'r1'}, None), results[1])
+        self.assertEqual((None, not_found), results[2])
+        self.assertEqual([base.MAX_BATCH_SIZE, 1, 1],
+                         [len(batch) for batch in batches])
+        self.assertEqual(['r1'], batches[2])
+        self.assertEqual(len(resources) + 1, bucket.calls)
+        mock_sleep.assert_called_once_with(2)
+
+    def test_execute_batch_query_authorized(self):
+        """The calls of a batch carry the credentials of the repository."""
+        # Like the shared service objects, not bound to any credentials.
+        service = discovery.build_from_document(
+            FAKE_DISCOVERY_DOCUMENT, http=http_helpers.build_http())
+        http_mock = http_mocks.RecordingHttpMockSequence([
+            ({'status': '200',
+              'content-type': 'multipart/mixed; boundary="batch_foobar"'},
+             FAKE_BATCH_RESPONSE)])
+        repo = base.GCPRepository(
+            gcp_service=service,
+            credentials=credentials.Credentials('fake-token'),
+            component='items')
+        repo._local = threading.local()
+        repo._local.http = google_auth_httplib2.AuthorizedHttp(
+            repo._credentials, http=http_mock)
+
+        results = repo.execute_batch_query(
+            'get', [{'item': 'i1'}, {'item': 'i2'}])
+
+        self.assertEqual([({'id': 'i1'}, None), ({'id': 'i2'}, None)],
+                         results)
+        (uri, headers, body), = http_mock.requests
+        self.assertEqual('https://fake.googleapis.com/batch', uri)
+        self.assertEqual('Bearer fake-token', headers['authorization'])
+        self.assertEqual(2, body.lower().count(
+            'authorization: bearer fake-token'))
+
+    def test_execute_paged_query_prefetch(self):
+        """Prefetched pages are returned in order and counted."""
+        pages = [{'items': [1]}, {'items': [2]}, {'items': [3]}]
+        repo = self.get_paged_repository(pages, prefetch_pages=2)
+
+        with mock.patch.object(page_prefetcher, 'prefetch',
+                               wraps=page_prefetcher.prefetch) as mock_prefetch:
+            self.assertEqual(pages, list(
+                repo.execute_paged_query('list', {'project': 'p'})))
+        self.assertEqual(2, mock_prefetch.call_args[0][1])
+        metrics = repo.get_pager_metrics()
+        self.assertEqual(3, metrics['pages'])
+        self.assertGreater(metrics['pages_per_second'], 0)
+
+    @mock.patch.object(base.asyncio, 'sleep')
+    def test_execute_async_http_retries_throttled(self, mock_sleep):
+        """Throttled async requests are retried and recorded in the bucket."""
+        async def no_sleep(_):
+            pass
+        mock_sleep.side_effect = no_sleep
+        throttled = errors.HttpError(httplib2.Response({'status': '429'}),
+                                     b'')
+        responses = [throttled, {'items': []}]
+
+        async def fake_send(request, credentials, num_retries):
+            response = responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        bucket = token_bucket.TokenBucket('fake_api', 100, 1)
+        repo = base.GCPRepository(
+            gcp_service=mock.Mock(),
+            credentials=mock.Mock(spec=credentials.Credentials),
+            component='fake_component',
+            rate_limiter=bucket)
+        with mock.patch.object(base._async_http, 'send', fake_send):
+            result = asyncio.get_event_loop().run_until_complete(
+                repo._execute_async_http(mock.Mock()))
+
+        self.assertEqual({'items': []}, result)
+        self.assertEqual(2, bucket.calls)
+        self.assertEqual(1, bucket.throttled)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -17,6 +17,8 @@ import json
 import unittest
 import uuid
 import unittest.mock as mock
+from googleapiclient import errors
+import httplib2
 import parameterized
 import google.auth
 from google.oauth2 import credentials
@@ -304,6 +306,53 @@ class ComputeTest(unittest_utils.ForsetiTestCase):
             list(self.gce_api_client.get_global_operation(
                 self.project_id, operation_id=fake_compute.FAKE_OPERATION_ID))
 
+    def test_poll_operations(self):
+        """Test poll_operations only gets the status of pending operations."""
+        operations = [{'name': 'operation-1', 'status': 'DONE'},
+                      {'name': 'operation-2', 'status': 'RUNNING'},
+                      {'name': 'operation-3', 'status': 'PENDING'}]
+        repository = self.gce_api_client.repository.global_operations
+        with mock.patch.object(repository, 'get_many') as mock_get_many, \
+                mock.patch.object(repository, 'get') as mock_get:
+            mock_get_many.return_value = [
+                ({'name': 'operation-2', 'status': 'DONE'}, None),
+                (None, api_errors.ApiExecutionError(self.project_id,
+                                                    mock.Mock()))]
+            mock_get.side_effect = errors.HttpError(
+                httplib2.Response({'status': '500'}), b'')
+            results = self.gce_api_client.poll_operations(self.project_id,
+                                                          operations)
+
+        mock_get_many.assert_called_once_with(
+            self.project_id, ['operation-2', 'operation-3'])
+        self.assertEqual(['DONE', 'DONE', 'PENDING'],
+                         [operation['status'] for operation in results])
+
+    def test_get_global_operations_alone_after_batch_failure(self):
+        """Test operations whose batched call failed are fetched alone."""
+        repository = self.gce_api_client.repository.global_operations
+        error = api_errors.ApiExecutionError(self.project_id, mock.Mock())
+        with mock.patch.object(repository, 'get_many') as mock_get_many, \
+                mock.patch.object(repository, 'get') as mock_get:
+            mock_get_many.return_value = [
+                ({'name': 'operation-1', 'status': 'RUNNING'}, None),
+                (None, error),
+                (None, error)]
+            mock_get.side_effect = [
+                {'name': 'operation-2', 'status': 'DONE'},
+                errors.HttpError(httplib2.Response({'status': '500'}), b'')]
+            results = self.gce_api_client.get_global_operations(
+                self.project_id, ['operation-1', 'operation-2',
+                                  'operation-3'])
+
+        self.assertEqual({'operation-1': 'RUNNING', 'operation-2': 'DONE'},
+                         {name: operation['status']
+                          for name, operation in results.items()})
+        self.assertEqual(
+            [mock.call(self.project_id, 'operation-2'),
+             mock.call(self.project_id, 'operation-3')],
+            mock_get.call_args_list)
+
     def test_get_image(self):
         """Test get_image."""
         http_mocks.mock_http_response(fake_compute.GET_IMAGE)
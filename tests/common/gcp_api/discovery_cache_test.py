@@ -0,0 +1,153 @@
+# Copyright 2020 The Forseti Security Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests the discovery document cache."""
+import os
+import shutil
+import stat
+import tempfile
+import time
+import unittest
+import unittest.mock as mock
+
+from tests import unittest_utils
+from google.cloud.forseti.common.gcp_api import _base_repository as base
+from google.cloud.forseti.common.gcp_api import _discovery_cache
+
+FAKE_URL = 'https://www.googleapis.com/discovery/v1/apis/fake/v1/rest'
+FAKE_DOCUMENT = '{"name": "fake", "version": "v1"}'
+
+
+class DiscoveryCacheTest(unittest_utils.ForsetiTestCase):
+    """Test the discovery document cache."""
+
+    def setUp(self):
+        """Set up."""
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Clean up."""
+        shutil.rmtree(self.cache_dir)
+
+    def test_cache_on_disk(self):
+        """Documents cached by a process are read by the next processes."""
+        cache = _discovery_cache.DiscoveryCache('fake', 'v1', self.cache_dir)
+        self.assertIsNone(cache.get(FAKE_URL))
+        cache.set(FAKE_URL, FAKE_DOCUMENT.encode('utf-8'))
+        self.assertEqual(FAKE_DOCUMENT, cache.get(FAKE_URL))
+        self.assertEqual(1, len(os.listdir(self.cache_dir)))
+        self.assertTrue(os.listdir(self.cache_dir)[0].startswith('fake_v1_'))
+
+        other_cache = _discovery_cache.DiscoveryCache('fake', 'v1',
+                                                      self.cache_dir)
+        self.assertEqual(FAKE_DOCUMENT, other_cache.get(FAKE_URL))
+        self.assertIsNone(other_cache.get(FAKE_URL + '?key=k'))
+
+    def test_expired_document(self):
+        """Documents older than the maximum age are fetched again."""
+        _discovery_cache.DiscoveryCache('fake', 'v1', self.cache_dir).set(
+            FAKE_URL, FAKE_DOCUMENT)
+        expired = time.time() - _discovery_cache.MAX_AGE_SECONDS - 1
+        for filename in os.listdir(self.cache_dir):
+            os.utime(os.path.join(self.cache_dir, filename),
+                     (expired, expired))
+
+        cache = _discovery_cache.DiscoveryCache('fake', 'v1', self.cache_dir)
+        self.assertIsNone(cache.get(FAKE_URL))
+
+    @mock.patch.object(_discovery_cache.time, 'time')
+    def test_expired_document_in_memory(self, mock_time):
+        """Documents held in memory also expire."""
+        os.chmod(self.cache_dir, 0o777)  # Only cache in memory.
+        mock_time.return_value = 1000.0
+        cache = _discovery_cache.DiscoveryCache('fake', 'v1', self.cache_dir)
+        cache.set(FAKE_URL, FAKE_DOCUMENT)
+
+        mock_time.return_value += _discovery_cache.MAX_AGE_SECONDS
+        self.assertEqual(FAKE_DOCUMENT, cache.get(FAKE_URL))
+        mock_time.return_value += 1
+        self.assertIsNone(cache.get(FAKE_URL))
+
+    def test_private_cache_dir(self):
+        """The cache directory is created private to the current user."""
+        cache_dir = os.path.join(self.cache_dir, 'discovery')
+        cache = _discovery_cache.DiscoveryCache('fake', 'v1', cache_dir)
+        cache.set(FAKE_URL, FAKE_DOCUMENT)
+        self.assertEqual(_discovery_cache.CACHE_DIR_MODE,
+                         stat.S_IMODE(os.stat(cache_dir).st_mode))
+        self.assertEqual(1, len(os.listdir(cache_dir)))
+
+    def test_shared_cache_dir_not_used(self):
+        """Directories other users can write to are never used."""
+        os.chmod(self.cache_dir, 0o777)
+        cache = _discovery_cache.DiscoveryCache('fake', 'v1', self.cache_dir)
+        cache.set(FAKE_URL, FAKE_DOCUMENT)
+        self.assertEqual([], os.listdir(self.cache_dir))
+        self.assertEqual(FAKE_DOCUMENT, cache.get(FAKE_URL))
+
+    @mock.patch.object(_discovery_cache.os, 'getuid')
+    def test_foreign_cache_dir_not_used(self, mock_getuid):
+        """Directories owned by other users are never used."""
+        _discovery_cache.DiscoveryCache('fake', 'v1', self.cache_dir).set(
+            FAKE_URL, FAKE_DOCUMENT)
+        mock_getuid.return_value = os.getuid() + 1
+
+        cache = _discovery_cache.DiscoveryCache('fake', 'v1', self.cache_dir)
+        self.assertIsNone(cache.get(FAKE_URL))
+
+    @mock.patch.object(base, '_create_service_api')
+    def test_service_api_shared_across_credentials(self, mock_create):
+        """Service objects are built once per version, for all credentials."""
+        mock_create.side_effect = lambda *args: mock.Mock()
+        credentials = mock.Mock()
+        other_credentials = mock.Mock()
+        base._SERVICE_APIS.clear()
+
+        service = base._get_service_api(credentials, 'fake', 'v1', False)
+        self.assertIs(service,
+                      base._get_service_api(credentials, 'fake', 'v1', False))
+        self.assertIs(service, base._get_service_api(
+            other_credentials, 'fake', 'v1', False))
+        self.assertIsNot(service,
+                         base._get_service_api(credentials, 'fake', 'v2',
+                                               False))
+        self.assertIsNot(service, base._get_service_api(
+            credentials, 'fake', 'v1', False, cache_discovery=False))
+        self.assertEqual(3, mock_create.call_count)
+        # The cached service objects are not bound to any credentials.
+        self.assertIsNone(mock_create.call_args_list[0][0][0])
+        self.assertIs(credentials, mock_create.call_args_list[2][0][0])
+        base._SERVICE_APIS.clear()
+
+    @mock.patch.object(base.time, 'time')
+    @mock.patch.object(base, '_create_service_api')
+    def test_service_api_expires(self, mock_create, mock_time):
+        """Service objects are built again once their document expires."""
+        mock_create.side_effect = lambda *args: mock.Mock()
+        mock_time.return_value = 1000.0
+        base._SERVICE_APIS.clear()
+
+        service = base._get_service_api(None, 'fake', 'v1', False)
+        mock_time.return_value += _discovery_cache.MAX_AGE_SECONDS
+        self.assertIs(service, base._get_service_api(None, 'fake', 'v1',
+                                                     False))
+        mock_time.return_value += 1
+        self.assertIsNot(service, base._get_service_api(None, 'fake', 'v1',
+                                                        False))
+        self.assertEqual(2, mock_create.call_count)
+        base._SERVICE_APIS.clear()
+
+
+if __name__ == '__main__':
+    unittest.main()
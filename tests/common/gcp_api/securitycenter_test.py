@@ -18,6 +18,8 @@ import unittest
 import unittest.mock as mock
 import google.auth
 from google.oauth2 import credentials
+from googleapiclient import errors
+import httplib2
 
 from google.cloud.forseti.common.gcp_api import securitycenter
 from google.cloud.forseti.common.gcp_api import errors as api_errors
@@ -65,5 +67,50 @@ class SecurityCenterTest(unittest_utils.ForsetiTestCase):
                 source_id=self.source_id)
 
 
+    def test_patch_findings(self):
+        """Test findings are patched in batch requests, in order."""
+        findings = [('{}/findings/{}'.format(self.source_id, i), {'id': i})
+                    for i in range(securitycenter.FINDINGS_BATCH_SIZE + 1)]
+        repository = self.securitycenter_client.repository.findings
+        with mock.patch.object(repository, 'execute_batch_query',
+                               side_effect=lambda verb, verb_arguments_list: [
+                                   (arguments['body'], None)
+                                   for arguments in verb_arguments_list]
+                              ) as mock_batch:
+            results = self.securitycenter_client.patch_findings(
+                findings, update_mask='state', max_workers=2)
+
+        self.assertEqual([(finding, None) for _, finding in findings],
+                         results)
+        self.assertEqual(2, mock_batch.call_count)
+        for _, kwargs in mock_batch.call_args_list:
+            self.assertEqual('patch', kwargs['verb'])
+            self.assertEqual('state',
+                             kwargs['verb_arguments_list'][0]['updateMask'])
+
+    def test_patch_findings_alone_after_batch_failure(self):
+        """Findings whose batched call failed are patched one at a time."""
+        findings = [('{}/findings/{}'.format(self.source_id, i), {'id': i})
+                    for i in range(3)]
+        unauthorized = errors.HttpError(
+            httplib2.Response({'status': '401'}), b'')
+        rejected = errors.HttpError(httplib2.Response({'status': '400'}),
+                                    b'')
+        repository = self.securitycenter_client.repository.findings
+        with mock.patch.object(repository, 'execute_batch_query',
+                               return_value=[({'id': 0}, None),
+                                             (None, unauthorized),
+                                             (None, rejected)]), \
+                mock.patch.object(repository, 'patch',
+                                  return_value={'id': 1}) as mock_patch:
+            results = self.securitycenter_client.patch_findings(
+                findings, update_mask='state')
+
+        self.assertEqual([({'id': 0}, None), ({'id': 1}, None),
+                          (None, rejected)], results)
+        mock_patch.assert_called_once_with(findings[1][0], {'id': 1},
+                                           updateMask='state')
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -17,20 +17,67 @@ from future import standard_library
 standard_library.install_aliases()
 import httplib2
 import google.auth
+import google_auth_httplib2
 import io
+import threading
 import unittest.mock as mock
 
 from google.oauth2 import credentials
+from googleapiclient import discovery
 from googleapiclient import errors
 
 from google.cloud.forseti.common.gcp_api import errors as api_errors
 from google.cloud.forseti.common.gcp_api import storage
+from google.cloud.forseti.common.util import http_helpers
 from google.cloud.forseti.common.util import metadata_server
 from tests import unittest_utils
 from tests.common.gcp_api.test_data import fake_storage_responses as fake_storage
 from tests.common.gcp_api.test_data import http_mocks
 
 
+FAKE_STORAGE_DISCOVERY_DOCUMENT = {
+    'kind': 'discovery#restDescription',
+    'discoveryVersion': 'v1',
+    'name': 'storage',
+    'version': 'v1',
+    'rootUrl': 'https://www.googleapis.com/',
+    'servicePath': 'storage/v1/',
+    'batchPath': 'batch/storage/v1',
+    'resources': {
+        'buckets': {
+            'methods': {
+                'getIamPolicy': {
+                    'id': 'storage.buckets.getIamPolicy',
+                    'path': 'b/{bucket}/iam',
+                    'httpMethod': 'GET',
+                    'parameters': {
+                        'bucket': {'type': 'string', 'required': True,
+                                   'location': 'path'},
+                        'fields': {'type': 'string', 'location': 'query'}},
+                    'parameterOrder': ['bucket'],
+                    'response': {'$ref': 'Policy'}}}}},
+    'schemas': {
+        'Policy': {'id': 'Policy', 'type': 'object',
+                   'properties': {'bindings': {
+                       'type': 'array', 'items': {'type': 'object'}}}}}}
+
+FAKE_BATCH_RESPONSE = '''--batch_foobar
+Content-Type: application/http
+Content-Transfer-Encoding: binary
+Content-ID: <response-batch + 0>
+
+HTTP/1.1 200 OK
+Content-Type: application/json\r\n\r\n{"bindings": []}
+--batch_foobar
+Content-Type: application/http
+Content-Transfer-Encoding: binary
+Content-ID: <response-batch + 1>
+
+HTTP/1.1 403 Forbidden
+Content-Type: application/json\r\n\r\n{"error": {"code": 403}}
+--batch_foobar--'''
+
+
 class StorageTest(unittest_utils.ForsetiTestCase):
     """Test the StorageClient."""
 
@@ -371,6 +418,53 @@ class StorageTest(unittest_utils.ForsetiTestCase):
                     'gs://{}/{}'.format(fake_storage.FAKE_BUCKET_NAME,
                                         fake_storage.FAKE_OBJECT_NAME))
 
+    def test_get_bucket_iam_policies_warns_about_failures(self):
+        """Buckets whose batched fetch failed are left out with a warning."""
+        error = errors.HttpError(httplib2.Response({'status': '403'}), b'')
+        with mock.patch.object(
+                self.gcs_api_client.repository.buckets, 'get_iam_policies',
+                return_value=[({'bindings': []}, None), (None, error)]), \
+                mock.patch.object(storage.LOGGER, 'warning') as mock_warning:
+            policies = self.gcs_api_client.get_bucket_iam_policies(
+                ['bucket1', 'bucket2'])
+
+        self.assertEqual({'bucket1': {'bindings': []}}, policies)
+        mock_warning.assert_called_once_with(
+            'Batched IAM policy fetch failed for bucket %s: %s', 'bucket2',
+            error)
+
+
+class StorageBucketsBatchTest(unittest_utils.ForsetiTestCase):
+    """Test the batch requests of the Storage Buckets repository."""
+
+    def test_get_iam_policies(self):
+        """The bucket policies are fetched in one authorized batch request."""
+        service = discovery.build_from_document(
+            FAKE_STORAGE_DISCOVERY_DOCUMENT, http=http_helpers.build_http())
+        http_mock = http_mocks.RecordingHttpMockSequence([
+            ({'status': '200',
+              'content-type': 'multipart/mixed; boundary="batch_foobar"'},
+             FAKE_BATCH_RESPONSE)])
+        repository = storage._StorageBucketsRepository(
+            gcp_service=service,
+            credentials=credentials.Credentials('fake-token'))
+        repository._local = threading.local()
+        repository._local.http = google_auth_httplib2.AuthorizedHttp(
+            repository._credentials, http=http_mock)
+
+        results = repository.get_iam_policies(['bucket1', 'bucket2'])
+
+        self.assertEqual(({'bindings': []}, None), results[0])
+        self.assertIsNone(results[1][0])
+        self.assertEqual(403, results[1][1].resp.status)
+        (uri, headers, body), = http_mock.requests
+        self.assertEqual('https://www.googleapis.com/batch/storage/v1', uri)
+        self.assertEqual('Bearer fake-token', headers['authorization'])
+        self.assertEqual(2, body.lower().count(
+            'authorization: bearer fake-token'))
+        self.assertIn('GET /storage/v1/b/bucket1/iam', body)
+        self.assertIn('GET /storage/v1/b/bucket2/iam', body)
+
 
 if __name__ == '__main__':
     unittest.main()
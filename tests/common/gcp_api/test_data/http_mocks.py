@@ -33,3 +33,17 @@ def mock_http_response_sequence(responses):
     """Set the mock response to an http request."""
     http_mock = http.HttpMockSequence(responses)
     _base_repository.LOCAL_THREAD.http = http_mock
+
+
+class RecordingHttpMockSequence(http.HttpMockSequence):
+    """HttpMockSequence recording the requests it answers."""
+
+    def __init__(self, iterable):
+        super(RecordingHttpMockSequence, self).__init__(iterable)
+        self.requests = []
+
+    def request(self, uri, method='GET', body=None, headers=None,
+                *args, **kwargs):
+        self.requests.append((uri, dict(headers or {}), body))
+        return super(RecordingHttpMockSequence, self).request(
+            uri, method, body, headers, *args, **kwargs)
@@ -1524,5 +1524,66 @@ class FirewallActionTest(ForsetiTestCase):
         action_2 = firewall_rule.FirewallAction(**action_2_dict)
         self.assertEqual(expected, action_1.is_equivalent(action_2))
 
+    @parameterized.parameterized.expand([
+        (['22', '20-21', '23-30', '80'], ((20, 30), (80, 80))),
+        (['443', '1-100', '50-60'], ((1, 100), (443, 443))),
+        (['all'], ((0, 65535),)),
+        ('all', ((0, 65535),)),
+        ([], ()),
+    ])
+    def test_port_ranges_merged(self, ports, expected):
+        """Tests ports are parsed into merged ranges."""
+        self.assertEqual(
+            expected,
+            firewall_rule.merge_port_ranges(
+                firewall_rule.parse_port_ranges(ports)))
+
+    @parameterized.parameterized.expand([
+        (((22, 22),), ((1, 1024),), True),
+        (((22, 22), (8080, 8080)), ((1, 1024),), False),
+        (((1, 65535),), ((0, 65535),), True),
+        (((20, 30),), ((20, 25), (27, 30)), False),
+        ((), ((80, 80),), True),
+        (((80, 80),), (), False),
+    ])
+    def test_port_ranges_in(self, port_ranges_1, port_ranges_2, expected):
+        """Tests port range containment."""
+        self.assertEqual(
+            expected,
+            firewall_rule.port_ranges_in(port_ranges_1, port_ranges_2))
+
+
+class IpRangesTest(ForsetiTestCase):
+    """Tests for IpRanges."""
+
+    @parameterized.parameterized.expand([
+        (['10.0.0.1', '10.1.0.0/16'], ['10.0.0.0/8'], True),
+        (['10.0.0.0/23'], ['10.0.0.0/24', '10.0.1.0/24'], False),
+        (['10.0.0.0/24', '192.168.1.1'],
+         ['10.0.0.0/25', '10.0.0.0/24', '192.168.0.0/16'], True),
+        (['10.0.0.0/8'], ['10.0.0.0/24', '10.0.0.0/9'], False),
+        (['2001:db8::1'], ['2001:db8::/32'], True),
+        (['2001:db8::1'], ['0.0.0.0/0'], False),
+        (['0.0.0.0/0'], [], True),
+        ([], ['1.1.1.1'], True),
+    ])
+    def test_in_ranges(self, ips, ips_list, expected):
+        """Tests ranges are matched like ips_in_list."""
+        ip_ranges = firewall_rule.IpRanges(ips)
+        self.assertEqual(
+            expected,
+            ip_ranges.in_ranges(firewall_rule.IpRanges(ips_list)))
+        self.assertEqual(expected, firewall_rule.ips_in_list(ips, ips_list))
+
+    def test_nested_ranges_dropped(self):
+        """Tests only ranges not contained in other ranges are kept."""
+        ip_ranges = firewall_rule.IpRanges(
+            ['10.0.0.0/24', '10.0.0.0/8', '10.1.2.3', '11.0.0.1'])
+        self.assertEqual(4, ip_ranges.count)
+        self.assertEqual(
+            [(4, 167772160, 184549375), (4, 184549377, 184549377)],
+            list(ip_ranges.intervals()))
+
+
 if __name__ == '__main__':
     unittest.main()
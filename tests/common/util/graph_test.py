@@ -0,0 +1,79 @@
+# Copyright 2020 The Forseti Security Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests the graph util."""
+
+import random
+import unittest
+
+from tests.unittest_utils import ForsetiTestCase
+from google.cloud.forseti.common.util import graph
+
+
+def naive_transitive_closure(edges):
+    """Fixpoint transitive closure, as computed by the SQL denormalization."""
+    relation = set(edges)
+    while True:
+        new_pairs = set((source, target)
+                        for source, middle in relation
+                        for other, target in relation
+                        if middle == other) - relation
+        if not new_pairs:
+            return relation
+        relation |= new_pairs
+
+
+class GraphTest(ForsetiTestCase):
+    """Test graph util."""
+
+    def test_strongly_connected_components(self):
+        """Test components are found and ordered sinks first."""
+        adjacency = [[1], [2], [0, 3], [4], [3], []]
+        components = graph.strongly_connected_components(adjacency)
+
+        self.assertEqual(3, len(components))
+        self.assertEqual(set([3, 4]), set(components[0]))
+        self.assertEqual(set([0, 1, 2]), set(components[1]))
+        self.assertEqual([5], components[2])
+
+    def test_transitive_closure_tree(self):
+        """Test closure of a nested hierarchy."""
+        edges = [('g1', 'g2'), ('g2', 'g3'), ('g1', 'g4')]
+        expected = set([('g1', 'g2'), ('g1', 'g3'), ('g1', 'g4'),
+                        ('g2', 'g3')])
+        self.assertEqual(expected, set(graph.transitive_closure(edges)))
+
+    def test_transitive_closure_cycle(self):
+        """Test members of a cycle reach each other and themselves."""
+        edges = [('g1', 'g2'), ('g2', 'g1'), ('g2', 'g3'), ('g4', 'g4')]
+        expected = set([('g1', 'g1'), ('g1', 'g2'), ('g1', 'g3'),
+                        ('g2', 'g1'), ('g2', 'g2'), ('g2', 'g3'),
+                        ('g4', 'g4')])
+        self.assertEqual(expected, set(graph.transitive_closure(edges)))
+
+    def test_transitive_closure_random_graphs(self):
+        """Test closure against a naive fixpoint on random graphs."""
+        rand = random.Random(42)
+        for _ in range(200):
+            node_count = rand.randint(1, 15)
+            edges = set(
+                (rand.randrange(node_count), rand.randrange(node_count))
+                for _ in range(rand.randint(0, 30)))
+            closure = list(graph.transitive_closure(edges))
+            self.assertEqual(len(set(closure)), len(closure))
+            self.assertEqual(naive_transitive_closure(edges), set(closure))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+# Copyright 2020 The Forseti Security Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests the page prefetcher."""
+import threading
+import unittest
+import unittest.mock as mock
+
+from tests import unittest_utils
+from google.cloud.forseti.common.util import page_prefetcher
+
+
+class PagePrefetcherTest(unittest_utils.ForsetiTestCase):
+    """Test the page prefetcher."""
+
+    def setUp(self):
+        """Set up."""
+        self.fetched = []
+        self.closed = threading.Event()
+
+    def pages(self, count, error=None):
+        """Generate pages, recording the fetched pages."""
+        try:
+            for i in range(count):
+                self.fetched.append(i)
+                yield i
+            if error:
+                raise error
+        finally:
+            self.closed.set()
+
+    def test_prefetch(self):
+        """Pages are returned in order, with and without prefetching."""
+        for pages_in_flight in (0, 1, 3):
+            metrics = page_prefetcher.PagerMetrics()
+            results = list(page_prefetcher.prefetch(
+                self.pages(5), pages_in_flight, metrics))
+            self.assertEqual(list(range(5)), results)
+            self.assertEqual(5, metrics.get_metrics()['pages'])
+
+    def test_prefetch_fetches_ahead(self):
+        """The next pages are fetched while the caller holds a page."""
+        pages = page_prefetcher.prefetch(self.pages(5), 2)
+        self.assertEqual(0, next(pages))
+        # The queue holds 2 pages and the fetcher waits with a third.
+        for _ in range(100):
+            if len(self.fetched) == 4:
+                break
+            threading.Event().wait(0.01)
+        self.assertEqual([0, 1, 2, 3], self.fetched)
+
+        pages.close()
+        self.assertTrue(self.closed.wait(5))
+        self.assertEqual([0, 1, 2, 3], self.fetched)
+
+    def test_prefetch_raises_fetch_error(self):
+        """Errors are raised after the pages fetched before them."""
+        results = []
+        with self.assertRaises(ValueError):
+            for page in page_prefetcher.prefetch(
+                    self.pages(2, error=ValueError('fetch failed')), 1):
+                results.append(page)
+        self.assertEqual([0, 1], results)
+
+    def test_prefetch_reuses_threads(self):
+        """Queries run one after another are fetched by the same thread."""
+        threads = set()
+
+        def pages():
+            threads.add(threading.current_thread())
+            yield threading.current_thread()
+
+        with mock.patch.object(page_prefetcher, '_POOL',
+                               page_prefetcher._FetcherPool(2)):
+            for _ in range(3):
+                fetched_by, = list(page_prefetcher.prefetch(pages(), 1))
+                self.assertIsNot(threading.current_thread(), fetched_by)
+                # The thread returns to the pool once its query is done.
+                for _ in range(100):
+                    if page_prefetcher._POOL._idle:
+                        break
+                    threading.Event().wait(0.01)
+
+        self.assertEqual(1, len(threads))
+
+    def test_prefetch_on_caller_thread_when_pool_busy(self):
+        """Queries are fetched by the caller while every thread is busy."""
+        with mock.patch.object(page_prefetcher, '_POOL',
+                               page_prefetcher._FetcherPool(1)):
+            outer = page_prefetcher.prefetch(self.pages(3), 1)
+            self.assertEqual(0, next(outer))
+
+            def pages():
+                yield threading.current_thread()
+
+            # The only thread of the pool still fetches the outer query.
+            fetched_by, = list(page_prefetcher.prefetch(pages(), 1))
+            self.assertIs(threading.current_thread(), fetched_by)
+            self.assertEqual([1, 2], list(outer))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -13,7 +13,10 @@
 # limitations under the License.
 """Tests for google.cloud.forseti.common.util.replay."""
 from builtins import str
+import asyncio
+import collections
 import os
+import pickle
 import tempfile
 import unittest
 import unittest.mock as mock
@@ -27,6 +30,34 @@ from google.cloud.forseti.common.gcp_api import compute
 from google.cloud.forseti.common.gcp_api import errors as api_errors
 from google.cloud.forseti.common.util import replay
 
+FakeRequest = collections.namedtuple('FakeRequest', ['uri', 'body'])
+FakeRequest.to_json = lambda self: '{}'
+
+
+class FakeRepository(object):
+    """Repository recording and replaying fake requests."""
+
+    def __init__(self, recorder, replayer):
+        self.executed = []
+
+        def execute_request(_, request):
+            self.executed.append(request.uri)
+            if request.uri.endswith('error'):
+                raise ValueError(request.uri)
+            return {'uri': request.uri, 'call': len(self.executed)}
+
+        execute = replay.replay(replayer)(
+            replay.record(recorder)(execute_request))
+
+        @replay.replay_async(replayer)
+        @replay.record_async(recorder)
+        async def execute_async(_, request):
+            return execute_request(_, request)
+
+        self.execute = lambda request: execute(self, request)
+        self.execute_async = lambda request: asyncio.get_event_loop(
+            ).run_until_complete(execute_async(self, request))
+
 
 class ReplayTest(unittest_utils.ForsetiTestCase):
     """Tests for the Record and Replay wrappers."""
@@ -92,6 +123,89 @@ class ReplayTest(unittest_utils.ForsetiTestCase):
         results = self.run_api_tests(record=False)
         self.assertEqual(expected_results, results)
 
+    def record_requests(self, requests, close=True, use_async=False):
+        """Record fake requests, returns the recorded results."""
+        os.environ[replay.RECORD_ENVIRONMENT_VAR] = self.record_file
+        os.environ[replay.REPLAY_ENVIRONMENT_VAR] = ''
+        recorder = {}
+        repository = FakeRepository(recorder, {})
+        execute = (repository.execute_async if use_async
+                   else repository.execute)
+        results = []
+        for request in requests:
+            try:
+                results.append(execute(request))
+            except ValueError as e:
+                results.append(str(e))
+        if close:
+            replay.close_recordings(recorder)
+        return results
+
+    def replay_requests(self, requests, use_async=False):
+        """Replay fake requests, returns the results and live requests."""
+        os.environ[replay.RECORD_ENVIRONMENT_VAR] = ''
+        os.environ[replay.REPLAY_ENVIRONMENT_VAR] = self.record_file
+        repository = FakeRepository({}, {})
+        execute = (repository.execute_async if use_async
+                   else repository.execute)
+        results = []
+        for request in requests:
+            try:
+                results.append(execute(request))
+            except ValueError as e:
+                results.append(str(e))
+        return results, repository.executed
+
+    def test_streaming_recording(self):
+        """Verify closed and interrupted recordings are replayed."""
+        requests = [FakeRequest('a', None), FakeRequest('b', '{}'),
+                    FakeRequest('a', None), FakeRequest('error', None)]
+        for close in (True, False):
+            expected_results = self.record_requests(requests, close=close)
+            with open(self.record_file, 'rb') as infile:
+                data = infile.read()
+            self.assertTrue(data.startswith(replay.RECORD_FILE_MAGIC))
+            self.assertEqual(close, data.endswith(replay.INDEX_MAGIC))
+
+            results, executed = self.replay_requests(
+                requests + [FakeRequest('c', None)])
+            self.assertEqual(expected_results, results[:-1])
+            self.assertEqual(['c'], executed)
+
+    def test_truncated_recording(self):
+        """Verify the truncated last record of a recording is ignored."""
+        requests = [FakeRequest('a', None), FakeRequest('b', None)]
+        expected_results = self.record_requests(requests, close=False)
+        with open(self.record_file, 'rb+') as outfile:
+            outfile.truncate(os.path.getsize(self.record_file) - 1)
+
+        results, executed = self.replay_requests(requests)
+        self.assertEqual(expected_results[0], results[0])
+        self.assertEqual(['b'], executed)
+
+    def test_replay_legacy_recording(self):
+        """Verify recordings pickled as a single dict are replayed."""
+        obj = {'exception_args': None, 'raised': False, 'request': '{}',
+               'result': {'items': []}, 'uri': 'a'}
+        with open(self.record_file, 'wb') as outfile:
+            pickle.dump({'aNone': collections.deque([obj])}, outfile)
+
+        results, executed = self.replay_requests(
+            [FakeRequest('a', None), FakeRequest('a', None)])
+        self.assertEqual({'items': []}, results[0])
+        self.assertEqual(['a'], executed)
+
+    def test_async_record_and_replay(self):
+        """Verify async and sync calls replay each other's recordings."""
+        requests = [FakeRequest('a', None), FakeRequest('error', None)]
+        for record_async in (True, False):
+            expected_results = self.record_requests(
+                requests, use_async=record_async)
+            results, executed = self.replay_requests(
+                requests, use_async=not record_async)
+            self.assertEqual(expected_results, results)
+            self.assertEqual([], executed)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,93 @@
+# Copyright 2020 The Forseti Security Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests the token bucket util."""
+
+import unittest
+import unittest.mock as mock
+
+from tests.unittest_utils import ForsetiTestCase
+from google.cloud.forseti.common.util import token_bucket
+
+
+class TokenBucketTest(ForsetiTestCase):
+    """Test the token bucket."""
+
+    @mock.patch.object(token_bucket.time, 'sleep')
+    @mock.patch.object(token_bucket.time, 'time')
+    def test_acquire_waits_for_refill(self, mock_time, mock_sleep):
+        """Test calls wait once the bucket is empty."""
+        mock_time.return_value = 100.0
+        bucket = token_bucket.TokenBucket('api', 2, 1.0)
+
+        with bucket:
+            pass
+        bucket.acquire()
+        self.assertEqual(0.5, bucket.wait_time())
+
+        def advance(seconds):
+            mock_time.return_value += seconds
+        mock_sleep.side_effect = advance
+        bucket.acquire()
+
+        mock_sleep.assert_called_once_with(0.5)
+        self.assertEqual(0.5, bucket.wait_time())
+
+    @mock.patch.object(token_bucket.time, 'time')
+    def test_metrics(self, mock_time):
+        """Test calls and throttled calls are counted."""
+        mock_time.return_value = 10.0
+        bucket = token_bucket.TokenBucket('api', 10, 1.0)
+        bucket.record(0.25)
+        bucket.record(0.75, token_bucket.THROTTLED_STATUS)
+        bucket.record(0.5, 500)
+        mock_time.return_value = 13.0
+
+        self.assertEqual({'calls': 3, 'throttled': 1, 'latency_seconds': 1.5,
+                          'calls_per_second': 1.0},
+                         bucket.get_metrics())
+
+    @mock.patch.object(token_bucket.time, 'time')
+    def test_reset_metrics(self, mock_time):
+        """Test the metrics restart from the reset, the tokens are kept."""
+        mock_time.return_value = 10.0
+        bucket = token_bucket.get_token_bucket('reset_api', 1, 10.0)
+        bucket.acquire()
+        bucket.record(0.25, token_bucket.THROTTLED_STATUS)
+        mock_time.return_value = 12.0
+
+        token_bucket.reset_metrics()
+        bucket.record(0.5)
+        mock_time.return_value = 14.0
+
+        self.assertEqual({'calls': 1, 'throttled': 0, 'latency_seconds': 0.5,
+                          'calls_per_second': 0.5},
+                         bucket.get_metrics())
+        self.assertAlmostEqual(6.0, bucket.wait_time())
+
+    def test_shared_buckets(self):
+        """Test clients of the same API and quota share a bucket."""
+        bucket = token_bucket.get_token_bucket('shared_api', 5, 1.0)
+
+        self.assertIs(bucket, token_bucket.get_token_bucket('shared_api', 5,
+                                                            1.0))
+        self.assertIsNot(bucket, token_bucket.get_token_bucket('shared_api',
+                                                               5, 2.0))
+        self.assertEqual(2, len(token_bucket.get_token_buckets('shared_api')))
+        self.assertEqual(0, token_bucket.wait_time('shared_api'))
+        self.assertEqual(0, token_bucket.wait_time('unknown_api'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1238,6 +1238,91 @@ class FirewallEnforcerTest(constants.EnforcerTestCase):
           self.assertEqual(expect_delete_before_insert, delete_before_insert)
 
 
+class FirewallEnforcerConcurrentChangesTest(ForsetiTestCase):
+    """Tests for applying firewall changes with several operations in flight."""
+
+    def setUp(self):
+        """Set up a FirewallEnforcer with a mock compute client."""
+        self.compute_client = mock.Mock(spec=compute.ComputeClient)
+        self.enforcer = fe.FirewallEnforcer(
+            constants.TEST_PROJECT, self.compute_client,
+            fe.FirewallRules(constants.TEST_PROJECT),
+            fe.FirewallRules(constants.TEST_PROJECT),
+            max_running_operations=2)
+        self.rules = [{'name': 'rule-%d' % i} for i in range(5)]
+        self.running = set()
+        self.max_running = 0
+
+    def submit(self, project, rule, blocking):
+        """Fake firewall function, returns a pending operation."""
+        self.assertEqual(constants.TEST_PROJECT, project)
+        self.assertFalse(blocking)
+        self.running.add(rule['name'])
+        self.max_running = max(self.max_running, len(self.running))
+        return {'name': rule['name'], 'status': 'PENDING'}
+
+    def complete(self, _, operations):
+        """Fake bulk poll, completes the first operation in flight."""
+        name = operations[0]['name']
+        self.running.discard(name)
+        operation = {'name': name, 'status': 'DONE'}
+        if name == 'rule-3':
+            operation['error'] = {'errors': [{'code': 'NOT_FOUND'}]}
+        return [operation] + operations[1:]
+
+    @mock.patch.object(fe.time, 'sleep')
+    def test_apply_change_concurrently(self, mock_sleep):
+        """Changes are submitted up to the limit and polled in bulk."""
+        self.compute_client.poll_operations.side_effect = self.complete
+
+        successes, failures, change_errors = self.enforcer._apply_change(
+            self.submit, self.rules)
+
+        self.assertEqual(2, self.max_running)
+        self.assertEqual(['rule-0', 'rule-1', 'rule-2', 'rule-4'],
+                         [rule['name'] for rule in successes])
+        self.assertEqual([self.rules[3]], failures)
+        self.assertEqual([], change_errors)
+        self.assertEqual(5, self.compute_client.poll_operations.call_count)
+        mock_sleep.assert_called_with(fe.OPERATION_POLL_INITIAL_DELAY)
+
+    @mock.patch.object(fe.time, 'time')
+    @mock.patch.object(fe.time, 'sleep')
+    def test_apply_change_concurrently_timeout(self, mock_sleep, mock_time):
+        """Operations still running after the timeouts fail."""
+        clock = [0.0]
+
+        def sleep(seconds):
+            clock[0] += seconds
+
+        mock_sleep.side_effect = sleep
+        mock_time.side_effect = lambda: clock[0]
+        self.compute_client.poll_operations.side_effect = (
+            lambda _, operations: operations)
+        insert_error = api_errors.ApiExecutionError(
+            constants.TEST_PROJECT, mock.Mock())
+
+        def submit(project, rule, blocking):
+            """Fails to submit the first rule."""
+            if rule['name'] == 'rule-0':
+                raise insert_error
+            return self.submit(project, rule, blocking)
+
+        successes, failures, change_errors = self.enforcer._apply_change(
+            submit, self.rules[:3])
+
+        self.assertEqual([], successes)
+        self.assertEqual(self.rules[:3], failures)
+        self.assertEqual(3, len(change_errors))
+        self.assertIn(str(insert_error), change_errors[0])
+        self.assertIn('rule-1', change_errors[1])
+        self.assertGreater(
+            clock[0], fe.OPERATION_TIMEOUT * (fe.OPERATION_RETRY_COUNT + 1))
+        self.assertEqual(fe.OPERATION_POLL_MAX_DELAY,
+                         max(args[0] for args, _ in
+                             mock_sleep.call_args_list))
+
+
 class FirewallRulesAreEqualTest(ForsetiTestCase):
     """Multiple tests for (in)equality between two firewall rules."""
 
@@ -14,6 +14,7 @@
 """Tests the notifier module."""
 
 from datetime import datetime
+import os
 import unittest.mock as mock
 import unittest
 
@@ -24,6 +25,27 @@ from tests.notifier.notifiers.test_data import fake_violations
 from tests.unittest_utils import ForsetiTestCase
 
 
+def mock_violations(mock_dao, violation_map):
+    """Make the mocked scanner_dao return the violations of a map.
+
+    Args:
+        mock_dao (Mock): The mocked scanner_dao module.
+        violation_map (dict): The violations of each resource.
+
+    """
+    rows = []
+    for resource, violations in violation_map.items():
+        for violation in violations:
+            row = dict(violation,
+                       created_at_datetime=datetime(2018, 3, 16, 9, 29, 52))
+            rows.append((row, resource))
+    mock_dao.ViolationAccess.return_value.iter.return_value = rows
+    mock_dao.convert_sqlalchemy_object_to_dict.side_effect = (
+        lambda row: dict(row[0], resource=row[1]))
+    mock_dao.decode_violation.side_effect = (
+        lambda v_data: v_data.pop('resource'))
+
+
 class NotifierTest(ForsetiTestCase):
     def setUp(self):
         pass
@@ -56,13 +78,13 @@ class NotifierTest(ForsetiTestCase):
         """No notifiers are instantiated/run if there are no violations.
 
         Setup:
-            Mock the scanner_dao and make its map_by_resource() function return
+            Mock the scanner_dao and make it return
             an empty violations map
 
         Expected outcome:
             The local find_notifiers() function is never called -> no notifiers
             are looked up, istantiated or run."""
-        mock_dao.map_by_resource.return_value = dict()
+        mock_violations(mock_dao, dict())
         mock_service_cfg = mock.MagicMock()
         mock_service_cfg.get_global_config.return_value = fake_violations.GLOBAL_CONFIGS
         mock_service_cfg.get_notifier_config.return_value = fake_violations.NOTIFIER_CONFIGS
@@ -84,14 +106,14 @@ class NotifierTest(ForsetiTestCase):
         """The email/GCS upload notifiers are instantiated/run.
 
         Setup:
-            Mock the scanner_dao and make its map_by_resource() function return
+            Mock the scanner_dao and make it return
             the VIOLATIONS dict
 
         Expected outcome:
             The local find_notifiers() is called with with 'email_violations'
             and 'gcs_violations' respectively. These 2 notifiers are
             instantiated and run."""
-        mock_dao.map_by_resource.return_value = fake_violations.VIOLATIONS
+        mock_violations(mock_dao, fake_violations.VIOLATIONS)
         mock_service_cfg = mock.MagicMock()
         mock_service_cfg.get_global_config.return_value = fake_violations.GLOBAL_CONFIGS
         mock_service_cfg.get_notifier_config.return_value = fake_violations.NOTIFIER_CONFIGS
@@ -117,6 +139,71 @@ class NotifierTest(ForsetiTestCase):
             mock_gcs_violations_cls.call_args[0][0])
         self.assertEqual(1, mock_gcs_violations.run.call_count)
 
+        # The notifiers get the spooled violations of their resource, which
+        # are removed once the notifiers are done.
+        spool = mock_gcs_violations_cls.call_args[0][2]
+        self.assertIs(spool, mock_email_violations_cls.call_args[0][2])
+        self.assertEqual(
+            len(fake_violations.VIOLATIONS['iam_policy_violations']),
+            len(spool))
+        self.assertFalse(os.path.exists(spool._file.name))
+
+    @mock.patch(
+        'google.cloud.forseti.notifier.notifier.cscc_notifier.CsccNotifier',
+        autospec=True)
+    @mock.patch(
+        'google.cloud.forseti.notifier.notifier.find_notifiers', autospec=True)
+    @mock.patch(
+        'google.cloud.forseti.notifier.notifier.scanner_dao', autospec=True)
+    def test_cscc_notifier_gets_all_violations(
+        self, mock_dao, mock_find_notifiers, mock_cscc_notifier_cls):
+        """The CSCC notifier gets the violations of all the resources.
+
+        Setup:
+            Enable the CSCC notifier and make the scanner_dao return the
+            VIOLATIONS dict.
+
+        Expected outcome:
+            The CSCC notifier is run with the violations of all the resources
+            as read from the database, with the timestamps converted."""
+        mock_violations(mock_dao, fake_violations.VIOLATIONS)
+        notifier_configs = dict(
+            fake_violations.NOTIFIER_CONFIGS,
+            resources=[],
+            violation={'cscc': {'enabled': True,
+                                'source_id': 'organizations/1/sources/2',
+                                'max_concurrent_batches': 2}})
+        mock_service_cfg = mock.MagicMock()
+        mock_service_cfg.get_global_config.return_value = fake_violations.GLOBAL_CONFIGS
+        mock_service_cfg.get_notifier_config.return_value = notifier_configs
+        received = []
+        mock_cscc_notifier_cls.return_value.run.side_effect = (
+            lambda violations, source_id: received.extend(violations))
+
+        notifier.run('iid-1-2-3', None, mock.MagicMock(), mock_service_cfg)
+
+        self.assertFalse(mock_find_notifiers.called)
+        self.assertEqual(2, mock_cscc_notifier_cls.call_args[1][
+            'max_concurrent_batches'])
+        self.assertEqual(
+            sum(len(v) for v in fake_violations.VIOLATIONS.values()),
+            len(received))
+        self.assertEqual(
+            ['2018-03-16T09:29:52Z'],
+            list(set(v['created_at_datetime'] for v in received)))
+
+    def test_run_notifiers_raises_after_all_notifiers_ran(self):
+        """An error of a notifier doesn't stop the other notifiers."""
+        ran = []
+
+        def failing_notifier():
+            raise ValueError('notifier failed')
+
+        with self.assertRaises(ValueError):
+            notifier.run_notifiers(
+                [failing_notifier, lambda: ran.append(True)], 1)
+        self.assertEqual([True], ran)
+
     @mock.patch(
         ('google.cloud.forseti.notifier.notifiers.email_violations'
          '.EmailViolations'), autospec=True)
@@ -134,7 +221,7 @@ class NotifierTest(ForsetiTestCase):
         """Without scanner index id, no notifications are sent.
 
         Setup:
-            Mock the scanner_dao and make its map_by_resource() function return
+            Mock the scanner_dao and make it return
             the VIOLATIONS dict.
             Make sure that no scanner index with a (SUCCESS, PARTIAL_SUCCESS)
             completion state is found.
@@ -155,7 +242,7 @@ class NotifierTest(ForsetiTestCase):
         notifier.run('iid-1-2-3', None, mock.MagicMock(), mock_service_cfg)
 
         self.assertFalse(mock_find_notifiers.called)
-        self.assertFalse(mock_dao.map_by_resource.called)
+        self.assertFalse(mock_dao.ViolationAccess.called)
         self.assertTrue(mock_logger.error.called)
 
     @mock.patch(
@@ -170,7 +257,7 @@ class NotifierTest(ForsetiTestCase):
         """No violation notifiers are run if there are no violations.
 
         Setup:
-            Mock the scanner_dao and make its map_by_resource() function return
+            Mock the scanner_dao and make it return
             an empty violations map
 
         Expected outcome:
@@ -178,7 +265,7 @@ class NotifierTest(ForsetiTestCase):
             are looked up, istantiated or run.
             The `run_inv_summary` function *is* called.
         """
-        mock_dao.map_by_resource.return_value = dict()
+        mock_violations(mock_dao, dict())
         mock_service_cfg = mock.MagicMock()
         mock_service_cfg.get_global_config.return_value = fake_violations.GLOBAL_CONFIGS
         mock_service_cfg.get_notifier_config.return_value = fake_violations.NOTIFIER_CONFIGS
@@ -19,12 +19,29 @@ import datetime
 import json
 import unittest.mock as mock
 
+from googleapiclient import errors
+import httplib2
+
 from google.cloud.forseti.notifier import notifier
 from google.cloud.forseti.notifier.notifiers import cscc_notifier
 from google.cloud.forseti.services.scanner import dao as scanner_dao
 from tests.services.scanner import scanner_base_db
 
 
+def _as_listed(finding, **source_properties):
+    """The finding as read from the API by a later scan."""
+    properties = dict(finding['source_properties'], **source_properties)
+    properties['rule_index'] = float(properties['rule_index'])
+    return {'finding': {
+        'name': finding['name'],
+        'parent': finding['parent'],
+        'resourceName': finding['resource_name'],
+        'state': finding['state'],
+        'category': finding['category'],
+        'eventTime': '2010-08-27T10:20:30Z',
+        'sourceProperties': properties}}
+
+
 class CsccNotifierTest(scanner_base_db.ScannerBaseDbTestCase):
 
     def setUp(self):
@@ -129,132 +146,6 @@ class CsccNotifierTest(scanner_base_db.ScannerBaseDbTestCase):
         _, kwargs = call
         self.assertEqual('111', kwargs['source_id'])
 
-    def test_outdated_findings_are_found(self):
-
-        NEW_FINDINGS = [['abc',
-                            {'category': 'BUCKET_VIOLATION',
-                             'resource_name': 'organization/123/project/inventoryscanner/bucket/isthispublic/',
-                             'name': 'organizations/123/sources/560/findings/abc',
-                             'parent': 'organizations/123/sources/560',
-                             'event_time': '2019-03-12T16:06:19Z',
-                             'state': 'ACTIVE',
-                             'source_properties': {'source': 'FORSETI',
-                                                   'rule_name': 'Bucket acls rule to search for public buckets',
-                                                   'inventory_index_id': 789,
-                                                   'resource_data': '{"bucket": "isthispublic", "entity": "allUsers", "id": "isthispublic/allUsers", "role": "READER"}',
-                                                   'db_source': 'table:violations/id:94953',
-                                                   'rule_index': 0,
-                                                   'violation_data': '{"bucket": "isthispublic", "domain": "", "email": "", "entity": "allUsers", "full_name": "organization/123/project/inventoryscanner/bucket/isthispublic/", "project_id": "inventoryscanner-henry", "role": "READER"}',
-                                                   'resource_id': 'isthispublic',
-                                                   'scanner_index_id': 1551913369403591,
-                                                   'resource_type': 'bucket'}}]]
-
-        FINDINGS_IN_CSCC = [['ffe',
-                            {'category': 'BUCKET_VIOLATION',
-                             'resource_name': 'organization/123/project/inventoryscanner/bucket/isthispublic/',
-                             'name': 'organizations/123/sources/560/findings/ffe',
-                             'parent': 'organizations/123/sources/560',
-                             'event_time': '2019-03-12T16:06:19Z',
-                             'state': 'ACTIVE',
-                             'source_properties': {'source': 'FORSETI',
-                                                   'rule_name': 'Bucket acls rule to search for public buckets',
-                                                   'inventory_index_id': 789,
-                                                   'resource_data': '{"bucket": "isthispublic", "entity": "allUsers", "id": "isthispublic/allUsers", "role": "READER"}',
-                                                   'db_source': 'table:violations/id:94953',
-                                                   'rule_index': 0,
-                                                   'violation_data': '{"bucket": "isthispublic", "domain": "", "email": "", "entity": "allUsers", "full_name": "organization/123/project/inventoryscanner/bucket/isthispublic/", "project_id": "inventoryscanner", "role": "READER"}',
-                                                   'resource_id': 'isthispublic',
-                                                   'scanner_index_id': 1551913369403591,
-                                                   'resource_type': 'bucket'}}],
-                            ['hij',
-                            {'category': 'BUCKET_VIOLATION',
-                             'resource_name': 'organization/123/project/inventoryscanner/bucket/nolongerpublic/',
-                             'name': 'organizations/123/sources/560/findings/hij',
-                             'parent': 'organizations/123/sources/560',
-                             'event_time': '2019-03-12T16:06:19Z',
-                             'state': 'INACTIVE',
-                             'source_properties': {'source': 'FORSETI',
-                                                   'rule_name': 'Bucket acls rule to search for public buckets',
-                                                   'inventory_index_id': 789,
-                                                   'resource_data': '{"bucket": "nolongerpublic", "entity": "allUsers", "id": "nolongerpublic/allUsers", "role": "READER"}',
-                                                   'db_source': 'table:violations/id:94953',
-                                                   'rule_index': 0,
-                                                   'violation_data': '{"bucket": "nolongerpublic", "domain": "", "email": "", "entity": "allUsers", "full_name": "organization/123/project/inventoryscanner/bucket/nolongerpublic/", "project_id": "inventoryscanner", "role": "READER"}',
-                                                   'resource_id': 'nolongerpublic',
-                                                   'scanner_index_id': 1551913369403591,
-                                                   'resource_type': 'bucket'}}]
-                             ]
-
-        EXPECTED_INACTIVE_FINDINGS = [['ffe',
-                            {'category': 'BUCKET_VIOLATION',
-                             'resource_name': 'organization/123/project/inventoryscanner-henry/bucket/isthispublic/',
-                             'name': 'organizations/123/sources/560/findings/ffe',
-                             'parent': 'organizations/123/sources/560',
-                             'event_time': '2019-03-12T16:06:19Z',
-                             'state': 'INACTIVE',
-                             'source_properties': {'source': 'FORSETI',
-                                                   'rule_name': 'Bucket acls rule to search for public buckets',
-                                                   'inventory_index_id': 789,
-                                                   'resource_data': '{"bucket": "isthispublic", "entity": "allUsers", "id": "isthispublic/allUsers", "role": "READER"}',
-                                                   'db_source': 'table:violations/id:94953',
-                                                   'rule_index': 0,
-                                                   'violation_data': '{"bucket": "isthispublic", "domain": "", "email": "", "entity": "allUsers", "full_name": "organization/123/project/inventoryscanner/bucket/isthispublic/", "project_id": "inventoryscanner", "role": "READER"}',
-                                                   'resource_id': 'isthispublic',
-                                                   'scanner_index_id': 1551913369403591,
-                                                   'resource_type': 'bucket'}}]]
-
-        notifier = cscc_notifier.CsccNotifier('123', self.api_quota)
-
-        inactive_findings = notifier.find_inactive_findings(NEW_FINDINGS,
-                                                            FINDINGS_IN_CSCC)
-        self.assertEqual(EXPECTED_INACTIVE_FINDINGS[0][1]['state'],
-                          inactive_findings[0][1]['state'])
-
-    def test_outdated_findings_are_not_found(self):
-
-        NEW_FINDINGS = [['abc',
-                            {'category': 'BUCKET_VIOLATION',
-                             'resource_name': 'organization/123/project/inventoryscanner/bucket/isthispublic/',
-                             'name': 'organizations/123/sources/560/findings/abc',
-                             'parent': 'organizations/123/sources/560',
-                             'event_time': '2019-03-12T16:06:19Z',
-                             'state': 'ACTIVE',
-                             'source_properties': {'source': 'FORSETI',
-                                                   'rule_name': 'Bucket acls rule to search for public buckets',
-                                                   'inventory_index_id': 789,
-                                                   'resource_data': '{"bucket": "isthispublic", "entity": "allUsers", "id": "isthispublic/allUsers", "role": "READER"}',
-                                                   'db_source': 'table:violations/id:94953',
-                                                   'rule_index': 0,
-                                                   'violation_data': '{"bucket": "isthispublic", "domain": "", "email": "", "entity": "allUsers", "full_name": "organization/123/project/inventoryscanner/bucket/isthispublic/", "project_id": "inventoryscanner-henry", "role": "READER"}',
-                                                   'resource_id': 'isthispublic',
-                                                   'scanner_index_id': 1551913369403591,
-                                                   'resource_type': 'bucket'}}]]
-
-        FINDINGS_IN_CSCC = [['abc',
-                            {'category': 'BUCKET_VIOLATION',
-                             'resource_name': 'organization/123/project/inventoryscanner/bucket/isthispublic/',
-                             'name': 'organizations/123/sources/560/findings/abc',
-                             'parent': 'organizations/123/sources/560',
-                             'event_time': '2019-03-12T16:06:19Z',
-                             'state': 'ACTIVE',
-                             'source_properties': {'source': 'FORSETI',
-                                                   'rule_name': 'Bucket acls rule to search for public buckets',
-                                                   'inventory_index_id': 789,
-                                                   'resource_data': '{"bucket": "isthispublic", "entity": "allUsers", "id": "isthispublic/allUsers", "role": "READER"}',
-                                                   'db_source': 'table:violations/id:94953',
-                                                   'rule_index': 0,
-                                                   'violation_data': '{"bucket": "isthispublic", "domain": "", "email": "", "entity": "allUsers", "full_name": "organization/123/project/inventoryscanner/bucket/isthispublic/", "project_id": "inventoryscanner-henry", "role": "READER"}',
-                                                   'resource_id': 'isthispublic',
-                                                   'scanner_index_id': 1551913369403591,
-                                                   'resource_type': 'bucket'}}]]
-
-        notifier = cscc_notifier.CsccNotifier('123', self.api_quota)
-
-        inactive_findings = notifier.find_inactive_findings(NEW_FINDINGS,
-                                                            FINDINGS_IN_CSCC)
-
-        assert(len(inactive_findings)) == 0
-
     @mock.patch('google.cloud.forseti.common.gcp_api.securitycenter.SecurityCenterClient')
     def test_empty_list_api_response(self, mock_list):
         source_id = 'organizations/123/sources/456'
@@ -283,7 +174,139 @@ class CsccNotifierTest(scanner_base_db.ScannerBaseDbTestCase):
             'id': 99185,
             'resource_type': 'cloudsqlinstance'}]
 
-        mock_list.list_findings.return_value = {'readTime': '111'}
+        mock_client = mock_list.return_value
+        mock_client.list_findings.return_value = [{'readTime': '111'}]
+        mock_client.patch_findings.return_value = [({}, None)]
         notifier = cscc_notifier.CsccNotifier('abc', self.api_quota)
-        notifier._send_findings_to_cscc(violations, source_id)
-        self.assertFalse(mock_list.update_finding.called)
+        summary = notifier._send_findings_to_cscc(violations, source_id)
+
+        # The finding is created, no finding is marked INACTIVE.
+        self.assertEqual(1, mock_client.patch_findings.call_count)
+        patched, = mock_client.patch_findings.call_args[0]
+        self.assertEqual(1, len(patched))
+        self.assertEqual('ACTIVE', patched[0][1]['state'])
+        self.assertIsNone(
+            mock_client.patch_findings.call_args[1]['update_mask'])
+        self.assertEqual(1, summary['created'])
+        self.assertEqual(0, summary['inactive'])
+
+    @mock.patch('google.cloud.forseti.common.gcp_api.securitycenter.SecurityCenterClient')
+    def test_findings_are_synchronized_by_fingerprint(self, mock_client_class):
+        source_id = 'organizations/11111/sources/22222'
+        violations_as_dict = self._populate_and_retrieve_violations()
+        notifier = cscc_notifier.CsccNotifier('iii', self.api_quota)
+        new_findings = notifier._transform_for_api(violations_as_dict,
+                                                   source_id=source_id)
+
+        unchanged = _as_listed(new_findings[0][1], scanner_index_id=1.0,
+                              db_source='table:violations/id:0')
+        changed = _as_listed(new_findings[1][1], rule_name='old rule')
+        outdated_id = 'a' * 32
+        outdated = {'finding': {
+            'name': '{}/findings/{}'.format(source_id, outdated_id),
+            'state': 'ACTIVE'}}
+
+        mock_client = mock_client_class.return_value
+        mock_client.list_findings.return_value = iter([
+            {'listFindingsResults': [unchanged, changed]},
+            {'listFindingsResults': [outdated]}])
+        mock_client.patch_findings.side_effect = (
+            lambda findings, **kwargs: [({}, None)] * len(findings))
+
+        summary = notifier._send_findings_to_cscc(violations_as_dict,
+                                                  source_id=source_id)
+
+        self.assertEqual({'created': 0, 'updated': 1, 'inactive': 1,
+                          'unchanged': 1, 'failed': 0, 'requests_saved': 1},
+                         summary)
+        (updates, update_kwargs), (inactive, inactive_kwargs) = [
+            (args[0], kwargs)
+            for args, kwargs in mock_client.patch_findings.call_args_list]
+        self.assertEqual([(new_findings[1][1]['name'], new_findings[1][1])],
+                         updates)
+        self.assertIsNone(update_kwargs['update_mask'])
+        self.assertEqual('{}/findings/{}'.format(source_id, outdated_id),
+                         inactive[0][0])
+        self.assertEqual('INACTIVE', inactive[0][1]['state'])
+        self.assertEqual('state,event_time', inactive_kwargs['update_mask'])
+
+    @mock.patch('google.cloud.forseti.common.util.date_time.'
+                'get_utc_now_datetime')
+    @mock.patch('google.cloud.forseti.common.gcp_api.securitycenter.SecurityCenterClient')
+    def test_outdated_findings_are_found(self, mock_client_class,
+                                         mock_get_utc_now):
+        """ACTIVE findings missing from the scan are marked INACTIVE."""
+        source_id = 'organizations/11111/sources/22222'
+        violations_as_dict = self._populate_and_retrieve_violations()
+        notifier = cscc_notifier.CsccNotifier('iii', self.api_quota)
+        new_findings = notifier._transform_for_api(violations_as_dict,
+                                                   source_id=source_id)
+        mock_get_utc_now.return_value = datetime.datetime(
+            2010, 8, 29, 10, 20, 30, 0)
+        outdated_ids = ['a' * 32, 'b' * 32]
+
+        mock_client = mock_client_class.return_value
+        mock_client.list_findings.return_value = [{'listFindingsResults': [
+            _as_listed(finding) for _, finding in new_findings] + [
+                {'finding': {
+                    'name': '{}/findings/{}'.format(source_id, outdated_id),
+                    'state': 'ACTIVE'}}
+                for outdated_id in outdated_ids]}]
+        mock_client.patch_findings.side_effect = (
+            lambda findings, **kwargs: [({}, None)] * len(findings))
+
+        summary = notifier._send_findings_to_cscc(violations_as_dict,
+                                                  source_id=source_id)
+
+        self.assertEqual(len(outdated_ids), summary['inactive'])
+        self.assertEqual(len(new_findings), summary['unchanged'])
+        mock_client.patch_findings.assert_called_once_with(
+            [('{}/findings/{}'.format(source_id, outdated_id),
+              {'state': 'INACTIVE', 'event_time': '2010-08-29T10:20:30Z'})
+             for outdated_id in outdated_ids],
+            update_mask='state,event_time',
+            max_workers=notifier.max_concurrent_batches)
+
+    @mock.patch('google.cloud.forseti.common.gcp_api.securitycenter.SecurityCenterClient')
+    def test_outdated_findings_are_not_found(self, mock_client_class):
+        """Findings found again and unchanged are not patched."""
+        source_id = 'organizations/11111/sources/22222'
+        violations_as_dict = self._populate_and_retrieve_violations()
+        notifier = cscc_notifier.CsccNotifier('iii', self.api_quota)
+        new_findings = notifier._transform_for_api(violations_as_dict,
+                                                   source_id=source_id)
+
+        mock_client = mock_client_class.return_value
+        mock_client.list_findings.return_value = [{'listFindingsResults': [
+            _as_listed(finding) for _, finding in new_findings]}]
+
+        summary = notifier._send_findings_to_cscc(violations_as_dict,
+                                                  source_id=source_id)
+
+        self.assertEqual({'created': 0, 'updated': 0, 'inactive': 0,
+                          'unchanged': len(new_findings), 'failed': 0,
+                          'requests_saved': len(new_findings)},
+                         summary)
+        self.assertFalse(mock_client.patch_findings.called)
+
+    @mock.patch('google.cloud.forseti.common.gcp_api.securitycenter.SecurityCenterClient')
+    def test_failed_findings_are_counted(self, mock_client_class):
+        """The findings failing to be patched are counted as failed."""
+        source_id = 'organizations/11111/sources/22222'
+        violations_as_dict = self._populate_and_retrieve_violations()
+        notifier = cscc_notifier.CsccNotifier('iii', self.api_quota)
+        new_findings = notifier._transform_for_api(violations_as_dict,
+                                                   source_id=source_id)
+        error = errors.HttpError(httplib2.Response({'status': '500'}), b'')
+
+        mock_client = mock_client_class.return_value
+        mock_client.list_findings.return_value = []
+        mock_client.patch_findings.side_effect = (
+            lambda findings, **kwargs: [({}, None)] + [(None, error)] * (
+                len(findings) - 1))
+
+        summary = notifier._send_findings_to_cscc(violations_as_dict,
+                                                  source_id=source_id)
+
+        self.assertEqual(len(new_findings), summary['created'])
+        self.assertEqual(len(new_findings) - 1, summary['failed'])
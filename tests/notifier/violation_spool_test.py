@@ -0,0 +1,70 @@
+# Copyright 2020 The Forseti Security Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests the violation spool."""
+import os
+import unittest
+
+from google.cloud.forseti.common.util import parser
+from google.cloud.forseti.notifier import violation_spool
+from tests.notifier.notifiers.test_data import fake_violations
+from tests.unittest_utils import ForsetiTestCase
+
+
+class ViolationSpoolTest(ForsetiTestCase):
+    """Test the violation spool."""
+
+    def setUp(self):
+        """Set up."""
+        self.violations = fake_violations.VIOLATIONS['iam_policy_violations']
+        self.spool = violation_spool.ViolationSpool('iam_policy_violations')
+
+    def tearDown(self):
+        """Tear down."""
+        self.spool.close()
+
+    def test_iterate_violations(self):
+        """The violations can be iterated several times, also concurrently."""
+        for violation in self.violations:
+            self.spool.append(violation)
+
+        self.assertEqual(len(self.violations), len(self.spool))
+        self.assertEqual(self.violations, list(self.spool))
+        first = iter(self.spool)
+        second = iter(self.spool)
+        self.assertEqual(self.violations[0], next(first))
+        self.assertEqual(self.violations[0], next(second))
+        self.assertEqual(self.violations[1:], list(first))
+
+    def test_json_stringify(self):
+        """The spool is stringified like the list of its violations."""
+        for violation in self.violations:
+            self.spool.append(violation)
+
+        self.assertEqual(parser.json_stringify(self.violations),
+                         ''.join(parser.json_stringify_iter(self.spool)))
+        empty_spool = violation_spool.ViolationSpool('empty')
+        self.assertEqual('[]', ''.join(
+            parser.json_stringify_iter(empty_spool)))
+        empty_spool.close()
+
+    def test_close(self):
+        """The temporary file is removed when the spool is closed."""
+        self.spool.append(self.violations[0])
+        self.spool.close()
+        self.assertFalse(os.path.exists(self.spool._file.name))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2024,5 +2024,86 @@ class IamRulesEngineTest(ForsetiTestCase):
         self.assertEqual(expected_violations, actual_violations)
 
 
+    def test_rule_index_rebuilt_after_add_rule(self):
+        """Test rules added after a lookup are found."""
+        rule_book = ire.IamRuleBook({}, test_rules.RULES1, self.fake_timestamp)
+        project = Project('my-project-1', 12345, parent=self.org789)
+        policy = mock.MagicMock(
+            full_name='organization/778899/project/my-project-1/')
+        bindings = [IamPolicyBinding.create_from(
+            {'role': 'roles/owner', 'members': ['user:evil@xyz.com']})]
+        before = list(rule_book.find_violations(project, policy, bindings))
+
+        rule_book.add_rule({
+            'name': 'no xyz owners',
+            'mode': 'blacklist',
+            'resource': [{'type': 'project', 'applies_to': 'self',
+                          'resource_ids': ['my-project-1']}],
+            'inherit_from_parents': True,
+            'bindings': [{'role': 'roles/owner',
+                          'members': ['user:*@xyz.com']}]}, 100)
+        after = list(rule_book.find_violations(project, policy, bindings))
+
+        self.assertEqual(len(before) + 1, len(after))
+        self.assertIn('no xyz owners', [v.rule_name for v in after])
+
+
+class MemberMatcherTest(ForsetiTestCase):
+    """Tests for the compiled rule binding members."""
+
+    def setUp(self):
+        """Set up."""
+        self.rule_members = [
+            IamPolicyMember.create_from(m) for m in (
+                'user:*@company.com', 'user:Admin@partner.com',
+                'user:a*@company.com', 'domain:company.com',
+                'serviceAccount:*@*.gserviceaccount.com', 'allUsers')]
+        self.matcher = ire._MemberMatcher(self.rule_members)
+
+    def test_matches_like_rule_members(self):
+        """Test the matcher agrees with matching every rule member."""
+        for member in ('user:joe@company.com', 'user:JOE@Company.com',
+                       'user:admin@partner.com', 'user:joe@partner.com',
+                       'user:joe@company.com.evil.com',
+                       'group:team@company.com', 'domain:company.com',
+                       'domain:partner.com', 'allUsers',
+                       'allAuthenticatedUsers',
+                       'serviceAccount:sa@p1.iam.gserviceaccount.com',
+                       'serviceAccount:sa@gserviceaccount.org'):
+            policy_member = IamPolicyMember.create_from(member)
+            expected = any(rule_member.matches(policy_member)
+                           for rule_member in self.rule_members)
+            self.assertEqual(expected, self.matcher.matches(policy_member),
+                             member)
+
+    def test_count_matches(self):
+        """Test the number of matching rule members is counted."""
+        count = self.matcher.count_matches(
+            IamPolicyMember.create_from('user:alice@company.com'))
+        self.assertEqual(3, count)
+        count = self.matcher.count_matches(
+            IamPolicyMember.create_from('user:bob@evil.com'))
+        self.assertEqual(0, count)
+
+    def test_check_members_same_as_member_checks(self):
+        """Test the compiled checks report the same members, duplicates too."""
+        policy_members = [IamPolicyMember.create_from(m) for m in (
+            'user:alice@company.com', 'user:bob@evil.com', 'allUsers')]
+        resource_rules = ire.ResourceRules()
+        rule_binding = IamPolicyBinding.create_from(
+            {'role': 'roles/*',
+             'members': ['user:*@company.com', 'user:a*@company.com',
+                         'allUsers']})
+
+        for mode, check in ((scanner_rules.RuleMode.BLACKLIST,
+                             ire._check_blacklist_members),
+                            (scanner_rules.RuleMode.WHITELIST,
+                             ire._check_whitelist_members)):
+            self.assertEqual(
+                check(rule_binding.members, policy_members),
+                resource_rules._check_members(mode, rule_binding,
+                                              policy_members))
+
+
 if __name__ == '__main__':
     unittest.main()
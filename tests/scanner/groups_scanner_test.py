@@ -14,11 +14,8 @@
 
 """Scanner runner script test."""
 
-from builtins import str
-import json
 import unittest.mock as mock
 
-import anytree
 import unittest
 import yaml
 
@@ -32,46 +29,19 @@ class GroupsScannerTest(ForsetiTestCase):
     def setUp(self):
         pass
 
-    def _render_ascii(self, starting_node, attr):
-        """Render an ascii representation of the tree structure.
-
-        Args:
-            starting_node: The starting node to render the ascii.
-
-        Returns:
-            attr: String of the attribute to render.
-        """
-        rows = []
-        for pre, fill, node in anytree.RenderTree(starting_node,
-                                                  style=anytree.AsciiStyle()):
-            value = getattr(node, attr, "")
-            if isinstance(value, (list, tuple)):
-                lines = value
-            else:
-                lines = str(value).split("\n")
-            rows.append(u"%s%s" % (pre,
-                                   json.dumps(lines[0], sort_keys=True)))
-            for line in lines[1:]:
-                rows.append(u"%s%s" % (fill,
-                                       json.dumps(line, sort_keys=True)))
-
-        return '\n'.join(rows)
-
     def _create_mock_service_config(self):
         mock_data_access = mock.MagicMock()
-        mock_data_access.iter_groups.return_value = fake_data.ALL_GROUPS
-        mock_data_access.return_value = fake_data.ALL_GROUPS
-
-        mock_data_access.expand_members.side_effect = [
-            fake_data.AAAAA_GROUP_MEMBERS,
-            fake_data.BBBBB_GROUP_MEMBERS,
-            fake_data.CCCCC_GROUP_MEMBERS,
-            fake_data.DDDDD_GROUP_MEMBERS]
+        mock_data_access.iter_member_details.return_value = (
+            fake_data.ALL_MEMBERS)
+        mock_data_access.iter_direct_group_members.return_value = (
+            fake_data.DIRECT_GROUP_MEMBERS)
+        mock_data_access.iter_group_in_group.return_value = (
+            fake_data.GROUP_IN_GROUP)
 
         mock_service_config = mock.MagicMock()
         mock_service_config.model_manager.get.return_value = (
             mock.MagicMock(), mock_data_access)
-        
+
         return mock_service_config
 
     def test_groups_scanner(self):
@@ -80,24 +50,54 @@ class GroupsScannerTest(ForsetiTestCase):
         mock_service_config = self._create_mock_service_config()
         scanner = groups_scanner.GroupsScanner(
             {}, {}, mock_service_config, '', '', '')
-        root = scanner._build_group_tree()
-        self.assertEqual(fake_data.EXPECTED_MEMBERS_IN_TREE,
-                          self._render_ascii(root, 'member_email'))
-
-        # test rules will be associated to the correct nodes
+        tree = scanner._build_group_tree()
+        members_in_tree = {
+            tree.member_emails[group]: [tree.member_emails[member]
+                                        for member in members]
+            for group, members in zip(tree.groups, tree.group_members)}
+        self.assertEqual(fake_data.EXPECTED_MEMBERS_IN_TREE, members_in_tree)
+
+        # test rules will be associated to the correct groups
         with open('tests/scanner/test_data/fake_group_rules.yaml', 'r') as f:
-            rules = yaml.load(f)
-        root_with_rules = scanner._apply_all_rules(root, rules)
-        self.assertEqual(fake_data.EXPECTED_MEMBERS_IN_TREE,
-                          self._render_ascii(root_with_rules, 'member_email'))
-        self.assertEqual(fake_data.EXPECTED_RULES_IN_TREE,
-                          self._render_ascii(root_with_rules, 'rules'))
+            rules = yaml.safe_load(f)
+        tree_with_rules = scanner._apply_all_rules(tree, rules)
+        rules_in_tree = {
+            tree.member_emails[group]: [rules[i]['name'] for i in rule_indexes]
+            for group, rule_indexes in zip(tree_with_rules.groups,
+                                           tree_with_rules.group_rules)}
+        self.assertEqual(fake_data.EXPECTED_RULES_IN_TREE, rules_in_tree)
 
         # test violations are found correctly
-        all_violations = scanner._find_violations(root_with_rules)
+        all_violations = scanner._find_violations(tree_with_rules)
         self.assertEqual(3, len(all_violations))
         for violation in all_violations:
             self.assertEqual('christy@yahoo.com', violation.member_email)
+        self.assertEqual(
+            fake_data.EXPECTED_VIOLATIONS,
+            sorted((violation.parent.member_email,
+                    violation.violated_rule_names)
+                   for violation in all_violations))
+
+    def test_groups_scanner_skips_org_and_empty_emails(self):
+        """The org and the members without email are never in violation."""
+        tree = groups_scanner.GroupTree()
+        group = tree.add_member('group', 'group@mycompany.com', 'group')
+        tree.add_group(group, [group,
+                               tree.add_member('all', '', 'group'),
+                               tree.add_member('org', 'my_customer', 'org'),
+                               tree.add_member('eve', 'eve@evil.com', 'user')])
+        tree = groups_scanner.GroupsScanner._apply_all_rules(tree, [
+            {'name': 'blacklist', 'group_email': 'my_customer',
+             'mode': 'blacklist', 'conditions': []}])
+
+        all_violations = groups_scanner.GroupsScanner._find_violations(tree)
+        # The group is in violation as a group and as its own member.
+        self.assertEqual(
+            [('my_customer', 'group@mycompany.com'),
+             ('group@mycompany.com', 'group@mycompany.com'),
+             ('group@mycompany.com', 'eve@evil.com')],
+            [(v.parent.member_email, v.member_email) for v in all_violations])
+        self.assertEqual([], all_violations[2].violated_rule_names)
 
 
 if __name__ == '__main__':
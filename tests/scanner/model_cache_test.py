@@ -0,0 +1,190 @@
+# Copyright 2020 The Forseti Security Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests the scanner model cache."""
+
+import unittest
+import unittest.mock as mock
+
+from tests.unittest_utils import ForsetiTestCase
+from google.cloud.forseti.scanner import model_cache
+
+
+def _resource(resource_type, name, parent=None, data='{}'):
+    """Create a fake model resource."""
+    resource = mock.Mock(spec=['cai_resource_name', 'cai_resource_type',
+                               'full_name', 'type_name', 'parent_type_name',
+                               'name', 'type', 'display_name', 'email', 'data',
+                               'parent'])
+    resource.type = resource_type
+    resource.name = name
+    resource.type_name = '{}/{}'.format(resource_type, name)
+    resource.full_name = '{}{}/'.format(
+        parent.full_name if parent else '', resource.type_name)
+    resource.parent_type_name = parent.type_name if parent else None
+    resource.parent = parent
+    resource.data = data
+    return resource
+
+
+class FakeModelAccess(object):
+    """Model access returning fixed resources by type."""
+
+    def __init__(self, resources):
+        self.resources = resources
+        self.reads = []
+        self.streaming = False
+
+    def scanner_iter(self, session, resource_type, parent_type_name=None):
+        self.reads.append((resource_type, parent_type_name))
+        self.streaming = True
+        try:
+            for resource in self.resources.get(resource_type, []):
+                if (not parent_type_name or
+                        resource.parent_type_name == parent_type_name):
+                    yield resource
+        finally:
+            self.streaming = False
+
+    def scanner_type_size(self, session, resource_type):
+        resources = self.resources.get(resource_type, [])
+        return (len(resources),
+                sum(len(resource.data or '') for resource in resources))
+
+
+class ModelCacheTest(ForsetiTestCase):
+    """Test the scanner model cache."""
+
+    def setUp(self):
+        """Set up."""
+        organization = _resource('organization', '1')
+        self.project = _resource('project', 'p1', organization)
+        self.policy = _resource('iam_policy', 'p1', self.project,
+                                '{"bindings": [{"role": "roles/owner"}]}')
+        self.bucket = _resource('bucket', 'b1', self.project, 'x' * 4096)
+        self.data_access = FakeModelAccess({
+            'project': [self.project],
+            'iam_policy': [self.policy],
+            'bucket': [self.bucket],
+        })
+
+    def test_scanner_iter_without_session(self):
+        """Test resources are read from the model without a scan session."""
+        results = list(model_cache.scanner_iter(
+            self.data_access, None, 'iam_policy'))
+
+        self.assertEqual([self.policy], results)
+        self.assertEqual([model_cache.load_data(self.policy)],
+                         [model_cache.load_data(r) for r in results])
+
+    def test_resources_read_once(self):
+        """Test scanners share the resources read in a scan session."""
+        with model_cache.scan_session(self.data_access, 1024 * 1024):
+            first = list(model_cache.scanner_iter(
+                self.data_access, None, 'iam_policy'))
+            second = list(model_cache.scanner_iter(
+                self.data_access, None, 'iam_policy'))
+
+        self.assertEqual([('iam_policy', None)], self.data_access.reads)
+        self.assertEqual(first, second)
+        policy = first[0]
+        self.assertIsInstance(policy, model_cache.CachedResource)
+        self.assertEqual(self.policy.full_name, policy.full_name)
+        self.assertEqual('project', policy.parent.type)
+        self.assertEqual('organization', policy.parent.parent.type)
+        self.assertIsNone(policy.parent.parent.parent)
+        self.assertIs(model_cache.load_data(first[0]),
+                      model_cache.load_data(second[0]))
+
+        # The session ended, the model is read again.
+        list(model_cache.scanner_iter(self.data_access, None, 'iam_policy'))
+        self.assertEqual(2, len(self.data_access.reads))
+
+    def test_least_recently_used_evicted(self):
+        """Test the least recently used resource type is evicted."""
+        max_bytes = 4096 + 2 * model_cache.RESOURCE_OVERHEAD_BYTES + 100
+        with model_cache.scan_session(self.data_access, max_bytes) as cache:
+            for resource_type in ('project', 'iam_policy', 'project',
+                                  'bucket', 'project', 'iam_policy'):
+                list(model_cache.scanner_iter(
+                    self.data_access, None, resource_type))
+            self.assertLessEqual(cache.size, max_bytes)
+
+        self.assertEqual([('project', None), ('iam_policy', None),
+                          ('bucket', None), ('iam_policy', None)],
+                         self.data_access.reads)
+
+    def test_resource_type_larger_than_cache(self):
+        """Test resource types larger than the cache are streamed."""
+        with model_cache.scan_session(self.data_access, 1024) as cache:
+            for _ in range(2):
+                results = list(model_cache.scanner_iter(
+                    self.data_access, None, 'bucket'))
+                self.assertEqual(['b1'], [r.name for r in results])
+            self.assertEqual(0, cache.size)
+
+        # The size of the type is known before reading it, every read
+        # streams the resources directly.
+        self.assertEqual([('bucket', None)] * 2, self.data_access.reads)
+
+    def test_resources_cached_by_type(self):
+        """Test reads filtering on the parent share the resources of a type."""
+        other_project = _resource('project', 'p2', self.project.parent)
+        other_policy = _resource('iam_policy', 'p2', other_project)
+        self.data_access.resources['iam_policy'].append(other_policy)
+
+        with model_cache.scan_session(self.data_access, 1024 * 1024):
+            first = list(model_cache.scanner_iter(
+                self.data_access, None, 'iam_policy', 'project/p1'))
+            second = list(model_cache.scanner_iter(
+                self.data_access, None, 'iam_policy', 'project/p2'))
+            every = list(model_cache.scanner_iter(
+                self.data_access, None, 'iam_policy'))
+
+        self.assertEqual([('iam_policy', None)], self.data_access.reads)
+        self.assertEqual([self.policy.full_name], [r.full_name for r in first])
+        self.assertEqual([other_policy.full_name],
+                         [r.full_name for r in second])
+        self.assertEqual(first + second, every)
+
+    def test_ancestors_loaded_after_stream(self):
+        """Test ancestors are not lazy loaded while the results stream."""
+        organization = self.project.parent
+
+        def lazy_load_parent(_):
+            """Fail like a query in the middle of a yield_per stream."""
+            self.assertFalse(self.data_access.streaming)
+            return organization
+
+        type(self.project).parent = property(lazy_load_parent)
+        with model_cache.scan_session(self.data_access, 1024 * 1024) as cache:
+            policies = list(model_cache.scanner_iter(
+                self.data_access, None, 'iam_policy'))
+            self.assertEqual({}, cache._key_locks)
+
+        self.assertEqual('organization', policies[0].parent.parent.type)
+
+    def test_cache_disabled(self):
+        """Test no cache is used if the size is 0."""
+        with model_cache.scan_session(self.data_access, 0) as cache:
+            self.assertIsNone(cache)
+            for _ in range(2):
+                list(model_cache.scanner_iter(
+                    self.data_access, None, 'project'))
+
+        self.assertEqual(2, len(self.data_access.reads))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -49,6 +49,31 @@ TWO_SCANNERS = {'scanners': [
     {'name': 'iam_policy', 'enabled': False}
 ]}
 
+class FakeScanner(object):
+    """Scanner recording that it ran."""
+
+    def __init__(self, ran):
+        self.ran = ran
+
+    def run(self):
+        self.ran.append(self.__class__.__name__)
+
+
+class FakeScannerA(FakeScanner):
+    """First fake scanner."""
+
+
+class FakeScannerB(FakeScanner):
+    """Second fake scanner."""
+
+
+class FailingScanner(FakeScanner):
+    """Scanner raising an error."""
+
+    def run(self):
+        raise ValueError('scanner failed')
+
+
 class ScannerRunnerTest(scanner_base_db.ScannerBaseDbTestCase):
 
     def setUp(self):
@@ -91,6 +116,43 @@ class ScannerRunnerTest(scanner_base_db.ScannerBaseDbTestCase):
                 self.assertTrue(closing_mock.called)
                 self.assertEqual(1, closing_mock.call_count)
 
+    @mock.patch(
+        'google.cloud.forseti.services.base.config.ServiceConfig',
+        autospec=True)
+    def test_run_concurrent_scanners(self, mock_service_config):
+        """Test scanners run concurrently and all results are recorded."""
+        scanner_configs = {'max_concurrent_scanners': 3}
+        mock_service_config.get_global_config.return_value = FAKE_GLOBAL_CONFIGS
+        mock_service_config.get_scanner_config.return_value = scanner_configs
+        mock_service_config.model_manager = mock.MagicMock()
+        mock_service_config.model_manager.get.return_value = (
+            mock.MagicMock(), mock.MagicMock())
+        ran = []
+        runnable_scanners = [FakeScannerA(ran), FailingScanner(ran),
+                             FakeScannerB(ran)]
+        progress_queue = mock.MagicMock()
+        with mock.patch.object(scanner.scanner_builder,
+                               'ScannerBuilder') as mock_builder, \
+                mock.patch.object(scanner, 'init_scanner_index'), \
+                mock.patch.object(scanner,
+                                  'mark_scanner_index_complete') as mock_mark:
+            mock_builder.return_value.build.return_value = runnable_scanners
+            scanner.run('m1', progress_queue, mock_service_config)
+
+        self.assertEqual(['FakeScannerA', 'FakeScannerB'], sorted(ran))
+        _, _, succeeded, failed = mock_mark.call_args[0]
+        self.assertEqual(['FakeScannerA', 'FakeScannerB'], sorted(succeeded))
+        self.assertEqual(['FailingScanner'], failed)
+        messages = [args[0] for args, _ in progress_queue.put.call_args_list]
+        self.assertTrue(any(message and
+                            message.startswith('FakeScannerA completed in')
+                            for message in messages))
+        self.assertTrue(any(message and
+                            message.startswith('Error running scanner: '
+                                               'FailingScanner')
+                            for message in messages))
+        self.assertIsNone(messages[-1])
+
     @mock.patch.object(date_time, 'get_utc_now_datetime')
     def test_init_scanner_index(self, mock_date_time):
         utc_now = datetime.utcnow()
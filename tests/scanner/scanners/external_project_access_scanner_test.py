@@ -91,9 +91,14 @@ class ExternalProjectAccessScannerTest(ForsetiTestCase):
         mock_inventory_config.get_root_resource_id.return_value = (
             'organizations/567890')
 
+        self.mock_data_access = mock.MagicMock()
+        self.mock_data_access.scanner_iter.return_value = []
+
         mock_service_config = mock.MagicMock()
         mock_service_config.get_inventory_config.return_value = (
             mock_inventory_config)
+        mock_service_config.model_manager.get.return_value = (
+            mock.MagicMock(), self.mock_data_access)
 
         self.service_config = mock_service_config
         self.model_name = 'TestModel'
@@ -151,6 +156,66 @@ class ExternalProjectAccessScannerTest(ForsetiTestCase):
         self.assertTrue(
             isinstance(user_ancestries['user1@example.com'][0][0], Project))
 
+    #pylint: disable=W0212
+    @mock.patch('google.cloud.forseti.common.gcp_api.cloud_resource_manager.CloudResourceManagerClient')
+    def test_retrieve_model_ancestries(self, mock_crm_client):
+        """Test projects in the model don't query their ancestry."""
+        epas.get_user_emails = mock.MagicMock(return_value=TEST_EMAILS)
+        self.scanner_configs['external_project_access_max_workers'] = 2
+        self.mock_data_access.scanner_iter.return_value = [
+            mock.MagicMock(full_name='organization/2222222/folder/3333333/'
+                                     'project/forseti-system-test/')]
+        # The name attribute of a mock is set after creation.
+        self.mock_data_access.scanner_iter.return_value[0].name = (
+            'forseti-system-test')
+
+        scanner = epas.ExternalProjectAccessScanner(self.global_configs,
+                                                    self.scanner_configs,
+                                                    self.service_config,
+                                                    self.model_name,
+                                                    self.snapshot_timestamp,
+                                                    self.rules)
+
+        mock_crm_client.get_projects.side_effect = lambda: [
+            {'projects': [{'projectId': 'forseti-system-test'},
+                          {'projectId': 'external-project'}]}]
+        mock_crm_client.get_project_ancestry.return_value = [
+            {'resourceId': {'type': 'project', 'id': 'external-project'}},
+            {'resourceId': {'type': 'organization', 'id': '4444444'}}]
+        scanner._get_crm_client = mock.MagicMock(
+            return_value=mock_crm_client)
+
+        user_ancestries = scanner._retrieve()
+
+        self.assertEqual(2, scanner.max_workers)
+        self.assertCountEqual(TEST_EMAILS, list(user_ancestries.keys()))
+        for ancestries in user_ancestries.values():
+            self.assertEqual(
+                [['forseti-system-test', '3333333', '2222222'],
+                 ['external-project', '4444444']],
+                [[resource.id for resource in ancestry]
+                 for ancestry in ancestries])
+            self.assertIsInstance(ancestries[0][1], Folder)
+        mock_crm_client.get_project_ancestry.assert_called_once_with(
+            'external-project')
+        self.assertEqual(1, len(scanner.ancestry_cache))
+
+    def test_ancestry_cache(self):
+        """Test the least recently used ancestries are evicted."""
+        cache = epas.AncestryCache(2)
+        cache.set('p1', [Project('p1')])
+        cache.set('p2', [Project('p2')])
+        self.assertEqual('p1', cache.get('p1')[0].id)
+        cache.set('p3', [Project('p3')])
+        self.assertIsNone(cache.get('p2'))
+        self.assertIsNotNone(cache.get('p1'))
+        self.assertIsNotNone(cache.get('p3'))
+        self.assertEqual(2, len(cache))
+
+        disabled_cache = epas.AncestryCache(0)
+        disabled_cache.set('p1', [Project('p1')])
+        self.assertIsNone(disabled_cache.get('p1'))
+
     def test_find_violations_bad_folder(self):
         """Test finding no violations with a bad folder as a parent"""
         epas.get_user_emails = mock.MagicMock(return_value=TEST_EMAILS)
@@ -11,15 +11,13 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-from builtins import object
-
 """Test data for groups scanner tests.
 
 Example data setup.
 group: aaaaa@mycompany.com
   member: adam@mycompany.com
   member: abby@mycompany.com
-  member: amelia@gmail.com
+  member: amelia@mycompany.com
 
 group: bbbbb@mycompany.com
   member: bob@mycompany.com
@@ -29,7 +27,7 @@ group: bbbbb@mycompany.com
 group: ccccc@mycompany.com
   member: charlie@mycompany.com
   member: cassy@mycompany.com
-  member: chrisy@gmail.com
+  member: christy@yahoo.com
 
 group: ddddd@mycompany.com
   member: david@mycompany.com
@@ -37,117 +35,95 @@ group: ddddd@mycompany.com
   member: bbbbb@mycompany.com
 """
 
-class FakeGroup(object):
-    def __init__(self, name, member_name, type):
-        self.name = name
-        self.member_name = member_name
-        self.type = type
-
-
-ALL_GROUPS = (
-    FakeGroup('aaaaa', 'aaaaa@mycompany.com', 'admin#directory#group'),
-    FakeGroup('bbbbb', 'bbbbb@mycompany.com', 'admin#directory#group'),
-    FakeGroup('ccccc', 'ccccc@mycompany.com', 'admin#directory#group'),
-    FakeGroup('ddddd', 'ddddd@mycompany.com', 'admin#directory#group'),
+# (name, member_name, type) of the members.
+ALL_MEMBERS = (
+    ('aaaaa', 'aaaaa@mycompany.com', 'group'),
+    ('bbbbb', 'bbbbb@mycompany.com', 'group'),
+    ('ccccc', 'ccccc@mycompany.com', 'group'),
+    ('ddddd', 'ddddd@mycompany.com', 'group'),
+    ('adam', 'adam@mycompany.com', 'user'),
+    ('abby', 'abby@mycompany.com', 'user'),
+    ('amelia', 'amelia@mycompany.com', 'user'),
+    ('bob', 'bob@mycompany.com', 'user'),
+    ('beth', 'beth@mycompany.com', 'user'),
+    ('charlie', 'charlie@mycompany.com', 'user'),
+    ('cassy', 'cassy@mycompany.com', 'user'),
+    ('christy', 'christy@yahoo.com', 'user'),
+    ('david', 'david@mycompany.com', 'user'),
+    ('daisy', 'daisy@mycompany.com', 'user'),
 )
 
+# (group name, member name) of the direct memberships.
+DIRECT_GROUP_MEMBERS = (
+    ('aaaaa', 'adam'),
+    ('aaaaa', 'abby'),
+    ('aaaaa', 'amelia'),
+    ('bbbbb', 'bob'),
+    ('bbbbb', 'beth'),
+    ('bbbbb', 'ccccc'),
+    ('ccccc', 'charlie'),
+    ('ccccc', 'cassy'),
+    ('ccccc', 'christy'),
+    ('ddddd', 'david'),
+    ('ddddd', 'daisy'),
+    ('ddddd', 'bbbbb'),
+)
 
-class FakeMember(object):
-    def __init__(self, name, member_name, type, starting_node):
-        self.name = name
-        self.member_name = member_name
-        self.type = type
-        self.starting_node = starting_node
-
-
-AAAAA_GROUP_MEMBERS = [
-    FakeMember('adam', 'adam@mycompany.com', 'USER', 'aaaaa'),
-    FakeMember('abby', 'abby@mycompany.com', 'USER', 'aaaaa'),
-    FakeMember('amelia', 'amelia@mycompany.com', 'USER', 'aaaaa'),
-]
-
-CCCCC_GROUP_MEMBERS = [
-    FakeMember('charlie', 'charlie@mycompany.com', 'USER', 'ccccc'),
-    FakeMember('cassy', 'cassy@mycompany.com', 'USER', 'ccccc'),
-    FakeMember('christy', 'christy@yahoo.com', 'USER', 'ccccc'),
-]
-
-BBBBB_GROUP_MEMBERS = [
-    FakeMember('bob', 'bob@mycompany.com', 'USER', 'bbbbb'),
-    FakeMember('beth', 'beth@mycompany.com', 'USER', 'bbbbb'),
-]
-BBBBB_GROUP_MEMBERS += CCCCC_GROUP_MEMBERS
-
-DDDDD_GROUP_MEMBERS = [
-    FakeMember('david', 'david@mycompany.com', 'USER', 'ddddd'),
-    FakeMember('daisy', 'daisy@mycompany.com', 'USER', 'ddddd'),
-]
-DDDDD_GROUP_MEMBERS += BBBBB_GROUP_MEMBERS
-
-# The order of these groups will be determined by the nesting structure
-# and by how the get_recursive_members() will return them.
-ALL_GROUP_MEMBERS = [
-    AAAAA_GROUP_MEMBERS,
-    BBBBB_GROUP_MEMBERS,
-    CCCCC_GROUP_MEMBERS,
-    DDDDD_GROUP_MEMBERS,
-]
-
-EXPECTED_MEMBERS_IN_TREE = (
-'''"my_customer"
-|-- "aaaaa@mycompany.com"
-|   |-- "adam@mycompany.com"
-|   |-- "abby@mycompany.com"
-|   +-- "amelia@mycompany.com"
-|-- "bbbbb@mycompany.com"
-|   |-- "bob@mycompany.com"
-|   |-- "beth@mycompany.com"
-|   |-- "charlie@mycompany.com"
-|   |-- "cassy@mycompany.com"
-|   +-- "christy@yahoo.com"
-|-- "ccccc@mycompany.com"
-|   |-- "charlie@mycompany.com"
-|   |-- "cassy@mycompany.com"
-|   +-- "christy@yahoo.com"
-+-- "ddddd@mycompany.com"
-    |-- "david@mycompany.com"
-    |-- "daisy@mycompany.com"
-    |-- "bob@mycompany.com"
-    |-- "beth@mycompany.com"
-    |-- "charlie@mycompany.com"
-    |-- "cassy@mycompany.com"
-    +-- "christy@yahoo.com"'''
+# (parent, member) of the denormalized group-in-group relation.
+GROUP_IN_GROUP = (
+    ('bbbbb', 'ccccc'),
+    ('ddddd', 'bbbbb'),
+    ('ddddd', 'ccccc'),
 )
 
-EXPECTED_RULES_IN_TREE = (
-"""{"conditions": [{"member_email": "@mycompany.com"}], "group_email": "my_customer", "mode": "whitelist", "name": "Allow my company users to be in my company groups."}
-|-- {"conditions": [{"member_email": "@mycompany.com"}], "group_email": "my_customer", "mode": "whitelist", "name": "Allow my company users to be in my company groups."}
-|   {"conditions": [{"member_email": "@gmail.com"}], "group_email": "aaaaa@mycompany.com", "mode": "whitelist", "name": "Allow gmail users to be in AAAAA group."}
-|   |-- {"conditions": [{"member_email": "@mycompany.com"}], "group_email": "my_customer", "mode": "whitelist", "name": "Allow my company users to be in my company groups."}
-|   |   {"conditions": [{"member_email": "@gmail.com"}], "group_email": "aaaaa@mycompany.com", "mode": "whitelist", "name": "Allow gmail users to be in AAAAA group."}
-|   |-- {"conditions": [{"member_email": "@mycompany.com"}], "group_email": "my_customer", "mode": "whitelist", "name": "Allow my company users to be in my company groups."}
-|   |   {"conditions": [{"member_email": "@gmail.com"}], "group_email": "aaaaa@mycompany.com", "mode": "whitelist", "name": "Allow gmail users to be in AAAAA group."}
-|   +-- {"conditions": [{"member_email": "@mycompany.com"}], "group_email": "my_customer", "mode": "whitelist", "name": "Allow my company users to be in my company groups."}
-|       {"conditions": [{"member_email": "@gmail.com"}], "group_email": "aaaaa@mycompany.com", "mode": "whitelist", "name": "Allow gmail users to be in AAAAA group."}
-|-- {"conditions": [{"member_email": "@mycompany.com"}], "group_email": "my_customer", "mode": "whitelist", "name": "Allow my company users to be in my company groups."}
-|   |-- {"conditions": [{"member_email": "@mycompany.com"}], "group_email": "my_customer", "mode": "whitelist", "name": "Allow my company users to be in my company groups."}
-|   |-- {"conditions": [{"member_email": "@mycompany.com"}], "group_email": "my_customer", "mode": "whitelist", "name": "Allow my company users to be in my company groups."}
-|   |-- {"conditions": [{"member_email": "@mycompany.com"}], "group_email": "my_customer", "mode": "whitelist", "name": "Allow my company users to be in my company groups."}
-|   |-- {"conditions": [{"member_email": "@mycompany.com"}], "group_email": "my_customer", "mode": "whitelist", "name": "Allow my company users to be in my company groups."}
-|   +-- {"conditions": [{"member_email": "@mycompany.com"}], "group_email": "my_customer", "mode": "whitelist", "name": "Allow my company users to be in my company groups."}
-|-- {"conditions": [{"member_email": "@mycompany.com"}], "group_email": "my_customer", "mode": "whitelist", "name": "Allow my company users to be in my company groups."}
-|   {"conditions": [{"member_email": "@gmail.com"}], "group_email": "ccccc@mycompany.com", "mode": "whitelist", "name": "Allow gmail users to be in CCCCC group."}
-|   |-- {"conditions": [{"member_email": "@mycompany.com"}], "group_email": "my_customer", "mode": "whitelist", "name": "Allow my company users to be in my company groups."}
-|   |   {"conditions": [{"member_email": "@gmail.com"}], "group_email": "ccccc@mycompany.com", "mode": "whitelist", "name": "Allow gmail users to be in CCCCC group."}
-|   |-- {"conditions": [{"member_email": "@mycompany.com"}], "group_email": "my_customer", "mode": "whitelist", "name": "Allow my company users to be in my company groups."}
-|   |   {"conditions": [{"member_email": "@gmail.com"}], "group_email": "ccccc@mycompany.com", "mode": "whitelist", "name": "Allow gmail users to be in CCCCC group."}
-|   +-- {"conditions": [{"member_email": "@mycompany.com"}], "group_email": "my_customer", "mode": "whitelist", "name": "Allow my company users to be in my company groups."}
-|       {"conditions": [{"member_email": "@gmail.com"}], "group_email": "ccccc@mycompany.com", "mode": "whitelist", "name": "Allow gmail users to be in CCCCC group."}
-+-- {"conditions": [{"member_email": "@mycompany.com"}], "group_email": "my_customer", "mode": "whitelist", "name": "Allow my company users to be in my company groups."}
-    |-- {"conditions": [{"member_email": "@mycompany.com"}], "group_email": "my_customer", "mode": "whitelist", "name": "Allow my company users to be in my company groups."}
-    |-- {"conditions": [{"member_email": "@mycompany.com"}], "group_email": "my_customer", "mode": "whitelist", "name": "Allow my company users to be in my company groups."}
-    |-- {"conditions": [{"member_email": "@mycompany.com"}], "group_email": "my_customer", "mode": "whitelist", "name": "Allow my company users to be in my company groups."}
-    |-- {"conditions": [{"member_email": "@mycompany.com"}], "group_email": "my_customer", "mode": "whitelist", "name": "Allow my company users to be in my company groups."}
-    |-- {"conditions": [{"member_email": "@mycompany.com"}], "group_email": "my_customer", "mode": "whitelist", "name": "Allow my company users to be in my company groups."}
-    |-- {"conditions": [{"member_email": "@mycompany.com"}], "group_email": "my_customer", "mode": "whitelist", "name": "Allow my company users to be in my company groups."}
-    +-- {"conditions": [{"member_email": "@mycompany.com"}], "group_email": "my_customer", "mode": "whitelist", "name": "Allow my company users to be in my company groups."}""")
+# The recursive members of each group, in the order of ALL_MEMBERS.
+EXPECTED_MEMBERS_IN_TREE = {
+    'aaaaa@mycompany.com': [
+        'aaaaa@mycompany.com',
+        'adam@mycompany.com',
+        'abby@mycompany.com',
+        'amelia@mycompany.com'],
+    'bbbbb@mycompany.com': [
+        'bbbbb@mycompany.com',
+        'ccccc@mycompany.com',
+        'bob@mycompany.com',
+        'beth@mycompany.com',
+        'charlie@mycompany.com',
+        'cassy@mycompany.com',
+        'christy@yahoo.com'],
+    'ccccc@mycompany.com': [
+        'ccccc@mycompany.com',
+        'charlie@mycompany.com',
+        'cassy@mycompany.com',
+        'christy@yahoo.com'],
+    'ddddd@mycompany.com': [
+        'bbbbb@mycompany.com',
+        'ccccc@mycompany.com',
+        'ddddd@mycompany.com',
+        'bob@mycompany.com',
+        'beth@mycompany.com',
+        'charlie@mycompany.com',
+        'cassy@mycompany.com',
+        'christy@yahoo.com',
+        'david@mycompany.com',
+        'daisy@mycompany.com'],
+}
+
+MY_COMPANY_RULE = 'Allow my company users to be in my company groups.'
+AAAAA_RULE = 'Allow gmail users to be in AAAAA group.'
+CCCCC_RULE = 'Allow gmail users to be in CCCCC group.'
+
+# The names of the rules applied to each group.
+EXPECTED_RULES_IN_TREE = {
+    'aaaaa@mycompany.com': [MY_COMPANY_RULE, AAAAA_RULE],
+    'bbbbb@mycompany.com': [MY_COMPANY_RULE],
+    'ccccc@mycompany.com': [MY_COMPANY_RULE, CCCCC_RULE],
+    'ddddd@mycompany.com': [MY_COMPANY_RULE],
+}
+
+# (group email, violated rule names) of the violations of christy@yahoo.com.
+EXPECTED_VIOLATIONS = [
+    ('bbbbb@mycompany.com', [MY_COMPANY_RULE]),
+    ('ccccc@mycompany.com', [MY_COMPANY_RULE, CCCCC_RULE]),
+    ('ddddd@mycompany.com', [MY_COMPANY_RULE]),
+]
@@ -46,6 +46,10 @@ class TestServiceConfig(object):
         """Stub."""
         return self.engine
 
+    def get_model_config(self):
+        """Stub."""
+        return {}
+
 
 MODEL = {
     'resources': {
@@ -182,6 +186,24 @@ class ExplainerTest(ForsetiTestCase):
                                  ]))
         self.setup.run(test)
 
+    def test_list_resources_in_pages(self):
+        """Test list resources in pages and resume after a resource."""
+
+        def test(client):
+            """Test implementation with API client."""
+            all_resources = [
+                r.full_resource_name for r in
+                client.explain.list_resources('', page_size=0)]
+            self.assertEqual(sorted(all_resources), all_resources)
+            for page_size in (1, 2, 6, 7):
+                self.assertEqual(all_resources, [
+                    r.full_resource_name for r in
+                    client.explain.list_resources('', page_size=page_size)])
+            self.assertEqual(all_resources[3:], [
+                r.full_resource_name for r in client.explain.list_resources(
+                    '', page_token=all_resources[2], page_size=2)])
+        self.setup.run(test)
+
     def test_list_members(self):
         """Test list members."""
 
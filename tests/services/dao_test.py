@@ -18,12 +18,15 @@ from builtins import str
 from builtins import range
 from collections import defaultdict
 import unittest
+import unittest.mock as mock
 from sqlalchemy.orm.exc import NoResultFound
 from tests.unittest_utils import ForsetiTestCase
 from tests.services import test_models
 from tests.services.model_tester import ModelCreator
 from tests.services.model_tester import ModelCreatorClient
 from google.cloud.forseti.common.util import logger
+from google.cloud.forseti.services import dao
+from google.cloud.forseti.services.dao import keyset_query
 from google.cloud.forseti.services.dao import session_creator
 
 LOGGER = logger.get_logger(__name__)
@@ -155,6 +158,68 @@ class DaoTest(ForsetiTestCase):
     checks = {u'user/u1', u'user/u2'}
     self.assertEqual(checks, set(all_member_names))
 
+  def test_iter_group_members_after(self):
+    """Test resuming a listing of group members after a member."""
+    session_maker, data_access = session_creator('test')
+    session = session_maker()
+    client = ModelCreatorClient(session, data_access)
+    _ = ModelCreator(test_models.MEMBER_TESTING_2, client)
+
+    all_member_names = list(data_access.iter_group_members(session, ''))
+    self.assertEqual(sorted(all_member_names), all_member_names)
+    self.assertEqual(
+        all_member_names[3:],
+        list(data_access.iter_group_members(session, '',
+                                            after=all_member_names[2])))
+
+  def test_keyset_query(self):
+    """Test paging a query by blocks of keys."""
+    session_maker, data_access = session_creator('test')
+    session = session_maker()
+    client = ModelCreatorClient(session, data_access)
+    _ = ModelCreator(test_models.RESOURCE_EXPANSION_1, client)
+
+    resource = data_access.TBL_RESOURCE
+    qry = session.query(resource)
+    expected = sorted(r.type_name for r in qry.all())
+    for block_size in (1, 3, 8, 100):
+      self.assertEqual(
+          expected,
+          [r.type_name for r in keyset_query(qry, resource.type_name,
+                                             block_size=block_size)])
+    self.assertEqual(
+        expected[5:],
+        [r.type_name for r in keyset_query(qry, resource.type_name,
+                                           after=expected[4],
+                                           block_size=3)])
+
+  def test_iter_group_memberships(self):
+    """Test the memberships and closure match the expanded members."""
+    session_maker, data_access = session_creator('test')
+    session = session_maker()
+    client = ModelCreatorClient(session, data_access)
+    _ = ModelCreator(test_models.MEMBER_TESTING_2, client)
+    data_access.denorm_group_in_group(session)
+
+    member_names = [name for name, _, _ in
+                    data_access.iter_member_details(session)]
+    direct_members = defaultdict(set)
+    for group_name, member_name in (
+        data_access.iter_direct_group_members(session)):
+      direct_members[group_name].add(member_name)
+    nested_groups = defaultdict(set)
+    for parent, member in data_access.iter_group_in_group(session):
+      nested_groups[parent].add(member)
+
+    for group in data_access.iter_groups(session):
+      self.assertIn(group.name, member_names)
+      members = {group.name} | direct_members[group.name]
+      for nested_group in nested_groups[group.name]:
+        members |= direct_members[nested_group]
+      expected = {m.name for m in
+                  data_access.expand_members(session, [group.name])}
+      self.assertEqual(expected, members)
+
   def test_iter_groups(self):
     """Test fetching all groups in model."""
     session_maker, data_access = session_creator('test')
@@ -204,6 +269,22 @@ class DaoTest(ForsetiTestCase):
     resource_type_names = [r.type_name for r in resources]
     self.assertEqual(set(), set(resource_type_names))
 
+  def test_scanner_type_size(self):
+    """Test counting the resources of a type and their data."""
+    session_maker, data_access = session_creator('test')
+    session = session_maker()
+    client = ModelCreatorClient(session, data_access)
+    _ = ModelCreator(test_models.RESOURCE_EXPANSION_1, client)
+
+    resource = (session.query(data_access.TBL_RESOURCE)
+                .filter(data_access.TBL_RESOURCE.type_name == 'r/res1')
+                .one())
+    resource.data = '{"a": 1}'
+    session.commit()
+
+    self.assertEqual((8, 8), data_access.scanner_type_size(session, 'r'))
+    self.assertEqual((0, 0), data_access.scanner_type_size(session, 'x'))
+
   def test_add_resource_by_name(self):
     """Test add_resource_by_name."""
     session_maker, data_access = session_creator('test')
@@ -536,6 +617,33 @@ class DaoTest(ForsetiTestCase):
         denormed_set,
         'Denormalized should be equivalent to transitive closure')
 
+  def test_denorm_group_in_group_in_memory(self):
+    """Test in-memory group_in_group denormalization matches the SQL one."""
+    session_maker, data_access = session_creator('test')
+    session = session_maker()
+    client = ModelCreatorClient(session, data_access)
+    _ = ModelCreator(test_models.GROUP_IN_GROUP_TESTING_1, client)
+
+    # Close a cycle g1 -> g7 -> g6 -> g5 -> g4 -> g1.
+    session.execute(data_access.TBL_MEMBERSHIP.insert(
+        {'group_name': 'group/g1', 'members_name': 'group/g7'}))
+    session.commit()
+
+    data_access.denorm_group_in_group(session)
+    entries = session.query(data_access.TBL_GROUP_IN_GROUP).all()
+    expected = set([(i.parent, i.member) for i in entries])
+    self.assertIn((u'group/g1', u'group/g1'), expected)
+
+    iterations = data_access.denorm_group_in_group_in_memory(session)
+    entries = session.query(data_access.TBL_GROUP_IN_GROUP).all()
+    denormed_set = set([(i.parent, i.member) for i in entries])
+    self.assertEqual(1, iterations)
+    self.assertEqual(len(expected), len(entries))
+    self.assertEqual(
+        expected,
+        denormed_set,
+        'In-memory denormalization should be equivalent to SQL')
+
   def test_query_access_by_permission(self):
     """Test query_access_by_permission."""
     session_maker, data_access = session_creator('test')
@@ -699,6 +807,77 @@ class DaoTest(ForsetiTestCase):
           expand_groups=expansion)
       self.assertEqual(set(members), set(res[permissions[0]]))
 
+  def test_access_index(self):
+    """Test the access queries answer the same from the access index."""
+
+    def by_member(session, data_access):
+      results = set()
+      for member in ['user/u1', 'user/u2', 'user/g2g1u1', 'group/g1',
+                     'user/missing']:
+        for expand_resources in [False, True]:
+          for reverse_expand in [False, True]:
+            for role, resources in data_access.query_access_by_member(
+                session, member, ['a'], expand_resources, reverse_expand):
+              results.add((member, expand_resources, reverse_expand, role,
+                           frozenset(resources)))
+      return results
+
+    def by_resource(session, data_access):
+      results = set()
+      for resource in ['r/res1', 'r/res2', 'r/res3', 'r/missing']:
+        for permissions in [['a'], ['b'], ['a', 'b'], []]:
+          for expand_groups in [False, True]:
+            mapping = data_access.query_access_by_resource(
+                session, resource, permissions, expand_groups)
+            results.update(
+                (resource, tuple(permissions), expand_groups, role,
+                 frozenset(members)) for role, members in mapping.items())
+      return results
+
+    def by_permission(session, data_access):
+      results = set()
+      for kwargs in [{'role_name': 'viewer'}, {'role_name': 'admin'},
+                     {'permission_name': 'readonly'},
+                     {'permission_name': 'delete'}]:
+        for expand_groups in [False, True]:
+          for expand_resources in [False, True]:
+            for role, resource, members in (
+                data_access.query_access_by_permission(
+                    session, expand_groups=expand_groups,
+                    expand_resources=expand_resources, **kwargs)):
+              results.add((tuple(kwargs.values()), expand_groups,
+                           expand_resources, role, resource,
+                           frozenset(members)))
+      return results
+
+    for model, queries in [
+        (test_models.DENORMALIZATION_TESTING_1, [by_member, by_resource]),
+        (test_models.ACCESS_BY_PERMISSIONS_1, [by_permission])]:
+      session_maker, data_access = session_creator('test')
+      session = session_maker()
+      client = ModelCreatorClient(session, data_access)
+      _ = ModelCreator(model, client)
+
+      expected = [query(session, data_access) for query in queries]
+      self.assertFalse(data_access.has_access_index(session))
+
+      entry_count = data_access.build_access_index(session)
+      self.assertTrue(entry_count)
+      self.assertTrue(data_access.has_access_index(session))
+      self.assertEqual(expected,
+                       [query(session, data_access) for query in queries])
+
+      # The entries written out by resource give the same index.
+      with mock.patch.object(dao, 'ACCESS_INDEX_FLUSH_SIZE', 1):
+        self.assertEqual(entry_count,
+                         data_access.build_access_index(session))
+      self.assertEqual(expected,
+                       [query(session, data_access) for query in queries])
+
+      # Changing the model clears the index.
+      data_access.add_group_member(session, 'user/new', ['group/g1'])
+      self.assertFalse(data_access.has_access_index(session))
+
   def test_query_permissions_by_roles(self):
     """Test query_permissions_by_roles."""
     session_maker, data_access = session_creator('test')
@@ -986,6 +1165,51 @@ class DaoTest(ForsetiTestCase):
                 for r in data_access.find_resource_path(session, test_val)]
       self.assertEqual(comparison, set(result))
 
+  def test_number_resources(self):
+    """Test the hierarchy queries answer the same on numbered resources."""
+    session_maker, data_access = session_creator('test')
+    session = session_maker()
+    client = ModelCreatorClient(session, data_access)
+    _ = ModelCreator(test_models.RESOURCE_PATH_TESTING_1, client)
+
+    type_names = [r.type_name
+                  for r in session.query(data_access.TBL_RESOURCE)]
+
+    def hierarchy_queries():
+      return (
+          [[r.type_name for r in data_access.find_resource_path(session, t)]
+           for t in type_names],
+          data_access.resource_ancestors(session, type_names[-3:]),
+          {k.type_name: set(v.type_name for v in values)
+           for k, values in data_access.expand_resources_by_type_names(
+               session, type_names).items()})
+
+    expected = hierarchy_queries()
+    self.assertFalse(data_access.resources_numbered(session))
+
+    self.assertEqual(len(type_names), data_access.number_resources(session))
+    self.assertTrue(data_access.resources_numbered(session))
+    root = session.query(data_access.TBL_RESOURCE).filter_by(
+        type_name='r/r1').one()
+    self.assertEqual(10, root.post_order - root.pre_order)
+    self.assertEqual(0, root.depth)
+    leaf = session.query(data_access.TBL_RESOURCE).filter_by(
+        type_name='r/r1r6r1r1r1').one()
+    self.assertEqual(4, leaf.depth)
+    self.assertEqual(leaf.pre_order, leaf.post_order)
+    self.assertEqual(expected, hierarchy_queries())
+
+    # Resources added later are not numbered, the queries fall back to the
+    # full names.
+    data_access.add_resource_by_name(session, 'r/r1r6r1r1r1r1',
+                                     'r/r1r6r1r1r1', False)
+    self.assertFalse(data_access.resources_numbered(session))
+    self.assertIn(
+        'r/r1r6r1r1r1r1',
+        set(r.type_name for r in list(
+            data_access.expand_resources_by_type_names(
+                session, ['r/r1']).values())[0]))
+
   def test_get_member(self):
     session_maker, data_access = session_creator('test')
     session = session_maker()
@@ -47,6 +47,10 @@ class TestServiceConfig(object):
         """Stub."""
         return self.engine
 
+    def get_model_config(self):
+        """Stub."""
+        return {}
+
 
 def create_tester(inventory_config):
     """Creates a model based test runner.
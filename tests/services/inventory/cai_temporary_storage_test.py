@@ -3,6 +3,7 @@
 from future import standard_library
 standard_library.install_aliases()
 from io import StringIO
+import os
 import unittest
 
 from tests.unittest_utils import ForsetiTestCase
@@ -126,6 +127,62 @@ class CaiTemporaryStoreTest(ForsetiTestCase):
                          results)
 
 
+class CaiIndexedStoreTest(CaiTemporaryStoreTest):
+    """Test the CaiDataAccess DAO with the indexed store."""
+
+    def setUp(self):
+        """Setup method."""
+        ForsetiTestCase.setUp(self)
+        self.engine, self.dbfile = cai_temporary_storage.create_indexed_store()
+
+    def tearDown(self):
+        """Tear down method."""
+        self.engine.close()
+        os.unlink(self.dbfile)
+        ForsetiTestCase.tearDown(self)
+
+    def test_iter_cai_assets_ordered_by_name(self):
+        """Validate assets added by multiple dumps are ordered by name."""
+        parent = '//cloudresourcemanager.googleapis.com/folders/11111'
+        asset_line = ('{{"name":"//cloudresourcemanager.googleapis.com/'
+                      'projects/{0}","asset_type":"cloudresourcemanager.'
+                      'googleapis.com/Project","resource":{{"parent":"{1}",'
+                      '"data":{{"projectNumber":"{0}"}}}}}}')
+        for numbers in (['3', '1'], ['2']):
+            cai_temporary_storage.CaiDataAccess.populate_cai_data(
+                StringIO('\n'.join(asset_line.format(number, parent)
+                                    for number in numbers)),
+                self.engine)
+
+        results = cai_temporary_storage.CaiDataAccess.iter_cai_assets(
+            cai_temporary_storage.ContentTypes.resource,
+            'cloudresourcemanager.googleapis.com/Project',
+            parent,
+            self.engine)
+        self.assertEqual(['1', '2', '3'],
+                         [asset['projectNumber'] for asset, _ in results])
+
+    def test_populate_skips_duplicate_assets(self):
+        """Validate an asset is only stored once."""
+        self._add_resources()
+
+        rows = cai_temporary_storage.CaiDataAccess.populate_cai_data(
+            StringIO(CAI_RESOURCE_DATA), self.engine)
+        self.assertEqual(0, rows)
+
+    def test_fetch_missing_cai_asset(self):
+        """Validate fetching an asset which does not exist."""
+        self._add_iam_policies()
+
+        results = cai_temporary_storage.CaiDataAccess.fetch_cai_asset(
+            cai_temporary_storage.ContentTypes.resource,
+            'cloudresourcemanager.googleapis.com/Organization',
+            '//cloudresourcemanager.googleapis.com/organizations/1234567890',
+            self.engine)
+        self.assertEqual(({}, None), results)
+
+
+
 
 CAI_RESOURCE_DATA = """{"name":"//cloudresourcemanager.googleapis.com/organizations/1234567890","asset_type":"cloudresourcemanager.googleapis.com/Organization","resource":{"version":"v1beta1","discovery_document_uri":"https://cloudresourcemanager.googleapis.com/$discovery/rest","discovery_name":"Organization","data":{"creationTime":"2016-09-02T18:55:58.783Z","displayName":"test.forseti","lastModifiedTime":"2017-02-14T05:43:45.012Z","lifecycleState":"ACTIVE","name":"organizations/1234567890","organizationId":"1234567890","owner":{"directoryCustomerId":"C00h00n00"}}}}
 {"name":"//cloudresourcemanager.googleapis.com/folders/11111","asset_type":"cloudresourcemanager.googleapis.com/Folder","resource":{"version":"v2alpha1","discovery_document_uri":"https://cloudresourcemanager.googleapis.com/$discovery/rest","discovery_name":"Folder","parent":"//cloudresourcemanager.googleapis.com/organizations/1234567890","data":{"createTime":"2017-05-15T17:48:13.407Z","displayName":"test-folder-11111","lifecycleState":"ACTIVE","name":"folders/11111","parent":"organizations/1234567890"}}}
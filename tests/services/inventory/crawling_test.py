@@ -22,9 +22,11 @@ from tests.services.inventory import gcp_api_mocks
 from tests.services.util.mock import MockServerConfig
 from tests import unittest_utils
 from google.cloud.forseti.common.util import logger
+from google.cloud.forseti.common.util import token_bucket
 from google.cloud.forseti.services.base.config import InventoryConfig
 from google.cloud.forseti.services.inventory.base.progress import Progresser
 from google.cloud.forseti.services.inventory.base.storage import Memory as MemoryStorage
+from google.cloud.forseti.services.inventory import crawler
 from google.cloud.forseti.services.inventory.crawler import run_crawler
 
 LOGGER = logger.get_logger(__name__)
@@ -282,6 +284,34 @@ class CrawlerTest(CrawlerBase):
 
         self.assertEqual(expected_counts, result_counts)
 
+    def test_crawling_from_folder_incremental(self):
+        """Crawl from folder, project subtrees copied by the storage."""
+        config = InventoryConfig(
+            'folders/1032',
+            '',
+            {},
+            '',
+            {},
+            incremental_configs={'enabled': True, 'max_age_hours': 12})
+        config.set_service_config(FakeServerConfig('mock_engine'))
+
+        with mock.patch.object(
+                MemoryStorage, 'copy_unchanged_subtree',
+                side_effect=lambda resource: resource.type() == 'project'):
+            with mock.patch.object(MemoryStorage,
+                                   'enable_incremental') as mock_enable:
+                result_counts = self._run_crawler(config)
+                mock_enable.assert_called_once_with(12)
+
+        expected_counts = {
+            'folder': {'iam_policy': 2, 'resource': 2},
+            'project': {'billing_info': 1, 'enabled_apis': 1, 'iam_policy': 1,
+                        'resource': 1},
+            'sink': {'resource': 1},
+        }
+
+        self.assertEqual(expected_counts, result_counts)
+
     def test_crawling_from_folder_exclude_project(self):
         """Crawl from folder, and skip one project, verify
         expected resources crawled."""
@@ -602,6 +632,15 @@ class CloudAssetCrawlerTest(CrawlerBase):
 
         self.assertEqual(expected_counts, result_counts)
 
+    def test_cai_crawl_indexed_storage(self):
+        """Validate the indexed CAI store crawls the same resources."""
+        sqlite_counts = self._run_crawler(self.inventory_config)
+
+        self.inventory_config.cai_configs['storage'] = 'indexed'
+        indexed_counts = self._run_crawler(self.inventory_config)
+
+        self.assertEqual(sqlite_counts, indexed_counts)
+
     def test_crawl_cai_api_polling_disabled(self):
         """Validate using only CAI and no API polling works."""
         self.inventory_config.api_quota_configs = {
@@ -796,5 +835,61 @@ class CloudAssetCrawlerTest(CrawlerBase):
         self.assertEqual(expected_counts, result_counts)
 
 
+class ParallelCrawlerTest(unittest_utils.ForsetiTestCase):
+    """Test the parallel crawler scheduling."""
+
+    def test_scheduler_prefers_apis_with_tokens(self):
+        """Test callbacks for APIs out of quota are handed out last."""
+        scheduler = crawler.DispatchScheduler()
+        for name, api_name in [('crm1', 'crm'), ('crm2', 'crm'),
+                               ('admin1', 'admin'), ('other', None)]:
+            scheduler.put(name, api_name)
+
+        wait_times = {'crm': 1.0, 'admin': 0.0}
+        with mock.patch.object(token_bucket, 'wait_time',
+                               side_effect=wait_times.get):
+            order = [scheduler.get(timeout=0) for _ in range(4)]
+
+        self.assertEqual(['admin1', 'other', 'crm1', 'crm2'], order)
+        self.assertIsNone(scheduler.get(timeout=0))
+        self.assertEqual(0, scheduler.pending())
+
+    def test_scheduler_join(self):
+        """Test join returns once all the callbacks have completed."""
+        scheduler = crawler.DispatchScheduler()
+        scheduler.put('callback')
+        scheduler.get(timeout=0)
+        scheduler.task_done()
+        scheduler.join()
+
+    def test_adjust_workers(self):
+        """Test the workers shrink on throttling and grow while queued."""
+        config = crawler.ParallelCrawlerConfig(None, None, None, threads=4)
+        parallel_crawler = crawler.ParallelCrawler(config)
+        bucket = token_bucket.TokenBucket('api', 10, 1.0)
+        parallel_crawler.dispatch('callback', 'api')
+
+        with mock.patch.object(token_bucket, 'get_token_buckets',
+                               return_value=[bucket]), \
+                mock.patch.object(parallel_crawler, '_start_workers'):
+            bucket.record(0.1)
+            parallel_crawler._adjust_workers()
+            self.assertEqual(5, parallel_crawler._target_workers)
+
+            bucket.record(0.1, token_bucket.THROTTLED_STATUS)
+            parallel_crawler._adjust_workers()
+            self.assertEqual(2, parallel_crawler._target_workers)
+
+            bucket.record(0.5)
+            parallel_crawler._adjust_workers()
+            self.assertEqual(1, parallel_crawler._target_workers)
+
+            for _ in range(10):
+                bucket.record(0.1)
+                parallel_crawler._adjust_workers()
+            self.assertEqual(config.max_threads,
+                             parallel_crawler._target_workers)
+
+
 if __name__ == '__main__':
     unittest.main()
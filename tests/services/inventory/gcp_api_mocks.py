@@ -200,12 +200,27 @@ def _mock_bigquery():
     def _mock_bq_get_dataset_access(projectid, datasetid):
         return results.BQ_GET_DATASET_ACCESS[projectid][datasetid]
 
+    def _mock_bq_get_datasets_access(projectid, datasetids):
+        # The batched fetch is called with the project id of the datasets.
+        for project_number, datasets in (
+                results.BQ_GET_DATASETS_FOR_PROJECTID.items()):
+            for dataset in datasets:
+                reference = dataset['datasetReference']
+                if (reference['projectId'] == projectid and
+                        reference['datasetId'] in datasetids):
+                    return {
+                        datasetid: _mock_bq_get_dataset_access(
+                            project_number, datasetid)
+                        for datasetid in datasetids}
+        return {}
+
     bq_patcher = mock.patch(
         MODULE_PATH + 'bigquery.BigQueryClient', spec=True)
     mock_bq = bq_patcher.start().return_value
     mock_bq.get_datasets_for_projectid.side_effect = (
         _mock_bq_get_datasets_for_projectid)
     mock_bq.get_dataset_access.side_effect = _mock_bq_get_dataset_access
+    mock_bq.get_datasets_access.side_effect = _mock_bq_get_datasets_access
 
     return bq_patcher, mock_bq
 
@@ -482,6 +497,9 @@ def _mock_gcs():
     mock_gcs.get_buckets.side_effect = _mock_gcs_get_buckets
     mock_gcs.get_objects.side_effect = _mock_gcs_get_objects
     mock_gcs.get_bucket_iam_policy.side_effect = _mock_gcs_get_bucket_iam
+    mock_gcs.get_bucket_iam_policies.side_effect = (
+        lambda buckets: {bucket: _mock_gcs_get_bucket_iam(bucket)
+                         for bucket in buckets})
     mock_gcs.get_object_iam_policy.side_effect = _mock_gcs_get_object_iam
 
     return gcs_patcher, mock_gcs
@@ -539,6 +557,9 @@ def _mock_iam():
     mock_iam.get_curated_roles.side_effect = _mock_iam_get_curated_roles
     mock_iam.get_service_account_iam_policy.side_effect = (
         _mock_iam_get_service_account_iam_policy)
+    mock_iam.get_service_account_iam_policies.side_effect = (
+        lambda names: {name: _mock_iam_get_service_account_iam_policy(name)
+                       for name in names})
     mock_iam.get_service_account_keys.side_effect = (
         _mock_iam_get_service_account_keys)
 
@@ -13,12 +13,139 @@
 # limitations under the License.
 """Unit Tests: Inventory resources for Forseti Server."""
 
+import unittest.mock as mock
+
 from tests import unittest_utils
+from google.cloud.forseti.services.inventory.base import resources
 from google.cloud.forseti.services.inventory.base.resources import size_t_hash
 
 
+class FakeVisitor(object):
+    """Visitor writing resources with increasing inventory keys."""
+
+    def __init__(self, release_payloads):
+        self.config = mock.Mock(
+            variables={'release_payloads': release_payloads})
+        self.visited = []
+
+    def visit(self, resource):
+        self.visited.append(resource)
+        resource.set_inventory_key(len(self.visited))
+
+    def copy_unchanged_subtree(self, resource):
+        return False
+
+    def on_child_error(self, resource_full_name, error):
+        raise AssertionError(error)
+
+
 class ResourcesTest(unittest_utils.ForsetiTestCase):
 
     def test_size_t_hash(self):
         key = 'https://container.googleapis.com/v1/projects/test-project-1/zones/us-west1-a/clusters/test-cluster-1'
         self.assertEqual('18346789146641068219', size_t_hash(key))
+
+    def _crawl(self, release_payloads):
+        """Crawl an organization and a project with an IAM policy."""
+        organization = resources.ResourceManagerOrganization(
+            {'name': 'organizations/1'}, root=True, contains=[])
+        project = resources.ResourceManagerProject(
+            {'projectId': 'p1', 'projectNumber': 11,
+             'labels': {'env': 'prod'}}, contains=[])
+        project._set_cache('iam_policy', {'bindings': []})
+        visitor = FakeVisitor(release_payloads)
+        organization.accept(visitor)
+        project.accept(visitor, organization)
+        return organization, project
+
+    def test_parent_chain(self):
+        """Test the ancestors are reached through the parent chain."""
+        organization, project = self._crawl(release_payloads=False)
+
+        self.assertIs(organization, organization.parent())
+        self.assertIs(organization, project.parent())
+        self.assertEqual([], organization.stack())
+        self.assertEqual([organization], project.stack())
+        self.assertEqual('organization/1/project/p1/',
+                         project.get_full_resource_name())
+        self.assertEqual({'bindings': []}, project.get_iam_policy())
+        self.assertEqual({'env': 'prod'}, project['labels'])
+        self.assertFalse(hasattr(project, '__dict__'))
+
+    def test_release_payload(self):
+        """Test the data and policies are released after the crawl."""
+        _, project = self._crawl(release_payloads=True)
+
+        self.assertEqual({'projectId': 'p1', 'projectNumber': 11},
+                         project.data())
+        self.assertEqual('p1', project.key())
+        self.assertEqual('organization/1/project/p1/',
+                         project.get_full_resource_name())
+        self.assertIsNone(project.get_iam_policy())
+
+    def test_release_payload_requires_write(self):
+        """Test the payload of a resource not written is kept."""
+        project = resources.ResourceManagerProject(
+            {'projectId': 'p1', 'labels': {'env': 'prod'}}, contains=[])
+        project.release_payload()
+
+        self.assertEqual({'env': 'prod'}, project['labels'])
+
+    def test_prefetch_bucket_iam_policies(self):
+        """Bucket IAM policies are fetched in batches before crawling."""
+        client = mock.Mock()
+        client.iter_storage_buckets.return_value = [
+            ({'id': 'b{}'.format(i)}, None)
+            for i in range(resources.PREFETCH_BATCH_SIZE + 1)]
+        # The last bucket policy is not returned by the batched fetch.
+        client.fetch_storage_bucket_iam_policies.side_effect = (
+            lambda bucket_ids: {bucket_id: {'etag': bucket_id}
+                                for bucket_id in bucket_ids
+                                if bucket_id != 'b100'})
+        client.fetch_storage_bucket_iam_policy.return_value = (
+            {'etag': 'single'}, None)
+        project = resources.ResourceManagerProject(
+            {'projectId': 'p1', 'projectNumber': '1'}, contains=[])
+
+        buckets = list(
+            resources.StorageBucketIterator(project, client).iter())
+
+        self.assertEqual(2, client.fetch_storage_bucket_iam_policies.call_count)
+        self.assertEqual({'etag': 'b0'}, buckets[0].get_iam_policy(client))
+        self.assertEqual({'etag': 'single'},
+                         buckets[-1].get_iam_policy(client))
+        client.fetch_storage_bucket_iam_policy.assert_called_once_with('b100')
+
+    def test_prefetch_dataset_policies(self):
+        """Dataset policies are fetched in batches before crawling."""
+        client = mock.Mock()
+        client.iter_bigquery_datasets.return_value = [
+            ({'datasetReference': {'projectId': 'p1',
+                                   'datasetId': 'd{}'.format(i)},
+              'id': 'p1:d{}'.format(i)}, None)
+            for i in range(resources.PREFETCH_BATCH_SIZE + 1)]
+        access = [{'role': 'OWNER', 'userByEmail': 'user@example.com'}]
+        # The last dataset policy is not returned by the batched fetch.
+        client.fetch_bigquery_dataset_policies.side_effect = (
+            lambda project_id, dataset_ids: {dataset_id: access
+                                             for dataset_id in dataset_ids
+                                             if dataset_id != 'd100'})
+        client.fetch_bigquery_dataset_policy.return_value = ([], None)
+        project = resources.ResourceManagerProject(
+            {'projectId': 'p1', 'projectNumber': '1'}, contains=[])
+
+        datasets = list(
+            resources.BigqueryDataSetIterator(project, client).iter())
+
+        self.assertEqual(2, client.fetch_bigquery_dataset_policies.call_count)
+        client.fetch_bigquery_dataset_policies.assert_called_with(
+            'p1', ['d100'])
+        self.assertEqual(access, datasets[0].get_dataset_policy(client))
+        self.assertEqual(
+            {'bindings': [{'role': 'roles/bigquery.dataOwner',
+                           'members': ['user:user@example.com']}]},
+            datasets[0].get_iam_policy(client))
+        datasets[-1]._parent = project
+        self.assertEqual([], datasets[-1].get_dataset_policy(client))
+        client.fetch_bigquery_dataset_policy.assert_called_once_with(
+            'p1', '1', 'd100')
@@ -272,6 +272,134 @@ class StorageTest(ForsetiTestCase):
                                      [])),
                                  'No types should yield empty list')
 
+    @mock.patch('google.cloud.forseti.services.inventory.storage.ID_BLOCK_SIZE',
+                4)
+    def test_write_links_parents_with_reserved_ids(self):
+        """Rows written in bulk keep the ids given to the resources."""
+        initialize(self.engine)
+        scoped_sessionmaker = db.create_scoped_sessionmaker(self.engine)
+
+        res_org = ResourceMock('1', {'id': 'test'}, 'organization', 'resource')
+        resources = [res_org]
+        for i in range(10):
+            res_proj = ResourceMock('p{}'.format(i), {'id': i}, 'project',
+                                    'resource', res_org)
+            res_proj.set_iam_policy({'id': i})
+            res_buc = ResourceMock('b{}'.format(i), {'id': i}, 'bucket',
+                                   'resource', res_proj)
+            resources.extend([res_proj, res_buc])
+
+        with scoped_sessionmaker() as session:
+            with Storage(session, self.engine) as storage:
+                for resource in resources:
+                    storage.write(resource)
+                keys = [resource.inventory_key() for resource in resources]
+                storage.commit()
+                inventory_index_id = storage.inventory_index.id
+                self.assertEqual(31, storage.inventory_index.counter)
+
+            self.assertEqual(sorted(keys), keys)
+            rows = {row.id: row for category in Categories
+                    for row in DataAccess.iter(session, inventory_index_id,
+                                               [], category)}
+            self.assertEqual(31, len(rows))
+            for resource in resources[1:]:
+                row = rows[resource.inventory_key()]
+                self.assertEqual(resource.get_full_resource_name(),
+                                 row.get_full_name())
+                self.assertEqual(resource.parent().inventory_key(),
+                                 row.get_parent_id())
+            iam_policies = [row for row in rows.values()
+                            if row.get_category() == 'iam_policy']
+            self.assertEqual(10, len(iam_policies))
+            for row in iam_policies:
+                self.assertEqual('project',
+                                 rows[row.get_parent_id()].get_resource_type())
+
+    def test_incremental_copies_unchanged_subtrees(self):
+        """Unchanged projects have their subtree copied, others are not."""
+
+        def inventory_rows(session, inventory_index_id):
+            rows = set()
+            for category in Categories:
+                for item, parent in DataAccess.iter(
+                        session, inventory_index_id, [], category,
+                        with_parent=True):
+                    rows.add((item.get_full_name(), item.get_category(),
+                              item.get_resource_data_raw(),
+                              parent.get_full_name()))
+            return rows
+
+        initialize(self.engine)
+        scoped_sessionmaker = db.create_scoped_sessionmaker(self.engine)
+
+        res_org = ResourceMock('1', {'id': 'test'}, 'organization', 'resource')
+        res_proj1 = ResourceMock('2', {'id': 'test'}, 'project', 'resource',
+                                 res_org)
+        res_proj1.set_iam_policy({'id': 'test'})
+        res_buc1 = ResourceMock('3', {'id': 'test'}, 'bucket', 'resource',
+                                res_proj1)
+        res_buc1.set_iam_policy({'id': 'bucket'})
+        res_obj1 = ResourceMock('4', {'id': 'test'}, 'object', 'resource',
+                                res_buc1)
+        res_proj2 = ResourceMock('5', {'id': 'test'}, 'project', 'resource',
+                                 res_org)
+        res_buc2 = ResourceMock('6', {'id': 'test'}, 'bucket', 'resource',
+                                res_proj2)
+        mock.patch.object(res_proj1, 'get_fingerprint',
+                          return_value='unchanged').start()
+        fingerprint2 = mock.patch.object(res_proj2, 'get_fingerprint',
+                                         return_value='before').start()
+
+        with scoped_sessionmaker() as session:
+            with Storage(session, self.engine) as storage:
+                storage.enable_incremental(24)
+                self.assertIsNone(storage.previous_inventory_index_id)
+                for resource in [res_org, res_proj1, res_buc1, res_obj1,
+                                 res_proj2, res_buc2]:
+                    storage.write(resource)
+                storage.commit()
+                first_index_id = storage.inventory_index.id
+
+        # The mock organization is its own parent, reset the key written
+        # by the first inventory.
+        res_org.set_inventory_key(None)
+        fingerprint2.return_value = 'after'
+        with scoped_sessionmaker() as session:
+            with Storage(session, self.engine) as storage:
+                storage.enable_incremental(24)
+                self.assertEqual(first_index_id,
+                                 storage.previous_inventory_index_id)
+                storage.write(res_org)
+                storage.write(res_proj1)
+                # Ids reserved but not written yet, like those of a row
+                # still queued by another thread.
+                reserved_ids = storage._allocate_ids(3)
+                self.assertTrue(storage.copy_unchanged_subtree(res_proj1))
+                storage.write(res_proj2)
+                self.assertFalse(storage.copy_unchanged_subtree(res_proj2))
+                storage.write(res_buc2)
+                storage.commit()
+                second_index_id = storage.inventory_index.id
+                self.assertEqual(8, storage.inventory_index.counter)
+
+            self.assertEqual(inventory_rows(session, first_index_id),
+                             inventory_rows(session, second_index_id))
+            second_ids = [row.id for category in Categories
+                          for row in DataAccess.iter(
+                              session, second_index_id, [], category)]
+            self.assertEqual(8, len(second_ids))
+            self.assertFalse(set(reserved_ids).intersection(second_ids))
+
+        with scoped_sessionmaker() as session:
+            with Storage(session, self.engine) as storage:
+                # The copied subtree was crawled in the first inventory.
+                storage.enable_incremental(0)
+                storage.write(res_org)
+                storage.write(res_proj1)
+                self.assertFalse(storage.copy_unchanged_subtree(res_proj1))
+                storage.commit()
+
 
 class InventoryIndexTest(ForsetiTestCase):
     """Test inventory storage."""
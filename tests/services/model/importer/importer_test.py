@@ -17,6 +17,7 @@ from __future__ import print_function
 from builtins import object
 import unittest.mock as mock
 import os
+from queue import Queue
 import shutil
 import tempfile
 import unittest
@@ -39,14 +40,19 @@ class ServiceConfig(object):
     """Helper class to implement dependency injection to Forseti Server services.
     """
 
-    def __init__(self, db_connect_string):
+    def __init__(self, db_connect_string, model_config=None):
         engine = create_engine(db_connect_string, echo=False)
         self.model_manager = ModelManager(engine)
+        self.model_config = model_config or {}
 
     def run_in_background(self, function):
         """Runs a function in a thread pool in the background."""
         return function()
 
+    def get_model_config(self):
+        """Get the model config."""
+        return self.model_config
+
 
 def get_db_file_path(db_name):
     module_dir = os.path.dirname(os.path.abspath(__file__))
@@ -203,6 +209,118 @@ class ImporterTest(ForsetiTestCase):
              },
             model_description)
 
+    def _import_model_snapshot(self, model_config):
+        """Import the test inventory and return a snapshot of the model."""
+        db_connect = 'sqlite:///{}'.format(
+            get_db_file_copy('forseti-test.db'))
+        service_config = ServiceConfig(db_connect, model_config)
+        model_manager = service_config.model_manager
+        model_name = model_manager.create(name=self.source)
+        scoped_session, data_access = model_manager.get(model_name)
+
+        with scoped_session as session:
+            import_runner = self.importer_cls(
+                session,
+                session,
+                model_manager.model(model_name,
+                                    expunge=False,
+                                    session=session),
+                data_access,
+                service_config,
+                inventory_index_id=FAKE_DATETIME_TIMESTAMP)
+            import_runner.run()
+
+            snapshot = {
+                'resources': sorted(
+                    (r.type_name, r.full_name, r.parent_type_name)
+                    for r in session.query(data_access.TBL_RESOURCE)),
+                'bindings': sorted(
+                    (b.resource_type_name, b.role_name,
+                     tuple(sorted(m.name for m in b.members)))
+                    for b in session.query(data_access.TBL_BINDING)),
+                'members': sorted(
+                    m.name for m in session.query(data_access.TBL_MEMBER)),
+                'group_in_group': sorted(
+                    (g.parent, g.member)
+                    for g in session.query(data_access.TBL_GROUP_IN_GROUP)),
+                'roles': sorted(
+                    r.name for r in session.query(data_access.TBL_ROLE)),
+            }
+
+        model = model_manager.model(model_name)
+        self.assertIn(model.state,
+                      ['SUCCESS', 'PARTIAL_SUCCESS'],
+                      'Model state should be success or partial success: %s' %
+                      model.message)
+        snapshot['message'] = model.message
+        return snapshot
+
+    def test_inventory_importer_parallel(self):
+        """Test the parallel importer creates the same model as serial."""
+        serial_snapshot = self._import_model_snapshot({})
+        parallel_snapshot = self._import_model_snapshot(
+            {'import_workers': 4})
+
+        self.assertTrue(serial_snapshot['resources'])
+        self.assertTrue(serial_snapshot['bindings'])
+        self.assertEqual(serial_snapshot, parallel_snapshot)
+
+    def test_inventory_importer_denorm_groups_in_memory(self):
+        """Test the groups denormalized in memory match the SQL ones."""
+        sql_snapshot = self._import_model_snapshot({})
+        in_memory_snapshot = self._import_model_snapshot(
+            {'denorm_groups_in_memory': True})
+
+        self.assertTrue(sql_snapshot['group_in_group'])
+        self.assertEqual(sql_snapshot, in_memory_snapshot)
+
+    def test_inventory_importer_access_index(self):
+        """Test the importer builds the access index used by the queries."""
+        db_connect = 'sqlite:///{}'.format(
+            get_db_file_copy('forseti-test.db'))
+        service_config = ServiceConfig(db_connect, {'access_index': True})
+        model_manager = service_config.model_manager
+        model_name = model_manager.create(name=self.source)
+        scoped_session, data_access = model_manager.get(model_name)
+
+        with scoped_session as session:
+            import_runner = self.importer_cls(
+                session,
+                session,
+                model_manager.model(model_name,
+                                    expunge=False,
+                                    session=session),
+                data_access,
+                service_config,
+                inventory_index_id=FAKE_DATETIME_TIMESTAMP)
+            import_runner.run()
+
+            self.assertTrue(data_access.has_access_index(session))
+            expected_abc_user_accesses = [
+                ('roles/appengine.appViewer', ['project/project3']),
+                ('roles/appengine.codeViewer', ['project/project3']),
+                ('roles/bigquery.dataViewer', ['dataset/project2:bq_test_ds']),
+                ('roles/bigquery.dataViewer', ['dataset/project3:bq_test_ds1']),
+            ]
+            abc_user_accesses = data_access.query_access_by_member(
+                session, 'user/abc_user@forseti.test', [])
+            self.assertEqual(expected_abc_user_accesses,
+                             sorted(abc_user_accesses))
+
+    @mock.patch.object(importer, 'SHARD_QUEUE_PUT_TIMEOUT', 0.01)
+    def test_put_in_shard_stopped_worker(self):
+        """A full shard queue never blocks once its worker stopped."""
+        shard_queue = Queue(1)
+        shard_future = mock.Mock()
+        shard_future.done.return_value = False
+        self.assertTrue(InventoryImporter._put_in_shard(
+            shard_queue, shard_future, 'resource'))
+
+        shard_future.done.side_effect = [False, True]
+        self.assertFalse(InventoryImporter._put_in_shard(
+            shard_queue, shard_future, None))
+        self.assertEqual(2, shard_future.done.call_count)
+
     def test_model_action_wrapper_post_action_called(self):
         session = mock.Mock()
         session.flush = mock.Mock()
@@ -17,9 +17,12 @@ from builtins import str
 from builtins import range
 import os
 import unittest
+import sqlalchemy
 from tests.unittest_utils import ForsetiTestCase
 from tests.services.util.db import create_test_engine_with_file
 from google.cloud.forseti.common.util.threadpool import ThreadPool
+from google.cloud.forseti.services.dao import generate_model_seed
+from google.cloud.forseti.services.dao import Model
 from google.cloud.forseti.services.dao import ModelManager
 
 
@@ -45,6 +48,33 @@ class ModelManagerTest(ForsetiTestCase):
         self.assertEqual(0, len(self.model_manager.models()),
                          'Expecting no models to exist after deletion')
 
+    def test_migrate_models(self):
+        """Columns missing from the models of a previous version are added."""
+        with self.model_manager.modelmaker() as session:
+            session.add(Model(handle='legacy', name='legacy',
+                              state='SUCCESS',
+                              etag_seed=generate_model_seed(),
+                              description='{}'))
+        self.engine.execute('CREATE TABLE legacy_resources ('
+                            'type_name VARCHAR(700) PRIMARY KEY, '
+                            'full_name VARCHAR(2048) NOT NULL, '
+                            'parent_type_name VARCHAR(700), '
+                            'name VARCHAR(512) NOT NULL, '
+                            'type VARCHAR(128) NOT NULL)')
+
+        model_manager = ModelManager(self.engine)
+
+        inspector = sqlalchemy.inspect(self.engine)
+        self.assertIn('pre_order', set(
+            c['name'] for c in inspector.get_columns('legacy_resources')))
+        self.assertIn(['pre_order'], [
+            i['column_names']
+            for i in inspector.get_indexes('legacy_resources')])
+        scoped_session, data_access = model_manager.get('legacy')
+        with scoped_session as session:
+            self.assertEqual(
+                [], data_access.find_resource_path(session, 'r/r1'))
+
     def test_create_get_delete_multiple_models(self):
         """Start with no models, create multiple, delete them again."""
         self.assertEqual(0, len(self.model_manager.models()),
@@ -20,6 +20,7 @@ import hashlib
 
 import json
 import os
+import threading
 import unittest
 import unittest.mock as mock
 from sqlalchemy.orm import sessionmaker
@@ -30,6 +31,7 @@ from tests.services.util.db import create_test_engine_with_file
 from tests.unittest_utils import ForsetiTestCase
 from google.cloud.forseti.common.util import date_time
 from google.cloud.forseti.common.util.index_state import IndexState
+from google.cloud.forseti.scanner import scanner
 from google.cloud.forseti.services.scanner import dao as scanner_dao
 
 
@@ -105,6 +107,98 @@ class ScannerDaoTest(scanner_base_db.ScannerBaseDbTestCase):
                                          saved_key_value)
                     )
 
+    @mock.patch.object(scanner_dao, 'VIOLATION_BATCH_MAX_ROWS', 3)
+    def test_save_violations_from_generator_in_batches(self):
+        """Test violations from a generator are saved in several batches."""
+        violation_count = 10
+
+        def generate_violations():
+            for i in range(violation_count):
+                violation = dict(scanner_base_db.FAKE_VIOLATIONS[i % 2])
+                violation['resource_id'] = 'fake_firewall_{}'.format(i)
+                yield violation
+
+        scanner_index_id = scanner.init_scanner_index(
+            self.session, self.inv_index_id1)
+        with mock.patch.object(self.session, 'execute',
+                               wraps=self.session.execute) as mock_execute:
+            saved_count = self.violation_access.create(
+                generate_violations(), scanner_index_id)
+        scanner.mark_scanner_index_complete(
+            self.session, scanner_index_id, ['IamPolicyScanner'], [])
+
+        self.assertEqual(violation_count, saved_count)
+        self.assertEqual(4, mock_execute.call_count)
+        saved_violations = self.violation_access.list(
+            scanner_index_id=scanner_index_id)
+        self.assertEqual(
+            ['fake_firewall_{}'.format(i) for i in range(violation_count)],
+            [violation.resource_id for violation in saved_violations])
+        for saved in saved_violations:
+            self.assertEqual(
+                scanner_dao._create_violation_hash(
+                    saved.full_name,
+                    saved.resource_data,
+                    json.loads(saved.violation_data),
+                    saved.rule_name),
+                saved.violation_hash)
+
+    @mock.patch.object(scanner_dao, 'VIOLATION_BATCH_MAX_ROWS', 3)
+    def test_save_violations_locked_per_batch(self):
+        """Test the lock is held by inserts, not while violations are made."""
+        lock_free = []
+        locked_executes = []
+
+        def try_lock():
+            acquired = self.violation_access.lock.acquire(blocking=False)
+            if acquired:
+                self.violation_access.lock.release()
+            lock_free.append(acquired)
+
+        def generate_violations():
+            for i in range(5):
+                # The lock is reentrant, try it from another thread.
+                thread = threading.Thread(target=try_lock)
+                thread.start()
+                thread.join()
+                violation = dict(scanner_base_db.FAKE_VIOLATIONS[i % 2])
+                violation['resource_id'] = 'fake_firewall_{}'.format(i)
+                yield violation
+
+        def execute(*args, **kwargs):
+            locked_executes.append(
+                self.violation_access.lock._is_owned())
+            return session_execute(*args, **kwargs)
+
+        scanner_index_id = scanner.init_scanner_index(
+            self.session, self.inv_index_id1)
+        session_execute = self.session.execute
+        with mock.patch.object(self.session, 'execute', side_effect=execute):
+            saved_count = self.violation_access.create(
+                generate_violations(), scanner_index_id)
+
+        self.assertEqual(5, saved_count)
+        self.assertEqual([True] * 5, lock_free)
+        self.assertEqual([True, True], locked_executes)
+
+    def test_save_violations_without_violation_data(self):
+        """Test the hash of a violation without violation data is stable."""
+        violation = dict(scanner_base_db.FAKE_VIOLATIONS[0])
+        del violation['violation_data']
+        scanner_index_id = self.populate_db(
+            violations=[violation], inv_index_id=self.inv_index_id1)
+        saved = self.violation_access.list(
+            scanner_index_id=scanner_index_id)[0]
+
+        self.assertEqual('null', saved.violation_data)
+        self.assertEqual(
+            scanner_dao._create_violation_hash(
+                violation['full_name'],
+                violation['resource_data'],
+                '',
+                violation['rule_name']),
+            saved.violation_hash)
+
     @mock.patch.object(scanner_dao, '_create_violation_hash')
     def test_convert_sqlalchemy_object_to_dict(self, mock_violation_hash):
         mock_violation_hash.side_effect = [
@@ -455,6 +549,23 @@ class ViolationListTest(scanner_base_db.ScannerBaseDbTestCase):
             scanner_index_id=scanner_index_id)
         self.assertEqual(0, len(actual_data))
 
+    def test_iter_with_scnr_index_in_blocks(self):
+        scanner_index_id = self.populate_db(inv_index_id=self.inv_index_id1)
+        self.populate_db(inv_index_id=self.inv_index_id3)
+        expected_ids = sorted(
+            violation.id for violation in self.violation_access.list(
+                scanner_index_id=scanner_index_id))
+        actual_data = list(self.violation_access.iter(scanner_index_id,
+                                                      block_size=1))
+        self.assertEqual(expected_ids,
+                         [violation.id for violation in actual_data])
+
+    def test_iter_with_scnr_index_failed_scan(self):
+        scanner_index_id = self.populate_db(
+            inv_index_id=self.inv_index_id1, succeeded=[], failed=['IapScanner']
+        )
+        self.assertEqual([], list(self.violation_access.iter(scanner_index_id)))
+
     def test_list_with_both_indices(self):
         scanner_index_id = self.populate_db(
             inv_index_id=self.inv_index_id1, succeeded=[], failed=['IapScanner']
@@ -139,12 +139,7 @@ class ResourceMock(Resource):
         self._full_resource_name = None
         self._root = parent is None
         self._metadata = None
-
-    def _set_cache(self, field_name, value):
-        """Manually set a cache value if it isn't already set."""
-        field_name = '__cached_{}'.format(field_name)
-        if not hasattr(self, field_name) or getattr(self, field_name) is None:
-            setattr(self, field_name, value)
+        self._cache = {}
 
     def type(self):
         return self._res_type